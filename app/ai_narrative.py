@@ -0,0 +1,167 @@
+"""
+Memoized OpenAI narratives for reports and EOD emails.
+
+The client report narrative, the per-user productivity assessment and the
+account executive summary are all prompts built from structured figures.
+When the figures haven't changed, neither should the narrative, so each
+completion is cached under a hash of the full request (kind, model,
+messages, max_tokens, temperature) for ``AI_NARRATIVE_TTL_SECONDS``.
+
+  • coalescing - concurrent identical requests share one OpenAI call; the
+                 others wait for its result
+  • timeout    - the call gets ``AI_NARRATIVE_TIMEOUT_SECONDS`` plus the time
+                 to generate ``max_tokens`` at ``AI_NARRATIVE_TOKENS_PER_SECOND``
+                 (no retries), so the 2000-token report narrative is not held
+                 to a short summary's budget; on timeout or any API error the
+                 caller's rule-based ``fallback`` is returned instead, and is
+                 not cached, so the next request tries the model again
+  • metrics    - calls, cache hits, coalesced waits, fallbacks, timeouts,
+                 latency and prompt/completion tokens, per kind, in
+                 ``narrative_metrics()`` (shown on the notification status)
+
+Configuration via environment variables:
+  AI_NARRATIVE_TTL_SECONDS        - cache lifetime (default 21600 = 6h; 0 disables)
+  AI_NARRATIVE_TIMEOUT_SECONDS    - per-call base budget (default 20)
+  AI_NARRATIVE_TOKENS_PER_SECOND  - generation rate the budget allows for
+                                    (default 40; 0 = base budget only)
+  AI_NARRATIVE_CACHE_SIZE         - max cached narratives (default 256)
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+
+log = logging.getLogger("ai_narrative")
+
+TTL_SECONDS = float(os.getenv("AI_NARRATIVE_TTL_SECONDS", "21600"))
+TIMEOUT_SECONDS = float(os.getenv("AI_NARRATIVE_TIMEOUT_SECONDS", "20"))
+TOKENS_PER_SECOND = float(os.getenv("AI_NARRATIVE_TOKENS_PER_SECOND", "40"))
+CACHE_SIZE = int(os.getenv("AI_NARRATIVE_CACHE_SIZE", "256"))
+
+_cache: "OrderedDict[str, tuple[float, str]]" = OrderedDict()
+_inflight: dict[str, dict] = {}
+_lock = threading.Lock()
+_metrics: dict[str, dict] = {}
+
+
+def _bump(kind: str, **counts) -> None:
+    with _lock:
+        m = _metrics.setdefault(kind, {
+            "calls": 0, "hits": 0, "coalesced": 0, "fallbacks": 0, "timeouts": 0,
+            "latency_ms_total": 0, "latency_ms_max": 0,
+            "prompt_tokens": 0, "completion_tokens": 0,
+        })
+        for k, v in counts.items():
+            if k == "latency_ms_max":
+                m[k] = max(m[k], v)
+            else:
+                m[k] += v
+
+
+def narrative_metrics() -> dict:
+    with _lock:
+        out = {k: dict(v) for k, v in _metrics.items()}
+        cached = len(_cache)
+    for m in out.values():
+        m["latency_ms_avg"] = round(m["latency_ms_total"] / m["calls"]) if m["calls"] else 0
+    return {"cached": cached, "ttl_seconds": TTL_SECONDS,
+            "timeout_seconds": TIMEOUT_SECONDS, "tokens_per_second": TOKENS_PER_SECOND,
+            "by_kind": out}
+
+
+def timeout_for(max_tokens: int) -> float:
+    """Seconds to allow a completion of up to ``max_tokens``."""
+    if TOKENS_PER_SECOND <= 0:
+        return TIMEOUT_SECONDS
+    return TIMEOUT_SECONDS + max_tokens / TOKENS_PER_SECOND
+
+
+def clear_cache() -> None:
+    with _lock:
+        _cache.clear()
+
+
+def _cache_key(kind, model, messages, max_tokens, temperature) -> str:
+    raw = json.dumps([kind, model, messages, max_tokens, temperature], sort_keys=True)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+def _call_openai(messages, model, max_tokens, temperature, timeout):
+    """One chat completion. Returns (text, usage dict)."""
+    from openai import OpenAI
+    from app.config import OPENAI_API_KEY
+    client = OpenAI(api_key=OPENAI_API_KEY, timeout=timeout, max_retries=0)
+    resp = client.chat.completions.create(
+        model=model, messages=messages, max_tokens=max_tokens, temperature=temperature,
+    )
+    usage = getattr(resp, "usage", None)
+    return (resp.choices[0].message.content or "").strip(), {
+        "prompt_tokens": int(getattr(usage, "prompt_tokens", 0) or 0),
+        "completion_tokens": int(getattr(usage, "completion_tokens", 0) or 0),
+    }
+
+
+def complete(kind: str, messages: list[dict], fallback, *, model: str = "gpt-4o-mini",
+             max_tokens: int = 400, temperature: float = 0.7,
+             timeout: float = None) -> tuple[str, str]:
+    """Return ``(text, source)`` for a chat completion, where source is
+    ``"cache"``, ``"model"`` or ``"fallback"``. ``fallback()`` produces the
+    rule-based text used when the call times out or fails. ``timeout``
+    defaults to ``timeout_for(max_tokens)``."""
+    timeout = timeout_for(max_tokens) if timeout is None else timeout
+    key = _cache_key(kind, model, messages, max_tokens, temperature)
+    now = time.monotonic()
+    with _lock:
+        hit = _cache.get(key)
+        if hit and hit[0] > now:
+            _cache.move_to_end(key)
+        else:
+            hit = None
+            flight = _inflight.get(key)
+            leader = flight is None
+            if leader:
+                flight = _inflight[key] = {"done": threading.Event(), "text": None}
+    if hit:
+        _bump(kind, hits=1)
+        return hit[1], "cache"
+
+    if not leader:
+        _bump(kind, coalesced=1)
+        if flight["done"].wait(timeout) and flight["text"] is not None:
+            return flight["text"], "model"
+        _bump(kind, fallbacks=1)
+        return fallback(), "fallback"
+
+    text = None
+    t = time.perf_counter()
+    try:
+        text, usage = _call_openai(messages, model, max_tokens, temperature, timeout)
+        ms = int((time.perf_counter() - t) * 1000)
+        _bump(kind, calls=1, latency_ms_total=ms, latency_ms_max=ms, **usage)
+        log.info("AI narrative %s: %dms, %d+%d tokens", kind, ms,
+                 usage["prompt_tokens"], usage["completion_tokens"])
+    except Exception as exc:
+        ms = int((time.perf_counter() - t) * 1000)
+        timed_out = "timeout" in type(exc).__name__.lower()
+        _bump(kind, calls=1, fallbacks=1, timeouts=int(timed_out),
+              latency_ms_total=ms, latency_ms_max=ms)
+        log.error(f"AI narrative {kind} {'timed out' if timed_out else 'failed'} after {ms}ms: {exc}")
+    finally:
+        with _lock:
+            if text and TTL_SECONDS > 0:
+                _cache[key] = (time.monotonic() + TTL_SECONDS, text)
+                _cache.move_to_end(key)
+                while len(_cache) > CACHE_SIZE:
+                    _cache.popitem(last=False)
+            flight["text"] = text or None
+            _inflight.pop(key, None)
+        flight["done"].set()
+    if text:
+        return text, "model"
+    return fallback(), "fallback"
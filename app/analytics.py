@@ -0,0 +1,413 @@
+"""
+Columnar analytics cache for the Team Production report.
+
+get_production_report re-read and re-aggregated raw rows on every request -
+including a Python pass over every Owner-attributed claim in the book that
+re-parsed four date strings per claim - so each move of the admin's date
+picker was a full re-aggregation. This module keeps the report's facts in
+memory as NumPy column arrays and answers a date window with vectorized
+reductions:
+
+  • claims      - per claim: owner, uploader, the bill / denied / paid / DOS
+                  dates as ordinals (parsed once, with the report's own rules),
+                  charge, paid and open balance
+  • production  - per team_production row: user, category, quantity, hours
+                  and the work date (ranked among the distinct date strings,
+                  so a window keeps SQL's text comparison)
+  • incremental - facts are partitioned by client and keyed on the per-client
+                  write counters (``client_data_versions``), so a write
+                  reloads only that client's partition
+  • fallback    - without NumPy, with ``ANALYTICS_CACHE=0`` or past
+                  ``ANALYTICS_MAX_ROWS`` every query returns None and the
+                  report runs its SQL path unchanged
+
+Sums accumulate in row-id order (``np.bincount`` weights add sequentially),
+so the totals match the SQL path's float-for-float.
+
+Configuration via environment variables:
+  ANALYTICS_CACHE     - "0" disables the columnar path (default on)
+  ANALYTICS_MAX_ROWS  - largest table held in memory (default 2,000,000)
+"""
+
+from __future__ import annotations
+
+import bisect
+import logging
+import os
+import threading
+import time
+from datetime import date
+from decimal import ROUND_HALF_UP, Decimal
+
+np = None   # imported on first use (see available()); it is optional
+
+log = logging.getLogger("analytics")
+
+ENABLED = os.getenv("ANALYTICS_CACHE", "1").strip().lower() not in ("0", "false", "no", "off")
+MAX_ROWS = int(os.getenv("ANALYTICS_MAX_ROWS", "2000000"))
+
+STATS = {"partition_loads": 0, "rows_loaded": 0, "load_seconds": 0.0, "queries": 0, "fallbacks": 0}
+
+_lock = threading.Lock()
+_numpy_missing = False
+
+
+def available() -> bool:
+    global np, _numpy_missing
+    if not ENABLED or _numpy_missing:
+        return False
+    if np is None:
+        try:
+            import numpy
+        except Exception:  # pragma: no cover - optional dependency
+            _numpy_missing = True
+            log.info("numpy is not installed; production reports use SQL")
+            return False
+        np = numpy
+    return True
+
+
+def _ordinal(raw) -> int:
+    """Ordinal of an ISO date string, 0 when blank or unparseable."""
+    try:
+        return date.fromisoformat(str(raw or "").strip()).toordinal()
+    except (ValueError, TypeError):
+        return 0
+
+
+def sql_round(value, digits: int) -> float:
+    """SQLite's ROUND(): half away from zero on the value's 15-digit decimal
+    form (Python's round() is half-to-even on the binary value)."""
+    q = Decimal(1).scaleb(-digits)
+    return float(Decimal("%.15g" % float(value or 0)).quantize(q, rounding=ROUND_HALF_UP))
+
+
+class _Strings:
+    """Interned strings (and None): columns hold ids, lookups go by id."""
+
+    def __init__(self):
+        self.ids: dict = {}
+        self.values: list = []
+
+    def id(self, value) -> int:
+        i = self.ids.get(value)
+        if i is None:
+            i = self.ids[value] = len(self.values)
+            self.values.append(value)
+        return i
+
+
+class _Table:
+    """One fact table: per-client partitions of column arrays, merged into a
+    single id-ordered set of columns when any partition changes."""
+
+    def __init__(self, table: str, columns: dict, load_sql: str, load_row):
+        self.table = table
+        self.columns = columns          # name -> dtype
+        self.load_sql = load_sql        # one client's rows; ? = client_id
+        self.load_row = load_row        # (row, strings) -> tuple in column order
+        self.strings = _Strings()
+        self.parts: dict = {}           # client_id -> (version, {col: array})
+        self.merged = None
+        self.merged_key = None
+
+    def _load_part(self, conn, client_id: int) -> dict:
+        rows = conn.execute(self.load_sql, (client_id,)).fetchall()
+        data = [self.load_row(r, self.strings) for r in rows]
+        cols = {}
+        for i, (name, dtype) in enumerate(self.columns.items()):
+            cols[name] = np.fromiter((d[i] for d in data), dtype=dtype, count=len(data))
+        STATS["partition_loads"] += 1
+        STATS["rows_loaded"] += len(data)
+        return cols
+
+    def refresh(self, conn):
+        """Bring partitions in line with the per-client write counters and
+        return the merged columns (None past MAX_ROWS)."""
+        versions = {int(r[0]): int(r[1]) for r in conn.execute(
+            "SELECT client_id, version FROM client_data_versions WHERE table_name=?",
+            (self.table,))}
+        # Rows written before the counters existed have no version row yet.
+        for r in conn.execute(f"SELECT DISTINCT client_id FROM {self.table}"):
+            if r[0] is not None:
+                versions.setdefault(int(r[0]), 0)
+        key = tuple(sorted(versions.items()))
+        if key == self.merged_key:
+            return self.merged
+        self.merged_key = key
+        total = conn.execute(f"SELECT COUNT(*) FROM {self.table}").fetchone()[0]
+        if total > MAX_ROWS:
+            log.info("%s has %d rows (> ANALYTICS_MAX_ROWS); using SQL", self.table, total)
+            self.parts.clear()
+            self.merged = None
+            return None
+        t = time.perf_counter()
+        for cid in [c for c in self.parts if c not in versions]:
+            del self.parts[cid]
+        for cid, version in versions.items():
+            part = self.parts.get(cid)
+            if part is None or part[0] != version:
+                self.parts[cid] = (version, self._load_part(conn, cid))
+        STATS["load_seconds"] += time.perf_counter() - t
+        parts = [self.parts[cid][1] for cid in sorted(self.parts)]
+        merged = {name: np.concatenate([p[name] for p in parts]) if parts
+                  else np.empty(0, dtype=dtype) for name, dtype in self.columns.items()}
+        order = np.argsort(merged["id"], kind="stable")
+        self.merged = {name: col[order] for name, col in merged.items()}
+        return self.merged
+
+
+def _claim_row(r, strings: _Strings) -> tuple:
+    st = str(r["st"] or "").strip().lower()
+    dd_raw = str(r["dd"] or "").strip()
+    bd_raw = str(r["bd"] or "").strip()
+    dkey = _ordinal(dd_raw) or _ordinal(bd_raw)
+    pkey = _ordinal(r["pd"]) or _ordinal(bd_raw) or _ordinal(r["dos"])
+    return (
+        r["id"], r["client_id"], strings.id(str(r["owner"] or "").strip()),
+        strings.id(str(r["uploader"] or "")),
+        _ordinal(bd_raw), st in ("denied", "appeals") or bool(dd_raw), dkey, pkey, _ordinal(r["dos"]),
+        float(r["amt"] or 0), float(r["paid"] or 0), float(r["bal"] or 0),
+    )
+
+
+def _production_row(r, strings: _Strings) -> tuple:
+    return (
+        r["id"], r["client_id"], strings.id(r["username"]), strings.id(r["category"]),
+        strings.id(r["work_date"]), float(r["quantity"] or 0), float(r["time_spent"] or 0),
+    )
+
+
+_CLAIMS = None
+_PRODUCTION = None
+_DB_PATH = None
+
+
+def _tables(db_path: str):
+    global _CLAIMS, _PRODUCTION, _DB_PATH
+    if _CLAIMS is None or db_path != _DB_PATH:
+        _DB_PATH = db_path
+        _CLAIMS = _Table(
+            "claims_master",
+            {"id": np.int64, "client_id": np.int64, "owner": np.int32, "uploader": np.int32,
+             "bd": np.int32, "denied": np.bool_, "dkey": np.int32, "pkey": np.int32,
+             "dos": np.int32, "amt": np.float64, "paid": np.float64, "bal": np.float64},
+            "SELECT id, client_id, TRIM(Owner) AS owner, "
+            "       substr(COALESCE(BillDate,''),1,10) AS bd, "
+            "       substr(COALESCE(DeniedDate,''),1,10) AS dd, "
+            "       substr(COALESCE(PaidDate,''),1,10) AS pd, "
+            "       substr(COALESCE(DOS,''),1,10) AS dos, "
+            "       COALESCE(ClaimStatus,'') AS st, "
+            "       COALESCE(ChargeAmount,0) AS amt, "
+            "       COALESCE(PaidAmount,0) AS paid, "
+            "       COALESCE(BalanceRemaining,0) AS bal, "
+            "       TRIM(COALESCE(uploaded_by,'')) AS uploader "
+            "FROM claims_master WHERE client_id=?",
+            _claim_row)
+        _PRODUCTION = _Table(
+            "team_production",
+            {"id": np.int64, "client_id": np.int64, "user": np.int32, "category": np.int32,
+             "work_date": np.int32, "quantity": np.float64, "hours": np.float64},
+            "SELECT id, client_id, username, category, work_date, quantity, time_spent "
+            "FROM team_production WHERE client_id=?",
+            _production_row)
+    return _CLAIMS, _PRODUCTION
+
+
+def _facts(which: str):
+    from app import client_db
+    claims, production = _tables(client_db.DATABASE_PATH)
+    table = claims if which == "claims" else production
+    conn = client_db.get_db()
+    try:
+        cols = table.refresh(conn)
+    finally:
+        conn.close()
+    STATS["queries"] += 1
+    if cols is None:
+        STATS["fallbacks"] += 1
+    return table, cols
+
+
+def _sum(value):
+    """A quantity total as SQL's SUM() returns it: int unless fractional."""
+    value = float(value)
+    return int(value) if value.is_integer() else value
+
+
+def _lut(strings: _Strings, fn):
+    """Per string id: fn(value), so a column of ids maps through one take."""
+    return np.fromiter((fn(v) for v in strings.values), dtype=np.int64, count=len(strings.values))
+
+
+def _grouped(labels: list, idx, mask, weights=None):
+    """Per label: (count, sequential sum of weights) over ``mask`` rows, in
+    the order each label first occurs."""
+    sel = idx[mask]
+    counts = np.bincount(sel, minlength=len(labels))
+    sums = np.bincount(sel, weights=weights[mask], minlength=len(labels)) if weights is not None else None
+    present, first = np.unique(sel, return_index=True)
+    return [(labels[i], int(counts[i]), float(sums[i]) if sums is not None else 0.0)
+            for i in present[np.argsort(first)].tolist()]
+
+
+def claim_rollups(client_id, d_lo: date, d_hi: date, resolve_owner, reworker_label):
+    """Billed / denied / paid per resolved owner plus the denial-recovery
+    sender and reworker slices for a window, or None to use the SQL path.
+
+    ``resolve_owner(raw)`` maps a claim Owner to the credited user (None
+    skips the claim); ``reworker_label(raw)`` names the uploader who reworked
+    a denial. Return shapes match get_production_report's dicts."""
+    if not available():
+        return None
+    with _lock:
+        table, cols = _facts("claims")
+        if cols is None:
+            return None
+        names: list = []
+        index: dict = {}
+
+        def _label(value, fn):
+            label = fn(value)
+            if label is None:
+                return -1
+            if label not in index:
+                index[label] = len(names)
+                names.append(label)
+            return index[label]
+
+        owner_lut = _lut(table.strings, lambda v: _label(v, resolve_owner) if v else -1)
+        owner = owner_lut[cols["owner"]]
+        keep = owner >= 0
+        if client_id:
+            keep &= cols["client_id"] == int(client_id)
+        lo, hi = d_lo.toordinal(), d_hi.toordinal()
+
+        def _in(col):
+            return (col > 0) & (col >= lo) & (col <= hi)
+
+        billed = _grouped(names, owner, keep & _in(cols["bd"]), cols["amt"])
+        denied_mask = keep & cols["denied"] & _in(cols["dkey"])
+        denied = _grouped(names, owner, denied_mask, cols["amt"])
+        paid = _grouped(names, owner, keep & (cols["paid"] != 0)
+                        & ((cols["pkey"] == 0) | _in(cols["pkey"])), cols["paid"])
+
+        rw_names: list = []
+        rw_index: dict = {}
+
+        def _rw(value):
+            label = reworker_label(value)
+            if label not in rw_index:
+                rw_index[label] = len(rw_names)
+                rw_names.append(label)
+            return rw_index[label]
+
+        rw_lut = _lut(table.strings, _rw)
+        reworker = rw_lut[cols["uploader"]]
+        reworked = _grouped(rw_names, reworker, denied_mask, cols["amt"])
+
+    return (
+        {u: {"claims_billed": n, "claims_billed_amount": s} for u, n, s in billed},
+        {u: {"claims_denied": n, "claims_denied_amount": s} for u, n, s in denied},
+        {u: {"claims_paid": n, "claims_paid_amount": s} for u, n, s in paid},
+        {u: {"sender": u, "count": n, "amount": s} for u, n, s in denied},
+        {w: {"reworker": w, "count": n, "amount": s} for w, n, s in reworked},
+    )
+
+
+def rolling_ar(client_id, uploader: str, cutoff: date):
+    """Open balance on claims with DOS before ``cutoff`` (or no usable DOS),
+    scoped to a client and/or an uploader; None to use the SQL path."""
+    if not available():
+        return None
+    with _lock:
+        table, cols = _facts("claims")
+        if cols is None:
+            return None
+        mask = (cols["bal"] > 0) & ((cols["dos"] == 0) | (cols["dos"] < cutoff.toordinal()))
+        if client_id:
+            mask &= cols["client_id"] == int(client_id)
+        if uploader:
+            want = uploader.strip().lower()
+            lut = _lut(table.strings, lambda v: int(isinstance(v, str) and v.lower() == want))
+            mask &= lut[cols["uploader"]].astype(bool)
+        sel = cols["bal"][mask]
+        return float(np.bincount(np.zeros(len(sel), dtype=np.int64), weights=sel, minlength=1)[0])
+
+
+def production_rollups(client_id, username: str, start_date: str, end_date: str):
+    """team_production summaries for a window - (by_user, by_category) shaped
+    like the report's GROUP BY rows - or None to use the SQL path. The window
+    compares work_date text exactly as SQL does."""
+    if not available():
+        return None
+    with _lock:
+        table, cols = _facts("production")
+        if cols is None:
+            return None
+        values = table.strings.values
+        mask = np.ones(len(cols["id"]), dtype=bool)
+        if client_id:
+            mask &= cols["client_id"] == int(client_id)
+        if username:
+            want = username.lower()
+            lut = _lut(table.strings, lambda v: int(isinstance(v, str) and v.lower() == want))
+            mask &= lut[cols["user"]].astype(bool)
+        if start_date or end_date:
+            dates = sorted({values[i] for i in np.unique(cols["work_date"]).tolist()
+                            if isinstance(values[i], str)})
+            rank = _lut(table.strings, lambda v: bisect.bisect_left(dates, v) if isinstance(v, str) else -1)
+            r = rank[cols["work_date"]]
+            mask &= r >= 0
+            if start_date:
+                mask &= r >= bisect.bisect_left(dates, start_date)
+            if end_date:
+                mask &= r < bisect.bisect_right(dates, end_date)
+
+        def _summary(key_col):
+            keys = cols[key_col][mask]
+            qty = cols["quantity"][mask]
+            hours = cols["hours"][mask]
+            uniq, inv = np.unique(keys, return_inverse=True)
+            n = len(uniq)
+            counts = np.bincount(inv, minlength=n)
+            qsum = np.bincount(inv, weights=qty, minlength=n)
+            hsum = np.bincount(inv, weights=hours, minlength=n)
+            return uniq, inv, counts, qsum, hsum
+
+        uniq, inv, counts, qsum, hsum = _summary("user")
+        day_pairs = np.unique(np.stack([inv, cols["work_date"][mask]]), axis=1)[0] \
+            if len(inv) else np.empty(0, dtype=np.int64)
+        days = np.bincount(day_pairs, minlength=len(uniq))
+        by_user = sorted((
+            {"username": values[u], "total_entries": int(counts[i]), "total_quantity": _sum(qsum[i]),
+             "total_hours": sql_round(hsum[i], 1), "days_worked": int(days[i])}
+            for i, u in enumerate(uniq.tolist())), key=lambda d: d["username"])
+
+        uniq, inv, counts, qsum, hsum = _summary("category")
+        by_category = sorted((
+            {"category": values[c], "total_entries": int(counts[i]), "total_quantity": _sum(qsum[i]),
+             "total_hours": sql_round(hsum[i], 1)}
+            for i, c in enumerate(uniq.tolist())),
+            key=lambda d: (d["category"] is not None, d["category"] or ""), reverse=True)
+        by_category.sort(key=lambda d: -d["total_hours"])   # ties as SQLite's DESC sort leaves them
+    return by_user, by_category
+
+
+def clear_cache() -> None:
+    """Drop every partition (a restored database's write counters go
+    backwards, so they no longer identify what is cached)."""
+    global _CLAIMS, _PRODUCTION
+    with _lock:
+        _CLAIMS = _PRODUCTION = None
+
+
+def analytics_stats() -> dict:
+    with _lock:
+        out = dict(STATS)
+        for name, table in (("claims", _CLAIMS), ("production", _PRODUCTION)):
+            out[f"{name}_rows"] = 0 if table is None or table.merged is None else len(table.merged["id"])
+            out[f"{name}_partitions"] = 0 if table is None else len(table.parts)
+    out["load_seconds"] = round(out["load_seconds"], 3)
+    out["enabled"] = available()
+    return out
@@ -305,6 +305,7 @@ async def prospect_and_scrub(
     limit: int = 50,
     new_only: bool = False,
     dm_only: bool = True,
+    run_key: Optional[str] = None,
 ) -> dict:
     """One-shot: hunt + enrich. Returns the same shape as `scrub_rows`.
 
@@ -316,7 +317,26 @@ async def prospect_and_scrub(
     Spam kills email anyway; DMs land. ~10x faster, zero false-positive
     emails, every row has a real human + LinkedIn/FB/IG/X URL + hook.
     Set `dm_only=False` only if you want the legacy email-hunt path.
+
+    `run_key` (dm_only only) runs the hunt through the checkpointed
+    `app.hunt_pipeline`, so calling again with the same key after a restart
+    resumes instead of starting from zero.
     """
+    if dm_only and run_key:
+        from app.hunt_pipeline import HuntPipeline
+        result = await HuntPipeline(run_key).run(
+            [state], specialty=specialty, per_state=limit, new_only=new_only,
+        )
+        result["prospect_source"] = {
+            "state": state.upper(),
+            "specialty": specialty,
+            "new_only": new_only,
+            "dm_only": dm_only,
+            "fetched": result["summary"].get("input_rows", 0),
+            "run_key": run_key,
+        }
+        return result
+
     prospects = await prospect_state(
         state, specialty=specialty, limit=limit, new_only=new_only,
     )
@@ -395,12 +415,12 @@ def _format_phone(raw: str) -> str:
     return f"({digits[0:3]}) {digits[3:6]}-{digits[6:10]}"
 
 
-async def _enrich_dm_only(prospects: list[dict], *, fast: bool = False) -> dict:
-    """Build DM-ready rows directly from NPPES records.
+def _dm_row_builder(*, fast: bool = False):
+    """Return the per-prospect coroutine used by the DM-only path.
 
-    fast=True: skip ALL network calls (email scraping, CLIA, PubMed, backup people).
-    Used by the national pull so 52 states complete in under 3 minutes instead of hours.
-    Rows still include org/DM/phone/LinkedIn URLs — enough for a rep to act on.
+    ``await builder(prospect)`` yields one output row dict, or None when the
+    prospect has no org name. Shared by ``_enrich_dm_only`` (one gather over
+    the whole batch) and ``app.hunt_pipeline`` (checkpointed per NPI).
     """
     from app.social_finder import find_social_profiles, social_outreach_templates
     from app.playbook import (
@@ -409,12 +429,6 @@ async def _enrich_dm_only(prospects: list[dict], *, fast: bool = False) -> dict:
     )
     from rule_intercept import score_lab_lead
 
-    # Reset the per-run live-lookup budget so each hunt gets a fresh quota
-    reset_run_budget()
-
-    # Fast mode: high concurrency — no network I/O so no risk of flooding
-    _sem = asyncio.Semaphore(100 if fast else 3)
-
     async def _process_impl(p: dict):
         """Enrich a single prospect; returns row dict or None."""
         org = (p.get("organization_name") or "").strip()
@@ -1004,15 +1018,41 @@ async def _enrich_dm_only(prospects: list[dict], *, fast: bool = False) -> dict:
             "Enumeration Date": enum_date,
         }
 
+    return _process_impl
+
+
+# Hard cap on one prospect's enrichment before it is abandoned.
+DM_ROW_TIMEOUT = 25.0
+
+
+async def _enrich_dm_only(prospects: list[dict], *, fast: bool = False) -> dict:
+    """Build DM-ready rows directly from NPPES records.
+
+    fast=True: skip ALL network calls (email scraping, CLIA, PubMed, backup people).
+    Used by the national pull so 52 states complete in under 3 minutes instead of hours.
+    Rows still include org/DM/phone/LinkedIn URLs — enough for a rep to act on.
+    """
+    # Reset the per-run live-lookup budget so each hunt gets a fresh quota
+    reset_run_budget()
+    _process_impl = _dm_row_builder(fast=fast)
+
+    # Fast mode: high concurrency — no network I/O so no risk of flooding
+    _sem = asyncio.Semaphore(100 if fast else 3)
+
     async def _process_safe(p: dict):
         async with _sem:
             try:
-                return await asyncio.wait_for(_process_impl(p), timeout=25.0)
+                return await asyncio.wait_for(_process_impl(p), timeout=DM_ROW_TIMEOUT)
             except Exception:
                 return None
 
     _raw = await asyncio.gather(*[_process_safe(p) for p in prospects])
     rows = [r for r in _raw if isinstance(r, dict)]
+    return _finalize_dm_rows(rows, input_rows=len(prospects))
+
+
+def _finalize_dm_rows(rows: list[dict], *, input_rows: int) -> dict:
+    """Reach / quality / email filters, heat sort and summary for DM rows."""
     # Production filter: drop rows with no reachable human at all.
     # A row needs at least ONE of:
     #   - a real DM name (from NPPES authorized official) AND any phone, OR
@@ -1100,7 +1140,7 @@ async def _enrich_dm_only(prospects: list[dict], *, fast: bool = False) -> dict:
     daily_top_10 = rows[:10]
 
     summary = {
-        "input_rows": len(prospects),
+        "input_rows": input_rows,
         "output_rows": len(rows),
         "rows_dropped_no_reach": dropped,
         "rows_dropped_low_quality": quality_dropped,
@@ -8,9 +8,15 @@ import os
 import json
 import hashlib
 import secrets
+import atexit
+import base64
 import logging
+import threading
+import copy
+from collections import OrderedDict, deque
 from datetime import datetime, date, timedelta
 from app.config import DATABASE_PATH, business_today, business_today_iso, business_now
+from app import analytics
 
 log = logging.getLogger(__name__)
 
@@ -209,6 +215,181 @@ def _run_migration_once(conn, key: str, fn):
     return True
 
 
+# Tables whose writes bump data_versions (one trigger per statement kind).
+# Startup repairs compare these counters with the ones they saw last time to
+# decide whether there is anything new to repair.
+DATA_VERSION_TABLES = (
+    "clients", "claims_master", "payments", "client_files", "providers",
+    "credentialing", "enrollment", "edi_setup", "eligibility",
+)
+
+
+# Per-client write counters for the tables a client report reads, so a cached
+# report artifact is invalidated by writes to that client only.  The value is
+# the column naming the client (``clients`` is keyed by its own id).
+CLIENT_VERSION_TABLES = {
+    "clients": "id", "claims_master": "client_id", "payments": "client_id",
+    "credentialing": "client_id", "enrollment": "client_id", "edi_setup": "client_id",
+    "team_production": "client_id",
+}
+
+
+def _ensure_data_versions(conn):
+    conn.execute(
+        """CREATE TABLE IF NOT EXISTS data_versions (
+               table_name  TEXT PRIMARY KEY,
+               version     INTEGER NOT NULL DEFAULT 0
+           )"""
+    )
+    for tbl in DATA_VERSION_TABLES:
+        conn.execute("INSERT OR IGNORE INTO data_versions (table_name) VALUES (?)", (tbl,))
+        for op in ("INSERT", "UPDATE", "DELETE"):
+            conn.execute(
+                f"CREATE TRIGGER IF NOT EXISTS trg_dv_{tbl}_{op.lower()} AFTER {op} ON {tbl} "
+                f"BEGIN UPDATE data_versions SET version = version + 1 "
+                f"WHERE table_name = '{tbl}'; END"
+            )
+    conn.execute(
+        """CREATE TABLE IF NOT EXISTS client_data_versions (
+               table_name  TEXT NOT NULL,
+               client_id   INTEGER NOT NULL,
+               version     INTEGER NOT NULL DEFAULT 0,
+               PRIMARY KEY (table_name, client_id)
+           )"""
+    )
+    for tbl, key in CLIENT_VERSION_TABLES.items():
+        bump = ("INSERT INTO client_data_versions (table_name, client_id, version) "
+                f"VALUES ('{tbl}', COALESCE({{row}}.{key}, 0), 1) "
+                "ON CONFLICT(table_name, client_id) DO UPDATE SET version = version + 1;")
+        for op, row in (("INSERT", "NEW"), ("UPDATE", "NEW"), ("DELETE", "OLD")):
+            conn.execute(
+                f"CREATE TRIGGER IF NOT EXISTS trg_cdv_{tbl}_{op.lower()} AFTER {op} ON {tbl} "
+                f"BEGIN {bump.format(row=row)} END"
+            )
+        # A row moved to another client changes what the old client sees too.
+        conn.execute(
+            f"CREATE TRIGGER IF NOT EXISTS trg_cdv_{tbl}_move AFTER UPDATE OF {key} ON {tbl} "
+            f"WHEN OLD.{key} IS NOT NEW.{key} BEGIN {bump.format(row='OLD')} END"
+        )
+    conn.commit()
+
+
+def get_data_versions(tables=None, conn=None) -> dict:
+    """``{table: write counter}`` for the tracked tables (or ``tables``)."""
+    own = conn is None
+    if own:
+        conn = get_db()
+    try:
+        rows = conn.execute("SELECT table_name, version FROM data_versions").fetchall()
+    finally:
+        if own:
+            conn.close()
+    versions = {r[0]: int(r[1]) for r in rows}
+    if tables is not None:
+        return {t: versions.get(t, 0) for t in tables}
+    return versions
+
+
+def get_client_data_versions(client_id: int, tables=None, conn=None) -> dict:
+    """``{table: write counter}`` of one client's rows in the per-client
+    tracked tables (or ``tables``); 0 for a table never written."""
+    tables = tuple(tables or CLIENT_VERSION_TABLES)
+    own = conn is None
+    if own:
+        conn = get_db()
+    try:
+        rows = conn.execute(
+            f"SELECT table_name, version FROM client_data_versions WHERE client_id=? "
+            f"AND table_name IN ({','.join('?' * len(tables))})",
+            (int(client_id), *tables),
+        ).fetchall()
+    finally:
+        if own:
+            conn.close()
+    versions = {r[0]: int(r[1]) for r in rows}
+    return {t: versions.get(t, 0) for t in tables}
+
+
+def _ensure_repair_state_table(conn):
+    conn.execute(
+        """CREATE TABLE IF NOT EXISTS app_repair_state (
+               name          TEXT PRIMARY KEY,
+               version       INTEGER NOT NULL DEFAULT 1,
+               watermark     TEXT DEFAULT '{}',
+               last_run_at   TEXT,
+               last_seconds  REAL,
+               last_result   TEXT DEFAULT ''
+           )"""
+    )
+    conn.commit()
+
+
+def get_repair_state(conn=None) -> dict:
+    own = conn is None
+    if own:
+        conn = get_db()
+    try:
+        _ensure_repair_state_table(conn)
+        return {r["name"]: dict(r) for r in conn.execute("SELECT * FROM app_repair_state")}
+    finally:
+        if own:
+            conn.close()
+
+
+def record_repair_run(name: str, version: int, watermark: dict,
+                      seconds: float, result: str = "") -> None:
+    conn = get_db()
+    try:
+        _ensure_repair_state_table(conn)
+        conn.execute(
+            "INSERT INTO app_repair_state (name, version, watermark, last_run_at, last_seconds, last_result) "
+            "VALUES (?,?,?,?,?,?) "
+            "ON CONFLICT(name) DO UPDATE SET version=excluded.version, watermark=excluded.watermark, "
+            "  last_run_at=excluded.last_run_at, last_seconds=excluded.last_seconds, "
+            "  last_result=excluded.last_result",
+            (name, int(version), json.dumps(watermark, sort_keys=True),
+             datetime.now().isoformat(timespec="seconds"), round(float(seconds), 3),
+             str(result)[:500]),
+        )
+        conn.commit()
+    finally:
+        conn.close()
+
+
+def run_repair_if_dirty(name: str, fn, *, watches, version: int = 1,
+                        force: bool = False) -> dict:
+    """Run a data repair only when a watched table was written since its last
+    run (or ``version`` was bumped). Returns the step record
+    ``{name, status: ran|skipped, seconds, result}``; exceptions propagate.
+
+    The watermark is taken after the repair so its own writes don't mark it
+    dirty again; writes by a later repair do, and cost one extra no-op run.
+    """
+    import time as _time
+    state = get_repair_state().get(name)
+    before = get_data_versions(watches)
+    if (not force and state and int(state["version"]) == int(version)
+            and json.loads(state["watermark"] or "{}") == before):
+        return {"name": name, "status": "skipped", "seconds": 0.0,
+                "result": "no new rows since last run"}
+    t = _time.perf_counter()
+    result = fn()
+    secs = _time.perf_counter() - t
+    record_repair_run(name, version, get_data_versions(watches), secs,
+                      json.dumps(result, default=str))
+    return {"name": name, "status": "ran", "seconds": round(secs, 3), "result": result}
+
+
+def _reparent_misfiled_claims_repair():
+    conn = get_db()
+    try:
+        moved = _reparent_misfiled_claims(conn.cursor())
+        conn.commit()
+        return moved
+    finally:
+        conn.close()
+
+
 def _apply_startup_user_migrations(conn):
     # Defensive: ensure auth columns exist before any migration touches them.
     _ensure_auth_columns(conn)
@@ -385,6 +566,7 @@ def _apply_startup_user_migrations(conn):
                     "credentialing", "enrollment", "edi_setup", "providers",
                     "client_files", "sharefile_links", "report_notes",
                     "team_production", "audit_log", "activity_events",
+                    "activity_rollup_hourly", "activity_rollup_daily",
                     "client_user_access", "chat_room_members", "chat_messages",
                     "chat_rooms", "notifications", "jobs",
                 ):
@@ -401,7 +583,8 @@ def _apply_startup_user_migrations(conn):
 
             # Also remove team_production / user_presence / activity_events rows
             # keyed by username (not client_id) for either username form.
-            for tbl in ("team_production", "user_presence", "activity_events"):
+            for tbl in ("team_production", "user_presence", "activity_events",
+                        "activity_rollup_hourly", "activity_rollup_daily"):
                 try:
                     cur.execute(
                         f"DELETE FROM {tbl} WHERE LOWER(username) IN ('rcm','rcm@medprosc.com')"
@@ -431,7 +614,12 @@ def _apply_startup_user_migrations(conn):
     # cheap and idempotent.
     _ensure_medpharma_team_accounts(cur)
     _ensure_bizdev_account(cur)
-    _reparent_misfiled_claims(cur)
+    conn.commit()
+    # Scans claims_master per staff login: only worth it when claims changed
+    # since the last boot. (clients is rewritten by the ensure-* calls above
+    # on every boot, so it can't serve as a watermark here.)
+    run_repair_if_dirty("reparent_misfiled_claims", _reparent_misfiled_claims_repair,
+                        watches=("claims_master",))
     _ensure_eligibility_team_chat(cur)
     conn.commit()
 
@@ -691,7 +879,8 @@ def _ensure_medpharma_team_accounts(cur):
     # team_production / presence / activity rows that survived (or were
     # written before the purge) keep surfacing 'rcm' in the Team Production
     # report. Clearing them every startup removes RCM from production for good.
-    for _tbl in ("team_production", "user_presence", "activity_events"):
+    for _tbl in ("team_production", "user_presence", "activity_events",
+                 "activity_rollup_hourly", "activity_rollup_daily"):
         try:
             cur.execute(
                 f"DELETE FROM {_tbl} WHERE LOWER(username) IN ('rcm','rcm@medprosc.com')"
@@ -844,7 +1033,7 @@ def _reparent_misfiled_claims(cur):
 def init_client_hub_db():
     conn = get_db()
     cur = conn.cursor()
-    cur.executescript("""
+    schema_sql = """
         -- ── users / auth ──────────────────────────────────────────────
         CREATE TABLE IF NOT EXISTS clients (
             id               INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -1165,6 +1354,8 @@ def init_client_hub_db():
         CREATE INDEX IF NOT EXISTS idx_claims_client   ON claims_master(client_id);
         CREATE INDEX IF NOT EXISTS idx_claims_status   ON claims_master(ClaimStatus);
         CREATE INDEX IF NOT EXISTS idx_claims_key      ON claims_master(ClaimKey);
+        CREATE INDEX IF NOT EXISTS idx_claims_updated  ON claims_master(updated_at, id);
+        CREATE INDEX IF NOT EXISTS idx_claims_client_updated ON claims_master(client_id, updated_at, id);
         CREATE INDEX IF NOT EXISTS idx_payments_claim  ON payments(ClaimKey);
         CREATE INDEX IF NOT EXISTS idx_notes_claim     ON notes_log(ClaimKey);
         CREATE INDEX IF NOT EXISTS idx_cred_client     ON credentialing(client_id);
@@ -1328,10 +1519,12 @@ def init_client_hub_db():
             body        TEXT NOT NULL,
             attachment_file_id INTEGER,
             attachment_name    TEXT DEFAULT '',
+            mentions_enc       TEXT,             -- legacy encrypted @handles; read only by the chat_mentions backfill
             created_at  TEXT DEFAULT CURRENT_TIMESTAMP,
             FOREIGN KEY (room_id) REFERENCES chat_rooms(id) ON DELETE CASCADE
         );
         CREATE INDEX IF NOT EXISTS idx_chatmsg_room ON chat_messages(room_id, created_at);
+        CREATE INDEX IF NOT EXISTS idx_chatmsg_created ON chat_messages(created_at);
 
         CREATE TABLE IF NOT EXISTS chat_reads (
             room_id              INTEGER NOT NULL,
@@ -1353,6 +1546,21 @@ def init_client_hub_db():
             PRIMARY KEY (message_id, user_id)
         );
 
+        -- One row per (message × mentioned room member), resolved when the
+        -- message is posted, so the mention-reminder job is an indexed range
+        -- scan over pending rows instead of decrypting and re-parsing every
+        -- message in the window. reminded=1 once the reminder email went out.
+        CREATE TABLE IF NOT EXISTS chat_mentions (
+            message_id INTEGER NOT NULL,
+            user_id    INTEGER NOT NULL,
+            room_id    INTEGER NOT NULL,
+            created_at TEXT DEFAULT CURRENT_TIMESTAMP,
+            reminded   INTEGER DEFAULT 0,
+            PRIMARY KEY (message_id, user_id)
+        );
+        CREATE INDEX IF NOT EXISTS idx_chat_mentions_pending ON chat_mentions(reminded, created_at);
+        CREATE INDEX IF NOT EXISTS idx_chat_mentions_user    ON chat_mentions(user_id, reminded);
+
         -- One row per user tracking the highest message id we've already sent
         -- a "you have unread team chat" catch-up email about. Lets the 15-min
         -- nudge fire once per wave of unread messages (never per-message spam),
@@ -1462,6 +1670,31 @@ def init_client_hub_db():
         CREATE INDEX IF NOT EXISTS idx_ae_time      ON activity_events(occurred_at);
         CREATE INDEX IF NOT EXISTS idx_ae_type      ON activity_events(event_type);
 
+        -- ── Activity rollups (maintained by flush_activity_buffer) ──────────
+        -- Raw events past ACTIVITY_RAW_RETAIN_DAYS are compacted away; these
+        -- keep the counts. client_id 0 = no client tagged.
+        CREATE TABLE IF NOT EXISTS activity_rollup_hourly (
+            hour          TEXT NOT NULL,
+            username      TEXT NOT NULL,
+            client_id     INTEGER NOT NULL DEFAULT 0,
+            event_type    TEXT NOT NULL,
+            path          TEXT NOT NULL DEFAULT '',
+            events        INTEGER NOT NULL DEFAULT 0,
+            duration_ms   INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (hour, username, client_id, event_type, path)
+        );
+        CREATE TABLE IF NOT EXISTS activity_rollup_daily (
+            day           TEXT NOT NULL,
+            username      TEXT NOT NULL,
+            client_id     INTEGER NOT NULL DEFAULT 0,
+            event_type    TEXT NOT NULL,
+            path          TEXT NOT NULL DEFAULT '',
+            events        INTEGER NOT NULL DEFAULT 0,
+            duration_ms   INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (day, username, client_id, event_type, path)
+        );
+        CREATE INDEX IF NOT EXISTS idx_ard_type_day ON activity_rollup_daily(event_type, day);
+
         -- ── Per-user-per-day presence rollup (ActivTrak-style) ──────────────
         CREATE TABLE IF NOT EXISTS user_presence (
             username       TEXT NOT NULL,
@@ -1505,7 +1738,11 @@ def init_client_hub_db():
             FOREIGN KEY (job_id) REFERENCES jobs(id) ON DELETE CASCADE
         );
         CREATE INDEX IF NOT EXISTS idx_job_events_job ON job_events(job_id, created_at);
-    """)
+    """
+    # The CREATE ... IF NOT EXISTS script only needs to run when it changed
+    # (or on a fresh DB); its hash is recorded like any other migration.
+    schema_key = "schema_" + hashlib.sha1(schema_sql.encode()).hexdigest()[:16]
+    _run_migration_once(conn, schema_key, lambda: cur.executescript(schema_sql))
     conn.commit()
 
     # ── Migrate existing DBs: add profile columns if missing ──────────────
@@ -1553,6 +1790,7 @@ def init_client_hub_db():
     for col, col_def in (
         ("attachment_file_id", "INTEGER"),
         ("attachment_name", "TEXT DEFAULT ''"),
+        ("mentions_enc", "TEXT"),
     ):
         if col not in cm_cols:
             cur.execute(f"ALTER TABLE chat_messages ADD COLUMN {col} {col_def}")
@@ -1646,6 +1884,28 @@ def init_client_hub_db():
     cur.execute("SELECT COUNT(*) FROM clients")
     total = cur.fetchone()[0]
 
+    _ensure_data_versions(conn)
+    _ensure_repair_state_table(conn)
+    _ensure_claim_ar_dates(conn)
+
+    if _ensure_search_index(conn):
+        _run_migration_once(conn, "search_index_v1", lambda: rebuild_search_index(conn))
+
+    # Fold activity_events written before the rollup tables existed into
+    # them, so compaction never drops uncounted history.
+    _run_migration_once(conn, "activity_rollups_backfill_v1",
+                        lambda: _backfill_activity_rollups(conn))
+
+    # query_claims pages on (updated_at, id); a NULL updated_at would fall
+    # out of the row-value comparison, so give legacy rows their created_at.
+    _run_migration_once(conn, "claims_updated_at_backfill_v1", lambda: conn.execute(
+        "UPDATE claims_master SET updated_at = COALESCE(created_at, '') WHERE updated_at IS NULL"))
+
+    # Resolve @mentions of the messages still inside the reminder window into
+    # chat_mentions; older history can never be reminded about anyway.
+    _run_migration_once(conn, "chat_mentions_backfill_v1",
+                        lambda: _backfill_chat_mentions(conn))
+
     if total == 0:
         _seed_data(conn)
     else:
@@ -3081,6 +3341,191 @@ def get_claims(client_id: int = None, status: str = None, sub_profile: str = Non
     return rows
 
 
+# ── Claims query: server-side filters, keyset pages, projection ──────────────
+# The Claims Queue used to pull every claim in scope (get_claims) and filter /
+# page in the browser. query_claims pages on (updated_at, id) newest first, so
+# page N costs the same as page 1 and a claim inserted between pages is not
+# repeated. updated_at is mutable, though: a claim edited between pages jumps
+# above the cursor, so a queue paged while claims are being worked can miss
+# that claim until it is reloaded. Walks that must see every row exactly once
+# (iter_claims, the export) page on the immutable id instead. The cursor is
+# opaque to callers.
+CLAIM_QUERY_MAX_LIMIT = 500
+CLAIM_COUNT_CAP = 50000       # past this the total is reported as ">= cap"
+_CLAIM_TEXT_COLUMNS = ("ClaimKey", "PatientName", "PatientID", "Payor", "ProviderName")
+# Filters that define the scope (who may see what); facets ignore the rest so
+# the status tabs and charts describe the whole queue, not the current page.
+_CLAIM_SCOPE_FILTERS = ("client_id", "sub_profile", "owner_scope")
+
+
+def _claim_table_columns(conn) -> list[str]:
+    return [r[1] for r in conn.execute("PRAGMA table_info(claims_master)").fetchall()]
+
+
+def _encode_claim_cursor(updated_at, claim_id) -> str:
+    raw = json.dumps([updated_at, int(claim_id)], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def _decode_claim_cursor(cursor: str):
+    try:
+        pad = "=" * (-len(cursor) % 4)
+        updated_at, claim_id = json.loads(base64.urlsafe_b64decode(cursor + pad))
+        return updated_at, int(claim_id)
+    except Exception:
+        raise ValueError("invalid cursor")
+
+
+def _claim_filter_sql(filters: dict) -> tuple[str, list]:
+    """WHERE fragment (starting with ' AND', table alias ``cm``) and params for
+    the claim query filters. Unknown or empty filters are ignored."""
+    f = filters or {}
+    sql, params = [], []
+    if f.get("client_id") is not None:
+        sql.append("cm.client_id = ?")
+        params.append(int(f["client_id"]))
+    if f.get("sub_profile"):
+        sql.append("cm.sub_profile = ?")
+        params.append(f["sub_profile"])
+    if f.get("owner_scope") is not None:
+        # Staff queue: claims the user owns, plus unassigned ones.
+        idents = sorted({str(i).strip().lower() for i in f["owner_scope"] if str(i).strip()})
+        marks = ",".join("?" * len(idents)) or "NULL"
+        sql.append(f"(LOWER(TRIM(COALESCE(cm.Owner,''))) IN ({marks}) OR TRIM(COALESCE(cm.Owner,'')) = '')")
+        params.extend(idents)
+    statuses = f.get("status")
+    if isinstance(statuses, str):
+        statuses = [s for s in statuses.split(",") if s.strip()]
+    if statuses:
+        sql.append(f"LOWER(cm.ClaimStatus) IN ({','.join('?' * len(statuses))})")
+        params.extend(s.strip().lower() for s in statuses)
+    if f.get("owner"):
+        sql.append("LOWER(TRIM(COALESCE(cm.Owner,''))) = ?")
+        params.append(str(f["owner"]).strip().lower())
+    if f.get("payer"):
+        sql.append("cm.Payor LIKE ?")
+        params.append(f"%{f['payer']}%")
+    if f.get("dos_from"):
+        sql.append("date(cm.DOS) >= ?")
+        params.append(f["dos_from"])
+    if f.get("dos_to"):
+        sql.append("date(cm.DOS) <= ?")
+        params.append(f["dos_to"])
+    if f.get("on_date"):
+        sql.append("(cm.DOS = ? OR cm.StatusStartDate = ?)")
+        params.extend([f["on_date"], f["on_date"]])
+    if f.get("balance_min") is not None:
+        sql.append("COALESCE(cm.BalanceRemaining,0) >= ?")
+        params.append(float(f["balance_min"]))
+    if f.get("balance_max") is not None:
+        sql.append("COALESCE(cm.BalanceRemaining,0) <= ?")
+        params.append(float(f["balance_max"]))
+    if f.get("q"):
+        like = f"%{str(f['q']).strip().lower()}%"
+        sql.append("(" + " OR ".join(f"LOWER(COALESCE(cm.{c},'')) LIKE ?" for c in _CLAIM_TEXT_COLUMNS) + ")")
+        params.extend([like] * len(_CLAIM_TEXT_COLUMNS))
+    return "".join(f" AND {c}" for c in sql), params
+
+
+def query_claims(filters: dict = None, *, columns=None, limit: int = 100, cursor: str = None,
+                 with_total: bool = True, with_facets: bool = False, by_id: bool = False) -> dict:
+    """One keyset page of claims, newest ``updated_at`` first (newest ``id``
+    first with ``by_id``, whose pages are stable under concurrent edits).
+
+    ``filters``: client_id, sub_profile, owner_scope (staff idents), status
+    (str, comma list or list), owner, payer (substring), dos_from / dos_to,
+    on_date (DOS or StatusStartDate), balance_min / balance_max, q (text over
+    claim key, patient, member id, payer, provider).
+    ``columns`` projects the row (``id`` and ``updated_at`` are always
+    included; ``client_company`` is the joined account name).
+
+    Returns ``{claims, next_cursor, total, total_capped, facets?}``;
+    ``next_cursor`` is None on the last page. Raises ValueError on a bad
+    cursor or unknown column.
+    """
+    limit = max(1, min(int(limit or 100), CLAIM_QUERY_MAX_LIMIT))
+    where, params = _claim_filter_sql(filters)
+    conn = get_db()
+    try:
+        if columns:
+            known = set(_claim_table_columns(conn)) | {"client_company"}
+            wanted = [c for c in dict.fromkeys(["id", "updated_at", *columns])]
+            bad = [c for c in wanted if c not in known]
+            if bad:
+                raise ValueError(f"unknown column(s): {', '.join(bad)}")
+            proj = ", ".join("c.company AS client_company" if c == "client_company" else f"cm.{c}"
+                             for c in wanted)
+        else:
+            proj = "cm.*, c.company AS client_company"
+
+        page_sql, page_params = where, list(params)
+        if cursor:
+            after_ts, after_id = _decode_claim_cursor(cursor)
+            if by_id:
+                page_sql += " AND cm.id < ?"
+                page_params.append(after_id)
+            else:
+                # Row-value comparison lets SQLite walk (client_id,) updated_at,
+                # id straight from the cursor instead of sorting the remainder.
+                page_sql += " AND (cm.updated_at, cm.id) < (?, ?)"
+                page_params.extend([after_ts or "", after_id])
+        order = "cm.id DESC" if by_id else "cm.updated_at DESC, cm.id DESC"
+        rows = conn.execute(
+            f"SELECT {proj} FROM claims_master cm JOIN clients c ON c.id = cm.client_id "
+            f"WHERE 1=1{page_sql} ORDER BY {order} LIMIT ?",
+            page_params + [limit + 1],
+        ).fetchall()
+        claims = [dict(r) for r in rows[:limit]]
+        next_cursor = None
+        if len(rows) > limit:
+            last = claims[-1]
+            next_cursor = _encode_claim_cursor(last["updated_at"], last["id"])
+        out = {"claims": claims, "next_cursor": next_cursor}
+
+        if with_total:
+            n = conn.execute(
+                f"SELECT COUNT(*) FROM (SELECT 1 FROM claims_master cm JOIN clients c ON c.id = cm.client_id "
+                f"WHERE 1=1{where} LIMIT ?)", params + [CLAIM_COUNT_CAP + 1],
+            ).fetchone()[0]
+            out["total"] = min(int(n), CLAIM_COUNT_CAP)
+            out["total_capped"] = int(n) > CLAIM_COUNT_CAP
+        if with_facets:
+            scope_where, scope_params = _claim_filter_sql(
+                {k: v for k, v in (filters or {}).items() if k in _CLAIM_SCOPE_FILTERS})
+            facet_rows = conn.execute(
+                "SELECT COALESCE(cm.ClaimStatus,'') AS status, COUNT(*) AS n, "
+                "  COALESCE(SUM(cm.ChargeAmount),0) AS charged, COALESCE(SUM(cm.PaidAmount),0) AS paid, "
+                "  COALESCE(SUM(cm.AdjustmentAmount),0) AS adjustments "
+                f"FROM claims_master cm JOIN clients c ON c.id = cm.client_id WHERE 1=1{scope_where} "
+                "GROUP BY COALESCE(cm.ClaimStatus,'')", scope_params,
+            ).fetchall()
+            out["facets"] = {
+                "by_status": {r["status"]: int(r["n"]) for r in facet_rows},
+                "total": sum(int(r["n"]) for r in facet_rows),
+                "charged": round(sum(float(r["charged"]) for r in facet_rows), 2),
+                "paid": round(sum(float(r["paid"]) for r in facet_rows), 2),
+                "adjustments": round(sum(float(r["adjustments"]) for r in facet_rows), 2),
+            }
+    finally:
+        conn.close()
+    return out
+
+
+def iter_claims(filters: dict = None, *, columns=None, batch: int = CLAIM_QUERY_MAX_LIMIT):
+    """Yield every claim matching ``filters`` one keyset page at a time, so an
+    export never holds the whole book in memory nor a read lock for the
+    length of a slow download. Pages walk ``id`` newest first: a claim edited
+    mid-walk is still returned exactly once, one inserted mid-walk is not."""
+    cursor = None
+    while True:
+        page = query_claims(filters, columns=columns, limit=batch, cursor=cursor,
+                            with_total=False, by_id=True)
+        yield from page["claims"]
+        cursor = page["next_cursor"]
+        if not cursor:
+            return
+
+
 # ── A/R aging + worklist priority weighting ──────────────────────────────────
 # Statuses that still have collectible money in play (open A/R). Paid/Closed are
 # done. Intake/Verification/Coding aren't billed yet, so they carry less A/R
@@ -3110,16 +3555,106 @@ def _parse_any_date(value):
     return None
 
 
-def _ar_bucket(days):
-    if days <= 30:
-        return "0-30"
-    if days <= 60:
-        return "31-60"
-    if days <= 90:
-        return "61-90"
-    if days <= 120:
-        return "91-120"
-    return "120+"
+# Normalized per-claim dates the A/R worklist ages and scores on. Refreshed
+# lazily by get_ar_worklist for open claims whose raw date text changed (the
+# ``src`` column), so claim writes and imports pay nothing for it and scoring
+# never re-parses date text.
+_AR_DATE_COLUMNS = ("DOS", "BillDate", "created_at", "NextActionDueDate")
+_AR_DATE_SRC = " || '|' || ".join(f"COALESCE(cm.{c}, '')" for c in _AR_DATE_COLUMNS)
+
+# claims_master write counter at the last refresh, per database file.
+_ar_dates_synced: dict = {}
+
+
+def _ensure_claim_ar_dates(conn):
+    # v1 kept the table current with per-row triggers that re-parsed dates in
+    # SQL on every claim insert/update; v2 refreshes lazily from Python.
+    for trg in ("trg_claim_ar_dates_ai_v1", "trg_claim_ar_dates_au_v1", "trg_claim_ar_dates_ad_v1"):
+        conn.execute(f"DROP TRIGGER IF EXISTS {trg}")
+    _run_migration_once(conn, "claims_ar_dates_v2", lambda: conn.execute(
+        "DROP TABLE IF EXISTS claims_ar_dates"))
+    conn.execute(
+        """CREATE TABLE IF NOT EXISTS claims_ar_dates (
+               claim_id  INTEGER PRIMARY KEY,
+               age_date  TEXT,       -- DOS, else bill date, else created_at
+               due_date  TEXT,       -- NextActionDueDate
+               src       TEXT        -- the raw date text these were parsed from
+           )"""
+    )
+    conn.commit()
+
+
+def _refresh_claim_ar_dates(conn) -> int:
+    """Re-parse the dates of open A/R claims that are new or whose date text
+    changed since their row was written; a no-op while claims_master's write
+    counter hasn't moved. Returns the number of rows refreshed."""
+    version = get_data_versions(("claims_master",), conn=conn)["claims_master"]
+    if _ar_dates_synced.get(DATABASE_PATH) == version:
+        return 0
+    stale = conn.execute(
+        f"""SELECT cm.id, {', '.join('cm.' + c for c in _AR_DATE_COLUMNS)}, {_AR_DATE_SRC}
+            FROM claims_master cm
+            LEFT JOIN claims_ar_dates d ON d.claim_id = cm.id
+            WHERE cm.BalanceRemaining > 0
+              AND cm.ClaimStatus NOT IN ('Paid', 'Closed')
+              AND (d.claim_id IS NULL OR d.src IS NOT ({_AR_DATE_SRC}))"""
+    ).fetchall()
+    if stale:
+        rows = []
+        for cid, dos, bill, created, due, src in stale:
+            age = _parse_any_date(dos) or _parse_any_date(bill) or _parse_any_date(created)
+            due = _parse_any_date(due)
+            rows.append((cid, age.isoformat() if age else None,
+                         due.isoformat() if due else None, src))
+        conn.executemany(
+            "INSERT OR REPLACE INTO claims_ar_dates (claim_id, age_date, due_date, src) VALUES (?,?,?,?)",
+            rows)
+        conn.commit()
+    _ar_dates_synced[DATABASE_PATH] = version
+    return len(stale)
+
+
+_AR_BUCKETS = ("0-30", "31-60", "61-90", "91-120", "120+")
+# (upper bound in days, bucket, age weight) — the weight ramps up the older
+# the money gets.
+_AR_AGE_STEPS = ((30, "0-30", 1.0), (60, "31-60", 1.5), (90, "61-90", 2.2), (120, "91-120", 3.2))
+_AR_AGE_OLDEST = ("120+", 4.5)
+AR_OVERDUE_BONUS = 1.25
+
+AR_WORKLIST_CACHE_SIZE = int(os.getenv("AR_WORKLIST_CACHE_SIZE", "32"))
+_ar_worklist_lock = threading.Lock()
+_ar_worklist_cache: "OrderedDict[tuple, dict]" = OrderedDict()
+
+
+def _ar_scored_sql(where: str) -> str:
+    """``WITH ... scored`` over open A/R claims: aging days and bucket, the
+    overdue flag and ``priority_score`` = balance × age weight × status weight
+    × overdue bonus. Parameters: today, today, then those of ``where``."""
+    bucket = "CASE " + " ".join(f"WHEN aging_days <= {d} THEN '{b}'" for d, b, _ in _AR_AGE_STEPS) \
+        + f" ELSE '{_AR_AGE_OLDEST[0]}' END"
+    age_w = "CASE " + " ".join(f"WHEN aging_days <= {d} THEN {w}" for d, _, w in _AR_AGE_STEPS) \
+        + f" ELSE {_AR_AGE_OLDEST[1]} END"
+    status_w = "CASE ClaimStatus " + " ".join(
+        f"WHEN '{st}' THEN {w}" for st, w in _AR_STATUS_WEIGHT.items()) + " ELSE 1.0 END"
+    return f"""
+        WITH ar AS (
+            SELECT cm.id, cm.client_id, c.company AS client_company, cm.ClaimKey,
+                   cm.PatientName, cm.Payor, cm.ProviderName, cm.DOS, cm.ClaimStatus,
+                   CAST(cm.BalanceRemaining AS REAL) AS bal, cm.Owner, cm.NextAction,
+                   cm.NextActionDueDate, cm.DenialReason,
+                   MAX(0, COALESCE(CAST(julianday(?) - julianday(d.age_date) AS INTEGER), 0)) AS aging_days,
+                   (d.due_date IS NOT NULL AND d.due_date < ?) AS overdue
+            FROM claims_master cm
+            JOIN clients c ON c.id = cm.client_id
+            LEFT JOIN claims_ar_dates d ON d.claim_id = cm.id
+            WHERE cm.BalanceRemaining > 0
+              AND cm.ClaimStatus NOT IN ('Paid', 'Closed'){where}
+        ), scored AS (
+            SELECT ar.*, {bucket} AS aging_bucket,
+                   bal * ({age_w}) * ({status_w})
+                       * (CASE WHEN overdue THEN {AR_OVERDUE_BONUS} ELSE 1.0 END) AS priority_score
+            FROM ar
+        )"""
 
 
 def get_ar_worklist(client_id: int = None, owner: str = None,
@@ -3130,99 +3665,90 @@ def get_ar_worklist(client_id: int = None, owner: str = None,
     Returns open claims (balance > 0, not Paid/Closed) scored by
     `balance × age_weight × status_weight`, plus aging-bucket rollups, so a
     biller can work the highest-recovery claims first instead of guessing.
+
+    Aging, weighting and the top-N cut run in SQL over the normalized dates in
+    claims_ar_dates (refreshed here for claims whose dates changed); the
+    rollups are one GROUP BY. Results are cached per
+    filter set until a claims/clients write (or the business day) moves on.
     """
-    today = business_today()
-    conn = get_db()
-    try:
-        cur = conn.cursor()
-        q = """SELECT cm.*, c.company AS client_company
-               FROM claims_master cm
-               JOIN clients c ON c.id = cm.client_id
-               WHERE cm.BalanceRemaining > 0
-                 AND cm.ClaimStatus NOT IN ('Paid', 'Closed')"""
-        params = []
+    today = business_today().isoformat()
+    limit = max(1, int(limit or 300))
+    key = (client_id, (owner or "").strip().lower(), bucket or "", sub_profile or "", limit, today)
+    conn = get_db()
+    try:
+        _refresh_claim_ar_dates(conn)
+        tables = ("claims_master", "clients")
+        versions = (get_client_data_versions(client_id, tables, conn=conn) if client_id is not None
+                    else get_data_versions(tables, conn=conn))
+        key += (tuple(sorted(versions.items())),)
+        with _ar_worklist_lock:
+            hit = _ar_worklist_cache.get(key)
+            if hit is not None:
+                _ar_worklist_cache.move_to_end(key)
+                return copy.deepcopy(hit)
+
+        where, params = "", []
         if client_id is not None:
-            q += " AND cm.client_id=?"
+            where += " AND cm.client_id=?"
             params.append(client_id)
         if owner:
-            q += " AND lower(cm.Owner)=?"
+            where += " AND lower(cm.Owner)=?"
             params.append(owner.strip().lower())
         if sub_profile:
-            q += " AND cm.sub_profile=?"
+            where += " AND cm.sub_profile=?"
             params.append(sub_profile)
-        rows = [dict(r) for r in cur.execute(q, params).fetchall()]
-    finally:
-        conn.close()
-
-    buckets = {b: {"count": 0, "balance": 0.0} for b in ("0-30", "31-60", "61-90", "91-120", "120+")}
-    total_balance = 0.0
-    items = []
-    for r in rows:
-        bal = float(r.get("BalanceRemaining") or 0)
-        # Age from date of service, falling back to bill date, then created_at.
-        ref = (_parse_any_date(r.get("DOS")) or _parse_any_date(r.get("BillDate"))
-               or _parse_any_date(r.get("created_at")))
-        age = (today - ref).days if ref else 0
-        if age < 0:
-            age = 0
-        bk = _ar_bucket(age)
-        # Age weight ramps up the older the money gets.
-        if age <= 30:
-            age_w = 1.0
-        elif age <= 60:
-            age_w = 1.5
-        elif age <= 90:
-            age_w = 2.2
-        elif age <= 120:
-            age_w = 3.2
-        else:
-            age_w = 4.5
-        status_w = _AR_STATUS_WEIGHT.get(r.get("ClaimStatus") or "", 1.0)
-        # Overdue next action gives an extra nudge.
-        due = _parse_any_date(r.get("NextActionDueDate"))
-        overdue = bool(due and due < today)
-        score = bal * age_w * status_w * (1.25 if overdue else 1.0)
-
-        buckets[bk]["count"] += 1
-        buckets[bk]["balance"] += bal
-        total_balance += bal
-
-        items.append({
-            "id": r.get("id"),
-            "client_id": r.get("client_id"),
-            "client_company": r.get("client_company") or "",
-            "ClaimKey": r.get("ClaimKey") or "",
-            "PatientName": r.get("PatientName") or "",
-            "Payor": r.get("Payor") or "",
-            "ProviderName": r.get("ProviderName") or "",
-            "DOS": r.get("DOS") or "",
-            "ClaimStatus": r.get("ClaimStatus") or "",
-            "BalanceRemaining": round(bal, 2),
-            "Owner": r.get("Owner") or "",
-            "NextAction": r.get("NextAction") or "",
-            "NextActionDueDate": r.get("NextActionDueDate") or "",
-            "DenialReason": r.get("DenialReason") or "",
-            "aging_days": age,
-            "aging_bucket": bk,
-            "overdue": overdue,
-            "priority_score": round(score, 2),
-        })
-
-    items.sort(key=lambda it: it["priority_score"], reverse=True)
-    if bucket:
-        items = [it for it in items if it["aging_bucket"] == bucket]
-    items = items[: max(1, int(limit or 300))]
-
-    for b in buckets.values():
-        b["balance"] = round(b["balance"], 2)
-
-    return {
+        cte = _ar_scored_sql(where)
+        rollup = conn.execute(
+            f"{cte} SELECT aging_bucket, COUNT(*), SUM(bal) FROM scored GROUP BY aging_bucket",
+            [today, today] + params,
+        ).fetchall()
+        item_sql = f"{cte} SELECT * FROM scored"
+        item_params = [today, today] + params
+        if bucket:
+            item_sql += " WHERE aging_bucket=?"
+            item_params.append(bucket)
+        rows = conn.execute(item_sql + " ORDER BY priority_score DESC, id LIMIT ?",
+                            item_params + [limit]).fetchall()
+    finally:
+        conn.close()
+
+    buckets = {b: {"count": 0, "balance": 0.0} for b in _AR_BUCKETS}
+    for bk, count, balance in rollup:
+        buckets[bk] = {"count": int(count), "balance": round(float(balance or 0), 2)}
+    items = [{
+        "id": r["id"],
+        "client_id": r["client_id"],
+        "client_company": r["client_company"] or "",
+        "ClaimKey": r["ClaimKey"] or "",
+        "PatientName": r["PatientName"] or "",
+        "Payor": r["Payor"] or "",
+        "ProviderName": r["ProviderName"] or "",
+        "DOS": r["DOS"] or "",
+        "ClaimStatus": r["ClaimStatus"] or "",
+        "BalanceRemaining": round(float(r["bal"]), 2),
+        "Owner": r["Owner"] or "",
+        "NextAction": r["NextAction"] or "",
+        "NextActionDueDate": r["NextActionDueDate"] or "",
+        "DenialReason": r["DenialReason"] or "",
+        "aging_days": int(r["aging_days"]),
+        "aging_bucket": r["aging_bucket"],
+        "overdue": bool(r["overdue"]),
+        "priority_score": round(float(r["priority_score"]), 2),
+    } for r in rows]
+
+    out = {
         "generated_at": datetime.now().isoformat(timespec="seconds"),
-        "total_open_count": len(rows),
-        "total_open_balance": round(total_balance, 2),
+        "total_open_count": sum(b["count"] for b in buckets.values()),
+        "total_open_balance": round(sum(float(r[2] or 0) for r in rollup), 2),
         "buckets": buckets,
         "items": items,
     }
+    if AR_WORKLIST_CACHE_SIZE > 0:
+        with _ar_worklist_lock:
+            _ar_worklist_cache[key] = copy.deepcopy(out)
+            while len(_ar_worklist_cache) > AR_WORKLIST_CACHE_SIZE:
+                _ar_worklist_cache.popitem(last=False)
+    return out
 
 
 def get_claim(claim_id: int):
@@ -5327,11 +5853,6 @@ def get_team_activity_rollup(bucket: str = "day", count: int = 14,
     try:
         cur = conn.cursor()
 
-        def _scalar(sql: str, params: tuple):
-            cur.execute(sql, params)
-            row = cur.fetchone()
-            return (row[0] if row and row[0] is not None else 0)
-
         # client_id filter fragment shared by the per-table queries.
         cfilt = " AND client_id=?" if client_id is not None else ""
         cargs: tuple = (int(client_id),) if client_id is not None else ()
@@ -5346,117 +5867,133 @@ def get_team_activity_rollup(bucket: str = "day", count: int = 14,
         cc = f"date(created_at, '{_tz_mod}')"   # created_at, business-local date
         uc = f"date(updated_at, '{_tz_mod}')"   # updated_at, business-local date
 
-        rows_out: list[dict] = []
-        for label, d_start, d_end in buckets:
-            s, e = d_start.isoformat(), d_end.isoformat()
-
-            claims_new = _scalar(
-                f"SELECT COUNT(*) FROM claims_master "
-                f"WHERE {cc} BETWEEN ? AND ?{cfilt}",
-                (s, e, *cargs))
-            claims_touched = _scalar(
-                f"SELECT COUNT(*) FROM claims_master "
-                f"WHERE {uc} BETWEEN ? AND ? "
-                f"AND {cc} NOT BETWEEN ? AND ?{cfilt}",
-                (s, e, s, e, *cargs))
-            payments_posted = _scalar(
-                f"SELECT COUNT(*) FROM payments "
-                f"WHERE {cc} BETWEEN ? AND ?{cfilt}",
-                (s, e, *cargs))
-            payments_amount = _scalar(
-                f"SELECT ROUND(COALESCE(SUM(PaymentAmount),0),2) FROM payments "
-                f"WHERE {cc} BETWEEN ? AND ?{cfilt}",
-                (s, e, *cargs))
-            cred_new = _scalar(
-                f"SELECT COUNT(*) FROM credentialing "
-                f"WHERE {cc} BETWEEN ? AND ?{cfilt}",
-                (s, e, *cargs))
-            enroll_new = _scalar(
-                f"SELECT COUNT(*) FROM enrollment "
-                f"WHERE {cc} BETWEEN ? AND ?{cfilt}",
-                (s, e, *cargs))
-            edi_new = _scalar(
-                f"SELECT COUNT(*) FROM edi_setup "
-                f"WHERE {cc} BETWEEN ? AND ?{cfilt}",
-                (s, e, *cargs))
-            production_rows = _scalar(
-                f"SELECT COUNT(*) FROM team_production "
-                f"WHERE (work_date BETWEEN ? AND ? "
-                f"OR {cc} BETWEEN ? AND ?){cfilt}",
-                (s, e, s, e, *cargs))
-            production_hours = _scalar(
-                f"SELECT ROUND(COALESCE(SUM(time_spent),0),2) FROM team_production "
-                f"WHERE (work_date BETWEEN ? AND ? "
-                f"OR {cc} BETWEEN ? AND ?){cfilt}",
-                (s, e, s, e, *cargs))
-            notes_new = _scalar(
-                f"SELECT COUNT(*) FROM notes_log "
-                f"WHERE {cc} BETWEEN ? AND ?{cfilt}",
-                (s, e, *cargs))
-            files_uploaded = _scalar(
-                f"SELECT COUNT(*) FROM client_files "
-                f"WHERE {cc} BETWEEN ? AND ?{cfilt}",
-                (s, e, *cargs))
-
-            # Billed = claim lines whose Bill Date falls in the window. Bill Date
-            # is free-text, so normalize to the first 10 chars (ISO date prefix),
-            # matching the dashboard's billing-activity computation.
-            cur.execute(
-                f"SELECT substr(COALESCE(BillDate,''),1,10), ChargeAmount "
-                f"FROM claims_master "
-                f"WHERE COALESCE(BillDate,'')!=''{cfilt}",
-                cargs)
-            billed_count = 0
-            billed_amount = 0.0
-            for _bd_raw, _amt_raw in cur.fetchall():
-                try:
-                    _bd = date.fromisoformat(str(_bd_raw or "").strip())
-                except (ValueError, TypeError):
-                    continue
-                if d_start <= _bd <= d_end:
-                    billed_count += 1
-                    billed_amount += float(_amt_raw or 0)
-            billed_amount = round(billed_amount, 2)
-
-            # Distinct contributors who logged any work in the window.
-            active_users = _scalar(
-                "SELECT COUNT(*) FROM ("
-                f"  SELECT PostedBy AS u FROM payments "
-                f"   WHERE {cc} BETWEEN ? AND ? AND COALESCE(PostedBy,'')!=''{cfilt} "
-                "  UNION "
-                f"  SELECT username AS u FROM team_production "
-                f"   WHERE (work_date BETWEEN ? AND ? OR {cc} BETWEEN ? AND ?) "
-                f"     AND COALESCE(username,'')!=''{cfilt} "
-                "  UNION "
-                f"  SELECT uploaded_by AS u FROM client_files "
-                f"   WHERE {cc} BETWEEN ? AND ? AND COALESCE(uploaded_by,'')!=''{cfilt} "
-                "  UNION "
-                f"  SELECT Author AS u FROM notes_log "
-                f"   WHERE {cc} BETWEEN ? AND ? AND COALESCE(Author,'')!=''{cfilt} "
-                ")",
-                (s, e, *cargs,
-                 s, e, s, e, *cargs,
-                 s, e, *cargs,
-                 s, e, *cargs))
+        # One grouped pass per table over the whole window, keyed by
+        # business-local day; days are then folded into buckets, so the cost
+        # tracks the window's activity rather than buckets x tables.
+        import bisect
+        from collections import defaultdict
+        starts = [b[1].isoformat() for b in buckets]
+        ends = [b[2].isoformat() for b in buckets]
+        first, last = starts[0], ends[-1]
+
+        def _bi(day):
+            """Bucket index for an ISO day string (None when outside)."""
+            if not day:
+                return None
+            day = str(day)
+            i = bisect.bisect_right(starts, day) - 1
+            return i if i >= 0 and day <= ends[i] else None
+
+        metrics = [defaultdict(float) for _ in buckets]
+        active = [set() for _ in buckets]
+
+        def _add(i, key, value=1):
+            if i is not None:
+                metrics[i][key] += value or 0
+
+        for table, key in (("claims_master", "claims_new"), ("credentialing", "cred_new"),
+                           ("enrollment", "enroll_new"), ("edi_setup", "edi_new"),
+                           ("notes_log", "notes_new"), ("client_files", "files_uploaded")):
+            for d, n in cur.execute(
+                f"SELECT {cc} AS d, COUNT(*) FROM {table} "
+                f"WHERE {cc} BETWEEN ? AND ?{cfilt} GROUP BY d",
+                (first, last, *cargs),
+            ).fetchall():
+                _add(_bi(d), key, n)
+
+        # Touched = updated inside the bucket but created outside it, so keep
+        # the (created, updated) day pair.
+        for cd, ud, n in cur.execute(
+            f"SELECT {cc} AS cd, {uc} AS ud, COUNT(*) FROM claims_master "
+            f"WHERE {uc} BETWEEN ? AND ?{cfilt} GROUP BY cd, ud",
+            (first, last, *cargs),
+        ).fetchall():
+            if cd is None:
+                continue
+            i = _bi(ud)
+            if i is not None and _bi(cd) != i:
+                _add(i, "claims_touched", n)
+
+        for d, n, amt in cur.execute(
+            f"SELECT {cc} AS d, COUNT(*), COALESCE(SUM(PaymentAmount),0) FROM payments "
+            f"WHERE {cc} BETWEEN ? AND ?{cfilt} GROUP BY d",
+            (first, last, *cargs),
+        ).fetchall():
+            _add(_bi(d), "payments_posted", n)
+            _add(_bi(d), "payments_amount", amt)
+
+        # A production row counts in a bucket when either its work_date or
+        # its created day falls inside it.
+        for wd, cd, n, hrs in cur.execute(
+            f"SELECT work_date, {cc} AS cd, COUNT(*), COALESCE(SUM(time_spent),0) "
+            f"FROM team_production "
+            f"WHERE (work_date BETWEEN ? AND ? OR {cc} BETWEEN ? AND ?){cfilt} "
+            f"GROUP BY work_date, cd",
+            (first, last, first, last, *cargs),
+        ).fetchall():
+            for i in {_bi(wd), _bi(cd)} - {None}:
+                _add(i, "production_rows", n)
+                _add(i, "production_hours", hrs)
+
+        # Billed = claim lines whose Bill Date falls in the window. Bill Date
+        # is free-text, so normalize to the first 10 chars (ISO date prefix),
+        # matching the dashboard's billing-activity computation.
+        for _bd_raw, _amt_raw in cur.execute(
+            f"SELECT substr(COALESCE(BillDate,''),1,10), ChargeAmount "
+            f"FROM claims_master "
+            f"WHERE COALESCE(BillDate,'')!=''{cfilt}",
+            cargs,
+        ).fetchall():
+            try:
+                _bd = date.fromisoformat(str(_bd_raw or "").strip())
+            except (ValueError, TypeError):
+                continue
+            i = _bi(_bd.isoformat())
+            if i is not None:
+                _add(i, "billed_count")
+                metrics[i]["billed_amount"] += float(_amt_raw or 0)
+
+        # Distinct contributors who logged any work in the window.
+        for sql, params in (
+            (f"SELECT DISTINCT {cc}, NULL, PostedBy FROM payments "
+             f"WHERE {cc} BETWEEN ? AND ? AND COALESCE(PostedBy,'')!=''{cfilt}",
+             (first, last, *cargs)),
+            (f"SELECT DISTINCT work_date, {cc}, username FROM team_production "
+             f"WHERE (work_date BETWEEN ? AND ? OR {cc} BETWEEN ? AND ?) "
+             f"AND COALESCE(username,'')!=''{cfilt}",
+             (first, last, first, last, *cargs)),
+            (f"SELECT DISTINCT {cc}, NULL, uploaded_by FROM client_files "
+             f"WHERE {cc} BETWEEN ? AND ? AND COALESCE(uploaded_by,'')!=''{cfilt}",
+             (first, last, *cargs)),
+            (f"SELECT DISTINCT {cc}, NULL, Author FROM notes_log "
+             f"WHERE {cc} BETWEEN ? AND ? AND COALESCE(Author,'')!=''{cfilt}",
+             (first, last, *cargs)),
+        ):
+            for d1, d2, who in cur.execute(sql, params).fetchall():
+                for i in {_bi(d1), _bi(d2)} - {None}:
+                    active[i].add(who)
 
+        rows_out: list[dict] = []
+        for i, (label, d_start, d_end) in enumerate(buckets):
+            m = metrics[i]
             rows_out.append({
                 "label": label,
-                "start": s,
-                "end": e,
-                "claims_new": int(claims_new),
-                "claims_touched": int(claims_touched),
-                "payments_posted": int(payments_posted),
-                "payments_amount": float(payments_amount),
-                "billed_count": int(billed_count),
-                "billed_amount": billed_amount,
-                "cred_new": int(cred_new),
-                "enroll_new": int(enroll_new),
-                "edi_new": int(edi_new),
-                "production_rows": int(production_rows),
-                "production_hours": float(production_hours),
-                "notes_new": int(notes_new),
-                "files_uploaded": int(files_uploaded),
-                "active_users": int(active_users),
+                "start": d_start.isoformat(),
+                "end": d_end.isoformat(),
+                "claims_new": int(m["claims_new"]),
+                "claims_touched": int(m["claims_touched"]),
+                "payments_posted": int(m["payments_posted"]),
+                "payments_amount": round(float(m["payments_amount"]), 2),
+                "billed_count": int(m["billed_count"]),
+                "billed_amount": round(m["billed_amount"], 2),
+                "cred_new": int(m["cred_new"]),
+                "enroll_new": int(m["enroll_new"]),
+                "edi_new": int(m["edi_new"]),
+                "production_rows": int(m["production_rows"]),
+                "production_hours": round(float(m["production_hours"]), 2),
+                "notes_new": int(m["notes_new"]),
+                "files_uploaded": int(m["files_uploaded"]),
+                "active_users": len(active[i]),
             })
 
         # Column totals across all returned buckets.
@@ -5664,11 +6201,36 @@ def list_app_settings() -> dict:
 # `user_presence`. "Active seconds" is computed as the gap between consecutive
 # events for the same user, capped at IDLE_THRESHOLD_SECONDS (default 5 min).
 # Gaps longer than the threshold are considered idle and not counted.
+#
+# log_activity only appends to an in-memory ring buffer; a background thread
+# flushes it every ACTIVITY_FLUSH_SECONDS in one transaction that inserts the
+# raw events, advances user_presence and bumps the hourly/daily rollups.
+# Readers flush first so they always see their own writes. Raw events older
+# than ACTIVITY_RAW_RETAIN_DAYS are deleted by compact_activity_events — the
+# rollups already hold their counts.
 
 IDLE_THRESHOLD_SECONDS = 5 * 60   # gap > 5 min = idle session
 HEARTBEAT_INTERVAL_SEC = 60       # frontend pings this often when tab is focused
 PRODUCTIVITY_TARGET_HOURS = 7.0   # used for the 0-100 productivity score
 
+ACTIVITY_FLUSH_SECONDS = float(os.getenv("ACTIVITY_FLUSH_SECONDS", "3"))  # 0 = write inline
+ACTIVITY_BUFFER_MAX = int(os.getenv("ACTIVITY_BUFFER_MAX", "50000"))
+ACTIVITY_RAW_RETAIN_DAYS = int(os.getenv("ACTIVITY_RAW_RETAIN_DAYS", "30"))
+ACTIVITY_HOURLY_RETAIN_DAYS = int(os.getenv("ACTIVITY_HOURLY_RETAIN_DAYS", "180"))
+
+_activity_buffer: deque = deque(maxlen=ACTIVITY_BUFFER_MAX)
+_activity_lock = threading.Lock()        # guards the buffer + flusher start
+_activity_flush_lock = threading.Lock()  # one flush transaction at a time
+_activity_flusher: threading.Thread | None = None
+_activity_stats = {"flushed": 0, "dropped": 0, "failed_flushes": 0}
+
+_ACTIVITY_INSERT_SQL = (
+    "INSERT INTO activity_events "
+    "(occurred_at, username, client_id, event_type, method, path, "
+    " status_code, duration_ms, ip, user_agent, details) "
+    "VALUES (?,?,?,?,?,?,?,?,?,?,?)"
+)
+
 
 def log_activity(username: str,
                  event_type: str,
@@ -5681,75 +6243,229 @@ def log_activity(username: str,
                  ip: str = "",
                  user_agent: str = "",
                  details: str = "") -> None:
-    """Record one timestamped activity event and update the user's daily
-    presence rollup. Safe — swallows any errors so tracking never breaks the
-    main request flow.
+    """Queue one timestamped activity event for the next buffered flush.
+
+    Safe — never raises, so tracking never breaks the main request flow. When
+    the buffer is full the oldest unflushed event is dropped (and counted).
     """
     if not username:
         return
     username = username.strip().lower()
     if not username:
         return
-    conn = None
     try:
-        conn = get_db()
-        cur = conn.cursor()
-        now = datetime.now()
-        now_iso = now.isoformat(timespec="seconds")
-        today = now.strftime("%Y-%m-%d")
-
-        cur.execute(
-            "INSERT INTO activity_events "
-            "(occurred_at, username, client_id, event_type, method, path, "
-            " status_code, duration_ms, ip, user_agent, details) "
-            "VALUES (?,?,?,?,?,?,?,?,?,?,?)",
-            (now_iso, username, client_id, event_type, method or "",
-             path or "", status_code, duration_ms, ip or "",
-             (user_agent or "")[:255], details or ""),
+        event = (
+            datetime.now().isoformat(timespec="seconds"), username, client_id,
+            event_type, method or "", path or "", status_code, duration_ms,
+            ip or "", (user_agent or "")[:255], details or "",
         )
+        with _activity_lock:
+            if len(_activity_buffer) == _activity_buffer.maxlen:
+                _activity_stats["dropped"] += 1
+            _activity_buffer.append(event)
+        if ACTIVITY_FLUSH_SECONDS <= 0:
+            flush_activity_buffer()
+        else:
+            _ensure_activity_flusher()
+    except Exception:
+        pass
 
-        cur.execute(
-            "SELECT last_seen_at, active_seconds, idle_seconds, action_count "
-            "FROM user_presence WHERE username=? AND work_date=?",
-            (username, today),
-        )
-        row = cur.fetchone()
-        counts_as_action = event_type not in ("heartbeat",)
-        action_inc = 1 if counts_as_action else 0
 
+def _ensure_activity_flusher() -> None:
+    global _activity_flusher
+    if _activity_flusher is not None and _activity_flusher.is_alive():
+        return
+    with _activity_lock:
+        if _activity_flusher is not None and _activity_flusher.is_alive():
+            return
+        _activity_flusher = threading.Thread(
+            target=_activity_flush_loop, name="activity-flusher", daemon=True)
+        _activity_flusher.start()
+
+
+def _activity_flush_loop() -> None:
+    import time as _time
+    while True:
+        _time.sleep(ACTIVITY_FLUSH_SECONDS)
+        flush_activity_buffer()
+
+
+def flush_activity_buffer() -> int:
+    """Write every buffered event in one transaction. Returns rows written.
+
+    On failure the batch goes back to the front of the buffer for the next
+    flush. If that overfills the buffer, the oldest events are dropped (and
+    counted) so the newest ones survive, as in log_activity.
+    """
+    with _activity_flush_lock:
+        with _activity_lock:
+            batch = list(_activity_buffer)
+            _activity_buffer.clear()
+        if not batch:
+            return 0
+        conn = None
+        try:
+            conn = get_db()
+            conn.execute("BEGIN IMMEDIATE")
+            cur = conn.cursor()
+            cur.executemany(_ACTIVITY_INSERT_SQL, batch)
+            _apply_presence_batch(cur, batch)
+            _apply_activity_rollups(cur, batch)
+            conn.commit()
+        except Exception as exc:
+            if conn is not None:
+                conn.rollback()
+            log.warning("activity flush of %d events failed: %s", len(batch), exc)
+            with _activity_lock:
+                _activity_stats["failed_flushes"] += 1
+                pending = batch + list(_activity_buffer)
+                overflow = len(pending) - _activity_buffer.maxlen
+                if overflow > 0:
+                    _activity_stats["dropped"] += overflow
+                    log.warning("activity buffer full: dropped %d oldest events", overflow)
+                _activity_buffer.clear()
+                _activity_buffer.extend(pending)
+            return 0
+        finally:
+            if conn is not None:
+                conn.close()
+        _activity_stats["flushed"] += len(batch)
+        return len(batch)
+
+
+def _flush_activity_at_exit() -> None:
+    try:
+        flush_activity_buffer()
+    except Exception:
+        pass
+
+
+atexit.register(_flush_activity_at_exit)
+
+
+def _apply_presence_batch(cur, batch) -> None:
+    """Advance user_presence for a batch: one read and one upsert per
+    (user, day), replaying the events in time order with the same gap rule
+    the per-event writer used."""
+    per_day: dict[tuple[str, str], list[tuple[str, str]]] = {}
+    for ev in sorted(batch, key=lambda e: e[0]):
+        per_day.setdefault((ev[1], ev[0][:10]), []).append((ev[0], ev[3]))
+
+    rows = []
+    for (username, day), events in per_day.items():
+        row = cur.execute(
+            "SELECT first_seen_at, last_seen_at, active_seconds, idle_seconds, action_count "
+            "FROM user_presence WHERE username=? AND work_date=?",
+            (username, day),
+        ).fetchone()
         if row is None:
-            cur.execute(
-                "INSERT INTO user_presence "
-                "(username, work_date, first_seen_at, last_seen_at, "
-                " active_seconds, idle_seconds, action_count) "
-                "VALUES (?,?,?,?,?,?,?)",
-                (username, today, now_iso, now_iso, 0, 0, action_inc),
-            )
+            first_seen, last_seen, active, idle, actions = events[0][0], None, 0, 0, 0
         else:
+            first_seen, last_seen = row["first_seen_at"], row["last_seen_at"]
+            active, idle = int(row["active_seconds"] or 0), int(row["idle_seconds"] or 0)
+            actions = int(row["action_count"] or 0)
+        for occurred_at, event_type in events:
+            now = datetime.fromisoformat(occurred_at)
             try:
-                prev = datetime.fromisoformat(row["last_seen_at"]) if row["last_seen_at"] else now
+                prev = datetime.fromisoformat(last_seen) if last_seen else now
             except Exception:
                 prev = now
             gap = max(0, int((now - prev).total_seconds()))
             if gap <= IDLE_THRESHOLD_SECONDS:
-                active_add, idle_add = gap, 0
+                active += gap
             else:
-                active_add, idle_add = 0, gap
-            cur.execute(
-                "UPDATE user_presence SET "
-                "  last_seen_at=?, "
-                "  active_seconds=active_seconds+?, "
-                "  idle_seconds=idle_seconds+?, "
-                "  action_count=action_count+? "
-                "WHERE username=? AND work_date=?",
-                (now_iso, active_add, idle_add, action_inc, username, today),
-            )
+                idle += gap
+            if event_type not in ("heartbeat",):
+                actions += 1
+            last_seen = occurred_at
+        rows.append((username, day, first_seen, last_seen, active, idle, actions))
+
+    cur.executemany(
+        "INSERT INTO user_presence "
+        "(username, work_date, first_seen_at, last_seen_at, "
+        " active_seconds, idle_seconds, action_count) "
+        "VALUES (?,?,?,?,?,?,?) "
+        "ON CONFLICT(username, work_date) DO UPDATE SET "
+        "  last_seen_at=excluded.last_seen_at, "
+        "  active_seconds=excluded.active_seconds, "
+        "  idle_seconds=excluded.idle_seconds, "
+        "  action_count=excluded.action_count",
+        rows,
+    )
+
+
+def _apply_activity_rollups(cur, batch) -> None:
+    """Add a batch of events to the hourly and daily rollup counters."""
+    hourly: dict[tuple, list[int]] = {}
+    daily: dict[tuple, list[int]] = {}
+    for occurred_at, username, client_id, event_type, _m, path, _s, duration_ms, *_ in batch:
+        try:
+            cid = int(client_id or 0)
+        except (TypeError, ValueError):
+            cid = 0
+        key = (username, cid, event_type, path or "")
+        for bucket, acc in ((occurred_at[:13] + ":00:00", hourly), (occurred_at[:10], daily)):
+            slot = acc.setdefault((bucket,) + key, [0, 0])
+            slot[0] += 1
+            slot[1] += int(duration_ms or 0)
+
+    for table, bucket_col, acc in (("activity_rollup_hourly", "hour", hourly),
+                                   ("activity_rollup_daily", "day", daily)):
+        cur.executemany(
+            f"INSERT INTO {table} "
+            f"({bucket_col}, username, client_id, event_type, path, events, duration_ms) "
+            f"VALUES (?,?,?,?,?,?,?) "
+            f"ON CONFLICT({bucket_col}, username, client_id, event_type, path) DO UPDATE SET "
+            f"  events=events+excluded.events, "
+            f"  duration_ms=duration_ms+excluded.duration_ms",
+            [k + tuple(v) for k, v in acc.items()],
+        )
+
+
+def _backfill_activity_rollups(conn) -> None:
+    """Rebuild both rollups from whatever raw activity_events exist."""
+    for table, bucket_col, bucket_expr in (
+        ("activity_rollup_hourly", "hour", "substr(occurred_at,1,13) || ':00:00'"),
+        ("activity_rollup_daily", "day", "substr(occurred_at,1,10)"),
+    ):
+        conn.execute(f"DELETE FROM {table}")
+        conn.execute(
+            f"INSERT INTO {table} "
+            f"({bucket_col}, username, client_id, event_type, path, events, duration_ms) "
+            f"SELECT {bucket_expr}, lower(username), COALESCE(client_id,0), event_type, "
+            f"       COALESCE(path,''), COUNT(*), COALESCE(SUM(duration_ms),0) "
+            f"FROM activity_events "
+            f"GROUP BY 1, 2, 3, 4, 5"
+        )
+
+
+def compact_activity_events(raw_retain_days: int = None,
+                            hourly_retain_days: int = None) -> dict:
+    """Retention tiers: raw events for ``raw_retain_days``, hourly rollups for
+    ``hourly_retain_days``, daily rollups forever.
+
+    Safe because every raw event is counted into both rollups in the same
+    transaction that inserts it.
+    """
+    raw_days = ACTIVITY_RAW_RETAIN_DAYS if raw_retain_days is None else int(raw_retain_days)
+    hourly_days = ACTIVITY_HOURLY_RETAIN_DAYS if hourly_retain_days is None else int(hourly_retain_days)
+    flush_activity_buffer()
+    now = datetime.now()
+    raw_cutoff = (now - timedelta(days=raw_days)).strftime("%Y-%m-%d")
+    hourly_cutoff = (now - timedelta(days=hourly_days)).strftime("%Y-%m-%d")
+    conn = get_db()
+    try:
+        raw = conn.execute(
+            "DELETE FROM activity_events WHERE occurred_at < ?", (raw_cutoff,)).rowcount
+        hourly = conn.execute(
+            "DELETE FROM activity_rollup_hourly WHERE hour < ?", (hourly_cutoff,)).rowcount
         conn.commit()
-    except Exception:
-        pass
     finally:
-        if conn:
-            conn.close()
+        conn.close()
+    log.info("activity compaction: %d raw events (< %s), %d hourly rows (< %s) removed",
+             raw, raw_cutoff, hourly, hourly_cutoff)
+    return {"raw_deleted": int(raw or 0), "hourly_deleted": int(hourly or 0),
+            "raw_cutoff": raw_cutoff, "hourly_cutoff": hourly_cutoff}
 
 
 def _repair_offline_eligibility_verification_state(cur) -> int:
@@ -5792,7 +6508,9 @@ def list_activity_events(username: str = None,
                          end: str = None,
                          event_type: str = None,
                          limit: int = 500) -> list[dict]:
-    """List recent activity events with optional filters."""
+    """List recent raw activity events with optional filters (raw events are
+    kept for ACTIVITY_RAW_RETAIN_DAYS; older history lives in the rollups)."""
+    flush_activity_buffer()
     conn = get_db()
     try:
         cur = conn.cursor()
@@ -5822,6 +6540,7 @@ def list_activity_events(username: str = None,
 
 def get_live_users(within_seconds: int = 300) -> list[dict]:
     """Users seen within the last N seconds — 'who is online right now'."""
+    flush_activity_buffer()
     conn = get_db()
     try:
         cutoff = (datetime.now() - timedelta(seconds=within_seconds)).isoformat(timespec="seconds")
@@ -5844,8 +6563,10 @@ def get_productivity_report(start_date: str = None,
 
     Returns one row per user per day with active/idle minutes, action count
     and a 0-100 productivity score relative to PRODUCTIVITY_TARGET_HOURS.
-    Also returns per-user totals and a top-paths breakdown.
+    Also returns per-user totals and a top-paths breakdown (from the daily
+    activity rollup, so it covers days whose raw events were compacted).
     """
+    flush_activity_buffer()
     conn = get_db()
     try:
         cur = conn.cursor()
@@ -5901,17 +6622,17 @@ def get_productivity_report(start_date: str = None,
 
         ev_conds, ev_params = ["event_type='request'"], []
         if start_date:
-            ev_conds.append("date(occurred_at) >= ?")
+            ev_conds.append("day >= ?")
             ev_params.append(start_date)
         if end_date:
-            ev_conds.append("date(occurred_at) <= ?")
+            ev_conds.append("day <= ?")
             ev_params.append(end_date)
         if username:
-            ev_conds.append("lower(username)=lower(?)")
+            ev_conds.append("username=lower(?)")
             ev_params.append(username)
         ev_where = "WHERE " + " AND ".join(ev_conds)
         cur.execute(
-            f"SELECT path, COUNT(*) AS hits FROM activity_events {ev_where} "
+            f"SELECT path, SUM(events) AS hits FROM activity_rollup_daily {ev_where} "
             f"GROUP BY path ORDER BY hits DESC LIMIT 20", ev_params,
         )
         top_paths = [dict(r) for r in cur.fetchall()]
@@ -6325,32 +7046,173 @@ def get_leads_pipeline() -> dict:
     }
 
 
-def get_eod_team_report(report_date: str = None) -> dict:
-    """Build the full end-of-day report for the team.
+# ── Daily activity snapshot ──────────────────────────────────────────────────
+# One query per source table for the day. The EOD team report and every
+# per-client daily report render from the same snapshot, so the 9:10 PM
+# fan-out costs one pass over the day's rows instead of clients x tables.
+# Each source: (sql, number of report_date params, optional). Optional
+# sources come back empty if the table is missing/broken rather than failing
+# the whole report, matching the per-section try/except the reports had.
+_DAILY_SNAPSHOT_SOURCES: dict[str, tuple[str, int, bool]] = {
+    "presence": (
+        "SELECT username, active_seconds, idle_seconds, action_count, "
+        "       first_seen_at, last_seen_at "
+        "FROM user_presence WHERE work_date=?", 1, False),
+    "pageviews": (
+        "SELECT username, client_id, path, SUM(events) AS hits "
+        "FROM activity_rollup_daily "
+        "WHERE day=? AND event_type IN ('request','pageview') "
+        "GROUP BY username, client_id, path "
+        "ORDER BY hits DESC", 1, False),
+    "claims": (
+        "SELECT client_id, ClaimKey, ClaimStatus, Owner, "
+        "       created_at, updated_at, "
+        "       date(created_at) AS cd, date(updated_at) AS ud "
+        "FROM claims_master "
+        "WHERE date(created_at)=? OR date(updated_at)=?", 2, False),
+    "payments": (
+        "SELECT client_id, ClaimKey, PaymentAmount, PayerType, PostDate, "
+        "       PostedBy, created_at "
+        "FROM payments WHERE date(created_at)=?", 1, False),
+    "credentialing": (
+        "SELECT client_id, ProviderName, Payor, Status, Owner, "
+        "       created_at, updated_at, "
+        "       date(created_at) AS cd, date(updated_at) AS ud "
+        "FROM credentialing "
+        "WHERE date(created_at)=? OR date(updated_at)=?", 2, False),
+    "enrollment": (
+        "SELECT client_id, ProviderName, Payor, Status, Owner, "
+        "       created_at, updated_at, "
+        "       date(created_at) AS cd, date(updated_at) AS ud "
+        "FROM enrollment "
+        "WHERE date(created_at)=? OR date(updated_at)=?", 2, False),
+    "edi": (
+        "SELECT client_id, ProviderName, Payor, EDIStatus AS Status, Owner, "
+        "       created_at, updated_at, "
+        "       date(created_at) AS cd, date(updated_at) AS ud "
+        "FROM edi_setup "
+        "WHERE date(created_at)=? OR date(updated_at)=?", 2, False),
+    "production": (
+        "SELECT client_id, username, category, task_description, "
+        "       quantity, time_spent, created_at FROM team_production "
+        "WHERE date(created_at)=? OR work_date=?", 2, True),
+    "notes": (
+        "SELECT client_id, ClaimKey, Module, Author, Note, created_at "
+        "FROM notes_log WHERE date(created_at)=?", 1, True),
+    "audit": (
+        "SELECT client_id, username, action, entity_type, entity_id, details "
+        "FROM audit_log WHERE date(created_at)=?", 1, True),
+    "documents": (
+        "SELECT client_id, original_name, uploaded_by, category, created_at "
+        "FROM client_files WHERE date(created_at)=?", 1, True),
+    "chat": (
+        "SELECT m.room_id, m.sender_name, r.client_id, r.name AS room_name, m.created_at "
+        "FROM chat_messages m LEFT JOIN chat_rooms r ON r.id = m.room_id "
+        "WHERE date(m.created_at)=?", 1, True),
+    "leads": (
+        "SELECT practice_name, status, est_value, owner, "
+        "       created_at, updated_at, "
+        "       date(created_at) AS cd, date(updated_at) AS ud "
+        "FROM leads "
+        "WHERE date(created_at)=? OR date(updated_at)=?", 2, True),
+}
 
-    Pulls every per-tab data store the hub has (claims, credentialing,
-    enrollment, EDI, production logs, notes, audit log, file uploads,
-    chat messages, activity firehose, presence rollup) and groups by
-    user, then by client, so the daily email shows exactly:
-      - who was active
-      - what client they worked
-      - what tab they touched (Claims / Credentialing / Enrollment /
-        EDI / Documents / Production / Chat / Reporting)
-      - how many rows they created/updated
-      - how many notes / files / messages they added
-            - activity/actions captured on the platform
+# The sources a per-client report reads (all carry client_id).
+CLIENT_REPORT_SOURCES = (
+    "claims", "credentialing", "enrollment", "edi", "production", "notes", "documents",
+)
 
-    Returns a structured dict the emailer can render as HTML.
+
+def build_daily_activity_snapshot(report_date: str = None, sources=None,
+                                  client_id: int = None) -> dict:
+    """Read the day's rows once per source table.
+
+    Returns ``{"report_date", "rows": {source: [row dict, ...]},
+    "by_client": {source: {client_id: [rows]}}}``. ``sources`` limits which
+    tables are read (default: all); ``client_id`` scopes every source to one
+    account (only valid for sources that carry client_id). Pass the result to
+    get_eod_team_report / get_client_daily_report as ``snapshot=``.
     """
     from collections import defaultdict
     if not report_date:
         report_date = business_today_iso()
-    day_start = f"{report_date} 00:00:00"
-    day_end   = f"{report_date} 23:59:59"
-    payment_posting_users = {"melissa", "susan", "jessica", "maria"}
-
-    def _payment_actor_key(username: str) -> str:
-        u = (username or "").strip().lower()
+    wanted = list(sources) if sources else list(_DAILY_SNAPSHOT_SOURCES)
+    if "presence" in wanted or "pageviews" in wanted:
+        flush_activity_buffer()
+    rows: dict[str, list[dict]] = {}
+    conn = get_db()
+    try:
+        cur = conn.cursor()
+        for source in wanted:
+            sql, n_params, optional = _DAILY_SNAPSHOT_SOURCES[source]
+            params: tuple = (report_date,) * n_params
+            if client_id is not None:
+                sql = f"SELECT * FROM ({sql}) WHERE client_id=?"
+                params += (int(client_id),)
+            try:
+                rows[source] = [dict(r) for r in cur.execute(sql, params).fetchall()]
+            except sqlite3.Error:
+                if not optional:
+                    raise
+                rows[source] = []
+    finally:
+        conn.close()
+
+    by_client: dict[str, dict[int, list[dict]]] = {}
+    for source, items in rows.items():
+        idx: dict[int, list[dict]] = defaultdict(list)
+        for r in items:
+            try:
+                idx[int(r.get("client_id") or 0)].append(r)
+            except (TypeError, ValueError):
+                idx[0].append(r)
+        by_client[source] = dict(idx)
+    return {"report_date": report_date, "client_id": client_id,
+            "rows": rows, "by_client": by_client}
+
+
+def _snapshot_for(snapshot: dict | None, report_date: str, sources,
+                  client_id: int = None) -> dict:
+    """Reuse ``snapshot`` when it covers this date and these sources, else
+    build a fresh one."""
+    if (snapshot and snapshot.get("report_date") == report_date
+            and all(s in snapshot["rows"] for s in sources)
+            and snapshot.get("client_id") in (None, client_id)):
+        return snapshot
+    return build_daily_activity_snapshot(report_date, sources=sources, client_id=client_id)
+
+
+def get_eod_team_report(report_date: str = None, snapshot: dict = None) -> dict:
+    """Build the full end-of-day report for the team.
+
+    Pulls every per-tab data store the hub has (claims, credentialing,
+    enrollment, EDI, production logs, notes, audit log, file uploads,
+    chat messages, activity firehose, presence rollup) and groups by
+    user, then by client, so the daily email shows exactly:
+      - who was active
+      - what client they worked
+      - what tab they touched (Claims / Credentialing / Enrollment /
+        EDI / Documents / Production / Chat / Reporting)
+      - how many rows they created/updated
+      - how many notes / files / messages they added
+            - activity/actions captured on the platform
+
+    The day's rows come from build_daily_activity_snapshot (pass one in as
+    ``snapshot`` to share it with the per-client reports).
+
+    Returns a structured dict the emailer can render as HTML.
+    """
+    from collections import defaultdict
+    if not report_date:
+        report_date = business_today_iso()
+    day_start = f"{report_date} 00:00:00"
+    day_end   = f"{report_date} 23:59:59"
+    payment_posting_users = {"melissa", "susan", "jessica", "maria"}
+    snap = _snapshot_for(snapshot, report_date, _DAILY_SNAPSHOT_SOURCES)
+    day = snap["rows"]
+
+    def _payment_actor_key(username: str) -> str:
+        u = (username or "").strip().lower()
         if not u:
             return ""
         return u.split("@", 1)[0]
@@ -6486,26 +7348,14 @@ def get_eod_team_report(report_date: str = None) -> dict:
                 cb["items"].append({"tab": tab, **item})
 
         # ── 1) Presence rollup → action/session markers ──
-        for row in cur.execute(
-            "SELECT username, active_seconds, idle_seconds, action_count, "
-            "       first_seen_at, last_seen_at "
-            "FROM user_presence WHERE work_date=?",
-            (report_date,),
-        ).fetchall():
+        for row in day["presence"]:
             slot = _u(row["username"])
             slot["actions"]      = int(row["action_count"] or 0)
             slot["first_seen"]   = row["first_seen_at"] or ""
             slot["last_seen"]    = row["last_seen_at"]  or ""
 
         # ── 2) Activity firehose → pageviews per client ──
-        for row in cur.execute(
-            "SELECT username, client_id, path, COUNT(*) AS hits "
-            "FROM activity_events "
-            "WHERE date(occurred_at)=? AND event_type IN ('request','pageview') "
-            "GROUP BY username, client_id, path "
-            "ORDER BY hits DESC",
-            (report_date,),
-        ).fetchall():
+        for row in day["pageviews"]:
             if not row["username"]:
                 continue
             slot = _u(row["username"])
@@ -6515,14 +7365,7 @@ def get_eod_team_report(report_date: str = None) -> dict:
             cb["totals"]["Pageviews"] = cb["totals"].get("Pageviews", 0) + int(row["hits"])
 
         # ── 3) Claims created/updated today, attributed to Owner ──
-        for row in cur.execute(
-            "SELECT client_id, ClaimKey, ClaimStatus, Owner, "
-            "       created_at, updated_at, "
-            "       date(created_at) AS cd, date(updated_at) AS ud "
-            "FROM claims_master "
-            "WHERE date(created_at)=? OR date(updated_at)=?",
-            (report_date, report_date),
-        ).fetchall():
+        for row in day["claims"]:
             owner = (row["Owner"] or "").strip().lower()
             if not owner:
                 continue
@@ -6539,12 +7382,7 @@ def get_eod_team_report(report_date: str = None) -> dict:
         # payment to the hub user who posted it (PostedBy). Older rows with no
         # PostedBy are skipped (same as ownerless claims) since there is no
         # reliable way to attribute them.
-        for row in cur.execute(
-            "SELECT client_id, ClaimKey, PaymentAmount, PayerType, PostDate, "
-            "       PostedBy, created_at "
-            "FROM payments WHERE date(created_at)=?",
-            (report_date,),
-        ).fetchall():
+        for row in day["payments"]:
             poster = (row["PostedBy"] or "").strip().lower()
             if not poster:
                 continue
@@ -6600,19 +7438,12 @@ def get_eod_team_report(report_date: str = None) -> dict:
         billed_team_total["amount"] = round(billed_team_total["amount"], 2)
 
         # ── 4) Credentialing / Enrollment / EDI created/updated today ──
-        for table, tab, status_col in (
-            ("credentialing", "Credentialing", "Status"),
-            ("enrollment",    "Enrollment",    "Status"),
-            ("edi_setup",     "EDI",           "EDIStatus"),
+        for source, tab in (
+            ("credentialing", "Credentialing"),
+            ("enrollment",    "Enrollment"),
+            ("edi",           "EDI"),
         ):
-            for row in cur.execute(
-                f"SELECT client_id, ProviderName, Payor, {status_col} AS Status, Owner, "
-                f"       created_at, updated_at, "
-                f"       date(created_at) AS cd, date(updated_at) AS ud "
-                f"FROM {table} "
-                f"WHERE date(created_at)=? OR date(updated_at)=?",
-                (report_date, report_date),
-            ).fetchall():
+            for row in day[source]:
                 owner = (row["Owner"] or "").strip().lower()
                 if not owner:
                     continue
@@ -6625,134 +7456,87 @@ def get_eod_team_report(report_date: str = None) -> dict:
                 })
 
         # ── 5) Production entries (Team Production tab) ──
-        try:
-            for row in cur.execute(
-                "SELECT client_id, username, category, task_description, "
-                "       quantity, time_spent, created_at FROM team_production "
-                "WHERE date(created_at)=? OR work_date=?",
-                (report_date, report_date),
-            ).fetchall():
-                if not row["username"]:
-                    continue
-                _bump(row["username"], row["client_id"], "Production", {
-                    "action": "logged",
-                    "title": f"{row['category'] or '—'}: {(row['task_description'] or '')[:80]} "
-                             f"({row['quantity'] or 0} · {row['time_spent'] or 0}h)",
-                    "ts": row["created_at"] or "",
-                })
-        except Exception:
-            pass
+        for row in day["production"]:
+            if not row["username"]:
+                continue
+            _bump(row["username"], row["client_id"], "Production", {
+                "action": "logged",
+                "title": f"{row['category'] or '—'}: {(row['task_description'] or '')[:80]} "
+                         f"({row['quantity'] or 0} · {row['time_spent'] or 0}h)",
+                "ts": row["created_at"] or "",
+            })
 
         # ── 6) Notes log ──
-        try:
-            for row in cur.execute(
-                "SELECT client_id, ClaimKey, Module, Author, Note, created_at "
-                "FROM notes_log WHERE date(created_at)=?",
-                (report_date,),
-            ).fetchall():
-                author = (row["Author"] or "").strip().lower()
-                if not author:
-                    continue
-                _bump(author, row["client_id"], "Notes", {
-                    "action": "noted",
-                    "title": f"{row['Module'] or 'Claim'} {row['ClaimKey'] or ''} — {(row['Note'] or '')[:80]}",
-                    "ts": row["created_at"] or "",
-                })
-        except Exception:
-            pass
+        for row in day["notes"]:
+            author = (row["Author"] or "").strip().lower()
+            if not author:
+                continue
+            _bump(author, row["client_id"], "Notes", {
+                "action": "noted",
+                "title": f"{row['Module'] or 'Claim'} {row['ClaimKey'] or ''} — {(row['Note'] or '')[:80]}",
+                "ts": row["created_at"] or "",
+            })
 
         # ── 7) Audit log (catch-all of explicit operator actions) ──
-        try:
-            for row in cur.execute(
-                "SELECT client_id, username, action, entity_type, entity_id, details "
-                "FROM audit_log WHERE date(created_at)=?",
-                (report_date,),
-            ).fetchall():
-                user_key = (row["username"] or "").strip().lower()
-                if not user_key:
-                    continue
-                slot = _u(user_key)
-                slot["totals"]["Audit"] = slot["totals"].get("Audit", 0) + 1
-                cname = _client_name(row["client_id"])
-                cb = slot["clients"][cname]
-                cb["totals"]["Audit"] = cb["totals"].get("Audit", 0) + 1
-                # Audit detail lines get put in the "highlights" pool so the
-                # email shows operator-meaningful events without flooding.
-                if len(slot["highlights"]) < 8:
-                    label = row["action"] or "action"
-                    where = row["entity_type"] or ""
-                    extra = (row["details"] or "")[:120]
-                    slot["highlights"].append(
-                        f"{label} {where} — {extra}" if extra else f"{label} {where}"
-                    )
-        except Exception:
-            pass
+        for row in day["audit"]:
+            user_key = (row["username"] or "").strip().lower()
+            if not user_key:
+                continue
+            slot = _u(user_key)
+            slot["totals"]["Audit"] = slot["totals"].get("Audit", 0) + 1
+            cname = _client_name(row["client_id"])
+            cb = slot["clients"][cname]
+            cb["totals"]["Audit"] = cb["totals"].get("Audit", 0) + 1
+            # Audit detail lines get put in the "highlights" pool so the
+            # email shows operator-meaningful events without flooding.
+            if len(slot["highlights"]) < 8:
+                label = row["action"] or "action"
+                where = row["entity_type"] or ""
+                extra = (row["details"] or "")[:120]
+                slot["highlights"].append(
+                    f"{label} {where} — {extra}" if extra else f"{label} {where}"
+                )
 
         # ── 8) File uploads ──
-        try:
-            for row in cur.execute(
-                "SELECT client_id, original_name, uploaded_by, category, created_at "
-                "FROM client_files WHERE date(created_at)=?",
-                (report_date,),
-            ).fetchall():
-                user_key = (row["uploaded_by"] or "").strip().lower()
-                if not user_key:
-                    continue
-                _bump(user_key, row["client_id"], "Documents", {
-                    "action": "uploaded",
-                    "title": f"{row['original_name']} · {row['category'] or 'General'}",
-                    "ts": row["created_at"] or "",
-                })
-        except Exception:
-            pass
+        for row in day["documents"]:
+            user_key = (row["uploaded_by"] or "").strip().lower()
+            if not user_key:
+                continue
+            _bump(user_key, row["client_id"], "Documents", {
+                "action": "uploaded",
+                "title": f"{row['original_name']} · {row['category'] or 'General'}",
+                "ts": row["created_at"] or "",
+            })
 
         # ── 9) Chat messages sent ──
-        try:
-            for row in cur.execute(
-                "SELECT m.room_id, m.sender_name, r.client_id, r.name AS room_name, m.created_at "
-                "FROM chat_messages m LEFT JOIN chat_rooms r ON r.id = m.room_id "
-                "WHERE date(m.created_at)=?",
-                (report_date,),
-            ).fetchall():
-                sender = (row["sender_name"] or "").strip().lower()
-                if not sender:
-                    continue
-                _bump(sender, row["client_id"], "Chat", {
-                    "action": "messaged",
-                    "title": f"room '{row['room_name'] or row['room_id']}'",
-                    "ts": row["created_at"] or "",
-                })
-        except Exception:
-            pass
+        for row in day["chat"]:
+            sender = (row["sender_name"] or "").strip().lower()
+            if not sender:
+                continue
+            _bump(sender, row["client_id"], "Chat", {
+                "action": "messaged",
+                "title": f"room '{row['room_name'] or row['room_id']}'",
+                "ts": row["created_at"] or "",
+            })
 
         # ── 10) Business Development leads worked today (so the bizdev/Victor
         #        appears in the daily report right alongside everyone else) ──
-        try:
-            for row in cur.execute(
-                "SELECT practice_name, status, est_value, owner, "
-                "       created_at, updated_at, "
-                "       date(created_at) AS cd, date(updated_at) AS ud "
-                "FROM leads "
-                "WHERE date(created_at)=? OR date(updated_at)=?",
-                (report_date, report_date),
-            ).fetchall():
-                owner = (row["owner"] or "").strip().lower()
-                if not owner:
-                    continue
-                action = "added" if row["cd"] == report_date else "updated"
-                ts = row["created_at"] if action == "added" else row["updated_at"]
-                try:
-                    val = float(row["est_value"] or 0)
-                except (TypeError, ValueError):
-                    val = 0
-                val_str = f" · ${val:,.0f}" if val else ""
-                _bump(owner, None, "Leads", {
-                    "action": action,
-                    "title": f"{row['practice_name'] or '—'} ({row['status'] or 'New'}){val_str}",
-                    "ts": ts or "",
-                })
-        except Exception:
-            pass
+        for row in day["leads"]:
+            owner = (row["owner"] or "").strip().lower()
+            if not owner:
+                continue
+            action = "added" if row["cd"] == report_date else "updated"
+            ts = row["created_at"] if action == "added" else row["updated_at"]
+            try:
+                val = float(row["est_value"] or 0)
+            except (TypeError, ValueError):
+                val = 0
+            val_str = f" · ${val:,.0f}" if val else ""
+            _bump(owner, None, "Leads", {
+                "action": action,
+                "title": f"{row['practice_name'] or '—'} ({row['status'] or 'New'}){val_str}",
+                "ts": ts or "",
+            })
 
         # ── Finalize: convert defaultdicts to dicts and sort ──
         ordered = []
@@ -6795,29 +7579,40 @@ def get_eod_team_report(report_date: str = None) -> dict:
             "amount": billed_team_total["amount"],
         }
 
-        # New rows added across the org today (handy headline numbers).
-        def _scalar(sql, params=()):
-            try:
-                return cur.execute(sql, params).fetchone()[0] or 0
-            except Exception:
-                return 0
+        # New rows added across the org today (handy headline numbers),
+        # counted off the same snapshot rows.
+        def _created(rows):
+            return sum(1 for r in rows if r["cd"] == report_date)
+
+        def _touched(rows):
+            return sum(1 for r in rows
+                       if r["ud"] == report_date and r["cd"] is not None and r["cd"] != report_date)
+
+        def _sum(rows, col):
+            total = 0.0
+            for r in rows:
+                try:
+                    total += float(r[col] or 0)
+                except (TypeError, ValueError):
+                    pass
+            return round(total, 2)
 
         headlines = {
-            "claims_new":       _scalar("SELECT COUNT(*) FROM claims_master WHERE date(created_at)=?", (report_date,)),
-            "claims_touched":   _scalar("SELECT COUNT(*) FROM claims_master WHERE date(updated_at)=? AND date(created_at)<>?", (report_date, report_date)),
-            "payments_posted":  _scalar("SELECT COUNT(*) FROM payments WHERE date(created_at)=?", (report_date,)),
-            "payments_amount":  _scalar("SELECT ROUND(COALESCE(SUM(PaymentAmount),0),2) FROM payments WHERE date(created_at)=?", (report_date,)),
-            "cred_new":         _scalar("SELECT COUNT(*) FROM credentialing WHERE date(created_at)=?", (report_date,)),
-            "enroll_new":       _scalar("SELECT COUNT(*) FROM enrollment   WHERE date(created_at)=?", (report_date,)),
-            "edi_new":          _scalar("SELECT COUNT(*) FROM edi_setup    WHERE date(created_at)=?", (report_date,)),
-            "production_rows":  _scalar("SELECT COUNT(*) FROM team_production WHERE date(created_at)=? OR work_date=?", (report_date, report_date)),
-            "production_hours": _scalar("SELECT ROUND(COALESCE(SUM(time_spent),0),2) FROM team_production WHERE date(created_at)=? OR work_date=?", (report_date, report_date)),
-            "leads_new":        _scalar("SELECT COUNT(*) FROM leads WHERE date(created_at)=?", (report_date,)),
-            "leads_touched":    _scalar("SELECT COUNT(*) FROM leads WHERE date(updated_at)=? AND date(created_at)<>?", (report_date, report_date)),
-            "notes_new":        _scalar("SELECT COUNT(*) FROM notes_log    WHERE date(created_at)=?", (report_date,)),
-            "files_uploaded":   _scalar("SELECT COUNT(*) FROM client_files WHERE date(created_at)=?", (report_date,)),
-            "chat_messages":    _scalar("SELECT COUNT(*) FROM chat_messages WHERE date(created_at)=?", (report_date,)),
-            "audit_events":     _scalar("SELECT COUNT(*) FROM audit_log    WHERE date(created_at)=?", (report_date,)),
+            "claims_new":       _created(day["claims"]),
+            "claims_touched":   _touched(day["claims"]),
+            "payments_posted":  len(day["payments"]),
+            "payments_amount":  _sum(day["payments"], "PaymentAmount"),
+            "cred_new":         _created(day["credentialing"]),
+            "enroll_new":       _created(day["enrollment"]),
+            "edi_new":          _created(day["edi"]),
+            "production_rows":  len(day["production"]),
+            "production_hours": _sum(day["production"], "time_spent"),
+            "leads_new":        _created(day["leads"]),
+            "leads_touched":    _touched(day["leads"]),
+            "notes_new":        len(day["notes"]),
+            "files_uploaded":   len(day["documents"]),
+            "chat_messages":    len(day["chat"]),
+            "audit_events":     len(day["audit"]),
             "active_users":     len(ordered),
             "billed_total_amount": team_billed["amount"],
             "billed_total_count":  team_billed["count"],
@@ -6838,7 +7633,8 @@ def get_eod_team_report(report_date: str = None) -> dict:
         conn.close()
 
 
-def get_client_daily_report(client_id: int, report_date: str = None) -> dict:
+def get_client_daily_report(client_id: int, report_date: str = None,
+                            snapshot: dict = None) -> dict:
     """Build a per-CLIENT production-focused daily report.
 
     Aggregates only the work touching a single client_id, organised by
@@ -6846,6 +7642,10 @@ def get_client_daily_report(client_id: int, report_date: str = None) -> dict:
     Production hours / Notes / Documents) so the practice owner sees what
     MedPharma did for them today. Each itemised row carries a timestamp.
 
+    Rows come from build_daily_activity_snapshot; the nightly fan-out builds
+    one snapshot for every client and passes it in as ``snapshot``, a lone
+    call reads just this client's rows.
+
     Returns:
         {
             "client_id":  int,
@@ -6934,14 +7734,13 @@ def get_client_daily_report(client_id: int, report_date: str = None) -> dict:
             "documents":     [],
         }
 
+        snap = _snapshot_for(snapshot, report_date, CLIENT_REPORT_SOURCES, client_id=cid)
+
+        def _day(source):
+            return snap["by_client"][source].get(cid, [])
+
         # Claims (always include — claims is the core of every RCM client)
-        for row in cur.execute(
-            "SELECT ClaimKey, ClaimStatus, Owner, created_at, updated_at, "
-            "       date(created_at) AS cd, date(updated_at) AS ud "
-            "FROM claims_master "
-            "WHERE client_id=? AND (date(created_at)=? OR date(updated_at)=?)",
-            (cid, report_date, report_date),
-        ).fetchall():
+        for row in _day("claims"):
             action = "created" if row["cd"] == report_date else "updated"
             ts = row["created_at"] if action == "created" else row["updated_at"]
             sections["claims"].append({
@@ -6953,21 +7752,10 @@ def get_client_daily_report(client_id: int, report_date: str = None) -> dict:
             })
 
         # Credentialing / Enrollment / EDI (module-gated)
-        for table, key, status_col, mod in (
-            ("credentialing", "credentialing", "Status",    "credentialing"),
-            ("enrollment",    "enrollment",   "Status",    "enrollment"),
-            ("edi_setup",     "edi",          "EDIStatus", "edi"),
-        ):
-            if mod not in enabled:
+        for key in ("credentialing", "enrollment", "edi"):
+            if key not in enabled:
                 continue
-            for row in cur.execute(
-                f"SELECT ProviderName, Payor, {status_col} AS Status, Owner, "
-                f"       created_at, updated_at, "
-                f"       date(created_at) AS cd, date(updated_at) AS ud "
-                f"FROM {table} "
-                f"WHERE client_id=? AND (date(created_at)=? OR date(updated_at)=?)",
-                (cid, report_date, report_date),
-            ).fetchall():
+            for row in _day(key):
                 action = "created" if row["cd"] == report_date else "updated"
                 ts = row["created_at"] if action == "created" else row["updated_at"]
                 sections[key].append({
@@ -6981,56 +7769,34 @@ def get_client_daily_report(client_id: int, report_date: str = None) -> dict:
 
         # Production hours (module-gated)
         if "production" in enabled:
-            try:
-                for row in cur.execute(
-                    "SELECT username, category, task_description, quantity, "
-                    "       time_spent, created_at FROM team_production "
-                    "WHERE client_id=? AND (date(created_at)=? OR work_date=?)",
-                    (cid, report_date, report_date),
-                ).fetchall():
-                    sections["production"].append({
-                        "ts": row["created_at"] or "",
-                        "Owner": row["username"] or "",
-                        "Category": row["category"] or "",
-                        "Task": (row["task_description"] or "")[:200],
-                        "Qty": row["quantity"] or 0,
-                        "Hours": row["time_spent"] or 0,
-                    })
-            except Exception:
-                pass
-
-        # Notes
-        try:
-            for row in cur.execute(
-                "SELECT Author, ClaimKey, Module, Note, created_at "
-                "FROM notes_log WHERE client_id=? AND date(created_at)=?",
-                (cid, report_date),
-            ).fetchall():
-                sections["notes"].append({
+            for row in _day("production"):
+                sections["production"].append({
                     "ts": row["created_at"] or "",
-                    "Author": row["Author"] or "",
-                    "Subject": f"{row['Module'] or 'Claim'} {row['ClaimKey'] or ''}".strip(),
-                    "Note": (row["Note"] or "")[:300],
+                    "Owner": row["username"] or "",
+                    "Category": row["category"] or "",
+                    "Task": (row["task_description"] or "")[:200],
+                    "Qty": row["quantity"] or 0,
+                    "Hours": row["time_spent"] or 0,
                 })
-        except Exception:
-            pass
+
+        # Notes
+        for row in _day("notes"):
+            sections["notes"].append({
+                "ts": row["created_at"] or "",
+                "Author": row["Author"] or "",
+                "Subject": f"{row['Module'] or 'Claim'} {row['ClaimKey'] or ''}".strip(),
+                "Note": (row["Note"] or "")[:300],
+            })
 
         # Documents (module-gated)
         if "documents" in enabled:
-            try:
-                for row in cur.execute(
-                    "SELECT original_name, uploaded_by, category, created_at "
-                    "FROM client_files WHERE client_id=? AND date(created_at)=?",
-                    (cid, report_date),
-                ).fetchall():
-                    sections["documents"].append({
-                        "ts": row["created_at"] or "",
-                        "Filename": row["original_name"] or "",
-                        "UploadedBy": row["uploaded_by"] or "",
-                        "Category": row["category"] or "General",
-                    })
-            except Exception:
-                pass
+            for row in _day("documents"):
+                sections["documents"].append({
+                    "ts": row["created_at"] or "",
+                    "Filename": row["original_name"] or "",
+                    "UploadedBy": row["uploaded_by"] or "",
+                    "Category": row["category"] or "General",
+                })
 
         # ── Operator roll-up: which MedPharma users worked this client today ──
         op_lookup: dict[str, dict] = defaultdict(lambda: {"actions": 0, "hours": 0.0})
@@ -7247,72 +8013,243 @@ def get_alerts(client_id: int = None):
 
 
 # ─── Global Search ────────────────────────────────────────────────────────
+#
+# search_index is an FTS5 table (trigram tokenizer, so "4471" finds claim
+# "CLM-004471" and partial member IDs) over the five searchable tables.
+# rowid = source id * stride + type code. Triggers on the sources only record
+# the rowid of each written row in search_dirty - indexing a document per row
+# made bulk claim imports ~8x slower - and global_search re-indexes the dirty
+# documents in one batch before it queries, so every write path, including
+# bulk imports, stays searchable without touching the helpers.
+#
+# The query matches as the LIKE scan it replaced did: the whole query string
+# is one substring (a trigram phrase) that must occur within a single field.
+# Queries shorter than one trigram fall back to that LIKE scan.
+
+# (type, rowid code, table, title column, other indexed columns, result columns)
+_SEARCH_SOURCES = (
+    ("claim", 1, "claims_master", "ClaimKey",
+     ("PatientName", "Payor", "ProviderName", "PatientID", "DenialReason"),
+     "ClaimKey AS title, PatientName || ' — ' || Payor || ' — $' || ChargeAmount AS subtitle, "
+     "ClaimStatus AS status"),
+    ("provider", 2, "providers", "ProviderName",
+     ("NPI", "Specialty", "Email"),
+     "ProviderName AS title, NPI || ' — ' || Specialty AS subtitle, Status AS status"),
+    ("credentialing", 3, "credentialing", "ProviderName",
+     ("Payor", "Owner"),
+     "ProviderName || ' → ' || Payor AS title, CredType || ' — ' || Owner AS subtitle, "
+     "Status AS status"),
+    ("enrollment", 4, "enrollment", "ProviderName",
+     ("Payor", "Owner"),
+     "ProviderName || ' → ' || Payor AS title, EnrollType || ' — ' || Owner AS subtitle, "
+     "Status AS status"),
+    ("edi", 5, "edi_setup", "ProviderName",
+     ("Payor", "PayerID"),
+     "ProviderName || ' → ' || Payor AS title, "
+     "'EDI: ' || EDIStatus || ' | ERA: ' || ERAStatus AS subtitle, EDIStatus AS status"),
+)
+_SEARCH_ROWID_STRIDE = 8
+_SEARCH_MIN_TERM = 3          # trigram tokenizer: shorter terms match nothing
+# Past this many matches ("CLM", a payer name) bm25 barely separates the rows
+# and scoring them all costs more than the scan it replaced, so the newest
+# documents are returned instead.
+_SEARCH_RANK_CAP = 5000
+# Whether search_index exists, per database file.
+_search_index_ready: dict = {}
+_search_sync_lock = threading.Lock()
 
-def global_search(query: str, client_id: int = None, limit: int = 30):
-    """Search across claims, providers, credentialing, enrollment, EDI."""
+
+def _search_doc_sql(ref: str, title_col: str, body_cols) -> tuple[str, str]:
+    title = f"COALESCE({ref}.{title_col},'')"
+    body = " || char(10) || ".join(f"COALESCE({ref}.{c},'')" for c in body_cols)
+    return title, body
+
+
+def _ensure_search_index(conn) -> bool:
+    """Create search_index, search_dirty and the triggers that mark written
+    rows dirty. False when this SQLite build has no FTS5 (global_search then
+    stays on the LIKE scan)."""
+    try:
+        conn.execute(
+            "CREATE VIRTUAL TABLE IF NOT EXISTS search_index USING fts5("
+            "title, body, type UNINDEXED, client_id UNINDEXED, tokenize='trigram')"
+        )
+    except sqlite3.OperationalError as exc:
+        log.warning("search_index unavailable (no FTS5 trigram support): %s", exc)
+        _search_index_ready[DATABASE_PATH] = False
+        return False
+    conn.execute("CREATE TABLE IF NOT EXISTS search_dirty (rowid INTEGER PRIMARY KEY)")
+    for etype, code, table, title_col, body_cols, _cols in _SEARCH_SOURCES:
+        # NOT EXISTS rather than INSERT OR IGNORE: an outer INSERT OR REPLACE /
+        # OR ABORT overrides a conflict clause inside a trigger.
+        key = f"{{ref}}.id * {_SEARCH_ROWID_STRIDE} + {code}"
+        mark = (f"INSERT INTO search_dirty(rowid) SELECT {key} "
+                f"WHERE NOT EXISTS (SELECT 1 FROM search_dirty WHERE rowid = {key});")
+        watched = ", ".join((title_col,) + tuple(body_cols) + ("client_id",))
+        conn.executescript(f"""
+            DROP TRIGGER IF EXISTS trg_search_{table}_ai;
+            DROP TRIGGER IF EXISTS trg_search_{table}_au;
+            DROP TRIGGER IF EXISTS trg_search_{table}_ad;
+            DROP TRIGGER IF EXISTS trg_search_dirty_{table}_ai;
+            DROP TRIGGER IF EXISTS trg_search_dirty_{table}_au;
+            DROP TRIGGER IF EXISTS trg_search_dirty_{table}_ad;
+            CREATE TRIGGER IF NOT EXISTS trg_search_dirty_{table}_ai_v2 AFTER INSERT ON {table}
+            BEGIN {mark.format(ref='new')} END;
+            CREATE TRIGGER IF NOT EXISTS trg_search_dirty_{table}_au_v2 AFTER UPDATE OF {watched} ON {table}
+            BEGIN {mark.format(ref='old')} {mark.format(ref='new')} END;
+            CREATE TRIGGER IF NOT EXISTS trg_search_dirty_{table}_ad_v2 AFTER DELETE ON {table}
+            BEGIN {mark.format(ref='old')} END;
+        """)
+    _search_index_ready[DATABASE_PATH] = True
+    return True
+
+
+def sync_search_index(conn) -> int:
+    """Re-index every document marked in search_dirty, one INSERT ... SELECT
+    per source table, and clear the marks. Returns the documents processed."""
+    pending = conn.execute("SELECT COUNT(*) FROM search_dirty").fetchone()[0]
+    if not pending:
+        return 0
+    with _search_sync_lock:
+        for etype, code, table, title_col, body_cols, _cols in _SEARCH_SOURCES:
+            dirty = f"SELECT rowid FROM search_dirty WHERE rowid % {_SEARCH_ROWID_STRIDE} = {code}"
+            conn.execute(f"DELETE FROM search_index WHERE rowid IN ({dirty})")
+            title, body = _search_doc_sql(table, title_col, body_cols)
+            conn.execute(
+                f"INSERT INTO search_index(rowid, title, body, type, client_id) "
+                f"SELECT id * {_SEARCH_ROWID_STRIDE} + {code}, {title}, {body}, '{etype}', client_id "
+                f"FROM {table} WHERE id IN (SELECT rowid / {_SEARCH_ROWID_STRIDE} FROM ({dirty}))"
+            )
+        conn.execute("DELETE FROM search_dirty")
+        conn.commit()
+    return int(pending)
+
+
+def rebuild_search_index(conn=None) -> dict:
+    """Repopulate search_index from the source tables and optimize it.
+
+    Run after restoring a backup or bulk-loading with triggers disabled.
+    Returns ``{type: documents indexed}``.
+    """
+    own = conn is None
+    if own:
+        conn = get_db()
+    try:
+        if not _ensure_search_index(conn):
+            return {}
+        counts = {}
+        conn.execute("DELETE FROM search_index")
+        conn.execute("DELETE FROM search_dirty")
+        for etype, code, table, title_col, body_cols, _cols in _SEARCH_SOURCES:
+            title, body = _search_doc_sql(table, title_col, body_cols)
+            cur = conn.execute(
+                f"INSERT INTO search_index(rowid, title, body, type, client_id) "
+                f"SELECT id * {_SEARCH_ROWID_STRIDE} + {code}, {title}, {body}, '{etype}', client_id "
+                f"FROM {table}"
+            )
+            counts[etype] = int(cur.rowcount or 0)
+        conn.execute("INSERT INTO search_index(search_index) VALUES ('optimize')")
+        conn.commit()
+        return counts
+    finally:
+        if own:
+            conn.close()
+
+
+def _search_index_available(conn) -> bool:
+    ready = _search_index_ready.get(DATABASE_PATH)
+    if ready is None:
+        ready = _search_index_ready[DATABASE_PATH] = conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE name='search_index'").fetchone() is not None
+    return ready
+
+
+def _fts_match_expr(query: str) -> str | None:
+    """The whole query as one quoted trigram phrase - a substring match
+    within a single field, like the LIKE scan. None when it is shorter than
+    one trigram."""
+    q = query.strip()
+    if len(q) < _SEARCH_MIN_TERM:
+        return None
+    return '"' + q.replace('"', '""') + '"'
+
+
+def global_search(query: str, client_id: int = None, limit: int = 30, offset: int = 0):
+    """Search across claims, providers, credentialing, enrollment, EDI.
+
+    Ranked by bm25 over one index for all five types (title hits weigh more
+    than the other fields), scoped to ``client_id`` and paged by
+    ``limit``/``offset``. Matches beyond _SEARCH_RANK_CAP come back newest
+    first instead.
+    """
     if not query or not query.strip():
         return []
+    limit, offset = max(1, int(limit)), max(0, int(offset))
+    match = _fts_match_expr(query)
     conn = get_db()
     try:
-        cur = conn.cursor()
-        results = []
-        q = f"%{query}%"
-        cond = " AND client_id=?" if client_id is not None else ""
-        p_base = [client_id] if client_id is not None else []
-
-        # Claims
-        cur.execute(f"""SELECT id, 'claim' as type, ClaimKey as title,
-                        PatientName || ' — ' || Payor || ' — $' || ChargeAmount as subtitle,
-                        ClaimStatus as status
-                        FROM claims_master WHERE (
-                            ClaimKey LIKE ? OR PatientName LIKE ? OR Payor LIKE ? OR
-                            ProviderName LIKE ? OR PatientID LIKE ? OR DenialReason LIKE ?
-                        ) {cond} ORDER BY updated_at DESC LIMIT ?""",
-                    [q]*6 + p_base + [limit])
-        results += [dict(r) for r in cur.fetchall()]
-
-        # Providers
-        cur.execute(f"""SELECT id, 'provider' as type, ProviderName as title,
-                        NPI || ' — ' || Specialty as subtitle, Status as status
-                        FROM providers WHERE (
-                            ProviderName LIKE ? OR NPI LIKE ? OR Specialty LIKE ? OR Email LIKE ?
-                        ) {cond} ORDER BY ProviderName LIMIT ?""",
-                    [q]*4 + p_base + [limit])
-        results += [dict(r) for r in cur.fetchall()]
+        if match is None or not _search_index_available(conn):
+            return _global_search_like(conn, query, client_id, limit, offset)
+        sync_search_index(conn)
+        cond, params = "", [match]
+        if client_id is not None:
+            cond = " AND client_id=?"
+            params.append(client_id)
+        matched = conn.execute(
+            f"SELECT COUNT(*) FROM (SELECT 1 FROM search_index "
+            f"WHERE search_index MATCH ?{cond} LIMIT {_SEARCH_RANK_CAP + 1})",
+            params,
+        ).fetchone()[0]
+        order = ("bm25(search_index, 4.0, 1.0), rowid DESC"
+                 if matched <= _SEARCH_RANK_CAP else "rowid DESC")
+        hits = conn.execute(
+            f"SELECT rowid, type FROM search_index WHERE search_index MATCH ?{cond} "
+            f"ORDER BY {order} LIMIT ? OFFSET ?",
+            params + [limit, offset],
+        ).fetchall()
 
-        # Credentialing
-        cur.execute(f"""SELECT id, 'credentialing' as type,
-                        ProviderName || ' → ' || Payor as title,
-                        CredType || ' — ' || Owner as subtitle, Status as status
-                        FROM credentialing WHERE (
-                            ProviderName LIKE ? OR Payor LIKE ? OR Owner LIKE ?
-                        ) {cond} ORDER BY updated_at DESC LIMIT ?""",
-                    [q]*3 + p_base + [limit])
-        results += [dict(r) for r in cur.fetchall()]
+        wanted: dict[str, list[int]] = {}
+        for h in hits:
+            wanted.setdefault(h["type"], []).append(h["rowid"] // _SEARCH_ROWID_STRIDE)
+        found: dict[tuple[str, int], dict] = {}
+        for etype, _code, table, _t, _b, cols in _SEARCH_SOURCES:
+            ids = wanted.get(etype)
+            if not ids:
+                continue
+            qs = ",".join("?" * len(ids))
+            for r in conn.execute(
+                f"SELECT id, '{etype}' AS type, {cols} FROM {table} WHERE id IN ({qs})", ids,
+            ):
+                found[(etype, r["id"])] = dict(r)
+        out = []
+        for h in hits:
+            row = found.get((h["type"], h["rowid"] // _SEARCH_ROWID_STRIDE))
+            if row is not None:
+                out.append(row)
+        return out
+    finally:
+        conn.close()
 
-        # Enrollment
-        cur.execute(f"""SELECT id, 'enrollment' as type,
-                        ProviderName || ' → ' || Payor as title,
-                        EnrollType || ' — ' || Owner as subtitle, Status as status
-                        FROM enrollment WHERE (
-                            ProviderName LIKE ? OR Payor LIKE ? OR Owner LIKE ?
-                        ) {cond} ORDER BY updated_at DESC LIMIT ?""",
-                    [q]*3 + p_base + [limit])
-        results += [dict(r) for r in cur.fetchall()]
 
-        # EDI
-        cur.execute(f"""SELECT id, 'edi' as type,
-                        ProviderName || ' → ' || Payor as title,
-                        'EDI: ' || EDIStatus || ' | ERA: ' || ERAStatus as subtitle,
-                        EDIStatus as status
-                        FROM edi_setup WHERE (
-                            ProviderName LIKE ? OR Payor LIKE ? OR PayerID LIKE ?
-                        ) {cond} ORDER BY updated_at DESC LIMIT ?""",
-                    [q]*3 + p_base + [limit])
+def _global_search_like(conn, query: str, client_id: int, limit: int, offset: int) -> list[dict]:
+    """Unindexed substring scan — used for one- and two-character queries."""
+    cur = conn.cursor()
+    results = []
+    q = f"%{query}%"
+    cond = " AND client_id=?" if client_id is not None else ""
+    p_base = [client_id] if client_id is not None else []
+    per_table = limit + offset
+    for etype, _code, table, title_col, body_cols, cols in _SEARCH_SOURCES:
+        fields = (title_col,) + tuple(body_cols)
+        order = "ProviderName" if table == "providers" else "updated_at DESC"
+        cur.execute(
+            f"SELECT id, '{etype}' AS type, {cols} FROM {table} "
+            f"WHERE ({' OR '.join(f'{f} LIKE ?' for f in fields)}){cond} "
+            f"ORDER BY {order} LIMIT ?",
+            [q] * len(fields) + p_base + [per_table],
+        )
         results += [dict(r) for r in cur.fetchall()]
-    finally:
-        conn.close()
-    return results[:limit]
+    return results[offset:offset + limit]
 
 
 # ─── Bulk Claim Updates ──────────────────────────────────────────────────
@@ -7359,23 +8296,91 @@ def bulk_update_claims(claim_ids: list, data: dict, client_id: int = None):
 
 # ─── Export Data ──────────────────────────────────────────────────────────
 
-def export_claims(client_id: int = None, sub_profile: str = None):
-    """Return all claims as list of dicts for CSV/Excel export."""
-    conn = get_db()
-    try:
-        cond, p = "", []
+EXPORT_PAGE_ROWS = 1000
+
+_EXPORT_TABLES = {
+    "claims": "claims_master", "credentialing": "credentialing", "enrollment": "enrollment",
+    "edi_setup": "edi_setup", "providers": "providers", "production": "team_production",
+}
+
+
+def _export_scope(section: str, client_id: int = None, sub_profile: str = None):
+    """(table, WHERE clause, params) for a section export."""
+    table = _EXPORT_TABLES.get(section)
+    if not table:
+        raise ValueError(f"Unknown section: {section}")
+    conditions, p = [], []
+    if section == "production":
+        # list_production_logs treats client 0 as "every client".
+        if client_id:
+            conditions.append("client_id=?")
+            p.append(client_id)
+        conditions.append(f"LOWER(TRIM(COALESCE(username,''))) NOT IN "
+                          f"({','.join('?' * len(_HIDDEN_ROSTER_USERS))})")
+        p.extend(sorted(_HIDDEN_ROSTER_USERS))
+    else:
         if client_id is not None:
-            cond = "WHERE client_id=?"
+            conditions.append("client_id=?")
             p.append(client_id)
-        if sub_profile:
-            cond += (" AND " if cond else "WHERE ") + "sub_profile=?"
+        if section == "claims" and sub_profile:
+            conditions.append("sub_profile=?")
             p.append(sub_profile)
-        raw_rows = conn.execute(
-            f"SELECT * FROM claims_master {cond} ORDER BY updated_at DESC", p).fetchall()
-        rows = [dict(r) for r in raw_rows]
+    return table, " AND ".join(conditions), p
+
+
+def iter_export_rows(section: str, client_id: int = None, sub_profile: str = None,
+                     batch: int = EXPORT_PAGE_ROWS):
+    """Yield a section's export rows newest ``id`` first, one keyset page at a
+    time, so an export never holds the table in memory nor a read lock for
+    the length of a slow download. Pages walk the immutable id rather than
+    updated_at: a row edited while the file is being written is still
+    exported exactly once (rows inserted meanwhile are not included)."""
+    table, where, params = _export_scope(section, client_id, sub_profile)
+    after = None
+    while True:
+        clauses, page_params = [where] if where else [], list(params)
+        if after is not None:
+            clauses.append("id < ?")
+            page_params.append(after)
+        cond = ("WHERE " + " AND ".join(clauses)) if clauses else ""
+        conn = get_db()
+        try:
+            rows = conn.execute(f"SELECT * FROM {table} {cond} ORDER BY id DESC LIMIT ?",
+                                page_params + [batch]).fetchall()
+        finally:
+            conn.close()
+        for r in rows:
+            yield dict(r)
+        if len(rows) < batch:
+            return
+        after = rows[-1]["id"]
+
+
+def count_export_rows(section: str, client_id: int = None, sub_profile: str = None) -> int:
+    table, where, params = _export_scope(section, client_id, sub_profile)
+    conn = get_db()
+    try:
+        return int(conn.execute(f"SELECT COUNT(*) FROM {table}" + (f" WHERE {where}" if where else ""),
+                                params).fetchone()[0])
     finally:
         conn.close()
-    return rows
+
+
+def export_columns(section: str) -> list:
+    """Column names of a section's table, in ``SELECT *`` order."""
+    table = _EXPORT_TABLES.get(section)
+    if not table:
+        raise ValueError(f"Unknown section: {section}")
+    conn = get_db()
+    try:
+        return [r[1] for r in conn.execute(f"PRAGMA table_info({table})")]
+    finally:
+        conn.close()
+
+
+def export_claims(client_id: int = None, sub_profile: str = None):
+    """Return all claims as list of dicts for CSV/Excel export."""
+    return list(iter_export_rows("claims", client_id, sub_profile))
 
 
 def export_table(table: str, client_id: int = None):
@@ -7383,17 +8388,7 @@ def export_table(table: str, client_id: int = None):
     allowed_tables = {"credentialing", "enrollment", "edi_setup", "providers"}
     if table not in allowed_tables:
         return []
-    conn = get_db()
-    try:
-        if client_id is not None:
-            rows = [dict(r) for r in conn.execute(
-                f"SELECT * FROM {table} WHERE client_id=? ORDER BY updated_at DESC", (client_id,)).fetchall()]
-        else:
-            rows = [dict(r) for r in conn.execute(
-                f"SELECT * FROM {table} ORDER BY updated_at DESC").fetchall()]
-    finally:
-        conn.close()
-    return rows
+    return list(iter_export_rows(table, client_id))
 
 
 # ─── Async Jobs ───────────────────────────────────────────────────────────
@@ -7891,17 +8886,23 @@ def get_production_report(client_id: int = None, start_date: str = None, end_dat
             p.append(end_date)
         cond = ("WHERE " + " AND ".join(conditions)) if conditions else ""
 
-        # Summary by user
-        cur.execute(f"""
-            SELECT username,
-                   COUNT(*) as total_entries,
-                   SUM(quantity) as total_quantity,
-                   ROUND(SUM(time_spent),1) as total_hours,
-                   COUNT(DISTINCT work_date) as days_worked
-            FROM team_production {cond}
-            GROUP BY username ORDER BY username
-        """, p)
-        by_user = [dict(r) for r in cur.fetchall()]
+        # Summary by user (and by category, below) - from the columnar
+        # analytics cache when it is available, else straight from SQL.
+        production = analytics.production_rollups(
+            None if self_scope else client_id, self_user, start_date, end_date)
+        if production is not None:
+            by_user = production[0]
+        else:
+            cur.execute(f"""
+                SELECT username,
+                       COUNT(*) as total_entries,
+                       SUM(quantity) as total_quantity,
+                       ROUND(SUM(time_spent),1) as total_hours,
+                       COUNT(DISTINCT work_date) as days_worked
+                FROM team_production {cond}
+                GROUP BY username ORDER BY username
+            """, p)
+            by_user = [dict(r) for r in cur.fetchall()]
         # Never surface system/department logins (e.g. retired 'rcm') in the
         # Team Production report, even if stale rows linger in team_production.
         by_user = [u for u in by_user
@@ -8073,27 +9074,10 @@ def get_production_report(client_id: int = None, start_date: str = None, end_dat
         # ON the claims, from PaidAmount — this is the money that came in,
         # sourced from the uploaded claim data, NOT the manual payments table).
         # Owner credits the biller.
-        attr_conditions = ["TRIM(COALESCE(Owner,''))!=''"]
-        attr_p = []
-        if client_id and not self_scope:
-            attr_conditions.append("client_id=?")
-            attr_p.append(client_id)
-        attr_cond = "WHERE " + " AND ".join(attr_conditions)
-        cur.execute(
-            f"SELECT TRIM(Owner) AS owner, "
-            f"       substr(COALESCE(BillDate,''),1,10) AS bd, "
-            f"       substr(COALESCE(DeniedDate,''),1,10) AS dd, "
-            f"       substr(COALESCE(PaidDate,''),1,10) AS pd, "
-            f"       substr(COALESCE(DOS,''),1,10) AS dos, "
-            f"       COALESCE(ClaimStatus,'') AS st, "
-            f"       COALESCE(ChargeAmount,0) AS amt, "
-            f"       COALESCE(PaidAmount,0) AS paid, "
-            f"       TRIM(COALESCE(uploaded_by,'')) AS reworker "
-            f"FROM claims_master {attr_cond}", attr_p)
-        for r in cur.fetchall():
-            owner_raw = str(r["owner"] or "").strip()
+        def _resolve_owner(owner_raw):
+            owner_raw = str(owner_raw or "").strip()
             if not owner_raw or owner_raw.lower() in _HIDDEN_ROSTER_USERS:
-                continue
+                return None
             # In self-view, keep only claims this biller is credited for —
             # match the free-text Owner against the biller's identity tokens
             # before falling back to the alias map.
@@ -8101,8 +9085,47 @@ def get_production_report(client_id: int = None, start_date: str = None, end_dat
                 owner_l = owner_raw.lower()
                 resolved_l = alias_to_user.get(owner_l, owner_raw).lower()
                 if owner_l not in self_identities and resolved_l != self_user.lower():
-                    continue
-            owner = alias_to_user.get(owner_raw.lower(), owner_raw)
+                    return None
+            return alias_to_user.get(owner_raw.lower(), owner_raw)
+
+        def _reworker_label(raw):
+            rw = str(raw or "").strip()
+            rwl = rw.lower()
+            if rwl == "admin" or rwl.startswith("admin@") or rwl.startswith("admin "):
+                return "(system)"
+            return rw or "(unattributed)"
+
+        # The columnar cache answers the window with vectorized rollups over
+        # claim facts parsed once; the row loop below is the fallback.
+        rollups = analytics.claim_rollups(None if self_scope else client_id, d_lo, d_hi,
+                                          _resolve_owner, _reworker_label)
+        if rollups is not None:
+            (billed_by_user, denied_by_user, paid_by_user,
+             denial_recovery_sender, denial_recovery_reworker) = rollups
+            rows = []
+        else:
+            attr_conditions = ["TRIM(COALESCE(Owner,''))!=''"]
+            attr_p = []
+            if client_id and not self_scope:
+                attr_conditions.append("client_id=?")
+                attr_p.append(client_id)
+            attr_cond = "WHERE " + " AND ".join(attr_conditions)
+            cur.execute(
+                f"SELECT TRIM(Owner) AS owner, "
+                f"       substr(COALESCE(BillDate,''),1,10) AS bd, "
+                f"       substr(COALESCE(DeniedDate,''),1,10) AS dd, "
+                f"       substr(COALESCE(PaidDate,''),1,10) AS pd, "
+                f"       substr(COALESCE(DOS,''),1,10) AS dos, "
+                f"       COALESCE(ClaimStatus,'') AS st, "
+                f"       COALESCE(ChargeAmount,0) AS amt, "
+                f"       COALESCE(PaidAmount,0) AS paid, "
+                f"       TRIM(COALESCE(uploaded_by,'')) AS reworker "
+                f"FROM claims_master {attr_cond}", attr_p)
+            rows = cur.fetchall()
+        for r in rows:
+            owner = _resolve_owner(r["owner"])
+            if owner is None:
+                continue
             amt = float(r["amt"] or 0)
 
             # Submitted — counted by Bill Date inside the window.
@@ -8139,12 +9162,7 @@ def get_production_report(client_id: int = None, start_date: str = None, end_dat
                         owner, {"sender": owner, "count": 0, "amount": 0.0})
                     _snd["count"] += 1
                     _snd["amount"] += amt
-                    _rw = str(r["reworker"] or "").strip()
-                    _rwl = _rw.lower()
-                    if _rwl == "admin" or _rwl.startswith("admin@") or _rwl.startswith("admin "):
-                        _rw = "(system)"
-                    elif not _rw:
-                        _rw = "(unattributed)"
+                    _rw = _reworker_label(r["reworker"])
                     _rwk = denial_recovery_reworker.setdefault(
                         _rw, {"reworker": _rw, "count": 0, "amount": 0.0})
                     _rwk["count"] += 1
@@ -8212,11 +9230,18 @@ def get_production_report(client_id: int = None, start_date: str = None, end_dat
             ar_conditions.append("LOWER(TRIM(uploaded_by))=LOWER(?)")
             ar_p.append(self_user)
         ar_cond = "WHERE " + " AND ".join(ar_conditions)
-        cur.execute(
-            f"SELECT substr(COALESCE(DOS,''),1,10) AS dos, "
-            f"       COALESCE(BalanceRemaining,0) AS bal "
-            f"FROM claims_master {ar_cond}", ar_p)
-        for r in cur.fetchall():
+        cached_ar = analytics.rolling_ar(None if self_scope else client_id,
+                                         self_user if self_scope else "", ar_cutoff)
+        if cached_ar is not None:
+            rows = []
+            rolling_ar = cached_ar
+        else:
+            cur.execute(
+                f"SELECT substr(COALESCE(DOS,''),1,10) AS dos, "
+                f"       COALESCE(BalanceRemaining,0) AS bal "
+                f"FROM claims_master {ar_cond}", ar_p)
+            rows = cur.fetchall()
+        for r in rows:
             dos_raw = str(r["dos"] or "").strip()
             try:
                 dosd = date.fromisoformat(dos_raw)
@@ -8348,15 +9373,18 @@ def get_production_report(client_id: int = None, start_date: str = None, end_dat
         by_user = [by_user_map[k] for k in sorted(by_user_map.keys(), key=lambda x: x.lower())]
 
         # Summary by category
-        cur.execute(f"""
-            SELECT category,
-                   COUNT(*) as total_entries,
-                   SUM(quantity) as total_quantity,
-                   ROUND(SUM(time_spent),1) as total_hours
-            FROM team_production {cond}
-            GROUP BY category ORDER BY total_hours DESC
-        """, p)
-        by_category = [dict(r) for r in cur.fetchall()]
+        if production is not None:
+            by_category = production[1]
+        else:
+            cur.execute(f"""
+                SELECT category,
+                       COUNT(*) as total_entries,
+                       SUM(quantity) as total_quantity,
+                       ROUND(SUM(time_spent),1) as total_hours
+                FROM team_production {cond}
+                GROUP BY category ORDER BY total_hours DESC
+            """, p)
+            by_category = [dict(r) for r in cur.fetchall()]
 
         # Daily breakdown
         cur.execute(f"""
@@ -8858,6 +9886,7 @@ def delete_room(room_id: int):
     try:
         # ON DELETE CASCADE handles members/messages/reads
         conn.execute("DELETE FROM chat_rooms WHERE id=?", (room_id,))
+        conn.execute("DELETE FROM chat_mentions WHERE room_id=?", (room_id,))
         conn.commit()
     finally:
         conn.close()
@@ -8956,6 +9985,9 @@ def add_room_message(room_id: int, sender_id: int, sender_name: str,
             stored_body = body
     else:
         stored_body = ""
+    # Mentions resolve into chat_mentions below, so the reminder jobs never
+    # decrypt bodies.
+    mentions = _extract_mentions(body)
     conn = get_db()
     try:
         cur = conn.execute(
@@ -8967,6 +9999,8 @@ def add_room_message(room_id: int, sender_id: int, sender_name: str,
              int(attachment_file_id) if has_attachment else None,
              (attachment_name or "")[:255]),
         )
+        if mentions:
+            _index_message_mentions(conn, cur.lastrowid, room_id, sender_id, mentions)
         # Sender has implicitly read their own message
         conn.execute(
             """INSERT INTO chat_reads (room_id, user_id, last_read_message_id, updated_at)
@@ -9004,16 +10038,16 @@ def list_room_messages(room_id: int, limit: int = 200,
                    ORDER BY id DESC LIMIT ?""",
                 (room_id, limit),
             ).fetchall()
-        # Return oldest → newest, decrypting each body on the way out.
+        # Return oldest → newest, decrypting the page's bodies in one batch
+        # (repeat polls are served from the decrypt cache).
+        out = [dict(r) for r in reversed(rows)]
         try:
-            from app.security import decrypt_message
+            from app.security import decrypt_many
+            bodies = decrypt_many((d["id"], d.get("body")) for d in out)
         except Exception:
-            decrypt_message = lambda v: v  # noqa: E731
-        out = []
-        for r in reversed(rows):
-            d = dict(r)
-            d["body"] = decrypt_message(d.get("body")) if d.get("body") else ""
-            out.append(d)
+            bodies = [d.get("body") for d in out]
+        for d, body in zip(out, bodies):
+            d["body"] = body or ""
         return out
     finally:
         conn.close()
@@ -9088,6 +10122,64 @@ def _user_mention_aliases(member: dict) -> set[str]:
     return {a for a in aliases if len(a) >= 2}
 
 
+def _index_message_mentions(conn, message_id: int, room_id: int, sender_id,
+                            mentions: set[str], created_at: str | None = None) -> int:
+    """Record which room members ``mentions`` refers to in chat_mentions.
+    The sender never mentions themselves. Returns the rows written."""
+    members = conn.execute(
+        """SELECT rm.user_id, c.username, c.contact_name, c.email
+           FROM chat_room_members rm
+           JOIN clients c ON c.id = rm.user_id
+           WHERE rm.room_id=?""",
+        (room_id,),
+    ).fetchall()
+    hits = [int(m["user_id"]) for m in members
+            if int(m["user_id"] or 0) > 0 and int(m["user_id"]) != int(sender_id or 0)
+            and _user_mention_aliases(dict(m)) & mentions]
+    for uid in hits:
+        conn.execute(
+            """INSERT OR IGNORE INTO chat_mentions (message_id, user_id, room_id, created_at)
+               VALUES (?,?,?,COALESCE(?, CURRENT_TIMESTAMP))""",
+            (int(message_id), uid, int(room_id), created_at),
+        )
+    return len(hits)
+
+
+def _backfill_chat_mentions(conn, max_age_minutes: int = 10080) -> int:
+    """Index mentions for messages posted before chat_mentions existed (within
+    the reminder window), carrying over reminders already sent."""
+    try:
+        from app.security import decrypt_mentions, decrypt_message
+    except Exception:
+        decrypt_message = lambda v, message_id=None: v  # noqa: E731
+        decrypt_mentions = lambda v, message_id=None: set((v or "").split())  # noqa: E731
+    rows = conn.execute(
+        """SELECT id, room_id, sender_id, created_at, mentions_enc,
+                  CASE WHEN mentions_enc IS NULL THEN body END AS body
+           FROM chat_messages
+           WHERE created_at >= datetime('now', ?)
+             AND (mentions_enc IS NULL OR mentions_enc <> '')""",
+        (f"-{int(max_age_minutes)} minutes",),
+    ).fetchall()
+    written = 0
+    for r in rows:
+        if r["mentions_enc"] is not None:
+            mentions = decrypt_mentions(r["mentions_enc"], r["id"])
+        else:
+            mentions = _extract_mentions(decrypt_message(r["body"], r["id"]))
+        if mentions:
+            written += _index_message_mentions(conn, r["id"], r["room_id"], r["sender_id"],
+                                               mentions, r["created_at"])
+    conn.execute(
+        """UPDATE chat_mentions SET reminded=1
+           WHERE EXISTS (SELECT 1 FROM chat_reminders cr
+                         WHERE cr.message_id=chat_mentions.message_id
+                           AND cr.user_id=chat_mentions.user_id)""")
+    if written:
+        log.info("chat_mentions backfill: indexed %d mention(s)", written)
+    return written
+
+
 def _recently_active_user_ids(conn, active_within_minutes: int = 10) -> set[int]:
     """Users with recent hub activity (heartbeat or any authenticated request).
 
@@ -9114,85 +10206,49 @@ def list_unread_mention_reminders(min_age_minutes: int = 120,
 
     Only messages between ``min_age_minutes`` and ``max_age_minutes`` old (so
     we never spam about ancient backlog) in non-archived rooms are considered.
+    Mentions are resolved when the message is posted (chat_mentions), so this
+    is a range scan over pending mentions - no message body is decrypted.
 
     Returns one dict per (message × recipient):
         {message_id, room_id, room_name, sender_name, created_at,
          user_id, username, contact_name, email}
     """
-    try:
-        from app.security import decrypt_message
-    except Exception:
-        decrypt_message = lambda v: v  # noqa: E731
+    flush_activity_buffer()
     conn = get_db()
-    out: list[dict] = []
     try:
         active_ids = _recently_active_user_ids(
             conn, active_within_minutes=active_within_minutes
         )
         rows = conn.execute(
-            """SELECT m.id, m.room_id, m.sender_id, m.sender_name, m.body,
-                      m.created_at, r.name AS room_name
-               FROM chat_messages m
-               JOIN chat_rooms r ON r.id = m.room_id
-               WHERE COALESCE(r.archived,0)=0
-                 AND m.created_at <= datetime('now', ?)
-                 AND m.created_at >= datetime('now', ?)
-               ORDER BY m.id""",
+            """SELECT cm.message_id, cm.room_id, cm.user_id,
+                      m.sender_name, m.created_at, r.name AS room_name,
+                      c.username, c.contact_name, c.email
+               FROM chat_mentions cm
+               JOIN chat_messages m      ON m.id = cm.message_id
+               JOIN chat_rooms r         ON r.id = cm.room_id AND COALESCE(r.archived,0)=0
+               JOIN chat_room_members rm ON rm.room_id = cm.room_id AND rm.user_id = cm.user_id
+               JOIN clients c            ON c.id = cm.user_id
+               LEFT JOIN chat_reads cr   ON cr.room_id = cm.room_id AND cr.user_id = cm.user_id
+               WHERE cm.reminded = 0
+                 AND cm.created_at <= datetime('now', ?)
+                 AND cm.created_at >= datetime('now', ?)
+                 AND COALESCE(cr.last_read_message_id, 0) < cm.message_id
+                 AND c.email IS NOT NULL AND TRIM(c.email) <> ''
+               ORDER BY cm.message_id, cm.user_id""",
             (f"-{int(min_age_minutes)} minutes",
              f"-{int(max_age_minutes)} minutes"),
         ).fetchall()
-        for row in rows:
-            msg = dict(row)
-            body = decrypt_message(msg.get("body"))
-            mentions = _extract_mentions(body)
-            if not mentions:
-                continue
-            members = conn.execute(
-                """SELECT rm.user_id, c.username, c.contact_name, c.email
-                   FROM chat_room_members rm
-                   JOIN clients c ON c.id = rm.user_id
-                   WHERE rm.room_id=?""",
-                (msg["room_id"],),
-            ).fetchall()
-            for mrow in members:
-                member = dict(mrow)
-                uid = int(member.get("user_id") or 0)
-                if uid <= 0 or uid == int(msg.get("sender_id") or 0):
-                    continue
-                if uid in active_ids:
-                    continue
-                if not member.get("email"):
-                    continue
-                if not (_user_mention_aliases(member) & mentions):
-                    continue
-                # already read?
-                read = conn.execute(
-                    """SELECT last_read_message_id FROM chat_reads
-                       WHERE room_id=? AND user_id=?""",
-                    (msg["room_id"], uid),
-                ).fetchone()
-                last_read = int((read[0] if read else 0) or 0)
-                if last_read >= int(msg["id"]):
-                    continue
-                # already reminded?
-                done = conn.execute(
-                    "SELECT 1 FROM chat_reminders WHERE message_id=? AND user_id=?",
-                    (msg["id"], uid),
-                ).fetchone()
-                if done:
-                    continue
-                out.append({
-                    "message_id": int(msg["id"]),
-                    "room_id": int(msg["room_id"]),
-                    "room_name": msg.get("room_name") or "",
-                    "sender_name": msg.get("sender_name") or "",
-                    "created_at": msg.get("created_at") or "",
-                    "user_id": uid,
-                    "username": member.get("username") or "",
-                    "contact_name": member.get("contact_name") or "",
-                    "email": member.get("email") or "",
-                })
-        return out
+        return [{
+            "message_id": int(r["message_id"]),
+            "room_id": int(r["room_id"]),
+            "room_name": r["room_name"] or "",
+            "sender_name": r["sender_name"] or "",
+            "created_at": r["created_at"] or "",
+            "user_id": int(r["user_id"]),
+            "username": r["username"] or "",
+            "contact_name": r["contact_name"] or "",
+            "email": r["email"] or "",
+        } for r in rows if int(r["user_id"]) not in active_ids]
     finally:
         conn.close()
 
@@ -9206,6 +10262,10 @@ def mark_chat_reminder_sent(message_id: int, user_id: int) -> None:
             "INSERT OR IGNORE INTO chat_reminders (message_id, user_id) VALUES (?,?)",
             (int(message_id), int(user_id)),
         )
+        conn.execute(
+            "UPDATE chat_mentions SET reminded=1 WHERE message_id=? AND user_id=?",
+            (int(message_id), int(user_id)),
+        )
         conn.commit()
     finally:
         conn.close()
@@ -9258,6 +10318,7 @@ def list_stale_unread_users(min_age_minutes: int = 15,
     Returns one row per user:
         {user_id, username, contact_name, email, max_unread_id, unread_count}
     """
+    flush_activity_buffer()
     conn = get_db()
     try:
         rows = conn.execute(
@@ -30,7 +30,7 @@ from app.client_db import (
     get_profile, update_profile,
     get_practice_profiles, upsert_practice_profile, delete_practice_profile,
     list_providers, create_provider, update_provider, delete_provider,
-    get_claims, get_claim, create_claim, update_claim, delete_claim,
+    get_claims, query_claims, iter_claims, get_claim, create_claim, update_claim, delete_claim,
     get_ar_worklist,
     get_payments, create_payment, delete_payment,
     get_notes, add_note, get_claim_client_ids,
@@ -49,6 +49,7 @@ from app.client_db import (
     log_audit, get_audit_log, auto_flag_sla, get_alerts,
     log_activity, list_activity_events, get_live_users, get_productivity_report,
     global_search, bulk_update_claims, export_claims, export_table,
+    count_export_rows, export_columns, iter_export_rows,
     get_report_notes, upsert_report_note, delete_report_note, rename_report_note,
     get_user_production_snapshot,
     list_sharefile_links, add_sharefile_link, delete_sharefile_link,
@@ -73,6 +74,7 @@ from app.client_db import (
     set_app_setting, get_app_setting, list_app_settings,
     ALLOWED_SETTING_KEYS,
     get_reported_summary, set_reported_summary,
+    get_client_data_versions,
     list_leads, create_lead, update_lead,
     delete_lead, mark_lead_followed_up, list_leads_due_followup,
     restore_lead, list_deleted_leads, get_leads_pipeline,
@@ -87,8 +89,9 @@ from app.notifications import (
     get_notification_debug,
     send_daily_account_summary,
 )
-from rule_intercept import intercept_excel_upload
 from app.config import business_today, business_today_iso, business_now
+from app.workbook import parse_workbook
+from app import doc_extract, export_stream, ingest, response_cache
 
 router = APIRouter(prefix="/hub/api")
 
@@ -612,29 +615,20 @@ def _is_svd_batch_workbook(content: bytes, ext: str) -> bool:
     if (ext or "").lower() not in (".xlsx", ".xlsm"):
         return False
     try:
-        import openpyxl
-        wb = openpyxl.load_workbook(io.BytesIO(content), read_only=True, data_only=True)
+        sheets = parse_workbook(content, ext).sheet_rows()
     except Exception:
         return False
     try:
-        for sn in wb.sheetnames:
+        for sn, rows in sheets:
             if "list by pt for batches" in _norm_text(sn):
                 return True
-            ws = wb[sn]
-            for i, row in enumerate(ws.iter_rows(values_only=True)):
-                if i > 4:
-                    break
+            for row in rows[:5]:
                 cells = [str(c) for c in row if c is not None and str(c).strip()]
                 if cells and _is_batch_transmission_log(cells):
                     return True
         return False
     except Exception:
         return False
-    finally:
-        try:
-            wb.close()
-        except Exception:
-            pass
 
 
 def _parse_svd_batch_sheets(content: bytes, ext: str) -> dict:
@@ -651,8 +645,7 @@ def _parse_svd_batch_sheets(content: bytes, ext: str) -> dict:
     if (ext or "").lower() not in (".xlsx", ".xlsm"):
         return out
     try:
-        import openpyxl
-        wb = openpyxl.load_workbook(io.BytesIO(content), read_only=True, data_only=True)
+        sheets = parse_workbook(content, ext).sheet_rows()
     except Exception:
         return out
 
@@ -681,59 +674,51 @@ def _parse_svd_batch_sheets(content: bytes, ext: str) -> dict:
                 continue
         return s[:10]
 
-    try:
-        for sn in wb.sheetnames:
-            ws = wb[sn]
-            rows = list(ws.iter_rows(values_only=True))
-            if not rows:
+    for sn, rows in sheets:
+        if not rows:
+            continue
+        hdr_i = None
+        for i, row in enumerate(rows[:8]):
+            cells = [str(c).strip().lower() for c in row if c is not None and str(c).strip()]
+            if any("batch" in c for c in cells) and any("billed" in c for c in cells):
+                hdr_i = i
+                break
+        if hdr_i is None:
+            continue
+        hdr = [str(c).strip().lower() if c is not None else "" for c in rows[hdr_i]]
+
+        def _col(pred):
+            for j, h in enumerate(hdr):
+                if pred(h):
+                    return j
+            return -1
+
+        di = _col(lambda h: h == "date" or h.startswith("date") or h.endswith(" date"))
+        bi = _col(lambda h: "batch" in h)
+        ci = _col(lambda h: "claim" in h and any(t in h for t in ("numer", "number", "no", "of", "#", "count")))
+        ti = _col(lambda h: "billed" in h)
+        if bi < 0 or ti < 0:
+            continue
+        last_date = ""
+        for row in rows[hdr_i + 1:]:
+            if not row:
                 continue
-            hdr_i = None
-            for i, row in enumerate(rows[:8]):
-                cells = [str(c).strip().lower() for c in row if c is not None and str(c).strip()]
-                if any("batch" in c for c in cells) and any("billed" in c for c in cells):
-                    hdr_i = i
-                    break
-            if hdr_i is None:
+            bnum_raw = row[bi] if bi < len(row) else None
+            bnum = str(bnum_raw).strip() if bnum_raw is not None else ""
+            if bnum.endswith(".0"):
+                bnum = bnum[:-2]
+            if not bnum or bnum.lower() in ("total", "totals", "grand total", "batch", "batch #", "batch#"):
                 continue
-            hdr = [str(c).strip().lower() if c is not None else "" for c in rows[hdr_i]]
-
-            def _col(pred):
-                for j, h in enumerate(hdr):
-                    if pred(h):
-                        return j
-                return -1
-
-            di = _col(lambda h: h == "date" or h.startswith("date") or h.endswith(" date"))
-            bi = _col(lambda h: "batch" in h)
-            ci = _col(lambda h: "claim" in h and any(t in h for t in ("numer", "number", "no", "of", "#", "count")))
-            ti = _col(lambda h: "billed" in h)
-            if bi < 0 or ti < 0:
+            d = _iso(row[di]) if 0 <= di < len(row) else ""
+            if d:
+                last_date = d
+            else:
+                d = last_date
+            billed = _num(row[ti]) if 0 <= ti < len(row) else 0.0
+            cnt = int(_num(row[ci])) if 0 <= ci < len(row) else 0
+            if billed <= 0:
                 continue
-            last_date = ""
-            for row in rows[hdr_i + 1:]:
-                if not row:
-                    continue
-                bnum_raw = row[bi] if bi < len(row) else None
-                bnum = str(bnum_raw).strip() if bnum_raw is not None else ""
-                if bnum.endswith(".0"):
-                    bnum = bnum[:-2]
-                if not bnum or bnum.lower() in ("total", "totals", "grand total", "batch", "batch #", "batch#"):
-                    continue
-                d = _iso(row[di]) if 0 <= di < len(row) else ""
-                if d:
-                    last_date = d
-                else:
-                    d = last_date
-                billed = _num(row[ti]) if 0 <= ti < len(row) else 0.0
-                cnt = int(_num(row[ci])) if 0 <= ci < len(row) else 0
-                if billed <= 0:
-                    continue
-                out[bnum] = {"date": d, "count": cnt, "billed": round(billed, 2)}
-    finally:
-        try:
-            wb.close()
-        except Exception:
-            pass
+            out[bnum] = {"date": d, "count": cnt, "billed": round(billed, 2)}
     return out
 
 
@@ -861,6 +846,7 @@ def _infer_excel_category(content: bytes, ext: str, filename: str = "", descript
     blob = " ".join([*headers, filename or "", description or ""]).lower()
 
     # Rule-intercept (deterministic) gets first shot.
+    from rule_intercept import intercept_excel_upload
     intercept = intercept_excel_upload(headers=headers, filename=filename, description=description)
     intercepted_category = intercept.get("category")
     if intercepted_category in DATA_IMPORT_CATEGORIES:
@@ -2579,8 +2565,17 @@ def admin_diag_backups(hub_session: Optional[str] = Cookie(None)):
 
     backups = []
     if os.path.isdir(backup_dir):
-        for p in sorted(glob.glob(os.path.join(backup_dir, "*.db")), key=os.path.getmtime, reverse=True):
-            backups.append(_probe(p))
+        for p in sorted(glob.glob(os.path.join(backup_dir, "*.db*")), key=os.path.getmtime, reverse=True):
+            if p.endswith((".gz", ".zst")):
+                # Compressed snapshots can't be opened in place; use
+                # scripts/db_backup.py verify for their contents.
+                backups.append({
+                    "file": os.path.basename(p), "size_bytes": os.path.getsize(p),
+                    "modified": datetime.fromtimestamp(os.path.getmtime(p)).isoformat(timespec="seconds"),
+                    "compressed": True,
+                })
+            elif p.endswith(".db"):
+                backups.append(_probe(p))
     return {"ok": True, "backup_dir": backup_dir, "current_db": current,
             "backup_count": len(backups), "backups": backups}
 
@@ -2588,13 +2583,13 @@ def admin_diag_backups(hub_session: Optional[str] = Cookie(None)):
 @router.post("/admin/diag/backups/keep")
 def admin_diag_backups_keep(file: str, hub_session: Optional[str] = Cookie(None)):
     """Admin-only: durably preserve a backup by copying it to KEEP_<file>, which the
-    startup rotation never deletes. Copy-only -- never overwrites the live DB or
+    backup retention never deletes. Copy-only -- never overwrites the live DB or
     deletes anything. Use this to lock in a good pre-loss snapshot before any restore."""
     _require_full_admin(hub_session)
     from .config import DATABASE_PATH
     backup_dir = os.path.join(os.path.dirname(DATABASE_PATH), "backups")
     base = os.path.basename(file or "")
-    if not re.fullmatch(r"[A-Za-z0-9_.\-]+\.db", base):
+    if not re.fullmatch(r"[A-Za-z0-9_.\-]+\.db(\.gz|\.zst)?", base):
         raise HTTPException(status_code=400, detail="invalid backup filename")
     src = os.path.join(backup_dir, base)
     if not os.path.isfile(src):
@@ -3509,6 +3504,131 @@ def get_claims_list(status: Optional[str] = None, client_id: Optional[int] = Non
     return {"claims": claims}
 
 
+def _claims_query_scope(user: dict, client_id: Optional[int]) -> dict:
+    """Scope filters for the claims query, mirroring GET /claims: admins see
+    any account, staff see their own plus unassigned claims, and account
+    logins are locked to the account(s) they belong to."""
+    role = (user.get("role") or "").lower()
+    if role in ("admin", "staff"):
+        scope = {"client_id": client_id}
+        if role == "staff":
+            scope["owner_scope"] = _owner_identities(user)
+        return scope
+    allowed = set(_doc_account_ids(user))
+    try:
+        requested = int(client_id) if client_id is not None else None
+    except (TypeError, ValueError):
+        requested = None
+    return {"client_id": requested if requested in allowed else _client_account_id(user)}
+
+
+def _claims_query_filters(user: dict, client_id, sub_profile, status, owner, payer,
+                          dos_from, dos_to, on_date, balance_min, balance_max, q) -> dict:
+    return {
+        **_claims_query_scope(user, client_id),
+        "sub_profile": sub_profile, "status": status, "owner": owner, "payer": payer,
+        "dos_from": dos_from, "dos_to": dos_to, "on_date": on_date,
+        "balance_min": balance_min, "balance_max": balance_max, "q": (q or "").strip() or None,
+    }
+
+
+@router.get("/claims/query")
+def query_claims_page(client_id: Optional[int] = None, sub_profile: Optional[str] = None,
+                      status: Optional[str] = None, owner: Optional[str] = None,
+                      payer: Optional[str] = None, dos_from: Optional[str] = None,
+                      dos_to: Optional[str] = None, on_date: Optional[str] = None,
+                      balance_min: Optional[float] = None, balance_max: Optional[float] = None,
+                      q: Optional[str] = None, columns: Optional[str] = None,
+                      limit: int = 100, cursor: Optional[str] = None,
+                      facets: bool = False, count: bool = True,
+                      hub_session: Optional[str] = Cookie(None)):
+    """One page of the claims queue, filtered server-side.
+
+    ``status`` takes a comma list; ``columns`` a comma list to project.
+    Pass the returned ``next_cursor`` back as ``cursor`` for the next page.
+    ``facets=true`` adds per-status counts and totals for the whole scope
+    (tabs and charts)."""
+    user = _require_user(hub_session)
+    filters = _claims_query_filters(user, client_id, sub_profile, status, owner, payer,
+                                    dos_from, dos_to, on_date, balance_min, balance_max, q)
+    cols = [c.strip() for c in columns.split(",") if c.strip()] if columns else None
+    try:
+        return query_claims(filters, columns=cols, limit=limit, cursor=cursor,
+                            with_total=count, with_facets=facets)
+    except ValueError as e:
+        raise HTTPException(400, str(e))
+
+
+@router.get("/claims/query/export")
+def export_claims_query(format: str = "csv", client_id: Optional[int] = None,
+                        sub_profile: Optional[str] = None, status: Optional[str] = None,
+                        owner: Optional[str] = None, payer: Optional[str] = None,
+                        dos_from: Optional[str] = None, dos_to: Optional[str] = None,
+                        on_date: Optional[str] = None, balance_min: Optional[float] = None,
+                        balance_max: Optional[float] = None, q: Optional[str] = None,
+                        columns: Optional[str] = None,
+                        hub_session: Optional[str] = Cookie(None)):
+    """Stream the filtered claims as CSV or XLSX, one keyset page at a time."""
+    user = _require_user(hub_session)
+    fmt = (format or "csv").lower()
+    if fmt not in ("csv", "xlsx"):
+        raise HTTPException(400, "format must be csv or xlsx")
+    filters = _claims_query_filters(user, client_id, sub_profile, status, owner, payer,
+                                    dos_from, dos_to, on_date, balance_min, balance_max, q)
+    cols = [c.strip() for c in columns.split(",") if c.strip()] if columns else None
+    try:
+        first = query_claims(filters, columns=cols, limit=1, with_total=False)
+    except ValueError as e:
+        raise HTTPException(400, str(e))
+    headers = cols or list((first["claims"] or [{}])[0].keys()) or _SECTION_FALLBACK_HEADERS["claims"]
+    rows = iter_claims(filters, columns=cols)
+    stamp = business_today_iso()
+    if fmt == "csv":
+        return StreamingResponse(
+            _iter_csv_chunks(headers, rows), media_type="text/csv",
+            headers={"Content-Disposition": f"attachment; filename=claims_{stamp}.csv"})
+    return StreamingResponse(
+        _iter_xlsx_chunks(headers, rows, "Claims"),
+        media_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+        headers={"Content-Disposition": f"attachment; filename=claims_{stamp}.xlsx"})
+
+
+def _iter_csv_chunks(headers: list, rows, chunk_rows: int = 500):
+    """CSV text for ``rows`` in chunks of ``chunk_rows`` lines."""
+    buf = io.StringIO()
+    writer = csv.writer(buf)
+    writer.writerow(headers)
+    n = 0
+    for r in rows:
+        writer.writerow(["" if r.get(h) is None else r.get(h) for h in headers])
+        n += 1
+        if n % chunk_rows == 0:
+            yield buf.getvalue()
+            buf.seek(0)
+            buf.truncate()
+    yield buf.getvalue()
+
+
+def _iter_xlsx_chunks(headers: list, rows, title: str, chunk_bytes: int = 1 << 16):
+    """An .xlsx built with openpyxl's write-only workbook (rows are not kept
+    in memory) into a temp file, then streamed from disk."""
+    import tempfile
+    from openpyxl import Workbook
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet(title=title[:31])
+    ws.append(headers)
+    for r in rows:
+        ws.append(["" if r.get(h) is None else r.get(h) for h in headers])
+    with tempfile.TemporaryFile(suffix=".xlsx") as tmp:
+        wb.save(tmp)
+        tmp.seek(0)
+        while True:
+            chunk = tmp.read(chunk_bytes)
+            if not chunk:
+                return
+            yield chunk
+
+
 @router.get("/claims/statuses")
 def claim_statuses():
     return CLAIM_STATUSES
@@ -5831,9 +5951,22 @@ async def upload_elig_file(
                ".png", ".jpg", ".jpeg")
     if ext not in ALLOWED:
         raise HTTPException(400, "Unsupported file type")
-    content = await file.read()
-    if len(content) > 50 * 1024 * 1024:
+    try:
+        spool_path, _size = await ingest.spool_upload(file, 50 * 1024 * 1024)
+    except ValueError:
         raise HTTPException(413, "File too large. Maximum is 50MB")
+    try:
+        return await ingest.run(_attach_elig_file_work, spool_path, file.filename or "",
+                                ext, kind, rid, rec, user)
+    finally:
+        ingest.discard(spool_path)
+
+
+def _attach_elig_file_work(spool_path: str, filename: str, ext: str, kind: str, rid: int,
+                           rec: dict, user: dict) -> dict:
+    """Blocking half of upload_elig_file (file write + record updates), run on
+    the ingestion pool."""
+    content = ingest.read_spool(spool_path)
     unique_name = f"{uuid.uuid4().hex}{ext}"
     with open(os.path.join(UPLOAD_DIR, unique_name), "wb") as f:
         f.write(content)
@@ -5841,26 +5974,26 @@ async def upload_elig_file(
     scope = int(rec.get("client_id") or 0)
     category = "Eligibility Report" if kind == "report" else "Eligibility Intake"
     file_id = add_file(
-        client_id=scope, filename=unique_name, original_name=file.filename or "file",
+        client_id=scope, filename=unique_name, original_name=filename or "file",
         file_type=("pdf" if ext == ".pdf" else "document"), file_size=len(content),
         category=category, description=f"{category} — {rec.get('PatientName', '')}",
         row_count=0, uploaded_by=user["username"],
     )
     if kind == "report":
         update_eligibility(rid, {
-            "ReportFileId": file_id, "ReportFileName": file.filename or "report",
+            "ReportFileId": file_id, "ReportFileName": filename or "report",
             "Stage": "Completed",
             "CompletedBy": (user.get("username") or ""),
             "CompletedAt": datetime.now().isoformat(),
         })
         notify_activity(user["username"], "completed report", "Eligibility",
-                        f"{rec.get('PatientName', '')} — {file.filename or ''}")
+                        f"{rec.get('PatientName', '')} — {filename or ''}")
     else:
         update_eligibility(rid, {
-            "IntakeFileId": file_id, "IntakeFileName": file.filename or "intake",
+            "IntakeFileId": file_id, "IntakeFileName": filename or "intake",
         })
         notify_activity(user["username"], "uploaded intake", "Eligibility",
-                        f"{rec.get('PatientName', '')} — {file.filename or ''}")
+                        f"{rec.get('PatientName', '')} — {filename or ''}")
     return {"ok": True, "file_id": file_id,
             "stage": "Completed" if kind == "report" else rec.get("Stage", "Received")}
 
@@ -6114,7 +6247,9 @@ def dashboard(hub_session: Optional[str] = Cookie(None), member: Optional[str] =
     except Exception as _e:
         log.warning("auto-import on dashboard failed: %s", _e)
     member_idents = _dashboard_member_scope(user, member)
-    data = get_dashboard(scope, member_idents=member_idents)
+    data = response_cache.result(
+        "dashboard", {"scope": scope, "member": member_idents},
+        lambda: get_dashboard(scope, member_idents=member_idents), client_id=scope)
     # "Billed Out by Team Member" — the per-biller split that sums EXACTLY to
     # Billed Out. Show it only on the comprehensive team view for reporting users
     # (full admins + Eric); a single-member scope (a biller's self-view or an
@@ -6138,7 +6273,10 @@ def dashboard_for_client(client_id: int, sub_profile: Optional[str] = None,
     except Exception as _e:
         log.warning("auto-import on client dashboard failed: %s", _e)
     member_idents = _dashboard_member_scope(user, member)
-    data = get_dashboard(client_id, sub_profile=sub_profile, member_idents=member_idents)
+    data = response_cache.result(
+        "dashboard", {"scope": client_id, "sub_profile": sub_profile, "member": member_idents},
+        lambda: get_dashboard(client_id, sub_profile=sub_profile, member_idents=member_idents),
+        client_id=client_id)
     # Keep the per-biller "Billed Out by Team Member" breakdown for reporting
     # users (admins + Eric) on the account's full view; blank it for a single-
     # member scope or non-reporting (client) logins. Rows sum to Billed Out.
@@ -6443,65 +6581,49 @@ async def import_production_excel(
     if ext not in {"xlsx", "xls", "csv", "ods", "odf", "pdf", "doc", "docx"}:
         raise HTTPException(status_code=422, detail="File must be .xlsx, .xls, .csv, .ods, .odf, .pdf, .doc, or .docx")
 
-    content = await file.read()
+    spool_path, _size = await ingest.spool_upload(file)
     try:
-        if ext == "pdf":
-            rows = _parse_pdf_rows(content)
-        elif ext in ("doc", "docx"):
-            rows = _parse_docx_rows(content)
-        else:
-            rows = _parse_excel_rows(content, f".{ext}")
-    except Exception as exc:
-        raise HTTPException(status_code=422, detail=f"Could not parse file: {exc}")
+        rows = await ingest.run(_parse_production_rows, spool_path, ext)
+    finally:
+        ingest.discard(spool_path)
     if not rows:
         raise HTTPException(status_code=422, detail="No data rows found in file")
 
     if async_job and not dry_run:
-        job = create_job(
+        filename = file.filename or "upload"
+
+        def _work(progress):
+            progress(10, "import", f"Importing {len(rows)} rows")
+            outcome = _import_rows_to_production(
+                rows=rows,
+                client_id=client_id,
+                default_username=user["username"],
+                dry_run=False,
+                progress_cb=progress,
+            )
+            progress(95, "import", f"Imported {outcome['imported']} rows")
+            notify_activity(user["username"], "imported", "Time Tracking",
+                            f"{outcome['imported']} entries for client #{client_id}")
+            return {
+                "source_type": ext,
+                "filename": filename,
+                "total_rows": len(rows),
+                "imported": outcome["imported"],
+                "skipped": outcome["skipped"],
+                "errors": outcome["errors"],
+            }
+
+        job = ingest.submit_job(
+            "production_import", _work,
             account_id=client_id,
-            job_type="production_import",
             created_by=user.get("username", ""),
             payload={
                 "client_id": client_id,
                 "source_type": ext,
-                "filename": file.filename or "upload",
+                "filename": filename,
                 "total_rows": len(rows),
             },
         )
-        append_job_event(job["id"], "queued", f"Queued import of {len(rows)} rows")
-
-        def _runner():
-            try:
-                set_job_running(job["id"], progress=5)
-                append_job_event(job["id"], "start", "Parsing and importing rows")
-
-                def _progress_cb(pct: int):
-                    update_job_progress(job["id"], pct)
-
-                outcome = _import_rows_to_production(
-                    rows=rows,
-                    client_id=client_id,
-                    default_username=user["username"],
-                    dry_run=False,
-                    progress_cb=_progress_cb,
-                )
-                result = {
-                    "source_type": ext,
-                    "filename": file.filename or "upload",
-                    "total_rows": len(rows),
-                    "imported": outcome["imported"],
-                    "skipped": outcome["skipped"],
-                    "errors": outcome["errors"],
-                }
-                complete_job(job["id"], result=result)
-                append_job_event(job["id"], "done", f"Imported {outcome['imported']} rows")
-                notify_activity(user["username"], "imported", "Time Tracking",
-                                f"{outcome['imported']} entries for client #{client_id}")
-            except Exception as exc:
-                fail_job(job["id"], str(exc))
-                append_job_event(job["id"], "error", f"Import failed: {str(exc)[:200]}", "error")
-
-        threading.Thread(target=_runner, daemon=True).start()
         return {
             "ok": True,
             "job_id": job["id"],
@@ -6511,7 +6633,8 @@ async def import_production_excel(
             "total_rows": len(rows),
         }
 
-    outcome = _import_rows_to_production(
+    outcome = await ingest.run(
+        _import_rows_to_production,
         rows=rows,
         client_id=client_id,
         default_username=user["username"],
@@ -6533,6 +6656,20 @@ async def import_production_excel(
     }
 
 
+def _parse_production_rows(spool_path: str, ext: str) -> list[dict]:
+    """Read production-log rows from a spooled upload (runs on the ingestion pool)."""
+    content = ingest.read_spool(spool_path)
+    try:
+        if ext == "pdf":
+            return _parse_pdf_rows(content)
+        if ext in ("doc", "docx"):
+            return _parse_docx_rows(content)
+        ingest.parse_ahead(content, f".{ext}")
+        return _parse_excel_rows(content, f".{ext}")
+    except Exception as exc:
+        raise HTTPException(status_code=422, detail=f"Could not parse file: {exc}")
+
+
 @router.post("/jobs/production-report")
 def create_production_report_job(body: ProductionReportJobIn, hub_session: Optional[str] = Cookie(None)):
     user = _require_user(hub_session)
@@ -7070,8 +7207,13 @@ async def upload_file(
     description: str = Form(""),
     client_id: Optional[int] = Form(None),
     sub_profile: Optional[str] = Form(None),
+    async_job: bool = Query(False, description="If true, run parse+import as a tracked background job."),
     hub_session: Optional[str] = Cookie(None),
 ):
+    """Save an uploaded file to the account's Documents and, for data files,
+    auto-import it. The body is spooled to disk and the parse+import runs on
+    the ingestion pool (app.ingest) so the event loop stays free; with
+    ``async_job`` the route returns a job id at once instead of waiting."""
     user = _require_user(hub_session)
     if client_id is not None:
         scope = client_id
@@ -7102,16 +7244,40 @@ async def upload_file(
         file_type = "pdf"
     else:
         file_type = "document"
-    unique_name = f"{uuid.uuid4().hex}{ext}"
-    dest = os.path.join(UPLOAD_DIR, unique_name)
 
-    content = await file.read()
-    file_size = len(content)
-
-    # Enforce upload size limit (50 MB)
+    # Enforce upload size limit (50 MB) while spooling the body to disk.
     MAX_UPLOAD_SIZE = 50 * 1024 * 1024
-    if file_size > MAX_UPLOAD_SIZE:
-        raise HTTPException(413, f"File too large. Maximum is {MAX_UPLOAD_SIZE // (1024*1024)}MB")
+    try:
+        spool_path, _size = await ingest.spool_upload(file, MAX_UPLOAD_SIZE)
+    except ValueError as exc:
+        raise HTTPException(413, str(exc))
+    args = (spool_path, file.filename or "", ext, file_type, category, description,
+            scope, sub_profile, user)
+    if async_job:
+        job = ingest.submit_job(
+            "file_upload", lambda progress: _upload_file_work(*args, progress=progress),
+            account_id=scope, created_by=user.get("username", ""), spool_path=spool_path,
+            payload={"filename": file.filename or "upload", "category": category})
+        return {"ok": True, "job_id": job["id"], "status": "queued", "async_job": True,
+                "original_name": file.filename}
+    try:
+        return await ingest.run(_upload_file_work, *args)
+    finally:
+        ingest.discard(spool_path)
+
+
+def _upload_file_work(spool_path: str, filename: str, ext: str, file_type: str,
+                      category: str, description: str, scope: int,
+                      sub_profile: Optional[str], user: dict, progress=None) -> dict:
+    """Blocking half of upload_file, run on the ingestion pool."""
+    progress = progress or (lambda *a, **k: None)
+    content = ingest.read_spool(spool_path)
+    file_size = len(content)
+    unique_name = f"{uuid.uuid4().hex}{ext}"
+    dest = os.path.join(UPLOAD_DIR, unique_name)
+    if file_type == "excel":
+        ingest.parse_ahead(content, ext)
+        progress(20, "parse", f"Parsed {filename or 'file'}")
 
     # ── Payment Posting tab is the ONLY source of truth for payments ──
     # A deposit / ERA / posted-payments register must be uploaded on the
@@ -7157,7 +7323,7 @@ async def upload_file(
     claims_fallback = False
 
     if file_type == "excel" and requested_category not in DATA_IMPORT_CATEGORIES:
-        inferred, infer_debug = _infer_excel_category(content, ext, file.filename or "", description or "")
+        inferred, infer_debug = _infer_excel_category(content, ext, filename or "", description or "")
         if inferred in DATA_IMPORT_CATEGORIES:
             effective_category = inferred
             category_source = "auto"
@@ -7183,7 +7349,7 @@ async def upload_file(
     file_id = add_file(
         client_id=scope,
         filename=unique_name,
-        original_name=file.filename or "file",
+        original_name=filename or "file",
         file_type=file_type,
         file_size=file_size,
         category=effective_category,
@@ -7197,6 +7363,7 @@ async def upload_file(
     import_errors = []
     import_category = None
     if effective_category in DATA_IMPORT_CATEGORIES and file_type in ("excel", "pdf", "document"):
+        progress(40, "import", f"Importing into {effective_category}")
         import_category = effective_category
         _uploader = user.get("username") or ""
         _sub_profile = (sub_profile or "").strip()
@@ -7234,11 +7401,11 @@ async def upload_file(
     # the numbers actually move, instead of letting it sit inert.
     data_warning = None
     if file_type in ("pdf", "document") and effective_category not in DATA_IMPORT_CATEGORIES:
-        _fn = (file.filename or "").lower()
+        _fn = (filename or "").lower()
         if any(k in _fn for k in ("daily", "claim", "worklist", "billed", "remit",
                                   "era", "deposit", "svd", "ledger", "aging", "payment")):
             data_warning = (
-                f"\u201c{file.filename}\u201d looks like claims data. We tried to read it "
+                f"\u201c{filename}\u201d looks like claims data. We tried to read it "
                 f"automatically but couldn't extract claim rows from this "
                 f"{(ext.lstrip('.') or 'file')}. For reliable totals, re-upload it as "
                 "Excel/CSV (.xlsx or .csv) with claim columns."
@@ -7246,7 +7413,7 @@ async def upload_file(
 
     try:
         size_kb = max(1, file_size // 1024)
-        nice_name = file.filename or unique_name
+        nice_name = filename or unique_name
         detail_bits = [f'"{nice_name}" ({size_kb} KB, {ext.lstrip(".") or "file"})',
                        f"category={effective_category}"]
         if row_count:
@@ -7267,7 +7434,7 @@ async def upload_file(
     return {
         "id": file_id,
         "filename": unique_name,
-        "original_name": file.filename,
+        "original_name": filename,
         "requested_category": requested_category,
         "effective_category": effective_category,
         "category_source": category_source,
@@ -7562,7 +7729,13 @@ def _build_section_data(conn, client_id, sub_profile=None, period=None):
 def get_report(client_id: int, period: str = "all", sub_profile: Optional[str] = None,
                hub_session: Optional[str] = Cookie(None)):
     """Generate a comprehensive cross-section report for CSV / print, with sub-profile breakdowns."""
-    user = _require_reporting_access(hub_session)
+    _require_reporting_access(hub_session)
+    return response_cache.result(
+        "report", {"client_id": client_id, "period": period, "sub_profile": sub_profile},
+        lambda: _build_report(client_id, period, sub_profile), client_id=client_id)
+
+
+def _build_report(client_id: int, period: str, sub_profile: Optional[str]) -> dict:
     from app.client_db import get_db
     from datetime import date, datetime
 
@@ -7607,10 +7780,12 @@ async def import_excel(
     category: str = Form("Claims"),
     client_id: Optional[int] = Form(None),
     sub_profile: Optional[str] = Form(None),
+    async_job: bool = Query(False, description="If true, run the import as a tracked background job."),
     hub_session: Optional[str] = Cookie(None),
 ):
     """Import an Excel/CSV file directly into a data table (Claims, Credentialing, Enrollment, EDI).
-    Also saves a copy of the file in Documents under the appropriate category."""
+    Also saves a copy of the file in Documents under the appropriate category.
+    The import runs on the ingestion pool; ``async_job`` returns a job id instead."""
     user = _require_user(hub_session)
     scope = client_id if client_id is not None else (_client_scope(user) if _client_scope(user) is not None else _single_client_account_or(user["id"]))
 
@@ -7618,7 +7793,28 @@ async def import_excel(
     if ext not in (".xlsx", ".xls", ".csv", ".ods", ".odf"):
         raise HTTPException(400, "Only .xlsx, .xls, .csv, .ods, .odf files supported for import")
 
-    content = await file.read()
+    spool_path, _size = await ingest.spool_upload(file)
+    args = (spool_path, file.filename or "", ext, category, scope, sub_profile, user)
+    if async_job:
+        job = ingest.submit_job(
+            "excel_import", lambda progress: _import_excel_work(*args, progress=progress),
+            account_id=scope, created_by=user.get("username", ""), spool_path=spool_path,
+            payload={"filename": file.filename or "upload", "category": category})
+        return {"ok": True, "job_id": job["id"], "status": "queued", "async_job": True,
+                "category": category, "original_name": file.filename}
+    try:
+        return await ingest.run(_import_excel_work, *args)
+    finally:
+        ingest.discard(spool_path)
+
+
+def _import_excel_work(spool_path: str, filename: str, ext: str, category: str, scope: int,
+                       sub_profile: Optional[str], user: dict, progress=None) -> dict:
+    """Blocking half of import_excel, run on the ingestion pool."""
+    progress = progress or (lambda *a, **k: None)
+    content = ingest.read_spool(spool_path)
+    ingest.parse_ahead(content, ext)
+    progress(20, "parse", f"Parsed {filename or 'file'}")
 
     # ── Save a copy of the file in Documents ──
     unique_name = f"{uuid.uuid4().hex}{ext}"
@@ -7633,21 +7829,20 @@ async def import_excel(
             reader = _csv.reader(_io.StringIO(content.decode("utf-8", errors="replace")))
             row_count = max(0, sum(1 for _ in reader) - 1)
         else:
-            import openpyxl
-            wb = openpyxl.load_workbook(_io.BytesIO(content), read_only=True, data_only=True)
-            row_count = max(0, sum(ws.max_row - 1 for ws in wb.worksheets if ws.max_row))
-            wb.close()
+            sheets = parse_workbook(content, ext).sheets
+            row_count = max(0, sum(len(ws.cells) - 1 for ws in sheets if ws.cells))
     except Exception:
         pass
     file_id = add_file(
-        client_id=scope, filename=unique_name, original_name=file.filename or "file",
+        client_id=scope, filename=unique_name, original_name=filename or "file",
         file_type="excel", file_size=file_size, category=category,
-        description=f"{category} import — {file.filename}",
+        description=f"{category} import — {filename}",
         row_count=row_count, uploaded_by=user["username"],
     )
 
     imported = 0
     errors = []
+    progress(40, "import", f"Importing into {category}")
 
     try:
         if category == "Claims":
@@ -7670,13 +7865,13 @@ async def import_excel(
     # Notify admin of team imports
     if imported > 0:
         notify_bulk_activity(user["username"], "imported", category, imported,
-                             f"File: {file.filename}")
+                             f"File: {filename}")
 
     return {
         "category": category,
         "imported": imported,
         "errors": errors[:10],
-        "original_name": file.filename,
+        "original_name": filename,
         "file_id": file_id,
     }
 
@@ -7685,6 +7880,7 @@ async def import_excel(
 async def import_payments_posted_route(
     file: UploadFile = FastAPIFile(...),
     client_id: Optional[int] = Form(None),
+    async_job: bool = Query(False, description="If true, post the payments as a tracked background job."),
     hub_session: Optional[str] = Cookie(None),
 ):
     """Upload a posted-payments / ERA deposit file.
@@ -7692,7 +7888,8 @@ async def import_payments_posted_route(
     Populates ONLY the payments table so "Payments (This Month)" and the
     collections picture reflect real money deposited — without creating or
     changing any claims. Idempotent on the deterministic payment key, so
-    re-uploading the same remittance never double-counts.
+    re-uploading the same remittance never double-counts. Parsing and posting
+    run on the ingestion pool; ``async_job`` returns a job id instead.
     """
     user = _require_user(hub_session)
     if not _is_allowed_payment_poster_username(user.get("username") or ""):
@@ -7708,7 +7905,28 @@ async def import_payments_posted_route(
     if ext not in (".xlsx", ".xls", ".csv", ".ods", ".odf", ".pdf", ".doc", ".docx"):
         raise HTTPException(400, "Upload a payments report as PDF, Word (.doc/.docx), or Excel/CSV (.xlsx/.xls/.csv/.ods)")
 
-    content = await file.read()
+    spool_path, _size = await ingest.spool_upload(file)
+    args = (spool_path, file.filename or "", ext, scope, user)
+    if async_job:
+        job = ingest.submit_job(
+            "payments_import", lambda progress: _import_payments_work(*args, progress=progress),
+            account_id=scope, created_by=user.get("username", ""), spool_path=spool_path,
+            payload={"filename": file.filename or "upload"})
+        return {"ok": True, "job_id": job["id"], "status": "queued", "async_job": True,
+                "original_name": file.filename}
+    try:
+        return await ingest.run(_import_payments_work, *args)
+    finally:
+        ingest.discard(spool_path)
+
+
+def _import_payments_work(spool_path: str, filename: str, ext: str, scope: int, user: dict,
+                          progress=None) -> dict:
+    """Blocking half of import_payments_posted_route, run on the ingestion pool."""
+    progress = progress or (lambda *a, **k: None)
+    content = ingest.read_spool(spool_path)
+    ingest.parse_ahead(content, ext)
+    progress(20, "parse", f"Parsed {filename or 'file'}")
 
     # Keep a copy of the remittance in Documents under "Payments" for the audit trail.
     unique_name = f"{uuid.uuid4().hex}{ext}"
@@ -7716,12 +7934,13 @@ async def import_payments_posted_route(
         f.write(content)
     _ftype = "pdf" if ext == ".pdf" else ("word" if ext in (".doc", ".docx") else "excel")
     add_file(
-        client_id=scope, filename=unique_name, original_name=file.filename or "file",
+        client_id=scope, filename=unique_name, original_name=filename or "file",
         file_type=_ftype, file_size=len(content), category="Payments",
-        description=f"Payments posted — {file.filename}",
+        description=f"Payments posted — {filename}",
         row_count=0, uploaded_by=user["username"],
     )
 
+    progress(40, "import", "Posting payments")
     try:
         posted, posted_amount, by_month, errors, split = _import_payments_posted(
             content, ext, scope, uploaded_by=user["username"])
@@ -7732,7 +7951,7 @@ async def import_payments_posted_route(
 
     if posted > 0:
         notify_bulk_activity(user["username"], "posted", "Payments", posted,
-                             f"${posted_amount:,.2f} — {file.filename}")
+                             f"${posted_amount:,.2f} — {filename}")
 
     return {
         "posted": posted,
@@ -7740,7 +7959,7 @@ async def import_payments_posted_route(
         "by_month": by_month,
         "split": split,
         "errors": errors[:10],
-        "original_name": file.filename,
+        "original_name": filename,
     }
 
 
@@ -7788,46 +8007,16 @@ def _iso_any(raw) -> str:
 
 
 def _extract_text_lines(content: bytes, ext: str) -> list:
-    """Return normalized, non-empty text lines from a PDF or Word document."""
-    lines = []
+    """Return normalized, non-empty text lines from a PDF or Word document.
+    PDFs are read in layout mode so column spacing keeps the header row and
+    each detail row intact; extraction is cached per file (app.doc_extract)."""
     if ext == ".pdf":
-        try:
-            from pypdf import PdfReader
-        except Exception as exc:
-            raise ValueError("PDF parsing dependency missing. Install 'pypdf'.") from exc
-        import io as _io
-        reader = PdfReader(_io.BytesIO(content))
-        for page in reader.pages:
-            # Layout mode preserves column spacing so the header row and each
-            # detail row stay intact and in reading order; fall back on older
-            # pypdf that doesn't support the kwarg.
-            try:
-                txt = page.extract_text(extraction_mode="layout") or ""
-            except TypeError:
-                txt = page.extract_text() or ""
-            for raw in txt.splitlines():
-                s = re.sub(r"\s+", " ", str(raw or "")).strip()
-                if s:
-                    lines.append(s)
-    elif ext in (".doc", ".docx"):
-        try:
-            from docx import Document
-        except Exception as exc:
-            raise ValueError("Word parsing dependency missing. Install 'python-docx'.") from exc
-        import io as _io
-        doc = Document(_io.BytesIO(content))
-        for p in doc.paragraphs:
-            s = re.sub(r"\s+", " ", str(p.text or "")).strip()
-            if s:
-                lines.append(s)
-        # Flatten any Word tables to text lines too — the detail parser keys off
-        # $-amounts + dates, so tabular exports read the same as paragraph text.
-        for table in doc.tables:
-            for tr in table.rows:
-                s = re.sub(r"\s+", " ", " ".join(c.text for c in tr.cells)).strip()
-                if s:
-                    lines.append(s)
-    return lines
+        return doc_extract.pdf_lines(content, layout=True)
+    if ext in (".doc", ".docx"):
+        # Word tables are flattened to text lines too — the detail parser keys
+        # off $-amounts + dates, so tabular exports read the same as paragraphs.
+        return doc_extract.docx_lines(content)
+    return []
 
 
 def _pp_column_order(lines: list):
@@ -8079,249 +8268,10 @@ def _parse_excel_rows(content: bytes, ext: str, combine_sheets: bool = True):
     """Parse Excel/CSV bytes into list of dict rows with smart header detection.
     If combine_sheets=True and multiple sheets share the same header structure,
     rows from all matching sheets are combined (useful for multi-tab claim files).
-    Supports .xlsx (openpyxl), .xls (xlrd), .ods/.odf (OpenDocument), and .csv."""
-    import csv, io
-    rows = []
-    if ext == ".csv":
-        # Decode tolerantly: strip a BOM if present, fall back through encodings
-        # so files exported from Excel/Windows/Mac all parse.
-        text = None
-        for enc in ("utf-8-sig", "utf-8", "latin-1"):
-            try:
-                text = content.decode(enc)
-                break
-            except Exception:
-                continue
-        if text is None:
-            text = content.decode("utf-8", errors="replace")
-
-        # Detect the delimiter — exports aren't always comma-separated
-        # (semicolon in many locales, tab/pipe from some systems).
-        sample = text[:8192]
-        delim = ","
-        try:
-            delim = csv.Sniffer().sniff(sample, delimiters=",;\t|").delimiter
-        except Exception:
-            first_line = next((ln for ln in sample.splitlines() if ln.strip()), "")
-            if first_line:
-                delim = max(",;\t|", key=first_line.count)
-
-        raw_rows = list(csv.reader(io.StringIO(text), delimiter=delim))
-        # Smart header detection: the header is the most "label-like" row within
-        # the first 10 (skips title/blank rows that sit above real headers).
-        header_idx = 0
-        best_score = -1
-        for idx, r in enumerate(raw_rows[:10]):
-            non_empty = sum(1 for c in r if c is not None and str(c).strip())
-            text_cells = sum(1 for c in r if c is not None and str(c).strip()
-                             and not str(c).strip().replace(",", "").replace(".", "")
-                             .replace("$", "").replace("-", "").isdigit())
-            score = text_cells * 2 + non_empty
-            if non_empty >= 2 and score > best_score:
-                best_score = score
-                header_idx = idx
-        if raw_rows:
-            headers = [str(c).strip() for c in raw_rows[header_idx]]
-            for r in raw_rows[header_idx + 1:]:
-                if any(c is not None and str(c).strip() for c in r):
-                    rows.append(dict(zip(headers, r)))
-    elif ext == ".xls":
-        # Legacy Excel (BIFF) — use xlrd
-        import xlrd
-        wb = xlrd.open_workbook(file_contents=content)
-        sheet_results = []
-        for sidx in range(wb.nsheets):
-            ws = wb.sheet_by_index(sidx)
-            if ws.nrows < 2:
-                continue
-            # Smart header detection: best row in first 10 rows
-            header_row_idx = 0
-            best_score = 0
-            for ri in range(min(10, ws.nrows)):
-                row_vals = [ws.cell_value(ri, ci) for ci in range(ws.ncols)]
-                non_empty = sum(1 for v in row_vals if v is not None and str(v).strip())
-                text = sum(1 for v in row_vals if isinstance(v, str) and str(v).strip())
-                score = text * 2 + non_empty
-                if score > best_score and non_empty >= 3:
-                    best_score = score
-                    header_row_idx = ri
-            hdrs = [str(ws.cell_value(header_row_idx, ci)).strip() for ci in range(ws.ncols)]
-            valid_cols = [i for i, h in enumerate(hdrs) if h]
-            if len(valid_cols) < 2:
-                continue
-            sheet_rows = []
-            for ri in range(header_row_idx + 1, ws.nrows):
-                row_vals = []
-                for ci in range(ws.ncols):
-                    cell = ws.cell(ri, ci)
-                    # Convert xlrd date serial to Python datetime
-                    if cell.ctype == xlrd.XL_CELL_DATE:
-                        try:
-                            import datetime as _dt
-                            dt = xlrd.xldate_as_datetime(cell.value, wb.datemode)
-                            row_vals.append(dt)
-                        except Exception:
-                            row_vals.append(cell.value)
-                    else:
-                        row_vals.append(cell.value)
-                if any(v is not None and str(v).strip() for v in row_vals):
-                    sheet_rows.append(dict(zip(hdrs, row_vals)))
-            if sheet_rows:
-                hdr_key = tuple(sorted(h.lower() for h in hdrs if h))
-                sheet_results.append((hdr_key, hdrs, sheet_rows))
-        if sheet_results:
-            if combine_sheets:
-                from collections import defaultdict
-                groups = defaultdict(list)
-                for hdr_key, hdrs, srows in sheet_results:
-                    groups[hdr_key].extend(srows)
-                rows = max(groups.values(), key=len)
-            else:
-                rows = max(sheet_results, key=lambda x: len(x[2]))[2]
-    elif ext in (".ods", ".odf"):
-        # OpenDocument spreadsheets — parse content.xml from zip package.
-        import xml.etree.ElementTree as _et
-        import zipfile as _zipfile
-
-        ns = {
-            "table": "urn:oasis:names:tc:opendocument:xmlns:table:1.0",
-            "text": "urn:oasis:names:tc:opendocument:xmlns:text:1.0",
-            "office": "urn:oasis:names:tc:opendocument:xmlns:office:1.0",
-        }
-        a_row_rep = "{urn:oasis:names:tc:opendocument:xmlns:table:1.0}number-rows-repeated"
-        a_col_rep = "{urn:oasis:names:tc:opendocument:xmlns:table:1.0}number-columns-repeated"
-        a_str = "{urn:oasis:names:tc:opendocument:xmlns:office:1.0}string-value"
-        a_date = "{urn:oasis:names:tc:opendocument:xmlns:office:1.0}date-value"
-        a_val = "{urn:oasis:names:tc:opendocument:xmlns:office:1.0}value"
-
-        try:
-            with _zipfile.ZipFile(io.BytesIO(content)) as zf:
-                xml_bytes = zf.read("content.xml")
-        except Exception as exc:
-            raise ValueError(f"Cannot read OpenDocument file: {exc}") from exc
-
-        root = _et.fromstring(xml_bytes)
-        sheet_results = []
-
-        for table in root.findall(".//table:table", ns):
-            all_sheet_rows = []
-            for tr in table.findall("table:table-row", ns):
-                row_repeat = int(tr.attrib.get(a_row_rep, "1") or "1")
-                row_vals = []
-                for cell in tr:
-                    if not (cell.tag.endswith("table-cell") or cell.tag.endswith("covered-table-cell")):
-                        continue
-                    col_repeat = int(cell.attrib.get(a_col_rep, "1") or "1")
-                    parts = []
-                    for p in cell.findall(".//text:p", ns):
-                        txt = "".join(p.itertext()).strip()
-                        if txt:
-                            parts.append(txt)
-                    v = " ".join(parts).strip()
-                    if not v:
-                        v = (cell.attrib.get(a_str) or cell.attrib.get(a_date) or cell.attrib.get(a_val) or "")
-                    row_vals.extend([v] * max(1, col_repeat))
-                if not row_vals:
-                    continue
-                for _ in range(max(1, row_repeat)):
-                    all_sheet_rows.append(tuple(row_vals))
-
-            if not all_sheet_rows:
-                continue
-
-            header_row_idx = 0
-            best_header_score = 0
-            for idx, row in enumerate(all_sheet_rows[:10]):
-                non_empty = sum(1 for c in row if c is not None and str(c).strip())
-                text_cells = sum(1 for c in row if c is not None and isinstance(c, str) and len(str(c).strip()) > 0)
-                score = text_cells * 2 + non_empty
-                if score > best_header_score and non_empty >= 3:
-                    best_header_score = score
-                    header_row_idx = idx
-
-            if header_row_idx < len(all_sheet_rows):
-                sheet_headers = [str(c).strip() if c is not None else "" for c in all_sheet_rows[header_row_idx]]
-                valid_cols = [i for i, h in enumerate(sheet_headers) if h]
-                if len(valid_cols) < 2:
-                    continue
-                sheet_rows = []
-                for row in all_sheet_rows[header_row_idx + 1:]:
-                    if any(c is not None and str(c).strip() for c in row):
-                        sheet_rows.append(dict(zip(sheet_headers, row)))
-                if sheet_rows:
-                    hdr_key = tuple(sorted(h.lower() for h in sheet_headers if h))
-                    sheet_results.append((hdr_key, sheet_headers, sheet_rows))
-
-        if sheet_results:
-            if combine_sheets:
-                from collections import defaultdict
-                groups = defaultdict(list)
-                for hdr_key, hdrs, srows in sheet_results:
-                    groups[hdr_key].extend(srows)
-                rows = max(groups.values(), key=len)
-            else:
-                best = max(sheet_results, key=lambda x: len(x[2]))
-                rows = best[2]
-    else:
-        # .xlsx — use openpyxl
-        import openpyxl
-        try:
-            wb = openpyxl.load_workbook(io.BytesIO(content), read_only=True, data_only=True)
-        except Exception as exc:
-            raise ValueError(f"Cannot read Excel file: {exc}. If this is a .xls file, rename to .xls extension.") from exc
-        # Collect parsed rows per sheet with their headers
-        sheet_results = []  # list of (headers_tuple, rows_list)
-        for sheet_name in wb.sheetnames:
-            ws = wb[sheet_name]
-            all_sheet_rows = []
-            for row in ws.iter_rows(values_only=True):
-                all_sheet_rows.append(row)
-            if not all_sheet_rows:
-                continue
-            # Smart header detection: find the best header row
-            header_row_idx = 0
-            best_header_score = 0
-            for idx, row in enumerate(all_sheet_rows[:10]):
-                if not row:
-                    continue
-                non_empty = sum(1 for c in row if c is not None and str(c).strip())
-                text_cells = sum(1 for c in row if c is not None and isinstance(c, str) and len(str(c).strip()) > 0)
-                # Require at least 3 non-empty cells to be a real header row
-                score = text_cells * 2 + non_empty
-                if score > best_header_score and non_empty >= 3:
-                    best_header_score = score
-                    header_row_idx = idx
-            if header_row_idx < len(all_sheet_rows):
-                sheet_headers = [str(c).strip() if c else "" for c in all_sheet_rows[header_row_idx]]
-                # Filter out empty header columns
-                valid_cols = [i for i, h in enumerate(sheet_headers) if h]
-                if len(valid_cols) < 2:
-                    continue
-                sheet_rows = []
-                for row in all_sheet_rows[header_row_idx + 1:]:
-                    if any(c is not None and str(c).strip() for c in row):
-                        sheet_rows.append(dict(zip(sheet_headers, row)))
-                if sheet_rows:
-                    # Use a normalized header key (sorted, lowered) for grouping
-                    hdr_key = tuple(sorted(h.lower() for h in sheet_headers if h))
-                    sheet_results.append((hdr_key, sheet_headers, sheet_rows))
-
-        if sheet_results:
-            if combine_sheets:
-                # Group sheets by header structure and combine sheets with same headers
-                from collections import defaultdict
-                groups = defaultdict(list)
-                for hdr_key, hdrs, srows in sheet_results:
-                    groups[hdr_key].extend(srows)
-                # Pick the group with the most total rows
-                best_group = max(groups.values(), key=len)
-                rows = best_group
-            else:
-                # Pick single sheet with most rows
-                best = max(sheet_results, key=lambda x: len(x[2]))
-                rows = best[2]
-        wb.close()
-    return rows
+    Supports .xlsx (openpyxl), .xls (xlrd), .ods/.odf (OpenDocument), and .csv.
+    The bytes are parsed once into the shared ParsedWorkbook (app.workbook), so
+    the classifiers and the importer reading the same upload reuse that parse."""
+    return parse_workbook(content, ext).rows(combine_sheets)
 
 
 # ─── Hardcoded format templates ("the glasses") ───────────────────────────────
@@ -8358,18 +8308,10 @@ def _cell_iso_date(v):
 
 def _load_xlsx_sheets(content: bytes):
     """Return [(sheet_name, [row_tuples...]), ...] for an .xlsx workbook, or []."""
-    import openpyxl
     try:
-        wb = openpyxl.load_workbook(io.BytesIO(content), read_only=True, data_only=True)
+        return parse_workbook(content, ".xlsx").sheet_rows()
     except Exception:
         return []
-    out = []
-    for sn in wb.sheetnames:
-        ws = wb[sn]
-        rows = [r for r in ws.iter_rows(values_only=True)]
-        out.append((sn, rows))
-    wb.close()
-    return out
 
 
 def _tpl_svd_denials(sheets):
@@ -8551,17 +8493,24 @@ def _extract_templated_claim_rows(content: bytes, ext: str):
     labeled_rows); otherwise None. Only .xlsx workbooks are templated."""
     if ext not in (".xlsx",):
         return None
-    sheets = _load_xlsx_sheets(content)
-    if not sheets:
+    try:
+        wb = parse_workbook(content, ext)
+    except Exception:
         return None
-    for name, fn in _CLAIM_TEMPLATES:
-        try:
-            rows = fn(sheets)
-        except Exception:
-            rows = None
-        if rows:
-            return name, rows
-    return None
+
+    def _match():
+        sheets = wb.sheet_rows()
+        for name, fn in _CLAIM_TEMPLATES:
+            try:
+                rows = fn(sheets)
+            except Exception:
+                rows = None
+            if rows:
+                return name, rows
+        return None
+
+    hit = wb.memo("claim_template", _match)
+    return (hit[0], [dict(r) for r in hit[1]]) if hit else None
 
 
 # Header tokens that mark a *claims* table (patient / charge / CPT / payor /
@@ -8611,23 +8560,13 @@ def _parse_pdf_rows(content: bytes, header_keywords: tuple = None) -> list[dict]
     `header_keywords` overrides the tokens used to locate the header row, so the
     same extractor reads production-log PDFs and claims-worklist PDFs alike.
     """
-    try:
-        from pypdf import PdfReader
-    except Exception as exc:
-        raise ValueError("PDF parsing dependency missing. Install 'pypdf'.") from exc
-
-    import io as _io
-
-    reader = PdfReader(_io.BytesIO(content))
-    lines: list[str] = []
-    for page in reader.pages:
-        txt = page.extract_text() or ""
-        for raw in txt.splitlines():
-            s = re.sub(r"\s+", " ", str(raw or "")).strip()
-            if s:
-                lines.append(s)
+    import itertools
 
-    if not lines:
+    # Lines stream page by page from the cached extractor; only the first 60
+    # are needed to find the header, so a PDF without a table stops early.
+    lines = doc_extract.iter_pdf_lines(content)
+    head = list(itertools.islice(lines, 60))
+    if not head:
         return []
 
     def _split_line(line: str) -> list[str]:
@@ -8646,7 +8585,7 @@ def _parse_pdf_rows(content: bytes, header_keywords: tuple = None) -> list[dict]
         header_keywords = (
             "date", "work date", "task", "description", "hours", "qty", "quantity", "category", "user", "notes",
         )
-    for i, line in enumerate(lines[:60]):
+    for i, line in enumerate(head):
         parts = _split_line(line)
         if len(parts) < 3:
             continue
@@ -8658,6 +8597,7 @@ def _parse_pdf_rows(content: bytes, header_keywords: tuple = None) -> list[dict]
             break
 
     if header_idx < 0:
+        lines.close()
         raise ValueError(
             "Could not detect a table header in PDF. "
             "Expected columns like Date, Task/Description, Category, Qty, Hours, Notes."
@@ -8665,7 +8605,7 @@ def _parse_pdf_rows(content: bytes, header_keywords: tuple = None) -> list[dict]
 
     ncols = len(headers)
     rows: list[dict] = []
-    for line in lines[header_idx + 1:]:
+    for line in itertools.chain(head[header_idx + 1:], lines):
         if re.fullmatch(r"[-_=| ]{3,}", line):
             continue
         parts = _split_line(line)
@@ -8688,27 +8628,19 @@ def _parse_docx_rows(content: bytes, header_keywords: tuple = None) -> list[dict
     document has no usable table, falls back to reading paragraph text and
     detecting a tabular header the same way the PDF parser does.
     """
-    try:
-        from docx import Document
-    except Exception as exc:  # pragma: no cover - dependency guard
-        raise ValueError("Word parsing dependency missing. Install 'python-docx'.") from exc
-
-    import io as _io
-
-    doc = Document(_io.BytesIO(content))
+    doc = doc_extract.docx_content(content)
 
     # 1) Prefer a real table with a header row + at least one data row.
-    for table in doc.tables:
-        trows = table.rows
+    for trows in doc["tables"]:
         if len(trows) < 2:
             continue
-        headers = [(_clean_val(c.text) or "").strip() for c in trows[0].cells]
+        headers = [(_clean_val(c) or "").strip() for c in trows[0]]
         if sum(1 for h in headers if h) < 2:
             continue
         ncols = len(headers)
         out: list[dict] = []
         for tr in trows[1:]:
-            cells = [(_clean_val(c.text) or "").strip() for c in tr.cells]
+            cells = [(_clean_val(c) or "").strip() for c in tr]
             if len(cells) < ncols:
                 cells = cells + [""] * (ncols - len(cells))
             elif len(cells) > ncols:
@@ -8720,7 +8652,7 @@ def _parse_docx_rows(content: bytes, header_keywords: tuple = None) -> list[dict
             return out
 
     # 2) Fall back to paragraph text using the PDF line/header heuristics.
-    text = "\n".join(p.text for p in doc.paragraphs)
+    text = "\n".join(doc["paragraphs"])
     fake_pdf_lines = [re.sub(r"\s+", " ", ln).strip() for ln in text.splitlines() if ln.strip()]
     if not fake_pdf_lines:
         return []
@@ -8871,28 +8803,10 @@ def _hl_read_all_rows(content: bytes, ext: str):
     """Read EVERY row of a spreadsheet as a list-of-lists, with NO header
     detection (unlike _parse_excel_rows, which drops the rows above its chosen
     header — fatal for a headerless file). Returns None if unreadable."""
-    import csv, io
     e = (ext or "").lower()
     try:
         if e == ".csv":
-            text = None
-            for enc in ("utf-8-sig", "utf-8", "latin-1"):
-                try:
-                    text = content.decode(enc)
-                    break
-                except Exception:
-                    continue
-            if text is None:
-                text = content.decode("utf-8", errors="replace")
-            sample = text[:8192]
-            delim = ","
-            try:
-                delim = csv.Sniffer().sniff(sample, delimiters=",;\t|").delimiter
-            except Exception:
-                fl = next((ln for ln in sample.splitlines() if ln.strip()), "")
-                if fl:
-                    delim = max(",;\t|", key=fl.count)
-            return [list(r) for r in csv.reader(io.StringIO(text), delimiter=delim)]
+            return [list(r) for r in parse_workbook(content, e).sheets[0].cells]
         if e == ".xlsx":
             sheets = _load_xlsx_sheets(content)
             if not sheets:
@@ -8930,51 +8844,98 @@ def _hl_looks_like_header(cells) -> bool:
     return mapped >= 3
 
 
-def _infer_headerless_claim_rows(matrix, received_date: str):
-    """Infer claim columns from cell VALUES when a file has no usable header.
-    Returns a list of canonical-keyed row dicts (ChargeAmount, ClaimStatus,
-    BillDate, ClaimKey, CPTCode, Payor, DenialReason, PatientName) that flow
-    straight through the normal fuzzy-mapping importer, or None when no charge
-    column can be identified (so the caller leaves the file to the normal path)."""
+# Column roles are inferred from a bounded, evenly spaced sample of the rows —
+# a full day's SV export can run to tens of thousands of lines, and the roles
+# are settled long before that. Each column is scored with one regex pass per
+# role over its cells joined by newlines (MULTILINE anchors make every line a
+# cell) instead of calling the per-value predicates above cell by cell, and
+# every row is then projected through the resulting layout in a single pass.
+# Layouts are inferred afresh for every file: two exports can share a column
+# shape yet order their money columns differently (charge before paid in one,
+# after it in the other), and reusing one file's picks for the other imports
+# the wrong amounts as charges.
+_HL_SAMPLE_ROWS = int(os.getenv("HEADERLESS_SAMPLE_ROWS", "2000"))
+
+_HL_MONEY_RE = re.compile(r"^-?\d+(?:\.\d+)?$", re.M)                  # "$" and "," removed
+_HL_CPT_RE = re.compile(r"^(?:\d{5}|[A-Z]\d{4})$", re.M)               # upper-cased
+_HL_DENIAL_RE = re.compile(r"^(?:CO|PI|PR|OA|CR|MA|N|M)\d+$", re.M)    # upper-cased, no spaces
+_HL_NAME_RE = re.compile(r"^[ '.\-]*[^\W\d_](?:[^\W\d_]|[ '.\-])*$", re.M)
+_HL_SINGLETOK_RE = re.compile(r"^['.\-]*[^\W\d_](?:[^\W\d_]|['.\-])*$", re.M)
+_HL_PAYOR_RE = re.compile(r"^[^\n]*?(?:" + "|".join(map(re.escape, _HL_INSURER_HINTS)) + ")", re.M)
+_HL_CLAIMID_RE = re.compile(
+    r"^(?=[A-Za-z0-9\-]*[A-Za-z])(?=[A-Za-z0-9\-]*[0-9])[A-Za-z0-9][A-Za-z0-9\-]{4,29}$", re.M)
+
+
+def _hl_money_text(t: str) -> bool:
+    return _HL_MONEY_RE.fullmatch(t.replace("$", "").replace(",", "")) is not None
+
+
+def _hl_column_profile(vals):
+    """(frac, meta) role scores for one column's cells — the same counts the
+    per-value predicates give, from one regex pass per role."""
     import statistics
-    matrix = [r for r in matrix if any(_hl_s(c) for c in r)]
-    if len(matrix) < 3:
-        return None
-    ncol = max(len(r) for r in matrix)
-    N = len(matrix)
+    nonempty = [s for s in (_hl_s(v) for v in vals) if s]
+    c = len(nonempty) or 1
+    text = "\n".join(nonempty)
+    if text.count("\n") != len(nonempty) - 1:
+        # A cell with an embedded line break would read as two cells; NUL fails
+        # every role pattern just as the newline fails the predicates.
+        text = "\n".join(s.replace("\n", "\x00") for s in nonempty)
+    upper = text.upper()
+    lower = text.lower()
+    mvals = [float(m) for m in _HL_MONEY_RE.findall(text.replace("$", "").replace(",", ""))]
+    nz = [m for m in mvals if m != 0]
+    distinct = len(set(nonempty))
+    cpt_ct = len(_HL_CPT_RE.findall(upper))
+    denial_ct = len(_HL_DENIAL_RE.findall(upper.replace(" ", "")))
+    payor_ct = len(_HL_PAYOR_RE.findall(lower))
+    if text.isascii():
+        name_ct = len(_HL_NAME_RE.findall(text))
+        single_ct = len(_HL_SINGLETOK_RE.findall(text))
+    else:
+        # Outside ASCII, \w also admits numeric letters (Roman numerals,
+        # superscripts) that isalpha() rejects; count those columns exactly.
+        names = [v for v in nonempty if _hl_is_name(v)]
+        name_ct = len(names)
+        single_ct = sum(1 for v in names if len(v.split()) == 1)
+    frac = dict(
+        money=len(mvals) / max(1, len(vals)),
+        cpt=cpt_ct / c,
+        denial=denial_ct / c,
+        name=name_ct / c,
+        singletok=single_ct / c,
+        payor=payor_ct / c,
+        claimid=len(_HL_CLAIMID_RE.findall(text)) / c,
+    )
+    meta = dict(
+        nonempty=len(nonempty), distinct=distinct, uniq=distinct / c,
+        money_nz=len(nz), money_sum=sum(nz),
+        money_med=statistics.median(nz) if nz else 0,
+        decimal_ct=sum(1 for m in nz if m != int(m)),
+        cpt_ct=cpt_ct, payor_ct=payor_ct, denial_ct=denial_ct,
+        medlen=statistics.median([len(v) for v in nonempty]) if nonempty else 0,
+    )
+    return frac, meta
+
+
+def _hl_sample(matrix):
+    """At most _HL_SAMPLE_ROWS rows, evenly spaced through the file."""
+    n = len(matrix)
+    if n <= _HL_SAMPLE_ROWS:
+        return matrix
+    return [matrix[k * n // _HL_SAMPLE_ROWS] for k in range(_HL_SAMPLE_ROWS)]
+
+
+def _hl_infer_layout(sample, ncol: int):
+    """Pick the role columns from the sampled rows. Returns a layout dict, or
+    None when no charge column can be identified."""
+    N = len(sample)
     cols = list(range(ncol))
     minc = max(3, int(0.3 * N))
 
-    def colvals(i):
-        return [(r[i] if i < len(r) else "") for r in matrix]
-
     frac, meta = {}, {}
     for i in cols:
-        vals = colvals(i)
-        nonempty = [_hl_s(v) for v in vals if _hl_s(v)]
-        c = len(nonempty) or 1
-        mvals = [m for m in (_hl_money(v) for v in vals) if m is not None]
-        nz = [m for m in mvals if m != 0]
-        distinct = len(set(nonempty))
-        frac[i] = dict(
-            money=len(mvals) / max(1, len(vals)),
-            cpt=sum(1 for v in nonempty if _hl_is_cpt(v)) / c,
-            denial=sum(1 for v in nonempty if _hl_is_denial(v)) / c,
-            name=sum(1 for v in nonempty if _hl_is_name(v)) / c,
-            singletok=sum(1 for v in nonempty if _hl_is_name(v) and len(v.split()) == 1) / c,
-            payor=sum(1 for v in nonempty if _hl_is_payor(v)) / c,
-            claimid=sum(1 for v in nonempty if _hl_is_claimid(v)) / c,
-        )
-        meta[i] = dict(
-            nonempty=len(nonempty), distinct=distinct, uniq=distinct / c,
-            money_nz=len(nz), money_sum=sum(nz),
-            money_med=statistics.median(nz) if nz else 0,
-            decimal_ct=sum(1 for m in nz if m != int(m)),
-            cpt_ct=sum(1 for v in nonempty if _hl_is_cpt(v)),
-            payor_ct=sum(1 for v in nonempty if _hl_is_payor(v)),
-            denial_ct=sum(1 for v in nonempty if _hl_is_denial(v)),
-            medlen=statistics.median([len(v) for v in nonempty]) if nonempty else 0,
-        )
+        frac[i], meta[i] = _hl_column_profile([(r[i] if i < len(r) else "") for r in sample])
 
     # Charge = numeric, repeated (uniq<0.6 rules out unique IDs), plausible size.
     cand = [i for i in cols if frac[i]["money"] >= 0.8 and meta[i]["money_nz"] >= minc
@@ -8999,9 +8960,12 @@ def _infer_headerless_claim_rows(matrix, received_date: str):
         # Within the money cluster the charge is the LARGEST amount on most rows
         # (allowed / paid / balance are derived from it and are <= charge).
         maxfreq = {i: 0 for i in money_cols}
-        for r in matrix:
-            vs = {i: _hl_money(r[i]) for i in money_cols
-                  if i < len(r) and _hl_money(r[i]) not in (None, 0)}
+        for r in sample:
+            vs = {}
+            for i in money_cols:
+                m = _hl_money(r[i]) if i < len(r) else None
+                if m not in (None, 0):
+                    vs[i] = m
             if not vs:
                 continue
             mx = max(vs.values())
@@ -9040,34 +9004,59 @@ def _infer_headerless_claim_rows(matrix, received_date: str):
               and i not in (payor_col,) and meta[i]["nonempty"] >= minc]
         name_col = c3[0] if c3 else None
 
+    return dict(charge=charge_col, cpt=cpt_col, payor=payor_col, denial=denial_col,
+                claimid=claimid_col, name_pair=name_pair, name=name_col)
+
+
+def _infer_headerless_claim_rows(matrix, received_date: str):
+    """Infer claim columns from cell VALUES when a file has no usable header.
+    Returns a list of canonical-keyed row dicts (ChargeAmount, ClaimStatus,
+    BillDate, ClaimKey, CPTCode, Payor, DenialReason, PatientName) that flow
+    straight through the normal fuzzy-mapping importer, or None when no charge
+    column can be identified (so the caller leaves the file to the normal path)."""
+    matrix = [r for r in matrix if any(_hl_s(c) for c in r)]
+    if len(matrix) < 3:
+        return None
+    ncol = max(len(r) for r in matrix)
+    layout = _hl_infer_layout(_hl_sample(matrix), ncol)
+    if layout is None:
+        return None
+
+    charge_col = layout["charge"]
+    optional = [(key, layout[role]) for key, role in (
+        ("ClaimKey", "claimid"), ("CPTCode", "cpt"), ("Payor", "payor"), ("DenialReason", "denial"))
+        if layout[role] is not None]
+    name_pair, name_col = layout["name_pair"], layout["name"]
+    identity = ("ClaimKey", "CPTCode", "Payor", "PatientName")
+
     out = []
     for r in matrix:
-        def g(i):
-            return _hl_s(r[i]) if (i is not None and i < len(r)) else ""
-        if _hl_money(g(charge_col)) is None:
+        width = len(r)
+        charge = _hl_s(r[charge_col]) if charge_col < width else ""
+        if not _hl_money_text(charge):
             continue
-        row = {"ChargeAmount": g(charge_col), "ClaimStatus": "Billed/Submitted",
+        row = {"ChargeAmount": charge, "ClaimStatus": "Billed/Submitted",
                "BillDate": received_date}
-        if claimid_col is not None and g(claimid_col):
-            row["ClaimKey"] = g(claimid_col)
-        if cpt_col is not None and g(cpt_col):
-            row["CPTCode"] = g(cpt_col)
-        if payor_col is not None and g(payor_col):
-            row["Payor"] = g(payor_col)
-        if denial_col is not None and g(denial_col):
-            row["DenialReason"] = g(denial_col)
+        for key, i in optional:
+            v = _hl_s(r[i]) if i < width else ""
+            if v:
+                row[key] = v
         if name_pair:
-            nm = (g(name_pair[0]) + " " + g(name_pair[1])).strip()
+            first = _hl_s(r[name_pair[0]]) if name_pair[0] < width else ""
+            last = _hl_s(r[name_pair[1]]) if name_pair[1] < width else ""
+            nm = (first + " " + last).strip()
             if nm:
                 row["PatientName"] = nm
-        elif name_col is not None and g(name_col):
-            row["PatientName"] = g(name_col)
+        elif name_col is not None:
+            v = _hl_s(r[name_col]) if name_col < width else ""
+            if v:
+                row["PatientName"] = v
         # Skip file totals / footer rows. A line that carries a dollar amount but
         # NO claim identity whatsoever — no claim id, CPT, payor, or patient — is
         # the spreadsheet's own summary row, not a billable claim. Importing it
         # adds the file's subtotal as a phantom claim (e.g. a lone $34k "claim"
         # sitting among $86 lines), inflating the billed total.
-        if not any(k in row for k in ("ClaimKey", "CPTCode", "Payor", "PatientName")):
+        if not any(k in row for k in identity):
             continue
         out.append(row)
     return out or None
@@ -10039,11 +10028,13 @@ def set_file_category(file_id: int, body: FileCategoryIn,
 async def replace_file(
     file_id: int,
     file: UploadFile = FastAPIFile(...),
+    async_job: bool = Query(False, description="If true, run the re-import as a tracked background job."),
     hub_session: Optional[str] = Cookie(None),
 ):
     """Replace an existing uploaded file with a new version.
     The old file remains until the new upload is validated and persisted.
-    If it's an Excel in a data category, the data is re-imported."""
+    If it's an Excel in a data category, the data is re-imported. The work
+    runs on the ingestion pool; ``async_job`` returns a job id instead."""
     user = _require_user(hub_session)
     scope = _client_scope(user)
     rec = get_file_record(file_id, scope)
@@ -10054,13 +10045,35 @@ async def replace_file(
     if ext not in (".xlsx", ".xls", ".csv", ".ods", ".odf", ".pdf", ".doc", ".docx"):
         raise HTTPException(400, "Unsupported file type")
 
-    content = await file.read()
+    spool_path, _size = await ingest.spool_upload(file)
+    args = (spool_path, file.filename or "", ext, file_id, rec, scope, user)
+    if async_job:
+        job = ingest.submit_job(
+            "file_replace", lambda progress: _replace_file_work(*args, progress=progress),
+            account_id=int(rec.get("client_id") or 0) or scope,
+            created_by=user.get("username", ""), spool_path=spool_path,
+            payload={"file_id": file_id, "filename": file.filename or "upload"})
+        return {"ok": True, "job_id": job["id"], "status": "queued", "async_job": True,
+                "file_id": file_id, "original_name": file.filename}
+    try:
+        return await ingest.run(_replace_file_work, *args)
+    finally:
+        ingest.discard(spool_path)
+
+
+def _replace_file_work(spool_path: str, filename: str, ext: str, file_id: int, rec: dict,
+                       scope: Optional[int], user: dict, progress=None) -> dict:
+    """Blocking half of replace_file, run on the ingestion pool."""
+    progress = progress or (lambda *a, **k: None)
+    content = ingest.read_spool(spool_path)
     file_size = len(content)
 
     # Count rows for Excel/CSV
     row_count = 0
     file_type = "excel" if ext in (".xlsx", ".xls", ".csv", ".ods", ".odf") else "pdf"
     if file_type == "excel":
+        ingest.parse_ahead(content, ext)
+        progress(20, "parse", f"Parsed {filename or 'file'}")
         try:
             import csv as _csv, io as _io
             if ext == ".csv":
@@ -10077,7 +10090,7 @@ async def replace_file(
     category_source = "existing"
     infer_debug = None
     if file_type == "excel" and category not in DATA_IMPORT_CATEGORIES:
-        inferred, infer_debug = _infer_excel_category(content, ext, file.filename or "", rec.get("description", "") or "")
+        inferred, infer_debug = _infer_excel_category(content, ext, filename or "", rec.get("description", "") or "")
         if inferred in DATA_IMPORT_CATEGORIES:
             effective_category = inferred
             category_source = "auto"
@@ -10096,7 +10109,7 @@ async def replace_file(
     try:
         update_file_record(file_id, {
             "filename": new_unique,
-            "original_name": file.filename or rec["original_name"],
+            "original_name": filename or rec["original_name"],
             "file_type": file_type,
             "file_size": file_size,
             "row_count": row_count,
@@ -10118,6 +10131,7 @@ async def replace_file(
     imported = 0
     import_errors = []
     if effective_category in DATA_IMPORT_CATEGORIES and file_type in ("excel", "pdf", "document"):
+        progress(40, "import", f"Importing into {effective_category}")
         _uploader = user.get("username") or ""
         try:
             if effective_category == "Claims":
@@ -10132,12 +10146,12 @@ async def replace_file(
             import_errors = [str(e)]
 
     notify_activity(user["username"], "replaced file", "Documents",
-                    f"{rec['original_name']} → {file.filename}")
+                    f"{rec['original_name']} → {filename}")
 
     return {
         "ok": True,
         "file_id": file_id,
-        "original_name": file.filename,
+        "original_name": filename,
         "effective_category": effective_category,
         "category_source": category_source,
         "category_inference": infer_debug,
@@ -10485,7 +10499,14 @@ def delete_file(file_id: int, hub_session: Optional[str] = Cookie(None)):
 @router.post("/report/{client_id}/ai-narrative")
 async def generate_ai_narrative(client_id: int, hub_session: Optional[str] = Cookie(None)):
     """Send dashboard/report data to OpenAI GPT and return a professional narrative."""
+    from starlette.concurrency import run_in_threadpool
     user = _require_reporting_access(hub_session)
+    return await run_in_threadpool(_report_narrative, client_id)
+
+
+def _report_narrative(client_id: int) -> dict:
+    """Narrative for one client's report. Identical figures reuse the cached
+    narrative (app.ai_narrative); a timeout falls back to the rule-based one."""
     from app.config import OPENAI_API_KEY
     from app.client_db import get_db
     from datetime import date
@@ -10516,74 +10537,7 @@ async def generate_ai_narrative(client_id: int, hub_session: Optional[str] = Coo
     ) or "  None"
 
     if not OPENAI_API_KEY:
-        # Rule-based narrative — no API key needed
-        try:
-            cl = overall.get("claims", {})
-            cred = overall.get("credentialing", {})
-            enr = overall.get("enrollment", {})
-            edi = overall.get("edi", {})
-            pay = overall.get("payments", {})
-            company = client_info.get("company", "the practice")
-            charged = cl.get("total_charged", 0)
-            paid = cl.get("total_paid", 0)
-            balance = cl.get("total_balance", 0)
-            total_claims = cl.get("total", 0)
-            coll_rate = round((paid / charged) * 100, 1) if charged else 0
-            denials = cl.get("top_denials", [])
-            cred_count = len(cred.get("detail", []))
-            enr_count = len(enr.get("detail", []))
-            edi_count = len(edi.get("detail", []))
-
-            health = "healthy" if coll_rate >= 90 else "moderate" if coll_rate >= 70 else "needs attention"
-            narrative = (
-                f"<b>Executive Summary:</b> {company} shows a {health} revenue cycle with a collection rate of <b>{coll_rate}%</b> "
-                f"on <b>{total_claims}</b> total claims. Total charges stand at <b>${charged:,.2f}</b> against payments of <b>${paid:,.2f}</b>, "
-                f"leaving an outstanding A/R balance of <b>${balance:,.2f}</b>.\n\n"
-            )
-            if denials:
-                top = denials[0]
-                narrative += (
-                    f"<b>Denial Management:</b> The leading denial category is <b>{top.get('category','Unknown')}</b> "
-                    f"({top.get('count', 0)} claims). Addressing this category represents the highest-leverage action "
-                    f"to recover revenue. "
-                )
-                if len(denials) > 1:
-                    narrative += f"Additional denial categories include: {', '.join(d.get('category','?') for d in denials[1:4])}. "
-                narrative += "\n\n"
-            if cred_count or enr_count or edi_count:
-                narrative += (
-                    f"<b>Operational Status:</b> Credentialing shows <b>{cred_count}</b> active records, "
-                    f"enrollment <b>{enr_count}</b> records, and EDI connectivity is configured for <b>{edi_count}</b> connections. "
-                    "Ensure all pending credentialing items are resolved to avoid future payment delays.\n\n"
-                )
-            narrative += (
-                f"<b>User Production Analysis:</b> Team members logged <b>{prod_total_entries}</b> production entries totaling "
-                f"<b>{prod_total_hours}</b> hours today. "
-            )
-            if prod_users:
-                top_user = prod_users[0]
-                narrative += (
-                    f"Top contributor was <b>{top_user.get('username','')}</b> with "
-                    f"<b>{top_user.get('total_hours',0)}h</b> across <b>{top_user.get('entry_count',0)}</b> entries.\n\n"
-                )
-            else:
-                narrative += "No team production entries were logged for today.\n\n"
-            if coll_rate < 80:
-                narrative += (
-                    "<b>Recommended Actions:</b> (1) Work down the top denial category immediately. "
-                    "(2) Review claim submission timely filing windows. "
-                    "(3) Confirm all providers are enrolled with all active payors. "
-                    "(4) Audit EDI/ERA/EFT setup for any inactive connections.\n\n"
-                )
-            else:
-                narrative += (
-                    "<b>Recommended Actions:</b> Maintain current billing cadence. "
-                    "Continue monitoring denial trends weekly and confirm all credentialing is current.\n\n"
-                )
-            narrative += f"<b>Outlook:</b> With continued focus on denial resolution and timely claim submission, {company} is positioned to improve net collections."
-            return {"narrative": narrative, "model": "rule-based", "company": client_info.get("company", "")}
-        except Exception:
-            return {"narrative": "Narrative generation unavailable — set OPENAI_API_KEY for AI narratives.", "model": "none", "company": client_info.get("company", "")}
+        return _rule_based_report_narrative(client_info, overall, production_snapshot)
 
     # Build concise data summary for GPT
     cl = overall.get("claims", {})
@@ -10659,23 +10613,90 @@ Write in a professional medical billing tone. Use specific numbers from the data
 Do NOT use markdown headers or bullets — write flowing paragraphs separated by blank lines, with key figures in bold (use <b> tags).
 Keep it concise but thorough — aim for 400-600 words."""
 
+    from app.ai_narrative import complete
+    narrative, source = complete(
+        "client_report",
+        [{"role": "system", "content": system_prompt},
+         {"role": "user", "content": f"Generate the narrative report based on this data:\n\n{data_summary}"}],
+        lambda: _rule_based_report_narrative(client_info, overall, production_snapshot)["narrative"],
+        max_tokens=2000,
+    )
+    return {"narrative": narrative, "model": "rule-based" if source == "fallback" else "gpt-4o-mini",
+            "cached": source == "cache", "company": client_info.get("company", "")}
+
+
+def _rule_based_report_narrative(client_info: dict, overall: dict, production_snapshot: dict) -> dict:
+    """Rule-based report narrative: used without OPENAI_API_KEY and as the
+    fallback when the model call times out or fails."""
+    prod_users = production_snapshot.get("user_stats", [])
+    prod_total_entries = production_snapshot.get("total_entries", 0)
+    prod_total_hours = production_snapshot.get("total_hours", 0)
     try:
-        import openai
-        client = openai.OpenAI(api_key=OPENAI_API_KEY)
-        response = client.chat.completions.create(
-            model="gpt-4o-mini",
-            messages=[
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": f"Generate the narrative report based on this data:\n\n{data_summary}"}
-            ],
-            temperature=0.7,
-            max_tokens=2000
+        cl = overall.get("claims", {})
+        cred = overall.get("credentialing", {})
+        enr = overall.get("enrollment", {})
+        edi = overall.get("edi", {})
+        company = client_info.get("company", "the practice")
+        charged = cl.get("total_charged", 0)
+        paid = cl.get("total_paid", 0)
+        balance = cl.get("total_balance", 0)
+        total_claims = cl.get("total", 0)
+        coll_rate = round((paid / charged) * 100, 1) if charged else 0
+        denials = cl.get("top_denials", [])
+        cred_count = len(cred.get("detail", []))
+        enr_count = len(enr.get("detail", []))
+        edi_count = len(edi.get("detail", []))
+
+        health = "healthy" if coll_rate >= 90 else "moderate" if coll_rate >= 70 else "needs attention"
+        narrative = (
+            f"<b>Executive Summary:</b> {company} shows a {health} revenue cycle with a collection rate of <b>{coll_rate}%</b> "
+            f"on <b>{total_claims}</b> total claims. Total charges stand at <b>${charged:,.2f}</b> against payments of <b>${paid:,.2f}</b>, "
+            f"leaving an outstanding A/R balance of <b>${balance:,.2f}</b>.\n\n"
         )
-        narrative = response.choices[0].message.content
-        return {"narrative": narrative, "model": "gpt-4o-mini", "company": client_info.get("company", "")}
-    except Exception as e:
-        logging.getLogger(__name__).exception("AI narrative generation failed")
-        raise HTTPException(500, "AI generation failed. Please try again later.")
+        if denials:
+            top = denials[0]
+            narrative += (
+                f"<b>Denial Management:</b> The leading denial category is <b>{top.get('category','Unknown')}</b> "
+                f"({top.get('count', 0)} claims). Addressing this category represents the highest-leverage action "
+                f"to recover revenue. "
+            )
+            if len(denials) > 1:
+                narrative += f"Additional denial categories include: {', '.join(d.get('category','?') for d in denials[1:4])}. "
+            narrative += "\n\n"
+        if cred_count or enr_count or edi_count:
+            narrative += (
+                f"<b>Operational Status:</b> Credentialing shows <b>{cred_count}</b> active records, "
+                f"enrollment <b>{enr_count}</b> records, and EDI connectivity is configured for <b>{edi_count}</b> connections. "
+                "Ensure all pending credentialing items are resolved to avoid future payment delays.\n\n"
+            )
+        narrative += (
+            f"<b>User Production Analysis:</b> Team members logged <b>{prod_total_entries}</b> production entries totaling "
+            f"<b>{prod_total_hours}</b> hours today. "
+        )
+        if prod_users:
+            top_user = prod_users[0]
+            narrative += (
+                f"Top contributor was <b>{top_user.get('username','')}</b> with "
+                f"<b>{top_user.get('total_hours',0)}h</b> across <b>{top_user.get('entry_count',0)}</b> entries.\n\n"
+            )
+        else:
+            narrative += "No team production entries were logged for today.\n\n"
+        if coll_rate < 80:
+            narrative += (
+                "<b>Recommended Actions:</b> (1) Work down the top denial category immediately. "
+                "(2) Review claim submission timely filing windows. "
+                "(3) Confirm all providers are enrolled with all active payors. "
+                "(4) Audit EDI/ERA/EFT setup for any inactive connections.\n\n"
+            )
+        else:
+            narrative += (
+                "<b>Recommended Actions:</b> Maintain current billing cadence. "
+                "Continue monitoring denial trends weekly and confirm all credentialing is current.\n\n"
+            )
+        narrative += f"<b>Outlook:</b> With continued focus on denial resolution and timely claim submission, {company} is positioned to improve net collections."
+        return {"narrative": narrative, "model": "rule-based", "company": client_info.get("company", "")}
+    except Exception:
+        return {"narrative": "Narrative generation unavailable — set OPENAI_API_KEY for AI narratives.", "model": "none", "company": client_info.get("company", "")}
 
 
 # ─── PDF Report Generation ───────────────────────────────────────────────────
@@ -10684,18 +10705,12 @@ Keep it concise but thorough — aim for 400-600 words."""
 async def download_report_pdf(client_id: int, period: str = "all", sub_profile: Optional[str] = None,
                               hub_session: Optional[str] = Cookie(None),
                               request: Request = None):
-    """Generate and return a branded PDF report."""
+    """Return the branded PDF report, from the artifact cache when nothing the
+    report reads has changed. Rendering runs in the threadpool so a large
+    report doesn't stall the event loop."""
+    from fastapi.responses import Response as _Response
+    from starlette.concurrency import run_in_threadpool
     user = _require_reporting_access(hub_session)
-    from app.client_db import get_db
-    from datetime import date
-    from io import BytesIO
-    from reportlab.lib.pagesizes import letter
-    from reportlab.lib.units import inch
-    from reportlab.lib.colors import HexColor
-    from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle, HRFlowable
-    from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-    from reportlab.lib.enums import TA_CENTER, TA_LEFT, TA_RIGHT, TA_JUSTIFY
-    from fastapi.responses import StreamingResponse
 
     # Extract narrative from POST body if available
     narrative = None
@@ -10706,14 +10721,54 @@ async def download_report_pdf(client_id: int, period: str = "all", sub_profile:
         except Exception:
             pass
 
-    conn = get_db()
-    conn.row_factory = sqlite3.Row
+    company, pdf = await run_in_threadpool(_report_pdf_artifact, client_id, period, sub_profile, narrative)
+    safe_name = company.replace(" ", "_").replace("/", "-")
+    filename = f"{safe_name}_Report_{business_today_iso()}.pdf"
+    return _Response(pdf, media_type="application/pdf",
+                     headers={"Content-Disposition": f"attachment; filename={filename}"})
 
-    client_row = conn.execute("SELECT company,contact_name,email,phone,practice_type,specialty FROM clients WHERE id=?", (client_id,)).fetchone()
+
+def _report_pdf_artifact(client_id: int, period: str, sub_profile: Optional[str],
+                         narrative: Optional[str]) -> tuple[str, bytes]:
+    """(company, PDF bytes) for one report, keyed in the artifact cache by
+    client, sub-profile, period, narrative and the client's data version."""
+    from app.client_db import get_db
+    from app.report_cache import artifact_key, get_or_render
+
+    conn = get_db()
+    try:
+        client_row = conn.execute("SELECT company,contact_name,email,phone,practice_type,specialty FROM clients WHERE id=?", (client_id,)).fetchone()
+        versions = get_client_data_versions(client_id, conn=conn)
+    finally:
+        conn.close()
     client_info = dict(client_row) if client_row else {}
+    version = {
+        "data": versions,
+        "day": business_today_iso(),
+        "narrative": hashlib.sha1((narrative or "").encode("utf-8")).hexdigest(),
+    }
+    key = artifact_key("pdf", client_id, sub_profile, period, version)
+    pdf, _hit = get_or_render(
+        key, lambda: _render_report_pdf(client_id, client_info, period, sub_profile, narrative))
+    return client_info.get("company", "Client"), pdf
+
+
+def _render_report_pdf(client_id: int, client_info: dict, period: str,
+                       sub_profile: Optional[str], narrative: Optional[str]) -> bytes:
+    from app.client_db import get_db
+    from io import BytesIO
+    from reportlab.lib.pagesizes import letter
+    from reportlab.lib.units import inch
+    from reportlab.lib.colors import HexColor
+    from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle, HRFlowable
+    from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+    from reportlab.lib.enums import TA_CENTER, TA_LEFT, TA_RIGHT, TA_JUSTIFY
+
     practice_type = client_info.get("practice_type", "") or ""
     company = client_info.get("company", "Client")
 
+    conn = get_db()
+    conn.row_factory = sqlite3.Row
     try:
         overall = _build_section_data(conn, client_id, sub_profile=sub_profile, period=period)
         sub_profiles_data = {}
@@ -10924,11 +10979,7 @@ async def download_report_pdf(client_id: int, period: str = "all", sub_profile:
     story.append(Paragraph(f"<i>Confidential — For internal use only  |  {business_today().strftime('%B %d, %Y')}</i>", styles['SmallGray']))
 
     doc.build(story)
-    buf.seek(0)
-    safe_name = company.replace(" ", "_").replace("/", "-")
-    filename = f"{safe_name}_Report_{business_today_iso()}.pdf"
-    return StreamingResponse(buf, media_type="application/pdf",
-                             headers={"Content-Disposition": f"attachment; filename={filename}"})
+    return buf.getvalue()
 
 
 # ─── Bulk Claim Status Update ─────────────────────────────────────────────────
@@ -10967,13 +11018,17 @@ def bulk_status_update(body: BulkStatusIn, hub_session: Optional[str] = Cookie(N
 
 @router.get("/search")
 def search(q: str = "", client_id: Optional[int] = None,
+           limit: int = 30, offset: int = 0,
            hub_session: Optional[str] = Cookie(None)):
     user = _require_user(hub_session)
     scope = client_id or _client_scope(user)
     if not q or len(q) < 2:
-        return {"results": []}
-    results = global_search(q, scope)
-    return {"results": results}
+        return {"results": [], "next_offset": None}
+    limit = max(1, min(int(limit or 30), 100))
+    offset = max(0, int(offset or 0))
+    results = global_search(q, scope, limit=limit, offset=offset)
+    return {"results": results,
+            "next_offset": offset + limit if len(results) == limit else None}
 
 
 # ─── Alerts & Notifications ──────────────────────────────────────────────────
@@ -10985,7 +11040,8 @@ def alerts_endpoint(client_id: Optional[int] = None,
     scope = client_id or _client_scope(user)
     # Auto-flag SLA breaches before returning alerts
     auto_flag_sla(scope)
-    alert_list = get_alerts(scope)
+    alert_list = response_cache.result("alerts", {"scope": scope}, lambda: get_alerts(scope),
+                                       client_id=scope or None, tables=("credentialing", "enrollment"))
     return {"alerts": alert_list, "count": len(alert_list)}
 
 
@@ -11109,124 +11165,6 @@ _SECTION_LABELS = {
 }
 
 
-def _rows_to_csv_bytes(rows: list[dict], headers: list[str]) -> bytes:
-    import csv, io
-    out = io.StringIO()
-    writer = csv.DictWriter(out, fieldnames=headers, extrasaction="ignore")
-    writer.writeheader()
-    for r in rows:
-        writer.writerow({h: ("" if r.get(h) is None else r.get(h)) for h in headers})
-    return out.getvalue().encode("utf-8")
-
-
-def _rows_to_xlsx_bytes(rows: list[dict], headers: list[str], sheet_title: str) -> bytes:
-    from io import BytesIO
-    from openpyxl import Workbook
-    from openpyxl.styles import Font, PatternFill, Alignment
-    wb = Workbook()
-    ws = wb.active
-    ws.title = (sheet_title or "Sheet1")[:31]
-    header_fill = PatternFill("solid", fgColor="0D47A1")
-    header_font = Font(bold=True, color="FFFFFF")
-    ws.append(headers)
-    for c in ws[1]:
-        c.fill = header_fill
-        c.font = header_font
-        c.alignment = Alignment(horizontal="left", vertical="center")
-    for r in rows:
-        ws.append([("" if r.get(h) is None else r.get(h)) for h in headers])
-    # Best-effort column auto-width
-    for i, h in enumerate(headers, start=1):
-        col_letter = ws.cell(row=1, column=i).column_letter
-        max_len = len(str(h))
-        for r in rows[:500]:
-            v = r.get(h)
-            if v is None:
-                continue
-            ln = len(str(v))
-            if ln > max_len:
-                max_len = ln
-        ws.column_dimensions[col_letter].width = min(60, max(10, max_len + 2))
-    buf = BytesIO()
-    wb.save(buf)
-    return buf.getvalue()
-
-
-def _rows_to_pdf_bytes(rows: list[dict], headers: list[str], title: str) -> bytes:
-    from io import BytesIO
-    from reportlab.lib.pagesizes import letter, landscape
-    from reportlab.lib.units import inch
-    from reportlab.lib.colors import HexColor
-    from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle
-    from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-    from reportlab.lib.enums import TA_LEFT
-
-    buf = BytesIO()
-    doc = SimpleDocTemplate(buf, pagesize=landscape(letter),
-                            topMargin=0.4 * inch, bottomMargin=0.4 * inch,
-                            leftMargin=0.4 * inch, rightMargin=0.4 * inch)
-    styles = getSampleStyleSheet()
-    blue = HexColor("#0d47a1")
-    light = HexColor("#e3f2fd")
-    grey = HexColor("#6b7280")
-    styles.add(ParagraphStyle("ExportTitle", parent=styles["Title"], fontSize=16,
-                              textColor=blue, alignment=TA_LEFT, spaceAfter=6))
-    styles.add(ParagraphStyle("ExportSub", parent=styles["Normal"], fontSize=9,
-                              textColor=grey, spaceAfter=12))
-    story = [
-        Paragraph(title or "Export", styles["ExportTitle"]),
-        Paragraph(
-            f"Generated {business_now().strftime('%B %d, %Y %I:%M %p')} — "
-            f"{len(rows)} row(s)",
-            styles["ExportSub"],
-        ),
-    ]
-    if not rows:
-        story.append(Paragraph(
-            "No records to export for the current selection.",
-            styles["Normal"],
-        ))
-    else:
-        # Limit columns to keep the PDF readable
-        max_cols = 10
-        cols = headers[:max_cols]
-        data = [cols]
-        for r in rows[:1000]:
-            data.append([str(r.get(h, "") if r.get(h) is not None else "")[:80] for h in cols])
-        col_w = max(0.7 * inch, (doc.width / max(1, len(cols))))
-        table = Table(data, repeatRows=1, colWidths=[col_w] * len(cols))
-        table.setStyle(TableStyle([
-            ("BACKGROUND", (0, 0), (-1, 0), blue),
-            ("TEXTCOLOR", (0, 0), (-1, 0), HexColor("#ffffff")),
-            ("FONTSIZE", (0, 0), (-1, 0), 8),
-            ("FONTSIZE", (0, 1), (-1, -1), 7),
-            ("ROWBACKGROUNDS", (0, 1), (-1, -1), [HexColor("#ffffff"), light]),
-            ("GRID", (0, 0), (-1, -1), 0.25, HexColor("#cbd5e1")),
-            ("VALIGN", (0, 0), (-1, -1), "TOP"),
-            ("LEFTPADDING", (0, 0), (-1, -1), 3),
-            ("RIGHTPADDING", (0, 0), (-1, -1), 3),
-        ]))
-        story.append(table)
-        if len(rows) > 1000:
-            story.append(Spacer(1, 8))
-            story.append(Paragraph(
-                f"Showing first 1,000 of {len(rows)} rows — use CSV/Excel for full data.",
-                styles["ExportSub"],
-            ))
-    doc.build(story)
-    return buf.getvalue()
-
-
-def _resolve_export_rows(section: str, scope: Optional[int], sub_profile: Optional[str]) -> list[dict]:
-    if section == "claims":
-        return export_claims(scope, sub_profile)
-    if section in ("credentialing", "enrollment", "edi_setup", "providers"):
-        return export_table(section, scope)
-    if section == "production":
-        return list_production_logs(scope)
-    raise HTTPException(400, f"Unknown section: {section}")
-
-
 _SECTION_FALLBACK_HEADERS = {
     "claims": [
         "id", "client_id", "ClaimKey", "PatientID", "PatientName", "Payor",
@@ -11257,16 +11195,26 @@ _SECTION_FALLBACK_HEADERS = {
 }
 
 
+def _export_rows(section: str, scope: Optional[int], sub_profile: Optional[str]):
+    """(headers, row count, row iterator) for a section export."""
+    if section not in _SECTION_LABELS:
+        raise HTTPException(400, f"Unknown section: {section}")
+    total = count_export_rows(section, scope, sub_profile)
+    headers = export_columns(section) if total else _SECTION_FALLBACK_HEADERS.get(section, ["id"])
+    return headers, total, iter_export_rows(section, scope, sub_profile)
+
+
 @router.get("/export/{section}")
 def export_section(section: str, client_id: Optional[int] = None,
                    sub_profile: Optional[str] = None,
-                   format: str = "csv",
+                   format: str = "csv", background: bool = False,
                    hub_session: Optional[str] = Cookie(None)):
     """Export a section as CSV / Excel / PDF. Empty data returns a file with
     only headers (or an empty PDF) instead of a 404 so the UI buttons always
-    succeed."""
+    succeed. Rows stream from the database a page at a time; with
+    ``background=true`` the file is rendered by a tracked job instead and
+    fetched from /export/jobs/{job_id}/download when it finishes."""
     from fastapi.responses import StreamingResponse
-    import io
 
     user = _require_user(hub_session)
     scope = client_id or _client_scope(user)
@@ -11274,41 +11222,56 @@ def export_section(section: str, client_id: Optional[int] = None,
     if fmt not in ("csv", "xlsx", "pdf"):
         raise HTTPException(400, "format must be csv, xlsx, or pdf")
 
-    rows = _resolve_export_rows(section, scope, sub_profile)
-    headers = (
-        list(rows[0].keys()) if rows
-        else _SECTION_FALLBACK_HEADERS.get(section, ["id"])
-    )
+    headers, total, rows = _export_rows(section, scope, sub_profile)
     label = _SECTION_LABELS.get(section, section.title())
     stamp = business_now().strftime("%Y%m%d_%H%M")
-    base_name = f"{section}_{stamp}"
+    filename = f"{section}_{stamp}.{fmt}"
 
     log_audit(scope, user.get("username", ""), "export",
-              section, None, f"Exported {len(rows)} rows as {fmt}")
+              section, None, f"Exported {total} rows as {fmt}")
+
+    if background:
+        def _work(progress):
+            progress(10, "export", f"Writing {total} rows as {fmt}")
+            out = export_stream.write_export(fmt, headers, rows, label, total,
+                                             f"{uuid.uuid4().hex}.{fmt}")
+            return {**out, "filename": filename, "format": fmt, "rows": total}
+
+        job = ingest.submit_job(
+            "export", _work, account_id=scope, created_by=user.get("username", ""),
+            payload={"section": section, "format": fmt, "rows": total, "filename": filename})
+        return {"ok": True, "job_id": job["id"], "status": "queued", "async_job": True, "rows": total}
 
-    if fmt == "csv":
-        payload = _rows_to_csv_bytes(rows, headers)
-        return StreamingResponse(
-            io.BytesIO(payload),
-            media_type="text/csv",
-            headers={"Content-Disposition": f"attachment; filename={base_name}.csv"},
-        )
-    if fmt == "xlsx":
-        payload = _rows_to_xlsx_bytes(rows, headers, sheet_title=label)
-        return StreamingResponse(
-            io.BytesIO(payload),
-            media_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-            headers={"Content-Disposition": f"attachment; filename={base_name}.xlsx"},
-        )
-    # pdf
-    payload = _rows_to_pdf_bytes(rows, headers, title=f"{label} Export")
     return StreamingResponse(
-        io.BytesIO(payload),
-        media_type="application/pdf",
-        headers={"Content-Disposition": f"attachment; filename={base_name}.pdf"},
+        export_stream.iter_export(fmt, headers, rows, label, total),
+        media_type=export_stream.MEDIA_TYPES[fmt],
+        headers={"Content-Disposition": f"attachment; filename={filename}"},
     )
 
 
+@router.get("/export/jobs/{job_id}/download")
+def export_job_download(job_id: str, hub_session: Optional[str] = Cookie(None)):
+    """The file a background export job rendered (kept for a day)."""
+    from fastapi.responses import FileResponse
+
+    user = _require_user(hub_session)
+    job = get_job(job_id)
+    if not job or job.get("job_type") != "export":
+        raise HTTPException(404, "Export not found")
+    scope = _client_scope(user)
+    if scope is not None and int(job.get("account_id") or 0) != int(scope):
+        raise HTTPException(403, "Forbidden")
+    if job.get("status") != "done":
+        raise HTTPException(409, f"Export is {job.get('status')}")
+    result = job.get("result") or {}
+    path = export_stream.export_path(result.get("file"))
+    if not path:
+        raise HTTPException(410, "Export file has expired")
+    return FileResponse(path, filename=result.get("filename") or os.path.basename(path),
+                        media_type=export_stream.MEDIA_TYPES.get(result.get("format"),
+                                                                 "application/octet-stream"))
+
+
 # ─── Dashboard with Date Filters ─────────────────────────────────────────────
 
 @router.get("/dashboard/filtered")
@@ -11323,8 +11286,10 @@ def dashboard_filtered(client_id: Optional[int] = None,
     scope = client_id or _client_scope(user)
     # Run SLA auto-flagging on dashboard load
     auto_flag_sla(scope)
-    data = get_dashboard(scope, sub_profile=sub_profile,
-                         date_from=start_date, date_to=end_date)
+    data = response_cache.result(
+        "dashboard", {"scope": scope, "sub_profile": sub_profile, "from": start_date, "to": end_date},
+        lambda: get_dashboard(scope, sub_profile=sub_profile, date_from=start_date, date_to=end_date),
+        client_id=scope)
     data["user"] = user
     data["alerts"] = get_alerts(scope)
     return data
@@ -3,16 +3,19 @@
 from __future__ import annotations
 
 import json
+import logging
 import sqlite3
 import os
 import time
 import threading
-from typing import Callable, Any
+from typing import Callable, Any, Iterable
 from datetime import datetime
 from app.config import DATABASE_PATH
 from app.email_finder import _is_quality_email
 
 
+log = logging.getLogger("database")
+
 SQLITE_TIMEOUT_SECONDS = 30
 SQLITE_BUSY_TIMEOUT_MS = 30000
 DB_WRITE_LOCK = threading.RLock()
@@ -51,6 +54,25 @@ def get_db():
     return conn
 
 
+_EMAIL_VERIFICATIONS_SCHEMA = """
+    CREATE TABLE IF NOT EXISTS email_verifications (
+        email TEXT PRIMARY KEY,
+        domain TEXT NOT NULL,
+        verdict TEXT DEFAULT 'unknown',
+        score INTEGER DEFAULT 0,
+        smtp_result TEXT,
+        catchall INTEGER,
+        mx_host TEXT DEFAULT '',
+        reason TEXT DEFAULT '',
+        payload_json TEXT DEFAULT '{}',
+        verified_at TEXT DEFAULT CURRENT_TIMESTAMP
+    );
+
+    CREATE INDEX IF NOT EXISTS idx_email_verifications_domain ON email_verifications(domain);
+    CREATE INDEX IF NOT EXISTS idx_email_verifications_verdict ON email_verifications(verdict, email);
+"""
+
+
 def init_db():
     """Initialize the database schema."""
     conn = get_db()
@@ -104,6 +126,10 @@ def init_db():
         CREATE INDEX IF NOT EXISTS idx_leads_state ON saved_leads(state);
         CREATE INDEX IF NOT EXISTS idx_leads_status ON saved_leads(lead_status);
         CREATE INDEX IF NOT EXISTS idx_leads_score ON saved_leads(lead_score);
+        -- Keyset pagination for query_saved_leads (score DESC, id DESC),
+        -- globally and within a state.
+        CREATE INDEX IF NOT EXISTS idx_leads_score_id ON saved_leads(lead_score DESC, id DESC);
+        CREATE INDEX IF NOT EXISTS idx_leads_state_score_id ON saved_leads(state, lead_score DESC, id DESC);
 
         CREATE TABLE IF NOT EXISTS lead_emails (
             id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -122,6 +148,7 @@ def init_db():
         );
 
         CREATE INDEX IF NOT EXISTS idx_emails_npi ON lead_emails(npi);
+        CREATE INDEX IF NOT EXISTS idx_emails_email ON lead_emails(email);
 
         CREATE TABLE IF NOT EXISTS lead_enrichment (
             id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -159,6 +186,7 @@ def init_db():
         CREATE INDEX IF NOT EXISTS idx_enrichment_billing ON lead_enrichment(billing_score);
         CREATE INDEX IF NOT EXISTS idx_enrichment_payor ON lead_enrichment(payor_score);
         CREATE INDEX IF NOT EXISTS idx_enrichment_workflow ON lead_enrichment(workflow_score);
+        CREATE INDEX IF NOT EXISTS idx_enrichment_overall_id ON lead_enrichment(overall_score DESC, id DESC);
 
         CREATE TABLE IF NOT EXISTS outreach_runs (
             id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -208,6 +236,7 @@ def init_db():
         CREATE INDEX IF NOT EXISTS idx_outreach_queue_run ON outreach_queue(run_id, queue_rank);
         CREATE INDEX IF NOT EXISTS idx_outreach_queue_npi ON outreach_queue(npi);
     """)
+    cursor.executescript(_EMAIL_VERIFICATIONS_SCHEMA)
 
     # Backward-compatible schema upgrades
     cursor.execute("PRAGMA table_info(saved_leads)")
@@ -584,43 +613,92 @@ def seed_demo_leads():
     conn.close()
 
 
+_SAVE_LEAD_SQL = """
+    INSERT OR REPLACE INTO saved_leads (
+        npi, organization_name, first_name, last_name, credential,
+        taxonomy_code, taxonomy_desc, address_line1, address_line2,
+        city, state, zip_code, phone, fax, enumeration_date,
+        last_updated, lead_score, lead_status, notes, tags, source, updated_at
+    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+# Rows per transaction for the *_bulk writers. Each chunk holds
+# DB_WRITE_LOCK only for its own commit, so other writers interleave.
+BULK_CHUNK_SIZE = 500
+
+
+def _lead_params(lead_data: dict, now: str) -> tuple:
+    return (
+        lead_data.get("npi"),
+        lead_data.get("organization_name"),
+        lead_data.get("first_name"),
+        lead_data.get("last_name"),
+        lead_data.get("credential"),
+        lead_data.get("taxonomy_code"),
+        lead_data.get("taxonomy_desc"),
+        lead_data.get("address_line1"),
+        lead_data.get("address_line2"),
+        lead_data.get("city"),
+        lead_data.get("state"),
+        lead_data.get("zip_code"),
+        lead_data.get("phone"),
+        lead_data.get("fax"),
+        lead_data.get("enumeration_date"),
+        lead_data.get("last_updated"),
+        lead_data.get("lead_score", 0),
+        lead_data.get("lead_status", "new"),
+        lead_data.get("notes", ""),
+        lead_data.get("tags", ""),
+        lead_data.get("source", "scraped"),
+        now,
+    )
+
+
+def _chunks(items: Iterable, size: int):
+    chunk: list = []
+    for item in items:
+        chunk.append(item)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def _executemany_outcomes(conn: sqlite3.Connection, sql: str, params: list[tuple]) -> list[tuple[str, str]]:
+    """executemany in the open transaction; on a non-lock error fall back to
+    row-by-row so one bad record only fails itself. Returns (status, error)
+    per param tuple: ("saved" | "unchanged" | "error", message)."""
+    try:
+        conn.executemany(sql, params)
+        return [("saved", "")] * len(params)
+    except sqlite3.OperationalError as exc:
+        if _is_locked_error(exc):
+            raise
+        conn.rollback()
+    except sqlite3.DatabaseError:
+        conn.rollback()
+    out: list[tuple[str, str]] = []
+    for p in params:
+        try:
+            cur = conn.execute(sql, p)
+            out.append(("saved" if cur.rowcount else "unchanged", ""))
+        except sqlite3.OperationalError as exc:
+            if _is_locked_error(exc):
+                raise
+            out.append(("error", str(exc)))
+        except sqlite3.DatabaseError as exc:
+            out.append(("error", str(exc)))
+    return out
+
+
 def save_lead(lead_data: dict) -> int:
     """Save a lead to the database. Returns the lead ID."""
     def _write() -> int:
         conn = get_db()
         cursor = conn.cursor()
         try:
-            cursor.execute("""
-                INSERT OR REPLACE INTO saved_leads (
-                    npi, organization_name, first_name, last_name, credential,
-                    taxonomy_code, taxonomy_desc, address_line1, address_line2,
-                    city, state, zip_code, phone, fax, enumeration_date,
-                    last_updated, lead_score, lead_status, notes, tags, source, updated_at
-                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            """, (
-                lead_data.get("npi"),
-                lead_data.get("organization_name"),
-                lead_data.get("first_name"),
-                lead_data.get("last_name"),
-                lead_data.get("credential"),
-                lead_data.get("taxonomy_code"),
-                lead_data.get("taxonomy_desc"),
-                lead_data.get("address_line1"),
-                lead_data.get("address_line2"),
-                lead_data.get("city"),
-                lead_data.get("state"),
-                lead_data.get("zip_code"),
-                lead_data.get("phone"),
-                lead_data.get("fax"),
-                lead_data.get("enumeration_date"),
-                lead_data.get("last_updated"),
-                lead_data.get("lead_score", 0),
-                lead_data.get("lead_status", "new"),
-                lead_data.get("notes", ""),
-                lead_data.get("tags", ""),
-                lead_data.get("source", "scraped"),
-                datetime.now().isoformat()
-            ))
+            cursor.execute(_SAVE_LEAD_SQL, _lead_params(lead_data, datetime.now().isoformat()))
             conn.commit()
             return cursor.lastrowid
         finally:
@@ -629,6 +707,61 @@ def save_lead(lead_data: dict) -> int:
     return _run_write_with_retry(_write)
 
 
+def save_leads_bulk(leads: Iterable[dict], chunk_size: int = BULK_CHUNK_SIZE) -> list[dict]:
+    """Upsert many leads, one transaction per ``chunk_size`` rows.
+
+    Returns one outcome per input lead, in order:
+    ``{"npi", "status": "saved" | "skipped" | "error", "id", "error"}``.
+    """
+    outcomes: list[dict] = []
+    for chunk in _chunks(leads, chunk_size):
+        now = datetime.now().isoformat()
+        chunk_out = [
+            {"npi": lead.get("npi"), "status": "skipped", "id": None, "error": "missing npi"}
+            for lead in chunk
+        ]
+        # Build each row's params on its own, so one malformed lead (say a
+        # non-numeric lead_score) fails only itself, as it did with save_lead.
+        todo, params = [], []
+        for i, lead in enumerate(chunk):
+            if not lead.get("npi"):
+                continue
+            try:
+                params.append(_lead_params(lead, now))
+            except (TypeError, ValueError) as exc:
+                log.warning("save_leads_bulk: skipping lead %s: %s", lead.get("npi"), exc)
+                chunk_out[i] = {"npi": lead.get("npi"), "status": "error", "id": None, "error": str(exc)}
+                continue
+            todo.append((i, lead))
+
+        def _write() -> None:
+            conn = get_db()
+            try:
+                results = _executemany_outcomes(conn, _SAVE_LEAD_SQL, params)
+                conn.commit()
+                npis = [lead["npi"] for _, lead in todo]
+                ids = {}
+                if npis:
+                    marks = ",".join("?" * len(npis))
+                    ids = {
+                        r["npi"]: r["id"]
+                        for r in conn.execute(f"SELECT id, npi FROM saved_leads WHERE npi IN ({marks})", npis)
+                    }
+                for (i, lead), (status, err) in zip(todo, results):
+                    chunk_out[i] = {
+                        "npi": lead["npi"],
+                        "status": "error" if status == "error" else "saved",
+                        "id": ids.get(lead["npi"]) if status != "error" else None,
+                        "error": err,
+                    }
+            finally:
+                conn.close()
+
+        _run_write_with_retry(_write)
+        outcomes.extend(chunk_out)
+    return outcomes
+
+
 def get_saved_leads(status=None, state=None, min_score=None):
     """Get saved leads with optional filters."""
     conn = get_db()
@@ -750,6 +883,56 @@ def log_search(search_type: str, params: str, count: int):
     conn.close()
 
 
+_SAVE_LEAD_EMAIL_SQL = """
+    INSERT OR IGNORE INTO lead_emails (
+        npi, email, first_name, last_name, position,
+        is_decision_maker, confidence, email_type, source, domain
+    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+
+def _lead_email_params(npi: str, e: dict) -> tuple[tuple | None, str]:
+    """Quality-gate one discovered email. Returns (params, "") when it may be
+    persisted, else (None, reason)."""
+    email = e.get("email", "")
+    source = str(e.get("source", "") or "").strip().lower()
+    confidence = int(e.get("confidence", 0) or 0)
+    verified = bool(e.get("verified", False))
+
+    # Apply final quality check before saving
+    if not _is_quality_email(email):
+        return None, f"Blocked bad email from saving: {email}"
+
+    # Pattern/fallback/generated sources are only acceptable when both
+    # verified and very high confidence.
+    if "pattern" in source or source in {"generated", "fallback"}:
+        if (not verified) or confidence < 90:
+            return None, (
+                "Blocked synthetic email: "
+                f"{email} ({source}, confidence={confidence}, verified={verified})"
+            )
+
+    # Require all persisted emails to be verified and high confidence.
+    if not verified or confidence < 80:
+        return None, (
+            "Blocked unverified/low-confidence email: "
+            f"{email} ({source}, confidence={confidence}, verified={verified})"
+        )
+
+    return (
+        npi,
+        email,
+        e.get("first_name", ""),
+        e.get("last_name", ""),
+        e.get("position", ""),
+        1 if e.get("is_decision_maker") else 0,
+        confidence,
+        e.get("type", "pattern"),
+        source or e.get("source", "generated"),
+        e.get("domain", ""),
+    ), ""
+
+
 def save_lead_emails(npi: str, emails: list) -> int:
     """Save discovered emails for a lead. Returns count saved."""
     def _write() -> int:
@@ -757,52 +940,13 @@ def save_lead_emails(npi: str, emails: list) -> int:
         cursor = conn.cursor()
         saved = 0
         for e in emails:
-            email = e.get("email", "")
-            source = str(e.get("source", "") or "").strip().lower()
-            confidence = int(e.get("confidence", 0) or 0)
-            verified = bool(e.get("verified", False))
-
-            # Apply final quality check before saving
-            if not _is_quality_email(email):
-                print(f"WARNING: Blocked bad email from saving: {email}")
+            params, reason = _lead_email_params(npi, e)
+            if params is None:
+                print(f"WARNING: {reason}")
                 continue
 
-            # Pattern/fallback/generated sources are only acceptable when both
-            # verified and very high confidence.
-            if "pattern" in source or source in {"generated", "fallback"}:
-                if (not verified) or confidence < 90:
-                    print(
-                        "WARNING: Blocked synthetic email: "
-                        f"{email} ({source}, confidence={confidence}, verified={verified})"
-                    )
-                    continue
-
-            # Require all persisted emails to be verified and high confidence.
-            if not verified or confidence < 80:
-                print(
-                    "WARNING: Blocked unverified/low-confidence email: "
-                    f"{email} ({source}, confidence={confidence}, verified={verified})"
-                )
-                continue
-            
             try:
-                cursor.execute("""
-                    INSERT OR IGNORE INTO lead_emails (
-                        npi, email, first_name, last_name, position,
-                        is_decision_maker, confidence, email_type, source, domain
-                    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                """, (
-                    npi,
-                    email,
-                    e.get("first_name", ""),
-                    e.get("last_name", ""),
-                    e.get("position", ""),
-                    1 if e.get("is_decision_maker") else 0,
-                    confidence,
-                    e.get("type", "pattern"),
-                    source or e.get("source", "generated"),
-                    e.get("domain", ""),
-                ))
+                cursor.execute(_SAVE_LEAD_EMAIL_SQL, params)
                 saved += cursor.rowcount
             except sqlite3.OperationalError as exc:
                 if _is_locked_error(exc):
@@ -816,6 +960,57 @@ def save_lead_emails(npi: str, emails: list) -> int:
     return _run_write_with_retry(_write)
 
 
+def save_lead_emails_bulk(
+    items: Iterable[tuple[str, list]],
+    chunk_size: int = BULK_CHUNK_SIZE,
+) -> list[dict]:
+    """Save emails for many leads. ``items`` yields ``(npi, emails)`` pairs.
+
+    Emails go through the same quality gate as ``save_lead_emails`` and are
+    written ``chunk_size`` at a time, one transaction per chunk. Returns one
+    outcome per email, in order: ``{"npi", "email", "status": "saved" |
+    "duplicate" | "blocked" | "error", "reason"}``.
+    """
+    flat = ((npi, e) for npi, emails in items for e in (emails or []))
+    outcomes: list[dict] = []
+    for chunk in _chunks(flat, chunk_size):
+        chunk_out: list[dict] = []
+        todo: list[tuple[int, tuple]] = []
+        for npi, e in chunk:
+            params, reason = _lead_email_params(npi, e)
+            chunk_out.append({
+                "npi": npi, "email": e.get("email", ""),
+                "status": "blocked" if params is None else "pending", "reason": reason,
+            })
+            if params is not None:
+                todo.append((len(chunk_out) - 1, params))
+
+        def _write() -> None:
+            conn = get_db()
+            try:
+                # One transaction, one cached statement; executing per row
+                # (rather than executemany) keeps the per-row rowcount so
+                # INSERT OR IGNORE duplicates are reported as such.
+                for i, params in todo:
+                    try:
+                        cur = conn.execute(_SAVE_LEAD_EMAIL_SQL, params)
+                        chunk_out[i]["status"] = "saved" if cur.rowcount else "duplicate"
+                    except sqlite3.OperationalError as exc:
+                        if _is_locked_error(exc):
+                            raise
+                        chunk_out[i].update(status="error", reason=str(exc))
+                    except sqlite3.DatabaseError as exc:
+                        chunk_out[i].update(status="error", reason=str(exc))
+                conn.commit()
+            finally:
+                conn.close()
+
+        if todo:
+            _run_write_with_retry(_write)
+        outcomes.extend(chunk_out)
+    return outcomes
+
+
 def get_lead_emails(npi: str) -> list:
     """Get all saved emails for a lead NPI."""
     conn = get_db()
@@ -859,58 +1054,227 @@ def get_all_leads_with_emails() -> list:
     return out
 
 
+# ─── Paginated / streaming lead queries ─────────────────────────────
+#
+# Keyset pagination on (lead_score DESC, id DESC): a page costs an index range
+# scan regardless of how deep it is, unlike OFFSET. Cursors are the opaque
+# "score:id" of the last row of the previous page.
+
+_LEAD_QUERY_SELECT = """
+    SELECT sl.*,
+           COALESCE(le.urgency_score, 0) AS urgency_score,
+           COALESCE(le.urgency_level, 'low') AS urgency_level,
+           COALESCE(le.urgency_reason, '') AS urgency_reason,
+           COALESCE(le.urgency_updated_at, '') AS urgency_updated_at,
+           COALESCE(le.services_needed, '[]') AS services_wanted,
+           COALESCE(le.overall_score, 0) AS overall_score,
+           (SELECT GROUP_CONCAT(em.email, '; ') FROM lead_emails em WHERE em.npi = sl.npi) AS emails,
+           (SELECT GROUP_CONCAT(em.position, '; ') FROM lead_emails em WHERE em.npi = sl.npi) AS email_positions
+    FROM saved_leads sl
+    LEFT JOIN lead_enrichment le ON sl.npi = le.npi
+"""
+
+
+def _encode_cursor(score: Any, row_id: Any) -> str:
+    return f"{int(score or 0)}:{int(row_id)}"
+
+
+def _decode_cursor(cursor: str | None) -> tuple[int, int] | None:
+    if not cursor:
+        return None
+    try:
+        score, row_id = str(cursor).split(":", 1)
+        return int(score), int(row_id)
+    except ValueError:
+        raise ValueError(f"invalid cursor: {cursor!r}") from None
+
+
+def _lead_filters(
+    state: str | None = None,
+    status: str | None = None,
+    min_score: int | None = None,
+    service: str | None = None,
+    verdict: str | None = None,
+    tier: str | None = None,
+) -> tuple[list[str], list]:
+    where: list[str] = []
+    params: list = []
+    if state:
+        where.append("sl.state = ?")
+        params.append(state.strip().upper())
+    if status:
+        where.append("sl.lead_status = ?")
+        params.append(status)
+    if min_score is not None:
+        where.append("sl.lead_score >= ?")
+        params.append(int(min_score))
+    if service:
+        where.append("le.services_needed LIKE ?")
+        params.append(f"%{service}%")
+    if verdict:
+        where.append(
+            "EXISTS (SELECT 1 FROM lead_emails em JOIN email_verifications ev ON ev.email = em.email "
+            "WHERE em.npi = sl.npi AND ev.verdict = ?)"
+        )
+        params.append(verdict)
+    if tier:
+        # Tiers are carried in tags as "tier-A" (import_to_hub / rule intercept).
+        where.append("sl.tags LIKE ?")
+        params.append(f"%tier-{tier.strip()}%")
+    return where, params
+
+
+def _lead_row(row: sqlite3.Row) -> dict:
+    item = dict(row)
+    try:
+        item["services_wanted"] = json.loads(item.get("services_wanted") or "[]")
+    except (json.JSONDecodeError, TypeError):
+        item["services_wanted"] = []
+    return item
+
+
+def query_saved_leads(
+    *,
+    state: str | None = None,
+    status: str | None = None,
+    min_score: int | None = None,
+    service: str | None = None,
+    verdict: str | None = None,
+    tier: str | None = None,
+    cursor: str | None = None,
+    limit: int = 100,
+) -> dict:
+    """One page of saved leads, best lead_score first.
+
+    Filters run in SQL (state / status / min lead_score / service need /
+    email verification verdict / tier tag). Returns ``{"rows", "next_cursor"}``;
+    pass ``next_cursor`` back to get the following page (None = last page).
+    """
+    limit = max(1, min(int(limit or 100), 1000))
+    where, params = _lead_filters(state, status, min_score, service, verdict, tier)
+    after = _decode_cursor(cursor)
+    if after is not None:
+        where.append("(sl.lead_score < ? OR (sl.lead_score = ? AND sl.id < ?))")
+        params.extend([after[0], after[0], after[1]])
+    sql = _LEAD_QUERY_SELECT
+    if where:
+        sql += " WHERE " + " AND ".join(where)
+    sql += " ORDER BY sl.lead_score DESC, sl.id DESC LIMIT ?"
+    params.append(limit + 1)
+
+    conn = get_db()
+    try:
+        rows = conn.execute(sql, params).fetchall()
+    finally:
+        conn.close()
+    page = [_lead_row(r) for r in rows[:limit]]
+    next_cursor = None
+    if len(rows) > limit and page:
+        next_cursor = _encode_cursor(page[-1]["lead_score"], page[-1]["id"])
+    return {"rows": page, "next_cursor": next_cursor}
+
+
+def iter_saved_leads(batch_size: int = 500, **filters):
+    """Yield every saved lead matching ``filters`` (see query_saved_leads),
+    one keyset page at a time, so exports never hold the full table."""
+    cursor = None
+    while True:
+        page = query_saved_leads(cursor=cursor, limit=batch_size, **filters)
+        yield from page["rows"]
+        cursor = page["next_cursor"]
+        if not cursor:
+            return
+
+
+def iter_lead_email_candidates(batch_size: int = 1000):
+    """Stream saved_leads joined to lead_emails ordered by npi, confidence.
+
+    Rows come off one cursor with ``fetchmany`` so callers that rank per NPI
+    (build_real_human_email_export) only keep the current group in memory.
+    """
+    conn = get_db()
+    try:
+        cur = conn.execute(
+            """
+            SELECT
+                sl.npi, sl.organization_name, sl.city, sl.state, sl.phone,
+                sl.lead_score, sl.tags, sl.notes, sl.taxonomy_desc,
+                le.email, le.first_name, le.last_name, le.position,
+                le.confidence, le.source, le.domain
+            FROM saved_leads sl
+            JOIN lead_emails le ON le.npi = sl.npi
+            ORDER BY sl.npi, le.confidence DESC, le.id ASC
+            """
+        )
+        while True:
+            rows = cur.fetchmany(batch_size)
+            if not rows:
+                return
+            yield from rows
+    finally:
+        conn.close()
+
+
 # ─── Lead Enrichment Persistence ────────────────────────────────────
 
+_SAVE_ENRICHMENT_SQL = """
+    INSERT OR REPLACE INTO lead_enrichment (
+        npi, organization_name, enriched_at,
+        overall_score, billing_score, payor_score, workflow_score,
+        priority, services_needed, recommendation,
+        billing_reasons, payor_reasons, workflow_reasons,
+        clia_data, medicare_data, authorized_official,
+        location_count, multi_state, states_present, taxonomy_count,
+        urgency_score, urgency_level, urgency_reason, urgency_updated_at,
+        updated_at
+    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+
+def _enrichment_params(npi: str, enrichment_data: dict, now: str) -> tuple:
+    sn = enrichment_data.get("service_needs", {})
+    billing = sn.get("billing", {})
+    payor = sn.get("payor_contracting", {})
+    workflow = sn.get("workflow", {})
+    return (
+        npi,
+        enrichment_data.get("organization_name", ""),
+        enrichment_data.get("enriched_at", now),
+        sn.get("overall_score", 0),
+        billing.get("score", 0),
+        payor.get("score", 0),
+        workflow.get("score", 0),
+        sn.get("priority", "low"),
+        json.dumps(sn.get("services_needed", [])),
+        sn.get("recommendation", ""),
+        json.dumps(billing.get("reasons", [])),
+        json.dumps(payor.get("reasons", [])),
+        json.dumps(workflow.get("reasons", [])),
+        json.dumps(enrichment_data.get("data_sources", {}).get("clia", {})),
+        json.dumps(enrichment_data.get("data_sources", {}).get("medicare", {})),
+        json.dumps(enrichment_data.get("authorized_official", {})),
+        enrichment_data.get("location_count", 0),
+        1 if enrichment_data.get("multi_state") else 0,
+        json.dumps(enrichment_data.get("states_present", [])),
+        len(enrichment_data.get("data_sources", {}).get("npi", {}).get("taxonomies", [])),
+        0,
+        "low",
+        "",
+        "",
+        now,
+    )
+
+
 def save_enrichment(npi: str, enrichment_data: dict) -> int:
     """Save or update enrichment data for a lead."""
     def _write() -> int:
         conn = get_db()
         cursor = conn.cursor()
-
-        sn = enrichment_data.get("service_needs", {})
-        billing = sn.get("billing", {})
-        payor = sn.get("payor_contracting", {})
-        workflow = sn.get("workflow", {})
-
         try:
-            cursor.execute("""
-                INSERT OR REPLACE INTO lead_enrichment (
-                    npi, organization_name, enriched_at,
-                    overall_score, billing_score, payor_score, workflow_score,
-                    priority, services_needed, recommendation,
-                    billing_reasons, payor_reasons, workflow_reasons,
-                    clia_data, medicare_data, authorized_official,
-                    location_count, multi_state, states_present, taxonomy_count,
-                    urgency_score, urgency_level, urgency_reason, urgency_updated_at,
-                    updated_at
-                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            """, (
-                npi,
-                enrichment_data.get("organization_name", ""),
-                enrichment_data.get("enriched_at", datetime.now().isoformat()),
-                sn.get("overall_score", 0),
-                billing.get("score", 0),
-                payor.get("score", 0),
-                workflow.get("score", 0),
-                sn.get("priority", "low"),
-                json.dumps(sn.get("services_needed", [])),
-                sn.get("recommendation", ""),
-                json.dumps(billing.get("reasons", [])),
-                json.dumps(payor.get("reasons", [])),
-                json.dumps(workflow.get("reasons", [])),
-                json.dumps(enrichment_data.get("data_sources", {}).get("clia", {})),
-                json.dumps(enrichment_data.get("data_sources", {}).get("medicare", {})),
-                json.dumps(enrichment_data.get("authorized_official", {})),
-                enrichment_data.get("location_count", 0),
-                1 if enrichment_data.get("multi_state") else 0,
-                json.dumps(enrichment_data.get("states_present", [])),
-                len(enrichment_data.get("data_sources", {}).get("npi", {}).get("taxonomies", [])),
-                0,
-                "low",
-                "",
-                "",
-                datetime.now().isoformat(),
-            ))
+            cursor.execute(
+                _SAVE_ENRICHMENT_SQL,
+                _enrichment_params(npi, enrichment_data, datetime.now().isoformat()),
+            )
             conn.commit()
             return cursor.lastrowid
         finally:
@@ -919,6 +1283,53 @@ def save_enrichment(npi: str, enrichment_data: dict) -> int:
     return _run_write_with_retry(_write)
 
 
+def save_enrichments_bulk(
+    items: Iterable[tuple[str, dict]],
+    chunk_size: int = BULK_CHUNK_SIZE,
+) -> list[dict]:
+    """Upsert enrichment for many leads. ``items`` yields ``(npi, data)``.
+
+    One executemany transaction per ``chunk_size`` rows. Returns one outcome
+    per input, in order: ``{"npi", "status": "saved" | "skipped" | "error",
+    "error"}``.
+    """
+    outcomes: list[dict] = []
+    for chunk in _chunks(items, chunk_size):
+        now = datetime.now().isoformat()
+        chunk_out = [
+            {"npi": npi, "status": "skipped", "error": "missing npi"} for npi, _ in chunk
+        ]
+        todo: list[int] = []
+        params: list[tuple] = []
+        for i, (npi, data) in enumerate(chunk):
+            if not npi:
+                continue
+            try:
+                params.append(_enrichment_params(npi, data or {}, now))
+                todo.append(i)
+            except (TypeError, ValueError, AttributeError) as exc:
+                chunk_out[i] = {"npi": npi, "status": "error", "error": str(exc)}
+
+        def _write() -> None:
+            conn = get_db()
+            try:
+                results = _executemany_outcomes(conn, _SAVE_ENRICHMENT_SQL, params)
+                conn.commit()
+                for i, (status, err) in zip(todo, results):
+                    chunk_out[i] = {
+                        "npi": chunk[i][0],
+                        "status": "error" if status == "error" else "saved",
+                        "error": err,
+                    }
+            finally:
+                conn.close()
+
+        if params:
+            _run_write_with_retry(_write)
+        outcomes.extend(chunk_out)
+    return outcomes
+
+
 def update_enrichment_urgency(npi: str, urgency_score: int, urgency_level: str, urgency_reason: str):
     """Update urgency metadata for an enriched lead."""
     conn = get_db()
@@ -999,6 +1410,75 @@ def get_all_enrichments(min_overall: int = 0, service_filter: str = None) -> lis
     return results
 
 
+_ENRICHMENT_JSON_FIELDS = (
+    "services_needed", "billing_reasons", "payor_reasons",
+    "workflow_reasons", "clia_data", "medicare_data",
+    "authorized_official", "states_present",
+)
+
+
+def query_enrichments(
+    *,
+    min_overall: int = 0,
+    service: str | None = None,
+    priority: str | None = None,
+    cursor: str | None = None,
+    limit: int = 100,
+) -> dict:
+    """One page of lead_enrichment rows, best overall_score first.
+
+    Keyset-paginated like ``query_saved_leads``; returns ``{"rows", "next_cursor"}``.
+    """
+    limit = max(1, min(int(limit or 100), 1000))
+    where = ["overall_score >= ?"]
+    params: list = [int(min_overall or 0)]
+    if service:
+        where.append("services_needed LIKE ?")
+        params.append(f"%{service}%")
+    if priority:
+        where.append("priority = ?")
+        params.append(priority)
+    after = _decode_cursor(cursor)
+    if after is not None:
+        where.append("(overall_score < ? OR (overall_score = ? AND id < ?))")
+        params.extend([after[0], after[0], after[1]])
+    params.append(limit + 1)
+
+    conn = get_db()
+    try:
+        rows = conn.execute(
+            "SELECT * FROM lead_enrichment WHERE " + " AND ".join(where)
+            + " ORDER BY overall_score DESC, id DESC LIMIT ?",
+            params,
+        ).fetchall()
+    finally:
+        conn.close()
+    page = []
+    for row in rows[:limit]:
+        r = dict(row)
+        for field in _ENRICHMENT_JSON_FIELDS:
+            try:
+                r[field] = json.loads(r.get(field, "{}"))
+            except (json.JSONDecodeError, TypeError):
+                pass
+        page.append(r)
+    next_cursor = None
+    if len(rows) > limit and page:
+        next_cursor = _encode_cursor(page[-1]["overall_score"], page[-1]["id"])
+    return {"rows": page, "next_cursor": next_cursor}
+
+
+def iter_enrichments(batch_size: int = 500, **filters):
+    """Yield every enrichment row matching ``filters``, page by page."""
+    cursor = None
+    while True:
+        page = query_enrichments(cursor=cursor, limit=batch_size, **filters)
+        yield from page["rows"]
+        cursor = page["next_cursor"]
+        if not cursor:
+            return
+
+
 def get_enrichment_stats() -> dict:
     """Get enrichment dashboard statistics."""
     conn = get_db()
@@ -1033,3 +1513,86 @@ def get_enrichment_stats() -> dict:
 
     conn.close()
     return stats
+
+
+# ─── Email Verification Store ───────────────────────────────────────
+
+EMAIL_VERIFICATION_MAX_AGE_DAYS = 7
+# Greylisted (tempfail) and timed-out (error) probes are inconclusive; they
+# are only reused briefly so the next run probes the mailbox again.
+EMAIL_VERIFICATION_INCONCLUSIVE_MAX_AGE_HOURS = 1
+
+
+def save_email_verifications(results: list[dict]) -> int:
+    """Upsert email_verifier results (one transaction). Returns rows written."""
+    rows = []
+    now = datetime.now().isoformat()
+    for r in results:
+        email = str(r.get("email") or "").strip().lower()
+        if "@" not in email:
+            continue
+        catchall = r.get("catchall")
+        rows.append((
+            email,
+            email.partition("@")[2],
+            r.get("verdict", "unknown"),
+            int(r.get("score") or 0),
+            r.get("smtp_result"),
+            None if catchall is None else int(bool(catchall)),
+            (r.get("mx_hosts") or [""])[0],
+            r.get("reason", ""),
+            json.dumps(r),
+            now,
+        ))
+    if not rows:
+        return 0
+
+    def _write() -> int:
+        conn = get_db()
+        try:
+            conn.executescript(_EMAIL_VERIFICATIONS_SCHEMA)
+            conn.executemany("""
+                INSERT OR REPLACE INTO email_verifications (
+                    email, domain, verdict, score, smtp_result, catchall,
+                    mx_host, reason, payload_json, verified_at
+                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """, rows)
+            conn.commit()
+            return len(rows)
+        finally:
+            conn.close()
+
+    return _run_write_with_retry(_write)
+
+
+def get_email_verifications(emails: list[str], max_age_days: int = EMAIL_VERIFICATION_MAX_AGE_DAYS,
+                            inconclusive_max_age_hours: float = EMAIL_VERIFICATION_INCONCLUSIVE_MAX_AGE_HOURS) -> dict:
+    """Return {email: result} for stored verifications newer than ``max_age_days``
+    (``inconclusive_max_age_hours`` for greylisted / timed-out SMTP probes)."""
+    keys = sorted({str(e or "").strip().lower() for e in emails if e})
+    if not keys:
+        return {}
+    now = time.time()
+    cutoff = datetime.fromtimestamp(now - max_age_days * 86400).isoformat()
+    short_cutoff = datetime.fromtimestamp(now - inconclusive_max_age_hours * 3600).isoformat()
+    conn = get_db()
+    out: dict = {}
+    try:
+        conn.executescript(_EMAIL_VERIFICATIONS_SCHEMA)
+        for i in range(0, len(keys), 500):
+            chunk = keys[i:i + 500]
+            marks = ",".join("?" * len(chunk))
+            cur = conn.execute(
+                f"SELECT email, payload_json FROM email_verifications "
+                f"WHERE email IN ({marks}) AND verified_at >= ? "
+                f"AND (COALESCE(smtp_result, '') NOT IN ('tempfail', 'error') OR verified_at >= ?)",
+                (*chunk, cutoff, short_cutoff),
+            )
+            for row in cur.fetchall():
+                try:
+                    out[row["email"]] = json.loads(row["payload_json"] or "{}")
+                except (json.JSONDecodeError, TypeError):
+                    continue
+    finally:
+        conn.close()
+    return out
@@ -0,0 +1,369 @@
+"""
+Online backups of the hub SQLite database.
+
+Snapshots are taken with the SQLite backup API (``Connection.backup``) from
+a read-only connection, ``BACKUP_PAGES_PER_STEP`` pages at a time with a
+short pause between steps, so writers are never locked out for the length
+of a full copy and the snapshot is transactionally consistent (a plain
+file copy of a database mid-write is not).  The copy is then streamed
+through zstd (when the ``zstandard`` package is installed) or gzip into
+``<db dir>/backups``.
+
+  • schedule    - every ``BACKUP_INTERVAL_HOURS`` via the daily scheduler;
+                  startup only backs up when the newest snapshot is older
+                  than ``BACKUP_STARTUP_FRESH_MINUTES``
+  • guards      - an empty/fresh DB or one holding zero claims is never
+                  snapshotted (it would push a good pre-loss backup out of
+                  retention); an unchanged DB is not snapshotted twice
+  • retention   - every snapshot for ``BACKUP_KEEP_ALL_HOURS``, then the
+                  newest per day for ``BACKUP_DAILY_DAYS``, then the newest
+                  per ISO week for ``BACKUP_WEEKLY_WEEKS``; KEEP_* files
+                  (manually preserved) are never removed
+  • verify      - decompress to a temp file and run PRAGMA integrity_check
+  • restore     - verify, snapshot the live DB (``pre_restore``), then copy
+                  the backup into the live DB through the backup API
+
+CLI: ``python scripts/db_backup.py backup|list|verify|restore``.
+"""
+
+from __future__ import annotations
+
+import gzip
+import logging
+import os
+import re
+import shutil
+import sqlite3
+import tempfile
+import threading
+import time
+from datetime import datetime, timedelta
+
+from app.config import DATABASE_PATH
+
+log = logging.getLogger("db_backup")
+
+PAGES_PER_STEP = int(os.getenv("BACKUP_PAGES_PER_STEP", "256"))
+STEP_PAUSE_SECONDS = float(os.getenv("BACKUP_STEP_PAUSE_SECONDS", "0.005"))
+COMPRESSION = os.getenv("BACKUP_COMPRESSION", "auto").lower()  # auto | zstd | gzip | none
+INTERVAL_HOURS = float(os.getenv("BACKUP_INTERVAL_HOURS", "6"))
+STARTUP_FRESH_MINUTES = float(os.getenv("BACKUP_STARTUP_FRESH_MINUTES", "60"))
+KEEP_ALL_HOURS = float(os.getenv("BACKUP_KEEP_ALL_HOURS", "48"))
+DAILY_DAYS = int(os.getenv("BACKUP_DAILY_DAYS", "14"))
+WEEKLY_WEEKS = int(os.getenv("BACKUP_WEEKLY_WEEKS", "8"))
+MAX_RESTARTS = 3
+MIN_DB_BYTES = 4096
+
+_NAME_RE = re.compile(r"^(?:KEEP_)?leads_(\d{8}_\d{6})(?:_[a-z_]+)?\.db(?:\.gz|\.zst)?$")
+_CHUNK = 1 << 20
+_lock = threading.Lock()
+
+
+def backup_dir(db_path: str = None) -> str:
+    return os.path.join(os.path.dirname(db_path or DATABASE_PATH), "backups")
+
+
+def _codec() -> str:
+    if COMPRESSION in ("gzip", "none"):
+        return COMPRESSION
+    try:
+        import zstandard  # noqa: F401
+        return "zstd"
+    except ImportError:
+        if COMPRESSION == "zstd":
+            log.warning("BACKUP_COMPRESSION=zstd but zstandard is not installed - using gzip")
+        return "gzip"
+
+
+_SUFFIX = {"zstd": ".db.zst", "gzip": ".db.gz", "none": ".db"}
+
+
+def _compress(src: str, dest: str, codec: str) -> None:
+    with open(src, "rb") as fin, open(dest, "wb") as fout:
+        if codec == "zstd":
+            import zstandard
+            with zstandard.ZstdCompressor(level=10, threads=-1).stream_writer(
+                    fout, closefd=False) as w:
+                shutil.copyfileobj(fin, w, _CHUNK)
+        elif codec == "gzip":
+            with gzip.GzipFile(fileobj=fout, mode="wb", compresslevel=6) as w:
+                shutil.copyfileobj(fin, w, _CHUNK)
+        else:
+            shutil.copyfileobj(fin, fout, _CHUNK)
+
+
+def _decompress_to(path: str, dest: str) -> None:
+    with open(path, "rb") as fin, open(dest, "wb") as fout:
+        if path.endswith(".zst"):
+            import zstandard
+            with zstandard.ZstdDecompressor().stream_reader(fin) as r:
+                shutil.copyfileobj(r, fout, _CHUNK)
+        elif path.endswith(".gz"):
+            with gzip.GzipFile(fileobj=fin, mode="rb") as r:
+                shutil.copyfileobj(r, fout, _CHUNK)
+        else:
+            shutil.copyfileobj(fin, fout, _CHUNK)
+
+
+class _Restarted(Exception):
+    pass
+
+
+def _snapshot(db_path: str, dest: str) -> int:
+    """Copy the live DB into ``dest`` with the paged backup API. Returns
+    the page count.
+
+    A write from another connection restarts a paged backup. After
+    ``MAX_RESTARTS`` of those the copy finishes in one step instead, which
+    holds the read lock only for the length of that copy.
+    """
+    src = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
+    dst = sqlite3.connect(dest)
+    state = {"total": 0, "remaining": None, "restarts": 0}
+
+    def _progress(status, remaining, total):
+        state["total"] = total
+        if state["remaining"] is not None and remaining > state["remaining"]:
+            state["restarts"] += 1
+            if state["restarts"] >= MAX_RESTARTS:
+                raise _Restarted()
+        state["remaining"] = remaining
+        if remaining and STEP_PAUSE_SECONDS > 0:
+            time.sleep(STEP_PAUSE_SECONDS)   # let writers in between steps
+
+    try:
+        try:
+            src.backup(dst, pages=PAGES_PER_STEP, progress=_progress)
+        except _Restarted:
+            log.info("paged backup restarted %d times under write load - finishing in one step",
+                     state["restarts"])
+            src.backup(dst)
+            state["total"] = dst.execute("PRAGMA page_count").fetchone()[0]
+    finally:
+        dst.close()
+        src.close()
+    return state["total"]
+
+
+def _has_claims(db_path: str) -> bool | None:
+    """True/False when claims_master is readable, None when unknown."""
+    try:
+        c = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
+        try:
+            return c.execute("SELECT 1 FROM claims_master LIMIT 1").fetchone() is not None
+        finally:
+            c.close()
+    except Exception:
+        return None
+
+
+def _stamp(name: str, path: str) -> datetime:
+    m = _NAME_RE.match(name)
+    if m:
+        try:
+            return datetime.strptime(m.group(1), "%Y%m%d_%H%M%S")
+        except ValueError:
+            pass
+    return datetime.fromtimestamp(os.path.getmtime(path))
+
+
+def list_backups(directory: str = None) -> list[dict]:
+    """Snapshots on disk, newest first."""
+    directory = directory or backup_dir()
+    if not os.path.isdir(directory):
+        return []
+    out = []
+    for name in os.listdir(directory):
+        if not re.search(r"\.db(\.gz|\.zst)?$", name):
+            continue
+        path = os.path.join(directory, name)
+        out.append({
+            "file": name,
+            "path": path,
+            "size_bytes": os.path.getsize(path),
+            "taken_at": _stamp(name, path),
+            "keep": name.startswith("KEEP_"),
+            "compressed": name.endswith((".gz", ".zst")),
+        })
+    out.sort(key=lambda b: b["taken_at"], reverse=True)
+    return out
+
+
+def _db_mtime(db_path: str) -> float:
+    mt = os.path.getmtime(db_path)
+    for side in ("-wal", "-journal"):
+        if os.path.exists(db_path + side):
+            mt = max(mt, os.path.getmtime(db_path + side))
+    return mt
+
+
+def create_backup(reason: str = "scheduled", *, db_path: str = None,
+                  directory: str = None, fresh_minutes: float = None,
+                  prune: bool = True) -> dict:
+    """Snapshot the live DB. Returns ``{"ok", "skipped"?, "file"?, ...}``.
+
+    ``fresh_minutes`` skips the run when the newest automatic snapshot is
+    younger than that. Never raises; failures come back as ``ok: False``.
+    """
+    db_path = db_path or DATABASE_PATH
+    directory = directory or backup_dir(db_path)
+    with _lock:
+        try:
+            if not os.path.exists(db_path):
+                return {"ok": True, "skipped": "no database file"}
+            size = os.path.getsize(db_path)
+            if size < MIN_DB_BYTES:
+                return {"ok": True, "skipped": f"database too small ({size} bytes)"}
+            if _has_claims(db_path) is False:
+                log.warning("Live DB has 0 claims - skipping backup + rotation to preserve existing backups")
+                return {"ok": True, "skipped": "no claims"}
+            autos = [b for b in list_backups(directory) if not b["keep"]]
+            if autos:
+                newest = autos[0]
+                if fresh_minutes and datetime.now() - newest["taken_at"] < timedelta(minutes=fresh_minutes):
+                    return {"ok": True, "skipped": "recent backup", "file": newest["file"]}
+                if _db_mtime(db_path) < os.path.getmtime(newest["path"]):
+                    return {"ok": True, "skipped": "unchanged since last backup", "file": newest["file"]}
+
+            os.makedirs(directory, exist_ok=True)
+            codec = _codec()
+            ts = datetime.now().strftime("%Y%m%d_%H%M%S")
+            tag = "" if reason == "scheduled" else "_" + re.sub(r"[^a-z_]", "", reason.lower())
+            name = f"leads_{ts}{tag}{_SUFFIX[codec]}"
+            final = os.path.join(directory, name)
+            started, started_at = time.perf_counter(), time.time()
+            with tempfile.TemporaryDirectory(dir=directory, prefix=".snap_") as tmp:
+                raw = os.path.join(tmp, "snapshot.db")
+                pages = _snapshot(db_path, raw)
+                c = sqlite3.connect(raw)
+                try:
+                    check = c.execute("PRAGMA quick_check").fetchone()[0]
+                finally:
+                    c.close()
+                if check != "ok":
+                    raise RuntimeError(f"snapshot failed quick_check: {check}")
+                partial = os.path.join(tmp, name)
+                _compress(raw, partial, codec)
+                os.replace(partial, final)
+            # Stamp with the snapshot start so writes made while it ran still
+            # count as "changed since last backup" next time.
+            os.utime(final, (started_at, started_at))
+            result = {
+                "ok": True, "file": name, "path": final, "codec": codec,
+                "pages": pages, "db_bytes": size,
+                "size_bytes": os.path.getsize(final),
+                "seconds": round(time.perf_counter() - started, 2),
+            }
+            log.info("DB backup created: %s (%s -> %s bytes, %.2fs)",
+                     name, f"{size:,}", f"{result['size_bytes']:,}", result["seconds"])
+            if prune:
+                result["pruned"] = prune_backups(directory)
+            return result
+        except Exception as exc:
+            log.error("DB backup failed: %s", exc)
+            return {"ok": False, "error": f"{type(exc).__name__}: {exc}"}
+
+
+def prune_backups(directory: str = None, now: datetime = None) -> list[str]:
+    """Apply the age tiers to automatic snapshots. Returns removed names."""
+    now = now or datetime.now()
+    autos = [b for b in list_backups(directory) if not b["keep"]]
+    keep_days, keep_weeks, removed = set(), set(), []
+    for i, b in enumerate(autos):          # newest first
+        age = now - b["taken_at"]
+        day = b["taken_at"].date()
+        week = tuple(b["taken_at"].isocalendar()[:2])
+        if i == 0 or age <= timedelta(hours=KEEP_ALL_HOURS):
+            keep = True
+        elif age <= timedelta(days=DAILY_DAYS):
+            keep = day not in keep_days
+        elif age <= timedelta(weeks=WEEKLY_WEEKS):
+            keep = week not in keep_weeks
+        else:
+            keep = False
+        keep_days.add(day)
+        keep_weeks.add(week)
+        if not keep:
+            os.remove(b["path"])
+            removed.append(b["file"])
+    if removed:
+        log.info("Pruned %d old backup(s)", len(removed))
+    return removed
+
+
+def _resolve(file: str, directory: str = None) -> str:
+    if os.path.isabs(file) or os.sep in file:
+        return file
+    return os.path.join(directory or backup_dir(), file)
+
+
+def verify_backup(file: str, directory: str = None) -> dict:
+    """Decompress a snapshot to a temp file and run PRAGMA integrity_check."""
+    path = _resolve(file, directory)
+    with tempfile.TemporaryDirectory(prefix="verify_") as tmp:
+        raw = os.path.join(tmp, "verify.db")
+        return _verify_into(path, raw)
+
+
+def _verify_into(path: str, raw: str) -> dict:
+    info = {"file": os.path.basename(path), "ok": False}
+    try:
+        _decompress_to(path, raw)
+        c = sqlite3.connect(raw)
+        try:
+            problems = [r[0] for r in c.execute("PRAGMA integrity_check").fetchall()]
+            info["integrity"] = problems[:20]
+            info["ok"] = problems == ["ok"]
+            info["tables"] = c.execute(
+                "SELECT COUNT(*) FROM sqlite_master WHERE type='table'").fetchone()[0]
+            try:
+                info["claims"] = c.execute("SELECT COUNT(*) FROM claims_master").fetchone()[0]
+            except sqlite3.Error:
+                info["claims"] = None
+        finally:
+            c.close()
+    except Exception as exc:
+        info["error"] = f"{type(exc).__name__}: {exc}"
+    return info
+
+
+def restore_backup(file: str, *, db_path: str = None, directory: str = None) -> dict:
+    """Replace the live DB contents with a verified snapshot.
+
+    The current DB is snapshotted first (``pre_restore``), and the copy goes
+    through the backup API so open connections see a consistent switch.
+    """
+    db_path = db_path or DATABASE_PATH
+    directory = directory or backup_dir(db_path)
+    path = _resolve(file, directory)
+    with tempfile.TemporaryDirectory(prefix="restore_") as tmp:
+        raw = os.path.join(tmp, "restore.db")
+        check = _verify_into(path, raw)
+        if not check["ok"]:
+            return {"ok": False, "restored": None, "verify": check}
+        safety = None
+        if os.path.exists(db_path) and os.path.getsize(db_path) >= MIN_DB_BYTES:
+            safety = create_backup("pre_restore", db_path=db_path, directory=directory, prune=False)
+            if not safety.get("ok"):
+                return {"ok": False, "restored": None, "verify": check, "pre_restore": safety}
+        src = sqlite3.connect(raw)
+        dst = sqlite3.connect(db_path)
+        try:
+            src.backup(dst, pages=PAGES_PER_STEP)
+        finally:
+            dst.close()
+            src.close()
+    log.warning("Restored %s from %s", db_path, os.path.basename(path))
+    # The restored per-client write counters go backwards, so cached report
+    # artifacts keyed on them could be matched by different data later.
+    from app.report_cache import clear as _clear_report_cache
+    _clear_report_cache()
+    from app import analytics, client_db, response_cache
+    analytics.clear_cache()
+    response_cache.clear()
+    client_db._ar_dates_synced.clear()
+    client_db._search_index_ready.clear()
+    with client_db._ar_worklist_lock:
+        client_db._ar_worklist_cache.clear()
+    return {"ok": True, "restored": os.path.basename(path), "verify": check,
+            "pre_restore": (safety or {}).get("file")}
@@ -0,0 +1,328 @@
+"""
+Text/table extraction for PDF and Word uploads (claim worklists, ERA and
+payment-posting registers, production logs).
+
+pypdf text extraction is the slowest step of a document import - a
+multi-hundred-page posting register spends nearly all its time in
+``page.extract_text()`` - and the sweep jobs used to redo it for every
+stored file on every pass. This stage does it once per file:
+
+  • parallel  - PDFs with at least ``DOC_PARALLEL_MIN_PAGES`` pages are split
+                into contiguous page ranges extracted across a process pool
+                (``DOC_EXTRACT_PROCESSES``); results come back in page order
+  • streaming - ``iter_pdf_lines`` yields normalized lines page by page, so a
+                caller that gives up early (no table header in the first
+                lines) stops the extraction there
+  • cache     - the extracted per-page line arrays (and a Word document's
+                paragraphs and table cells) are kept per SHA-1 of the bytes and
+                extraction mode, in memory and gzip'd JSON under
+                ``DOC_CACHE_DIR``, so re-imports never re-extract; an early
+                stop caches the pages read so far and the next read resumes
+  • timing    - every extraction records per-page seconds; see
+                ``doc_extract_stats()``
+
+Configuration via environment variables:
+  DOC_EXTRACT_PROCESSES   - extraction processes (default min(4, cpus); <=1 is serial)
+  DOC_PARALLEL_MIN_PAGES  - smallest PDF extracted in parallel (default 8)
+  DOC_CACHE_DIR           - on-disk line cache (default <db dir>/doc_cache)
+  DOC_CACHE_MAX_MB        - on-disk cache cap (default 100; 0 disables it)
+  DOC_CACHE_SIZE          - documents kept in memory (default 16)
+"""
+
+from __future__ import annotations
+
+import gzip
+import hashlib
+import io
+import json
+import logging
+import os
+import re
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+
+log = logging.getLogger("doc_extract")
+
+PROCESSES = int(os.getenv("DOC_EXTRACT_PROCESSES", str(min(4, os.cpu_count() or 1))))
+PARALLEL_MIN_PAGES = int(os.getenv("DOC_PARALLEL_MIN_PAGES", "8"))
+MAX_BYTES = int(float(os.getenv("DOC_CACHE_MAX_MB", "100")) * 1024 * 1024)
+MEMORY_SIZE = int(os.getenv("DOC_CACHE_SIZE", "16"))
+SLOW_PAGE_SECONDS = 2.0
+
+STATS = {"extractions": 0, "hits": 0, "disk_hits": 0, "pages": 0, "seconds": 0.0,
+         "parallel": 0, "slowest_page_seconds": 0.0, "last": None}
+
+_lock = threading.Lock()
+_memory: "OrderedDict[str, object]" = OrderedDict()
+_pool = None
+
+_WS_RE = re.compile(r"\s+")
+
+
+def cache_dir() -> str:
+    if os.getenv("DOC_CACHE_DIR"):
+        return os.getenv("DOC_CACHE_DIR")
+    from app.config import DATABASE_PATH
+    return os.path.join(os.path.dirname(DATABASE_PATH), "doc_cache")
+
+
+def _norm(raw) -> str:
+    return _WS_RE.sub(" ", str(raw or "")).strip()
+
+
+# ─── Cache (memory LRU in front of gzip'd JSON on disk) ──────────────────────
+
+def _key(content: bytes, mode: str) -> str:
+    return f"{mode}_{hashlib.sha1(content).hexdigest()}"
+
+
+def _cache_get(key: str):
+    with _lock:
+        if key in _memory:
+            _memory.move_to_end(key)
+            STATS["hits"] += 1
+            return _memory[key]
+    if MAX_BYTES <= 0:
+        return None
+    path = os.path.join(cache_dir(), key + ".json.gz")
+    try:
+        with gzip.open(path, "rt", encoding="utf-8") as f:
+            value = json.load(f)
+        os.utime(path)
+    except (OSError, ValueError):
+        return None
+    with _lock:
+        STATS["disk_hits"] += 1
+    _remember(key, value)
+    return value
+
+
+def _remember(key: str, value) -> None:
+    if MEMORY_SIZE <= 0:
+        return
+    with _lock:
+        _memory[key] = value
+        _memory.move_to_end(key)
+        while len(_memory) > MEMORY_SIZE:
+            _memory.popitem(last=False)
+
+
+def _cache_put(key: str, value) -> None:
+    _remember(key, value)
+    if MAX_BYTES <= 0:
+        return
+    d = cache_dir()
+    try:
+        os.makedirs(d, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=d, prefix=".tmp_")
+        with os.fdopen(fd, "wb") as raw, gzip.open(raw, "wt", encoding="utf-8") as f:
+            json.dump(value, f)
+        os.replace(tmp, os.path.join(d, key + ".json.gz"))
+        _evict(d)
+    except OSError as exc:
+        log.warning("doc cache write failed for %s: %s", key, exc)
+
+
+def _evict(d: str) -> None:
+    files = []
+    for name in os.listdir(d):
+        if not name.endswith(".json.gz"):
+            continue
+        try:
+            st = os.stat(os.path.join(d, name))
+        except OSError:
+            continue
+        files.append((st.st_mtime, st.st_size, name))
+    total = sum(f[1] for f in files)
+    for _mtime, size, name in sorted(files):
+        if total <= MAX_BYTES:
+            break
+        try:
+            os.remove(os.path.join(d, name))
+            total -= size
+        except OSError:
+            pass
+
+
+def clear_cache() -> None:
+    with _lock:
+        _memory.clear()
+    d = cache_dir()
+    if os.path.isdir(d):
+        for name in os.listdir(d):
+            try:
+                os.remove(os.path.join(d, name))
+            except OSError:
+                pass
+
+
+# ─── PDF ──────────────────────────────────────────────────────────────────────
+
+def _reader(content: bytes):
+    try:
+        from pypdf import PdfReader
+    except Exception as exc:
+        raise ValueError("PDF parsing dependency missing. Install 'pypdf'.") from exc
+    return PdfReader(io.BytesIO(content))
+
+
+def _page_lines(page, layout: bool) -> list[str]:
+    if layout:
+        # Layout mode preserves column spacing so a header row and each detail
+        # row stay intact and in reading order; older pypdf lacks the kwarg.
+        try:
+            txt = page.extract_text(extraction_mode="layout") or ""
+        except TypeError:
+            txt = page.extract_text() or ""
+    else:
+        txt = page.extract_text() or ""
+    return [s for s in (_norm(raw) for raw in txt.splitlines()) if s]
+
+
+def _extract_range(content: bytes, start: int, stop: int, layout: bool) -> list[tuple]:
+    """Worker: [(page_index, lines, seconds), ...] for pages [start, stop)."""
+    reader = _reader(content)
+    out = []
+    for i in range(start, stop):
+        t = time.perf_counter()
+        lines = _page_lines(reader.pages[i], layout)
+        out.append((i, lines, time.perf_counter() - t))
+    return out
+
+
+def _get_pool():
+    global _pool
+    with _lock:
+        if _pool is None:
+            import multiprocessing
+            from concurrent.futures import ProcessPoolExecutor
+            # spawn, not fork: the hub has live threads and SQLite handles.
+            _pool = ProcessPoolExecutor(max_workers=PROCESSES,
+                                        mp_context=multiprocessing.get_context("spawn"))
+        return _pool
+
+
+def _extract_pages(content: bytes, layout: bool, start: int = 0):
+    """Yield (page_index, lines, seconds) in page order from page ``start``."""
+    reader = _reader(content)
+    n = len(reader.pages)
+    done = start
+    if PROCESSES > 1 and n - start >= PARALLEL_MIN_PAGES:
+        step = -(-(n - start) // (PROCESSES * 2))   # two ranges per process balances uneven pages
+        ranges = [(s, min(n, s + step)) for s in range(start, n, step)]
+        try:
+            pool = _get_pool()
+            futures = [pool.submit(_extract_range, content, s, e, layout) for s, e in ranges]
+            with _lock:
+                STATS["parallel"] += 1
+            for fut in futures:
+                for item in fut.result():
+                    done = item[0] + 1
+                    yield item
+            return
+        except GeneratorExit:
+            for fut in futures:
+                fut.cancel()
+            raise
+        except Exception as exc:
+            log.warning("parallel PDF extraction failed at page %d, continuing serially: %s", done, exc)
+    for i in range(done, n):
+        t = time.perf_counter()
+        lines = _page_lines(reader.pages[i], layout)
+        yield i, lines, time.perf_counter() - t
+
+
+def _record(key: str, page_seconds: list[float], complete: bool) -> None:
+    total = sum(page_seconds)
+    slowest = max(page_seconds, default=0.0)
+    with _lock:
+        STATS["extractions"] += 1
+        STATS["pages"] += len(page_seconds)
+        STATS["seconds"] += total
+        STATS["slowest_page_seconds"] = max(STATS["slowest_page_seconds"], slowest)
+        STATS["last"] = {"key": key, "pages": len(page_seconds), "complete": complete,
+                         "seconds": round(total, 4),
+                         "page_seconds": [round(s, 4) for s in page_seconds]}
+    if slowest >= SLOW_PAGE_SECONDS:
+        log.info("PDF extraction %s: %d pages in %.1fs (slowest page %.1fs)",
+                 key, len(page_seconds), total, slowest)
+
+
+def iter_pdf_lines(content: bytes, layout: bool = False):
+    """Normalized, non-empty text lines of a PDF, page by page.
+
+    Pages already extracted for this file come from the cache; the rest are
+    extracted (in parallel for long documents) and added to it. A caller that
+    stops early still caches the pages it read, so the next read resumes
+    after them instead of starting over."""
+    key = _key(content, "pdf-layout" if layout else "pdf")
+    cached = _cache_get(key) or {"pages": [], "complete": False}
+    pages = list(cached["pages"])
+    for lines in pages:
+        yield from lines
+    if cached["complete"]:
+        return
+    seconds: list[float] = []
+    complete = False
+    try:
+        for _i, lines, secs in _extract_pages(content, layout, start=len(pages)):
+            pages.append(lines)
+            seconds.append(secs)
+            yield from lines
+        complete = True
+    finally:
+        if seconds:
+            _record(key, seconds, complete)
+        if seconds or complete:
+            _cache_put(key, {"pages": pages, "complete": complete})
+
+
+def pdf_lines(content: bytes, layout: bool = False) -> list[str]:
+    return list(iter_pdf_lines(content, layout))
+
+
+# ─── Word ─────────────────────────────────────────────────────────────────────
+
+def docx_content(content: bytes) -> dict:
+    """{"paragraphs": [text, ...], "tables": [[[cell text, ...], ...], ...]}
+    for a .docx, cached per file like PDF lines."""
+    key = _key(content, "docx")
+    cached = _cache_get(key)
+    if cached is not None:
+        return cached
+    try:
+        from docx import Document
+    except Exception as exc:  # pragma: no cover - dependency guard
+        raise ValueError("Word parsing dependency missing. Install 'python-docx'.") from exc
+    t = time.perf_counter()
+    doc = Document(io.BytesIO(content))
+    value = {
+        "paragraphs": [p.text or "" for p in doc.paragraphs],
+        "tables": [[[c.text or "" for c in tr.cells] for tr in table.rows] for table in doc.tables],
+    }
+    _record(key, [time.perf_counter() - t], True)
+    _cache_put(key, value)
+    return value
+
+
+def docx_lines(content: bytes) -> list[str]:
+    """Paragraph lines followed by each table row flattened to one line."""
+    doc = docx_content(content)
+    lines = [s for s in (_norm(p) for p in doc["paragraphs"]) if s]
+    for table in doc["tables"]:
+        for cells in table:
+            s = _norm(" ".join(cells))
+            if s:
+                lines.append(s)
+    return lines
+
+
+def doc_extract_stats() -> dict:
+    with _lock:
+        out = dict(STATS)
+        out["memory_cached"] = len(_memory)
+    out["seconds"] = round(out["seconds"], 3)
+    out["processes"] = PROCESSES
+    return out
@@ -15,6 +15,7 @@ quality still produce a useful confidence score.
 from __future__ import annotations
 
 import asyncio
+import os
 import re
 import time
 from typing import Optional
@@ -44,21 +45,29 @@ _MX_CACHE: dict[str, tuple[float, list[str]]] = {}
 _CATCHALL_CACHE: dict[str, tuple[float, bool]] = {}
 _VERIFY_CACHE: dict[str, tuple[float, dict]] = {}
 _CACHE_TTL = 6 * 3600  # 6 hours
+# A greylist (4xx) or a timeout / dropped session says nothing about the
+# mailbox, so those answers are re-probed much sooner than definitive ones.
+_INCONCLUSIVE_SMTP = ("tempfail", "error")
+_INCONCLUSIVE_TTL = 15 * 60
 
 
 def _cache_get(c: dict, key: str):
     e = c.get(key)
     if not e:
         return None
-    ts, val = e
-    if time.time() - ts > _CACHE_TTL:
+    expires, val = e
+    if time.time() > expires:
         c.pop(key, None)
         return None
     return val
 
 
-def _cache_put(c: dict, key: str, val):
-    c[key] = (time.time(), val)
+def _cache_put(c: dict, key: str, val, ttl: float = _CACHE_TTL):
+    c[key] = (time.time() + ttl, val)
+
+
+def _verdict_ttl(out: dict) -> float:
+    return _INCONCLUSIVE_TTL if out.get("smtp_result") in _INCONCLUSIVE_SMTP else _CACHE_TTL
 
 
 # ─── DNS over HTTPS (Cloudflare) ────────────────────────────────────────
@@ -120,22 +129,73 @@ async def lookup_mx(domain: str, client: Optional[httpx.AsyncClient] = None) ->
 
 # ─── SMTP RCPT probe ────────────────────────────────────────────────────
 
+# Port used for RCPT probes. Overridable so tests can point the verifier at a
+# local SMTP stand-in instead of a real MX on port 25.
+SMTP_PROBE_PORT = int(os.getenv("SMTP_PROBE_PORT", "25"))
+
+# Max simultaneous SMTP sessions opened against one MX host during a batch.
+# Big providers (Google / Microsoft) throttle or tarpit hosts that open many
+# parallel connections, which turns every RCPT into a tempfail.
+_MX_HOST_CONCURRENCY = 2
+
+# Greylisting servers answer 450/451 to the first RCPT from an unknown sender
+# and accept the same triple after a short delay.
+_GREYLIST_RETRY_DELAY = float(os.getenv("EMAIL_VERIFY_GREYLIST_DELAY", "8"))
+
+
+async def _read_reply(reader: asyncio.StreamReader, timeout: float) -> str:
+    """Read one (possibly multi-line) SMTP reply. Returns all lines joined.
+
+    Multi-line replies (``250-...`` continuation lines, as sent for EHLO) must
+    be consumed completely or the next command reads a stale line.
+    """
+    lines: list[str] = []
+    while True:
+        try:
+            data = await asyncio.wait_for(reader.readline(), timeout=timeout)
+        except Exception:
+            break
+        if not data:
+            break
+        line = data.decode("ascii", errors="ignore").rstrip("\r\n")
+        lines.append(line)
+        if len(line) < 4 or line[3] != "-":
+            break
+    return "\n".join(lines)
+
+
+def _rcpt_status(resp: str) -> str:
+    code = resp[:3]
+    if code.startswith("2"):
+        return "ok"
+    if code.startswith("4"):
+        return "tempfail"
+    if code.startswith("5"):
+        return "rejected"
+    return "error"
+
+
 async def _smtp_probe(
     mx_host: str,
     addresses: list[str],
     helo_domain: str = "medpharma-hub.onrender.com",
     mail_from: str = "verify@medpharma-hub.onrender.com",
     timeout: float = 8.0,
+    port: Optional[int] = None,
 ) -> dict[str, str]:
     """Open SMTP connection to MX and probe each address with RCPT TO.
 
+    All addresses share one session. When the server advertises PIPELINING
+    the RCPT commands are written in one burst and the replies read back in
+    order (RFC 2920); otherwise they are sent one at a time.
+
     Returns {address: "ok" | "rejected" | "tempfail" | "error"}.
     Best effort — many providers block port 25 outbound.
     """
     results: dict[str, str] = {a: "error" for a in addresses}
     try:
         reader, writer = await asyncio.wait_for(
-            asyncio.open_connection(mx_host, 25), timeout=timeout
+            asyncio.open_connection(mx_host, port or SMTP_PROBE_PORT), timeout=timeout
         )
     except Exception:
         return results
@@ -143,36 +203,33 @@ async def _smtp_probe(
     async def _send(line: str) -> str:
         writer.write((line + "\r\n").encode("ascii", errors="ignore"))
         await writer.drain()
-        try:
-            data = await asyncio.wait_for(reader.readline(), timeout=timeout)
-            return data.decode("ascii", errors="ignore").strip()
-        except Exception:
-            return ""
+        return await _read_reply(reader, timeout)
 
     try:
         # Greeting
-        try:
-            await asyncio.wait_for(reader.readline(), timeout=timeout)
-        except Exception:
+        if not (await _read_reply(reader, timeout)).startswith("2"):
             return results
         ehlo = await _send(f"EHLO {helo_domain}")
-        if not ehlo.startswith("2"):
+        pipelining = False
+        if ehlo.startswith("2"):
+            pipelining = any(
+                ln[4:].strip().upper().startswith("PIPELINING")
+                for ln in ehlo.split("\n")
+            )
+        else:
             await _send(f"HELO {helo_domain}")
         # MAIL FROM
         mf = await _send(f"MAIL FROM:<{mail_from}>")
         if not mf.startswith("2"):
             return results
-        for addr in addresses:
-            resp = await _send(f"RCPT TO:<{addr}>")
-            code = resp[:3]
-            if code.startswith("2"):
-                results[addr] = "ok"
-            elif code.startswith("4"):
-                results[addr] = "tempfail"
-            elif code.startswith("5"):
-                results[addr] = "rejected"
-            else:
-                results[addr] = "error"
+        if pipelining and len(addresses) > 1:
+            writer.write("".join(f"RCPT TO:<{a}>\r\n" for a in addresses).encode("ascii", errors="ignore"))
+            await writer.drain()
+            for addr in addresses:
+                results[addr] = _rcpt_status(await _read_reply(reader, timeout))
+        else:
+            for addr in addresses:
+                results[addr] = _rcpt_status(await _send(f"RCPT TO:<{addr}>"))
         try:
             await _send("QUIT")
         except Exception:
@@ -186,6 +243,10 @@ async def _smtp_probe(
     return results
 
 
+def _catchall_probe_address(domain: str) -> str:
+    return f"zz-noexist-{int(time.time()) % 100000}@{domain}"
+
+
 async def detect_catchall(domain: str, mx_hosts: list[str]) -> bool:
     """Probe a random nonsense address. If accepted, domain is catch-all."""
     cached = _cache_get(_CATCHALL_CACHE, domain)
@@ -194,25 +255,19 @@ async def detect_catchall(domain: str, mx_hosts: list[str]) -> bool:
     if not mx_hosts:
         _cache_put(_CATCHALL_CACHE, domain, False)
         return False
-    probe = f"zz-noexist-{int(time.time()) % 100000}@{domain}"
+    probe = _catchall_probe_address(domain)
     res = await _smtp_probe(mx_hosts[0], [probe])
     is_catchall = res.get(probe) == "ok"
     _cache_put(_CATCHALL_CACHE, domain, is_catchall)
     return is_catchall
 
 
-# ─── Public API ─────────────────────────────────────────────────────────
+# ─── Scoring helpers ────────────────────────────────────────────────────
 
-async def verify_email(
-    email: str,
-    client: Optional[httpx.AsyncClient] = None,
-    do_smtp: bool = True,
-) -> dict:
-    """Verify a single email. Returns:
-      {
-        email, valid_syntax, is_role, is_disposable,
-        mx_found, mx_hosts, smtp_result, catchall, score, verdict, reason
-      }
+def _precheck(email: str) -> tuple[dict, bool]:
+    """Syntax / disposable / role checks. Returns (result, needs_network).
+
+    When ``needs_network`` is False the result is already final.
     """
     out = {
         "email": email,
@@ -229,54 +284,45 @@ async def verify_email(
     }
     if not email or "@" not in email:
         out["reason"] = "no @"
-        return out
+        return out, False
     email = email.lower().strip()
     out["email"] = email
     if not _SYNTAX_RE.match(email):
         out["reason"] = "bad syntax"
-        return out
+        return out, False
     out["valid_syntax"] = True
 
     local, _, domain = email.partition("@")
     if domain in _DISPOSABLE:
         out["is_disposable"] = True
         out["reason"] = "disposable domain"
-        return out
+        return out, False
     if local in _ROLE_LOCALS:
         out["is_role"] = True
+    return out, True
 
-    cached = _cache_get(_VERIFY_CACHE, email)
-    if cached is not None:
-        return cached
 
-    mx = await lookup_mx(domain, client=client)
-    out["mx_hosts"] = mx
-    out["mx_found"] = bool(mx)
-    if not mx:
-        out["reason"] = "no MX"
-        out["verdict"] = "undeliverable"
-        out["score"] = 0
-        _cache_put(_VERIFY_CACHE, email, out)
-        return out
+def _apply_no_mx(out: dict) -> dict:
+    out["reason"] = "no MX"
+    out["verdict"] = "undeliverable"
+    out["score"] = 0
+    return out
 
-    if not do_smtp:
-        # No SMTP probe — score on MX + role/syntax signals only
-        score = 45 if mx else 0
-        if out["is_role"]:
-            score -= 5
-        out["score"] = max(0, min(100, score))
-        out["verdict"] = "risky" if score >= 30 else "unknown"
-        out["reason"] = "MX-only check (smtp disabled)"
-        _cache_put(_VERIFY_CACHE, email, out)
-        return out
 
-    # SMTP probe
-    catchall = await detect_catchall(domain, mx)
+def _apply_mx_only(out: dict) -> dict:
+    # No SMTP probe — score on MX + role/syntax signals only
+    score = 45 if out["mx_found"] else 0
+    if out["is_role"]:
+        score -= 5
+    out["score"] = max(0, min(100, score))
+    out["verdict"] = "risky" if score >= 30 else "unknown"
+    out["reason"] = "MX-only check (smtp disabled)"
+    return out
+
+
+def _apply_smtp(out: dict, rcpt: str, catchall: bool) -> dict:
     out["catchall"] = catchall
-    smtp_res = await _smtp_probe(mx[0], [email])
-    rcpt = smtp_res.get(email, "error")
     out["smtp_result"] = rcpt
-
     if rcpt == "rejected":
         out["verdict"] = "undeliverable"
         out["score"] = 5
@@ -301,26 +347,197 @@ async def verify_email(
         out["score"] = score
         out["verdict"] = "risky"
         out["reason"] = "SMTP probe inconclusive (port 25 may be blocked)"
+    return out
+
+
+# ─── Public API ─────────────────────────────────────────────────────────
 
-    _cache_put(_VERIFY_CACHE, email, out)
+async def verify_email(
+    email: str,
+    client: Optional[httpx.AsyncClient] = None,
+    do_smtp: bool = True,
+) -> dict:
+    """Verify a single email. Returns:
+      {
+        email, valid_syntax, is_role, is_disposable,
+        mx_found, mx_hosts, smtp_result, catchall, score, verdict, reason
+      }
+    """
+    out, needs_network = _precheck(email)
+    if not needs_network:
+        return out
+    email = out["email"]
+    domain = email.partition("@")[2]
+
+    cached = _cache_get(_VERIFY_CACHE, email)
+    if cached is not None:
+        return cached
+
+    mx = await lookup_mx(domain, client=client)
+    out["mx_hosts"] = mx
+    out["mx_found"] = bool(mx)
+    if not mx:
+        _cache_put(_VERIFY_CACHE, email, _apply_no_mx(out))
+        return out
+
+    if not do_smtp:
+        _cache_put(_VERIFY_CACHE, email, _apply_mx_only(out))
+        return out
+
+    # SMTP probe
+    catchall = await detect_catchall(domain, mx)
+    smtp_res = await _smtp_probe(mx[0], [email])
+    _apply_smtp(out, smtp_res.get(email, "error"), catchall)
+
+    _cache_put(_VERIFY_CACHE, email, out, _verdict_ttl(out))
     return out
 
 
+async def _verify_domain(
+    domain: str,
+    outs: list[dict],
+    client: httpx.AsyncClient,
+    do_smtp: bool,
+    host_sems: dict[str, asyncio.Semaphore],
+    greylist_retry_delay: float,
+) -> None:
+    """Verify every address of one domain in place.
+
+    One MX lookup, and one SMTP session that carries the catch-all probe
+    (when not already cached) plus every candidate RCPT. Addresses answered
+    with a 4xx are retried once in a fresh session after
+    ``greylist_retry_delay`` seconds.
+    """
+    mx = await lookup_mx(domain, client=client)
+    for out in outs:
+        out["mx_hosts"] = mx
+        out["mx_found"] = bool(mx)
+    if not mx:
+        for out in outs:
+            _apply_no_mx(out)
+        return
+    if not do_smtp:
+        for out in outs:
+            _apply_mx_only(out)
+        return
+
+    host = mx[0]
+    sem = host_sems.setdefault(host, asyncio.Semaphore(_MX_HOST_CONCURRENCY))
+    addrs = [o["email"] for o in outs]
+
+    catchall = _cache_get(_CATCHALL_CACHE, domain)
+    probe = None if catchall is not None else _catchall_probe_address(domain)
+    async with sem:
+        res = await _smtp_probe(host, ([probe] if probe else []) + addrs)
+    if probe:
+        probe_res = res.pop(probe, "error")
+        catchall = probe_res == "ok"
+        _cache_put(_CATCHALL_CACHE, domain, catchall,
+                   _INCONCLUSIVE_TTL if probe_res in _INCONCLUSIVE_SMTP else _CACHE_TTL)
+
+    tempfailed = [a for a in addrs if res.get(a) == "tempfail"]
+    if tempfailed and greylist_retry_delay >= 0:
+        await asyncio.sleep(greylist_retry_delay)
+        async with sem:
+            res.update(await _smtp_probe(host, tempfailed))
+
+    for out in outs:
+        _apply_smtp(out, res.get(out["email"], "error"), bool(catchall))
+
+
+def _load_stored(emails: list[str]) -> dict[str, dict]:
+    try:
+        from app.database import get_email_verifications
+        return get_email_verifications(emails)
+    except Exception:
+        return {}
+
+
+def _store(results: list[dict]) -> None:
+    try:
+        from app.database import save_email_verifications
+        save_email_verifications(results)
+    except Exception:
+        pass
+
+
 async def verify_batch(
     emails: list[str],
     do_smtp: bool = True,
     concurrency: int = 6,
+    persist: bool = True,
+    greylist_retry_delay: Optional[float] = None,
 ) -> list[dict]:
-    """Verify many emails in parallel. Reuses one HTTP client for DNS lookups."""
+    """Verify many emails, grouped by domain. Returns results in input order.
+
+    Each domain gets one MX lookup, one catch-all probe and one SMTP session
+    (RCPTs pipelined where supported); ``concurrency`` bounds how many domains
+    are in flight and each MX host is capped at ``_MX_HOST_CONCURRENCY``
+    sessions. With ``persist`` the results are written to (and fresh ones read
+    back from) the ``email_verifications`` table so re-runs skip the network.
+    """
+    if greylist_retry_delay is None:
+        greylist_retry_delay = _GREYLIST_RETRY_DELAY
+
+    results: dict[str, dict] = {}
+    by_domain: dict[str, list[dict]] = {}
+    for e in emails:
+        out, needs_network = _precheck(e)
+        key = out["email"]
+        if key in results:
+            continue
+        cached = _cache_get(_VERIFY_CACHE, key) if needs_network else None
+        if not needs_network or cached is not None:
+            results[key] = cached if cached is not None else out
+            continue
+        results[key] = out
+        by_domain.setdefault(key.partition("@")[2], []).append(out)
+
+    if persist and by_domain:
+        pending = [o["email"] for outs in by_domain.values() for o in outs]
+        stored = _load_stored(pending)
+        # Only SMTP-backed verdicts satisfy an SMTP request.
+        usable = {
+            k: v for k, v in stored.items()
+            if not do_smtp or v.get("smtp_result") is not None
+        }
+        if usable:
+            for domain in list(by_domain):
+                keep = []
+                for o in by_domain[domain]:
+                    if o["email"] in usable:
+                        results[o["email"]] = usable[o["email"]]
+                    else:
+                        keep.append(o)
+                if keep:
+                    by_domain[domain] = keep
+                else:
+                    del by_domain[domain]
+
     sem = asyncio.Semaphore(concurrency)
+    host_sems: dict[str, asyncio.Semaphore] = {}
     async with httpx.AsyncClient(timeout=8.0) as client:
-        async def _one(e: str) -> dict:
+        async def _one(domain: str, outs: list[dict]) -> None:
             async with sem:
                 try:
-                    return await verify_email(e, client=client, do_smtp=do_smtp)
+                    await _verify_domain(domain, outs, client, do_smtp, host_sems, greylist_retry_delay)
                 except Exception as exc:
-                    return {
-                        "email": e, "valid_syntax": False, "score": 0,
-                        "verdict": "unknown", "reason": f"verify error: {exc}",
-                    }
-        return await asyncio.gather(*[_one(e) for e in emails])
+                    for out in outs:
+                        out.update({
+                            "valid_syntax": False, "score": 0,
+                            "verdict": "unknown", "reason": f"verify error: {exc}",
+                        })
+                    return
+            for out in outs:
+                _cache_put(_VERIFY_CACHE, out["email"], out, _verdict_ttl(out))
+
+        await asyncio.gather(*[_one(d, outs) for d, outs in by_domain.items()])
+
+    if persist and by_domain:
+        _store([o for outs in by_domain.values() for o in outs if o["verdict"] != "unknown"])
+
+    ordered = []
+    for e in emails:
+        key = (e or "").lower().strip() if e and "@" in e else e
+        ordered.append(results.get(key) or _precheck(e)[0])
+    return ordered
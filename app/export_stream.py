@@ -0,0 +1,245 @@
+"""
+Streaming export engine for the section exports (``/export/{section}``).
+
+Exports used to materialize the whole section as dicts and then build the
+complete CSV / XLSX / PDF payload in memory before handing it to the
+response - a full claims history briefly doubled or tripled the process's
+memory. Each format here consumes a row iterator (``iter_export_rows``, one
+keyset page at a time) with memory bounded regardless of row count:
+
+  • csv         - an incremental writer yields encoded chunks every
+                  ``chunk_rows`` rows
+  • xlsx        - openpyxl's write-only workbook (rows are not kept) saved to
+                  a temp file that is then streamed from disk; the styled
+                  header and column widths are kept, widths sized from the
+                  first ``WIDTH_SAMPLE_ROWS`` rows
+  • pdf         - only the first ``PDF_MAX_ROWS`` rows are read; the table is
+                  built in ``PDF_CHUNK_ROWS``-row blocks (one huge platypus
+                  Table is what made long PDFs slow to split into pages)
+  • background  - ``write_export`` renders to a file under ``EXPORT_DIR`` for
+                  the background-job mode; files older than a day are swept
+
+Configuration via environment variables:
+  EXPORT_DIR             - finished background exports (default <db dir>/exports)
+  EXPORT_PDF_MAX_ROWS    - rows rendered into a PDF export (default 1000)
+"""
+
+from __future__ import annotations
+
+import csv
+import io
+import logging
+import os
+import tempfile
+import time
+from itertools import islice
+
+from app.config import DATABASE_PATH, business_now
+
+log = logging.getLogger("export_stream")
+
+PDF_MAX_ROWS = int(os.getenv("EXPORT_PDF_MAX_ROWS", "1000"))
+PDF_CHUNK_ROWS = 100
+WIDTH_SAMPLE_ROWS = 500
+CHUNK_BYTES = 1 << 16
+MAX_AGE_SECONDS = 86400
+
+MEDIA_TYPES = {
+    "csv": "text/csv",
+    "xlsx": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+    "pdf": "application/pdf",
+}
+
+
+def export_dir() -> str:
+    return os.getenv("EXPORT_DIR") or os.path.join(os.path.dirname(DATABASE_PATH), "exports")
+
+
+def _cell(value):
+    return "" if value is None else value
+
+
+# ─── CSV ──────────────────────────────────────────────────────────────────────
+
+def iter_csv(headers: list, rows, chunk_rows: int = 500):
+    """UTF-8 CSV bytes for ``rows`` in chunks of ``chunk_rows`` lines."""
+    buf = io.StringIO()
+    writer = csv.writer(buf)
+    writer.writerow(headers)
+    n = 0
+    for r in rows:
+        writer.writerow([_cell(r.get(h)) for h in headers])
+        n += 1
+        if n % chunk_rows == 0:
+            yield buf.getvalue().encode("utf-8")
+            buf.seek(0)
+            buf.truncate()
+    yield buf.getvalue().encode("utf-8")
+
+
+# ─── XLSX ─────────────────────────────────────────────────────────────────────
+
+def write_xlsx(headers: list, rows, title: str, fileobj) -> None:
+    from openpyxl import Workbook
+    from openpyxl.cell import WriteOnlyCell
+    from openpyxl.styles import Alignment, Font, PatternFill
+    from openpyxl.utils import get_column_letter
+
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet(title=(title or "Sheet1")[:31])
+    rows = iter(rows)
+    # Column widths must be set before the first row is written, so size them
+    # from a bounded sample that is then written out ahead of the rest.
+    sample = list(islice(rows, WIDTH_SAMPLE_ROWS))
+    for i, h in enumerate(headers, start=1):
+        longest = max((len(str(r.get(h))) for r in sample if r.get(h) is not None), default=0)
+        ws.column_dimensions[get_column_letter(i)].width = min(60, max(10, len(str(h)) + 2, longest + 2))
+    fill = PatternFill("solid", fgColor="0D47A1")
+    font = Font(bold=True, color="FFFFFF")
+    align = Alignment(horizontal="left", vertical="center")
+    header_cells = []
+    for h in headers:
+        c = WriteOnlyCell(ws, value=h)
+        c.fill, c.font, c.alignment = fill, font, align
+        header_cells.append(c)
+    ws.append(header_cells)
+    for r in sample:
+        ws.append([_cell(r.get(h)) for h in headers])
+    for r in rows:
+        ws.append([_cell(r.get(h)) for h in headers])
+    wb.save(fileobj)
+
+
+def iter_xlsx(headers: list, rows, title: str):
+    """The workbook spooled to a temp file, then streamed from disk."""
+    with tempfile.TemporaryFile(suffix=".xlsx") as tmp:
+        write_xlsx(headers, rows, title, tmp)
+        tmp.seek(0)
+        while True:
+            chunk = tmp.read(CHUNK_BYTES)
+            if not chunk:
+                return
+            yield chunk
+
+
+# ─── PDF ──────────────────────────────────────────────────────────────────────
+
+def write_pdf(headers: list, rows, title: str, total: int, fileobj) -> None:
+    """Landscape table of the first PDF_MAX_ROWS rows (first 10 columns);
+    ``total`` is the full row count for the subtitle and the overflow note."""
+    from reportlab.lib.colors import HexColor
+    from reportlab.lib.enums import TA_LEFT
+    from reportlab.lib.pagesizes import landscape, letter
+    from reportlab.lib.styles import ParagraphStyle, getSampleStyleSheet
+    from reportlab.lib.units import inch
+    from reportlab.platypus import Paragraph, SimpleDocTemplate, Spacer, Table, TableStyle
+
+    doc = SimpleDocTemplate(fileobj, pagesize=landscape(letter),
+                            topMargin=0.4 * inch, bottomMargin=0.4 * inch,
+                            leftMargin=0.4 * inch, rightMargin=0.4 * inch)
+    styles = getSampleStyleSheet()
+    blue = HexColor("#0d47a1")
+    light = HexColor("#e3f2fd")
+    grey = HexColor("#6b7280")
+    styles.add(ParagraphStyle("ExportTitle", parent=styles["Title"], fontSize=16,
+                              textColor=blue, alignment=TA_LEFT, spaceAfter=6))
+    styles.add(ParagraphStyle("ExportSub", parent=styles["Normal"], fontSize=9,
+                              textColor=grey, spaceAfter=12))
+    story = [
+        Paragraph(title or "Export", styles["ExportTitle"]),
+        Paragraph(f"Generated {business_now().strftime('%B %d, %Y %I:%M %p')} — {total} row(s)",
+                  styles["ExportSub"]),
+    ]
+    # Limit columns to keep the PDF readable
+    cols = headers[:10]
+    col_w = max(0.7 * inch, (doc.width / max(1, len(cols))))
+    style = TableStyle([
+        ("BACKGROUND", (0, 0), (-1, 0), blue),
+        ("TEXTCOLOR", (0, 0), (-1, 0), HexColor("#ffffff")),
+        ("FONTSIZE", (0, 0), (-1, 0), 8),
+        ("FONTSIZE", (0, 1), (-1, -1), 7),
+        ("ROWBACKGROUNDS", (0, 1), (-1, -1), [HexColor("#ffffff"), light]),
+        ("GRID", (0, 0), (-1, -1), 0.25, HexColor("#cbd5e1")),
+        ("VALIGN", (0, 0), (-1, -1), "TOP"),
+        ("LEFTPADDING", (0, 0), (-1, -1), 3),
+        ("RIGHTPADDING", (0, 0), (-1, -1), 3),
+    ])
+    rows = islice(iter(rows), PDF_MAX_ROWS)
+    shown = 0
+    while True:
+        block = [[str(_cell(r.get(h)))[:80] for h in cols] for r in islice(rows, PDF_CHUNK_ROWS)]
+        if not block:
+            break
+        shown += len(block)
+        # Each block repeats the header, so a page break between blocks still
+        # reads as one table.
+        story.append(Table([cols] + block, repeatRows=1, colWidths=[col_w] * len(cols), style=style))
+    if not shown:
+        story.append(Paragraph("No records to export for the current selection.", styles["Normal"]))
+    elif total > shown:
+        story.append(Spacer(1, 8))
+        story.append(Paragraph(f"Showing first {shown:,} of {total} rows — use CSV/Excel for full data.",
+                               styles["ExportSub"]))
+    doc.build(story)
+
+
+def iter_pdf(headers: list, rows, title: str, total: int):
+    with tempfile.TemporaryFile(suffix=".pdf") as tmp:
+        write_pdf(headers, rows, title, total, tmp)
+        tmp.seek(0)
+        while True:
+            chunk = tmp.read(CHUNK_BYTES)
+            if not chunk:
+                return
+            yield chunk
+
+
+# ─── Dispatch ─────────────────────────────────────────────────────────────────
+
+def iter_export(fmt: str, headers: list, rows, title: str, total: int):
+    """Chunks of the rendered export, for a StreamingResponse."""
+    if fmt == "csv":
+        return iter_csv(headers, rows)
+    if fmt == "xlsx":
+        return iter_xlsx(headers, rows, title)
+    if fmt == "pdf":
+        return iter_pdf(headers, rows, f"{title} Export", total)
+    raise ValueError("format must be csv, xlsx, or pdf")
+
+
+def _sweep() -> None:
+    cutoff = time.time() - MAX_AGE_SECONDS
+    try:
+        for name in os.listdir(export_dir()):
+            path = os.path.join(export_dir(), name)
+            if os.path.getmtime(path) < cutoff:
+                os.remove(path)
+    except OSError:
+        pass
+
+
+def write_export(fmt: str, headers: list, rows, title: str, total: int, name: str) -> dict:
+    """Render an export to ``EXPORT_DIR/name`` (background-job mode)."""
+    d = export_dir()
+    os.makedirs(d, exist_ok=True)
+    _sweep()
+    path = os.path.join(d, name)
+    fd, tmp = tempfile.mkstemp(dir=d, prefix=".tmp_")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            for chunk in iter_export(fmt, headers, rows, title, total):
+                f.write(chunk)
+        os.replace(tmp, path)
+    except BaseException:
+        try:
+            os.remove(tmp)
+        except OSError:
+            pass
+        raise
+    return {"file": name, "bytes": os.path.getsize(path)}
+
+
+def export_path(name: str) -> str | None:
+    """Path of a finished background export, or None once swept."""
+    path = os.path.join(export_dir(), os.path.basename(name or ""))
+    return path if name and os.path.isfile(path) else None
@@ -4,16 +4,18 @@ import os
 import time
 import shutil
 import logging
-from datetime import datetime
 from fastapi import FastAPI, Request
 from fastapi.responses import HTMLResponse, Response, RedirectResponse, JSONResponse
 from fastapi.staticfiles import StaticFiles
 
-from app.client_db import get_db, init_client_hub_db, normalize_claim_statuses, validate_session, backfill_missing_bill_dates, backfill_dos_from_claim_key, dedupe_resubmitted_claims
+from app.client_db import get_db, init_client_hub_db, validate_session
 from app.client_routes import router as client_hub_router
 from app.notifications import start_daily_scheduler, get_notification_status
 from app.config import DATABASE_PATH
 from app.build_info import BUILD_MARKER
+from app.startup_repairs import (
+    STARTUP_STEPS, prewarm_lazy_imports, run_startup_repairs, startup_step, startup_report,
+)
 
 IS_PROD = bool(os.getenv("PORT"))  # Render sets PORT; local dev does not
 log = logging.getLogger(__name__)
@@ -33,58 +35,15 @@ if os.path.isdir(_STATIC_DIR):
 
 
 def _backup_db():
-    """Create a timestamped backup of the SQLite database before any startup modifications.
-
-    Safety: if the live DB currently holds ZERO claims (e.g. it was wiped, or an
-    account holding all the data was deleted), do NOT create a backup and do NOT
-    rotate. A wiped DB always reports 0 claims, so this stops an empty snapshot
-    from pushing a still-good pre-loss backup out of the retention window.
-    Backups named KEEP_*.db are manually-preserved good copies and are never
-    rotated out."""
-    try:
-        if not os.path.exists(DATABASE_PATH):
-            log.info("No database file found - skipping backup")
-            return
-        size = os.path.getsize(DATABASE_PATH)
-        if size < 4096:  # empty/fresh DB, nothing worth backing up
-            log.info(f"Database too small ({size} bytes) - skipping backup")
-            return
-        # Never let an empty-of-claims DB create a snapshot or rotate out good
-        # backups. This is the guard that protects a pre-loss backup from being
-        # deleted by routine restarts after a data-loss event.
-        try:
-            import sqlite3 as _sqlite
-            _bc = _sqlite.connect(f"file:{DATABASE_PATH}?mode=ro", uri=True)
-            _claim_n = _bc.execute("SELECT COUNT(*) FROM claims_master").fetchone()[0]
-            _bc.close()
-        except Exception:
-            _claim_n = -1  # unknown -> fall through and back up (safe default)
-        if _claim_n == 0:
-            log.warning("Live DB has 0 claims - skipping backup + rotation to preserve existing backups")
-            return
-        backup_dir = os.path.join(os.path.dirname(DATABASE_PATH), "backups")
-        os.makedirs(backup_dir, exist_ok=True)
-        ts = datetime.now().strftime("%Y%m%d_%H%M%S")
-        dest = os.path.join(backup_dir, f"leads_{ts}.db")
-        log.info(f"Creating DB backup: {size:,} bytes")
-        shutil.copy2(DATABASE_PATH, dest)
-        log.info(f"DB backup created: {dest}")
-
-        # Keep the 20 most recent auto-backups; never rotate out protected
-        # KEEP_*.db snapshots (manually preserved good copies).
-        autos = sorted(
-            [os.path.join(backup_dir, f) for f in os.listdir(backup_dir)
-             if f.endswith(".db") and not f.startswith("KEEP_")],
-            key=os.path.getmtime,
-            reverse=True
-        )
-        for old in autos[20:]:
-            os.remove(old)
-            log.info(f"Removed old backup: {old}")
-    except Exception as e:
-        log.error(f"DB backup failed: {e}")
-        # Don't fail startup for backup issues
-        pass
+    """Snapshot the database before any startup modifications.
+
+    Skipped when a scheduled snapshot is younger than
+    BACKUP_STARTUP_FRESH_MINUTES, so restarts don't pay for a full copy; the
+    zero-claims / KEEP_* protections live in app.db_backup."""
+    from app.db_backup import create_backup, STARTUP_FRESH_MINUTES
+    result = create_backup("startup", fresh_minutes=STARTUP_FRESH_MINUTES)
+    if result.get("skipped"):
+        log.info(f"DB backup skipped: {result['skipped']}")
 
 
 @app.on_event("startup")
@@ -92,6 +51,7 @@ async def startup():
     logging.basicConfig(level=logging.INFO)
     app.state.startup_ready = False
     app.state.startup_status = {"db": False, "scheduler": False}
+    STARTUP_STEPS.clear()
 
     # ── Safety: check persistent disk on production ──
     if IS_PROD:
@@ -105,75 +65,26 @@ async def startup():
 
     # ── Backup existing DB before any schema migrations ──
     try:
-        _backup_db()
+        with startup_step("db_backup"):
+            _backup_db()
     except Exception as e:
         log.error(f"Startup error: DB backup failed: {e}")
 
     try:
-        init_client_hub_db()
+        with startup_step("init_client_hub_db", kind="schema"):
+            init_client_hub_db()
         log.info("✅ Client hub database initialized")
         app.state.startup_status["db"] = True
     except Exception as e:
         log.error(f"Startup error: client DB init failed: {e}")
         raise RuntimeError("Client hub database initialization failed") from e
 
-    try:
-        normalize_claim_statuses()
-        log.info("✅ Claim statuses normalized")
-    except Exception as e:
-        log.error(f"Startup error: normalize_claim_statuses failed: {e}")
-
-    try:
-        fixed = backfill_missing_bill_dates()
-        if fixed:
-            log.info(f"✅ Backfilled Bill Date on {fixed} billed claim(s)")
-        else:
-            log.info("✅ Bill Dates already complete (nothing to backfill)")
-    except Exception as e:
-        log.error(f"Startup error: backfill_missing_bill_dates failed: {e}")
-
-    try:
-        dos_fixed = backfill_dos_from_claim_key()
-        if dos_fixed:
-            log.info(f"✅ Recovered DOS from accession on {dos_fixed} claim(s)")
-        else:
-            log.info("✅ Dates of service already complete (nothing to recover)")
-    except Exception as e:
-        log.error(f"Startup error: backfill_dos_from_claim_key failed: {e}")
-
-    try:
-        from app.client_routes import auto_import_pending_claim_files
-        swept = auto_import_pending_claim_files()
-        if swept.get("files"):
-            log.info("✅ Auto-imported %s claim row(s) from %s pending file(s)",
-                     swept["rows"], swept["files"])
-        else:
-            log.info("✅ No pending claim files to auto-import")
-    except Exception as e:
-        log.error(f"Startup error: auto_import_pending_claim_files failed: {e}")
-
-    try:
-        from app.client_routes import auto_import_pending_payment_files
-        pswept = auto_import_pending_payment_files()
-        if pswept.get("rows"):
-            log.info("✅ Posted %s deposit payment row(s) totaling %.2f from ERA/deposit registers",
-                     pswept["rows"], pswept["amount"])
-        else:
-            log.info("✅ No deposit/ERA registers to post")
-    except Exception as e:
-        log.error(f"Startup error: auto_import_pending_payment_files failed: {e}")
-
-    try:
-        collapsed = dedupe_resubmitted_claims()
-        if collapsed:
-            log.info(f"✅ Collapsed {collapsed} duplicate resubmitted claim line(s)")
-        else:
-            log.info("✅ No duplicate resubmitted claims to reconcile")
-    except Exception as e:
-        log.error(f"Startup error: dedupe_resubmitted_claims failed: {e}")
+    # ── Data repairs: each runs only when its tables changed since last boot ──
+    run_startup_repairs()
 
     try:
-        start_daily_scheduler()
+        with startup_step("start_daily_scheduler"):
+            start_daily_scheduler()
         log.info("✅ Daily scheduler started")
         app.state.startup_status["scheduler"] = True
     except Exception as e:
@@ -182,6 +93,10 @@ async def startup():
     app.state.startup_ready = True
     log.info("🚀 Hub service startup complete")
 
+    # Eligibility, PDF/XLSX, AI and parser libraries load on first use; warm
+    # them in the background once the port is up so that first use is fast.
+    prewarm_lazy_imports()
+
 
 @app.middleware("http")
 async def _no_store_api_responses(request: Request, call_next):
@@ -280,7 +195,8 @@ async def readyz():
     if not app.state.startup_ready or not app.state.startup_status.get("db"):
         return JSONResponse(
             status_code=503,
-            content={"ok": False, "service": "hub", "ready": False, "status": app.state.startup_status},
+            content={"ok": False, "service": "hub", "ready": False, "status": app.state.startup_status,
+                     "startup": startup_report()},
         )
 
     try:
@@ -315,6 +231,7 @@ async def readyz():
         "ready": True,
         "status": app.state.startup_status,
         "chat_encryption": chat_enc,
+        "startup": startup_report(),
     }
 
 
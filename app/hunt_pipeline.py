@@ -0,0 +1,404 @@
+"""Staged, resumable hunt pipeline.
+
+`prospect_and_scrub` and the national pull used to run a whole hunt as one
+`asyncio.gather`: a restart (Render redeploy, scheduler overlap) or a row
+that tripped the 25 s per-row cap threw every finished row away. This module
+runs the same work as explicit stages:
+
+    fetch      → NPPES pull, checkpointed per state
+    lab_filter → cross-state dedupe + lab-name filter, per NPI
+    enrich     → domain / email / social / CLIA / hook for one prospect
+                 (`bulk_prospector._dm_row_builder`), per NPI
+    score      → reach / quality filters + heat sort (`_finalize_dm_rows`)
+    export     → caller-supplied writer (CSV, hub import, ...)
+
+Every per-key result is checkpointed in the `hunt_checkpoints` table keyed by
+(run_key, stage, item_key). Re-running with the same `run_key` skips finished
+items, so a national pull can advance a few hundred rows per scheduler tick
+(`budget_seconds`) instead of needing one long uninterrupted window. Each
+stage has its own concurrency limit and reports items / failures / latency.
+
+Run keys carry their date, so a finished run's checkpoints are only needed
+while that day's ticks keep re-reading them. `prune_checkpoints` deletes
+every run not touched for `HUNT_CHECKPOINT_RETAIN_DAYS` (default 7); each
+run calls it at most once an hour per database.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import os
+import sqlite3
+import time
+from typing import Any, Awaitable, Callable, Optional
+
+from app.config import DB_PATH as CONFIG_DB_PATH
+
+log = logging.getLogger(__name__)
+
+DB_PATH = os.environ.get("DB_PATH", CONFIG_DB_PATH)
+
+STAGES = ("fetch", "lab_filter", "enrich", "score", "export")
+
+# Per-stage concurrency. Enrichment is network-heavy (scraping, DNS, SMTP)
+# so it stays low unless the run is in fast mode (no network per row).
+DEFAULT_CONCURRENCY = {
+    "fetch": 8,
+    "lab_filter": 200,
+    "enrich": 3,
+    "enrich_fast": 100,
+}
+
+# A row that failed (timeout / exception) is retried on later ticks until it
+# has been attempted this many times, then it is left as failed.
+MAX_ATTEMPTS = 2
+
+# Runs whose newest checkpoint is older than this are swept (0 keeps all).
+CHECKPOINT_RETAIN_DAYS = float(os.environ.get("HUNT_CHECKPOINT_RETAIN_DAYS", "7"))
+PRUNE_INTERVAL_SECONDS = 3600
+
+_SCHEMA = """
+    CREATE TABLE IF NOT EXISTS hunt_checkpoints (
+        run_key TEXT NOT NULL,
+        stage TEXT NOT NULL,
+        item_key TEXT NOT NULL,
+        status TEXT NOT NULL,
+        attempts INTEGER DEFAULT 1,
+        elapsed_ms INTEGER DEFAULT 0,
+        payload_json TEXT DEFAULT 'null',
+        updated_at INTEGER,
+        PRIMARY KEY (run_key, stage, item_key)
+    );
+    CREATE INDEX IF NOT EXISTS idx_hunt_checkpoints_status
+        ON hunt_checkpoints(run_key, stage, status);
+    CREATE INDEX IF NOT EXISTS idx_hunt_checkpoints_run_updated
+        ON hunt_checkpoints(run_key, updated_at);
+"""
+
+_last_prune: dict[str, float] = {}
+
+
+def _connect(db_path: str) -> sqlite3.Connection:
+    parent = os.path.dirname(db_path)
+    if parent:
+        os.makedirs(parent, exist_ok=True)
+    conn = sqlite3.connect(db_path, timeout=30)
+    conn.execute("PRAGMA busy_timeout=30000")
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.executescript(_SCHEMA)
+    return conn
+
+
+def prune_checkpoints(db_path: Optional[str] = None, *,
+                      retain_days: Optional[float] = None) -> int:
+    """Delete the checkpoints of every run whose newest row is older than
+    ``retain_days``. A whole run goes at once, so a run that is still being
+    resumed never loses part of its rows. Returns rows deleted."""
+    retain_days = CHECKPOINT_RETAIN_DAYS if retain_days is None else retain_days
+    if retain_days <= 0:
+        return 0
+    cutoff = int(time.time() - retain_days * 86400)
+    conn = _connect(db_path or DB_PATH)
+    try:
+        cur = conn.execute(
+            "DELETE FROM hunt_checkpoints WHERE run_key IN ("
+            " SELECT run_key FROM hunt_checkpoints GROUP BY run_key"
+            " HAVING MAX(COALESCE(updated_at, 0)) < ?)",
+            (cutoff,),
+        )
+        conn.commit()
+        deleted = cur.rowcount
+    finally:
+        conn.close()
+    if deleted:
+        log.info(f"[hunt-pipeline] pruned {deleted} checkpoints older than {retain_days:g}d")
+    return deleted
+
+
+def _maybe_prune(db_path: str) -> None:
+    now = time.monotonic()
+    last = _last_prune.get(db_path)
+    if last is not None and now - last < PRUNE_INTERVAL_SECONDS:
+        return
+    _last_prune[db_path] = now
+    try:
+        prune_checkpoints(db_path)
+    except sqlite3.Error as exc:
+        log.warning(f"[hunt-pipeline] checkpoint prune failed: {exc}")
+
+
+class StageStats:
+    """Throughput / latency counters for one stage of one invocation."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.processed = 0
+        self.resumed = 0
+        self.failed = 0
+        self.dropped = 0
+        self.latencies_ms: list[int] = []
+        self.wall_seconds = 0.0
+
+    def as_dict(self) -> dict[str, Any]:
+        lat = sorted(self.latencies_ms)
+        p95 = lat[min(len(lat) - 1, int(len(lat) * 0.95))] if lat else 0
+        return {
+            "stage": self.name,
+            "processed": self.processed,
+            "resumed": self.resumed,
+            "failed": self.failed,
+            "dropped": self.dropped,
+            "wall_seconds": round(self.wall_seconds, 3),
+            "throughput_per_s": round(self.processed / self.wall_seconds, 2) if self.wall_seconds else 0.0,
+            "avg_ms": int(sum(lat) / len(lat)) if lat else 0,
+            "p95_ms": p95,
+        }
+
+
+class HuntPipeline:
+    """Run a hunt as checkpointed stages under a stable ``run_key``.
+
+    The same key resumes: items already checkpointed ``ok`` / ``dropped`` are
+    loaded instead of recomputed. ``budget_seconds`` stops launching new
+    enrichment work once elapsed so a scheduler tick stays bounded; the
+    result then has ``complete=False`` and the next call picks up the rest.
+    """
+
+    def __init__(
+        self,
+        run_key: str,
+        *,
+        db_path: Optional[str] = None,
+        concurrency: Optional[dict[str, int]] = None,
+        row_timeout: Optional[float] = None,
+    ):
+        from app.bulk_prospector import DM_ROW_TIMEOUT
+
+        self.run_key = run_key
+        self.db_path = db_path or DB_PATH
+        self.concurrency = {**DEFAULT_CONCURRENCY, **(concurrency or {})}
+        self.row_timeout = row_timeout or DM_ROW_TIMEOUT
+        self.stats: dict[str, StageStats] = {s: StageStats(s) for s in STAGES}
+
+    # ── checkpoint store ────────────────────────────────────────────────
+
+    def _load(self, stage: str) -> dict[str, tuple[str, int, Any]]:
+        conn = _connect(self.db_path)
+        try:
+            rows = conn.execute(
+                "SELECT item_key, status, attempts, payload_json FROM hunt_checkpoints "
+                "WHERE run_key = ? AND stage = ?",
+                (self.run_key, stage),
+            ).fetchall()
+        finally:
+            conn.close()
+        out: dict[str, tuple[str, int, Any]] = {}
+        for key, status, attempts, payload in rows:
+            try:
+                out[key] = (status, attempts or 0, json.loads(payload or "null"))
+            except (json.JSONDecodeError, TypeError):
+                out[key] = (status, attempts or 0, None)
+        return out
+
+    def _save(self, stage: str, items: list[tuple[str, str, int, int, Any]]) -> None:
+        """Upsert (item_key, status, attempts, elapsed_ms, payload) rows."""
+        if not items:
+            return
+        now = int(time.time())
+        conn = _connect(self.db_path)
+        try:
+            conn.executemany(
+                "INSERT OR REPLACE INTO hunt_checkpoints "
+                "(run_key, stage, item_key, status, attempts, elapsed_ms, payload_json, updated_at) "
+                "VALUES (?,?,?,?,?,?,?,?)",
+                [
+                    (self.run_key, stage, k, st, att, ms, json.dumps(payload, default=str), now)
+                    for k, st, att, ms, payload in items
+                ],
+            )
+            conn.commit()
+        finally:
+            conn.close()
+
+    def reset(self) -> None:
+        """Forget every checkpoint of this run (start over)."""
+        conn = _connect(self.db_path)
+        try:
+            conn.execute("DELETE FROM hunt_checkpoints WHERE run_key = ?", (self.run_key,))
+            conn.commit()
+        finally:
+            conn.close()
+
+    async def _run_stage(
+        self,
+        stage: str,
+        items: dict[str, Any],
+        fn: Callable[[Any], Awaitable[Any]],
+        *,
+        limit: int,
+        timeout: Optional[float] = None,
+        deadline: Optional[float] = None,
+        flush_every: int = 25,
+    ) -> tuple[dict[str, Any], bool]:
+        """Apply ``fn`` to every item not already checkpointed.
+
+        ``fn`` returns the payload to keep, or None to mark the item dropped.
+        Returns ({item_key: payload} for kept items, complete?).
+        """
+        st = self.stats[stage]
+        done = self._load(stage)
+        results: dict[str, Any] = {}
+        todo: list[str] = []
+        for key in items:
+            prev = done.get(key)
+            if prev and (prev[0] in ("ok", "dropped") or prev[1] >= MAX_ATTEMPTS):
+                st.resumed += 1
+                if prev[0] == "ok":
+                    results[key] = prev[2]
+                continue
+            todo.append(key)
+
+        sem = asyncio.Semaphore(max(1, limit))
+        pending: list[tuple[str, str, int, int, Any]] = []
+        skipped = 0
+        retryable = 0
+        t0 = time.perf_counter()
+
+        async def _one(key: str) -> None:
+            nonlocal skipped, retryable
+            async with sem:
+                if deadline is not None and time.monotonic() >= deadline:
+                    skipped += 1
+                    return
+                attempts = (done.get(key) or ("", 0, None))[1] + 1
+                ts = time.perf_counter()
+                try:
+                    coro = fn(items[key])
+                    payload = await (asyncio.wait_for(coro, timeout=timeout) if timeout else coro)
+                    status = "ok" if payload is not None else "dropped"
+                except Exception as exc:
+                    log.info(f"[hunt-pipeline] {stage} {key} failed: {exc!r}")
+                    payload, status = None, "failed"
+                ms = int((time.perf_counter() - ts) * 1000)
+                st.latencies_ms.append(ms)
+                st.processed += 1
+                if status == "ok":
+                    results[key] = payload
+                elif status == "dropped":
+                    st.dropped += 1
+                else:
+                    st.failed += 1
+                    if attempts < MAX_ATTEMPTS:
+                        retryable += 1
+                pending.append((key, status, attempts, ms, payload))
+                if len(pending) >= flush_every:
+                    batch = pending[:]
+                    pending.clear()
+                    self._save(stage, batch)
+
+        await asyncio.gather(*[_one(k) for k in todo])
+        self._save(stage, pending)
+        st.wall_seconds += time.perf_counter() - t0
+        return results, skipped == 0 and retryable == 0
+
+    # ── the hunt ────────────────────────────────────────────────────────
+
+    async def run(
+        self,
+        states: list[str],
+        *,
+        specialty: str = "all_labs",
+        per_state: int = 50,
+        new_only: bool = False,
+        new_days: int = 90,
+        fast: bool = False,
+        budget_seconds: Optional[float] = None,
+        export: Optional[Callable[[list[dict], dict], Any]] = None,
+    ) -> dict[str, Any]:
+        """Run (or resume) the hunt. Returns the `_enrich_dm_only` result shape
+        plus ``complete`` and a ``pipeline`` per-stage summary.
+
+        ``export(rows, summary)`` runs only once every stage is complete.
+        """
+        from app.bulk_prospector import (
+            prospect_state, _looks_like_lab, _recent, _dm_row_builder,
+            _finalize_dm_rows,
+        )
+        from app.linkedin_resolver import reset_run_budget
+
+        deadline = time.monotonic() + budget_seconds if budget_seconds else None
+        t_start = time.time()
+        _maybe_prune(self.db_path)
+
+        # 1. fetch — one NPPES pull per state
+        async def _fetch(state: str):
+            return await prospect_state(
+                state, specialty=specialty, limit=per_state,
+                new_only=new_only, new_days=new_days,
+            )
+
+        fetched, fetch_done = await self._run_stage(
+            "fetch", {s.upper(): s.upper() for s in states}, _fetch,
+            limit=self.concurrency["fetch"],
+        )
+
+        # 2. lab_filter — dedupe across states, re-check name / recency
+        candidates: dict[str, dict] = {}
+        for state in (s.upper() for s in states):
+            for p in fetched.get(state) or []:
+                key = str(p.get("npi") or p.get("organization_name", "")).lower()
+                if key and key not in candidates:
+                    candidates[key] = p
+
+        async def _filter(p: dict):
+            if not _looks_like_lab(p.get("organization_name", ""), p.get("taxonomy", "")):
+                return None
+            if new_only and not _recent(p.get("enumeration_date", ""), days=new_days):
+                return None
+            return p
+
+        prospects, _ = await self._run_stage(
+            "lab_filter", candidates, _filter, limit=self.concurrency["lab_filter"],
+        )
+
+        # 3. enrich — per NPI, bounded by the per-row timeout and tick budget
+        reset_run_budget()
+        builder = _dm_row_builder(fast=fast)
+        enriched, enrich_done = await self._run_stage(
+            "enrich", prospects, builder,
+            limit=self.concurrency["enrich_fast" if fast else "enrich"],
+            timeout=self.row_timeout, deadline=deadline,
+        )
+        complete = fetch_done and enrich_done
+
+        # 4. score — filters, heat sort and summary over every checkpointed row
+        ts = time.perf_counter()
+        rows = [r for r in enriched.values() if isinstance(r, dict)]
+        result = _finalize_dm_rows(rows, input_rows=len(prospects))
+        sc = self.stats["score"]
+        sc.processed = len(rows)
+        sc.dropped = len(rows) - len(result["rows"])
+        sc.wall_seconds = time.perf_counter() - ts
+
+        # 5. export — only once the run has every row
+        if complete and export is not None:
+            ts = time.perf_counter()
+            export(result["rows"], result["summary"])
+            ex = self.stats["export"]
+            ex.processed = len(result["rows"])
+            ex.wall_seconds = time.perf_counter() - ts
+
+        result["complete"] = complete
+        result["pipeline"] = {
+            "run_key": self.run_key,
+            "complete": complete,
+            "elapsed_seconds": round(time.time() - t_start, 2),
+            "stages": [self.stats[s].as_dict() for s in STAGES],
+        }
+        log.info(
+            f"[hunt-pipeline] {self.run_key} complete={complete} rows={len(result['rows'])} "
+            + " ".join(f"{s['stage']}={s['processed']}+{s['resumed']}r" for s in result["pipeline"]["stages"])
+        )
+        return result
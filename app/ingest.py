@@ -0,0 +1,220 @@
+"""
+Ingestion service: upload parsing and imports run off the event loop.
+
+The upload/import routes are ``async def`` but their work - openpyxl / xlrd /
+pypdf / python-docx parsing and thousands of SQLite writes - is synchronous.
+Run inline it blocked the event loop, so chat polls, heartbeats and the
+dashboard froze for everyone while one large file imported. This module
+gives those routes three pieces:
+
+  • spool     - ``spool_upload`` streams the request body to a file in the
+                spool directory in 1 MB chunks (enforcing the size limit as it
+                goes) instead of holding it in the route
+  • pool      - ``run`` executes the parse+import function on a bounded
+                thread pool (``INGEST_WORKERS``) and awaits it, so the route
+                keeps its synchronous response shape; ``submit_job`` queues the
+                same function as a tracked job (``jobs`` / ``job_events``)
+                and returns the job row immediately
+  • parsing   - ``parse_ahead`` builds large spreadsheets' ParsedWorkbook in a
+                worker process (``INGEST_PARSE_PROCESSES``) and seeds the
+                shared workbook cache, so the CPU-bound parse doesn't hold the
+                GIL the event loop needs; smaller files parse in the thread
+
+Configuration via environment variables:
+  INGEST_WORKERS             - concurrent ingestion threads (default 2)
+  INGEST_PARSE_PROCESSES     - parse processes (default 1; 0 parses in-thread)
+  INGEST_PROCESS_MIN_KB      - smallest spreadsheet sent to a process (default 256)
+  INGEST_SPOOL_DIR           - spool directory (default <db dir>/ingest_spool)
+"""
+
+from __future__ import annotations
+
+import asyncio
+import functools
+import logging
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from app.config import DATABASE_PATH
+
+log = logging.getLogger("ingest")
+
+WORKERS = max(1, int(os.getenv("INGEST_WORKERS", "2")))
+PARSE_PROCESSES = max(0, int(os.getenv("INGEST_PARSE_PROCESSES", "1")))
+PROCESS_MIN_BYTES = int(float(os.getenv("INGEST_PROCESS_MIN_KB", "256")) * 1024)
+SPOOL_MAX_AGE_SECONDS = 86400
+CHUNK_BYTES = 1024 * 1024
+
+SPREADSHEET_EXTS = (".xlsx", ".xlsm", ".xls", ".csv", ".ods", ".odf")
+
+STATS = {"runs": 0, "jobs": 0, "failed": 0, "process_parses": 0, "active": 0}
+
+_lock = threading.Lock()
+_pool = ThreadPoolExecutor(max_workers=WORKERS, thread_name_prefix="ingest")
+_parse_pool = None
+_swept = False
+
+
+def spool_dir() -> str:
+    return os.getenv("INGEST_SPOOL_DIR") or os.path.join(os.path.dirname(DATABASE_PATH), "ingest_spool")
+
+
+def _sweep_spool() -> None:
+    """Drop spool files left behind by a process that died mid-import."""
+    global _swept
+    if _swept:
+        return
+    _swept = True
+    cutoff = time.time() - SPOOL_MAX_AGE_SECONDS
+    try:
+        for name in os.listdir(spool_dir()):
+            path = os.path.join(spool_dir(), name)
+            if os.path.getmtime(path) < cutoff:
+                os.remove(path)
+    except OSError:
+        pass
+
+
+async def spool_upload(upload, max_bytes: int = None) -> tuple[str, int]:
+    """Stream an UploadFile to the spool directory. Returns (path, size);
+    raises ValueError (and removes the partial file) past ``max_bytes``."""
+    d = spool_dir()
+    os.makedirs(d, exist_ok=True)
+    _sweep_spool()
+    ext = os.path.splitext(getattr(upload, "filename", "") or "")[1].lower()
+    path = os.path.join(d, f"{uuid.uuid4().hex}{ext}")
+    size = 0
+    try:
+        with open(path, "wb") as f:
+            while True:
+                chunk = await upload.read(CHUNK_BYTES)
+                if not chunk:
+                    break
+                size += len(chunk)
+                if max_bytes is not None and size > max_bytes:
+                    raise ValueError(f"File too large. Maximum is {max_bytes // (1024 * 1024)}MB")
+                f.write(chunk)
+    except BaseException:
+        discard(path)
+        raise
+    return path, size
+
+
+def read_spool(path: str) -> bytes:
+    with open(path, "rb") as f:
+        return f.read()
+
+
+def discard(path: str) -> None:
+    if path:
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+
+def _get_parse_pool():
+    global _parse_pool
+    with _lock:
+        if _parse_pool is None:
+            import multiprocessing
+            from concurrent.futures import ProcessPoolExecutor
+            # spawn, not fork: the hub has live threads and SQLite handles.
+            _parse_pool = ProcessPoolExecutor(max_workers=PARSE_PROCESSES,
+                                              mp_context=multiprocessing.get_context("spawn"))
+        return _parse_pool
+
+
+def parse_ahead(content: bytes, ext: str) -> None:
+    """Parse a large spreadsheet in a worker process and seed the shared
+    workbook cache with the result. Small files, documents, a disabled pool
+    or any pool failure leave parsing to the importer's own thread."""
+    from app import workbook
+    if (PARSE_PROCESSES <= 0 or len(content) < PROCESS_MIN_BYTES
+            or (ext or "").lower() not in SPREADSHEET_EXTS or workbook.CACHE_SIZE <= 0):
+        return
+    try:
+        wb = _get_parse_pool().submit(workbook.read_workbook, content, ext).result()
+    except Exception as exc:
+        log.warning("process parse failed, parsing in-thread: %s", exc)
+        return
+    workbook.remember(content, ext, wb)
+    with _lock:
+        STATS["process_parses"] += 1
+
+
+def _tracked(fn, *args, **kwargs):
+    with _lock:
+        STATS["active"] += 1
+    try:
+        return fn(*args, **kwargs)
+    finally:
+        with _lock:
+            STATS["active"] -= 1
+
+
+async def run(fn, *args, **kwargs):
+    """Run ``fn(*args, **kwargs)`` on the ingestion pool and await its result;
+    exceptions (including HTTPException) propagate to the caller."""
+    with _lock:
+        STATS["runs"] += 1
+    fut = _pool.submit(functools.partial(_tracked, fn, *args, **kwargs))
+    return await asyncio.wrap_future(fut)
+
+
+def _error_text(exc: Exception) -> str:
+    detail = getattr(exc, "detail", None)
+    return str(detail if detail else exc) or type(exc).__name__
+
+
+def submit_job(job_type: str, work, *, account_id: int = None, created_by: str = "",
+               payload: dict = None, spool_path: str = None) -> dict:
+    """Queue ``work(progress)`` as a tracked job and return the job row.
+
+    ``progress(pct, stage="", message="")`` updates the job's progress and,
+    with a message, appends a job event. ``work``'s return value becomes the
+    job result; an exception fails the job. ``spool_path`` is removed when
+    the job finishes either way."""
+    from app.client_db import (
+        append_job_event, complete_job, create_job, fail_job, set_job_running,
+        update_job_progress,
+    )
+    job = create_job(account_id=account_id, job_type=job_type,
+                     created_by=created_by, payload=payload or {})
+    job_id = job["id"]
+    append_job_event(job_id, "queued", f"Queued {job_type.replace('_', ' ')}")
+
+    def progress(pct: int, stage: str = "", message: str = ""):
+        update_job_progress(job_id, pct)
+        if message:
+            append_job_event(job_id, stage or "progress", message)
+
+    def _runner():
+        try:
+            set_job_running(job_id, progress=5)
+            append_job_event(job_id, "start", "Started")
+            result = work(progress)
+            complete_job(job_id, result=result if isinstance(result, dict) else {"result": result})
+            append_job_event(job_id, "done", "Finished")
+        except Exception as exc:
+            with _lock:
+                STATS["failed"] += 1
+            msg = _error_text(exc)
+            log.warning("ingest job %s (%s) failed: %s", job_id, job_type, msg)
+            fail_job(job_id, msg)
+            append_job_event(job_id, "error", f"Failed: {msg[:200]}", "error")
+        finally:
+            discard(spool_path)
+
+    with _lock:
+        STATS["jobs"] += 1
+    _pool.submit(functools.partial(_tracked, _runner))
+    return job
+
+
+def ingest_stats() -> dict:
+    with _lock:
+        return {**STATS, "workers": WORKERS, "parse_processes": PARSE_PROCESSES}
@@ -0,0 +1,542 @@
+"""
+Outbound mail spool for report delivery.
+
+Report senders (EOD team report, per-client daily reports) enqueue one row
+per recipient into the ``outbound_mail`` table of the hub DB and a small
+worker pool drains it.  Each worker keeps one authenticated SMTP session
+open for the whole drain and all workers share one keep-alive SendGrid
+HTTP client, so a 40-recipient fan-out costs one TLS handshake per worker
+instead of one per message.
+
+  • dedupe_key   - (report, recipient, date); a second enqueue of the same
+                   key is a no-op unless ``requeue=True`` (manual resend)
+  • retries      - transient failures go back to ``queued`` with
+                   exponential backoff; permanent ones (5xx recipient
+                   refusal, no provider configured) fail immediately
+  • lease        - a claimed row is ``sending`` until settled; rows left
+                   ``sending`` by a crashed process are re-claimed after
+                   ``LEASE_SECONDS``
+  • status       - EOD rows (kind ``eod_report``) write their aggregate
+                   delivery status back via update_eod_report_email_status
+
+Configuration via environment variables:
+  MAIL_SPOOL_WORKERS         - parallel senders per drain (default 4)
+  MAIL_SPOOL_MAX_ATTEMPTS    - attempts before a row is marked failed (4)
+  MAIL_SPOOL_BACKOFF_SECONDS - first retry delay, doubled per attempt (20)
+  MAIL_SPOOL_SYNC_WAIT       - how long an inline send waits on retries (60)
+"""
+
+from __future__ import annotations
+
+import base64
+import json
+import logging
+import os
+import smtplib
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from email import encoders
+from email.mime.base import MIMEBase
+from email.mime.multipart import MIMEMultipart
+from email.mime.text import MIMEText
+
+log = logging.getLogger("mail_spool")
+
+SENDGRID_URL = "https://api.sendgrid.com/v3/mail/send"
+
+WORKERS = int(os.getenv("MAIL_SPOOL_WORKERS", "4"))
+MAX_ATTEMPTS = int(os.getenv("MAIL_SPOOL_MAX_ATTEMPTS", "4"))
+BACKOFF_SECONDS = float(os.getenv("MAIL_SPOOL_BACKOFF_SECONDS", "20"))
+MAX_BACKOFF_SECONDS = 15 * 60
+SYNC_WAIT_SECONDS = float(os.getenv("MAIL_SPOOL_SYNC_WAIT", "60"))
+LEASE_SECONDS = 10 * 60
+RETENTION_DAYS = 30
+
+NO_PROVIDER = "no provider configured (SendGrid/SMTP env vars missing)"
+
+_SCHEMA = """
+    CREATE TABLE IF NOT EXISTS outbound_mail (
+        id               INTEGER PRIMARY KEY AUTOINCREMENT,
+        dedupe_key       TEXT UNIQUE,
+        kind             TEXT DEFAULT '',
+        ref_id           INTEGER,
+        recipient        TEXT NOT NULL,
+        subject          TEXT DEFAULT '',
+        text_body        TEXT DEFAULT '',
+        html_body        TEXT DEFAULT '',
+        attachments_json TEXT DEFAULT '[]',
+        status           TEXT DEFAULT 'queued',
+        attempts         INTEGER DEFAULT 0,
+        next_attempt_at  REAL DEFAULT 0,
+        via              TEXT DEFAULT '',
+        last_error       TEXT DEFAULT '',
+        created_at       TEXT DEFAULT CURRENT_TIMESTAMP,
+        sent_at          TEXT
+    );
+    CREATE INDEX IF NOT EXISTS idx_outbound_mail_due
+        ON outbound_mail(status, next_attempt_at);
+    CREATE INDEX IF NOT EXISTS idx_outbound_mail_ref
+        ON outbound_mail(kind, ref_id);
+"""
+
+_RESULT_COLUMNS = (
+    "id, dedupe_key, kind, ref_id, recipient, status, attempts, via, last_error, sent_at"
+)
+
+
+def _connect():
+    from app.client_db import get_db
+    conn = get_db()
+    conn.execute("PRAGMA busy_timeout = 30000")
+    conn.executescript(_SCHEMA)
+    return conn
+
+
+# ── Queue ──
+
+def enqueue(recipient: str, subject: str, text_body: str = "", html_body: str = "",
+            attachments: list | None = None, *, dedupe_key: str | None = None,
+            kind: str = "", ref_id: int | None = None, requeue: bool = False) -> int:
+    """Queue one message for one recipient and return its spool id.
+
+    ``attachments`` uses the _send_email_to shape ({filename, content, mime}).
+    When ``dedupe_key`` already exists the existing row's id is returned and
+    nothing is re-sent, unless ``requeue`` is set and that row has settled
+    (sent / failed), in which case it is reset with the new content.
+    """
+    stored = json.dumps([
+        {
+            "filename": a["filename"],
+            "mime": a.get("mime", "application/octet-stream"),
+            "content": base64.b64encode(a["content"]).decode("ascii"),
+        }
+        for a in (attachments or []) if a.get("content")
+    ])
+    params = (kind, ref_id, recipient, subject, text_body or "", html_body or "", stored)
+    conn = _connect()
+    try:
+        cur = conn.execute(
+            "INSERT OR IGNORE INTO outbound_mail "
+            "(dedupe_key, kind, ref_id, recipient, subject, text_body, html_body, attachments_json) "
+            "VALUES (?,?,?,?,?,?,?,?)",
+            (dedupe_key, *params),
+        )
+        if cur.rowcount:
+            conn.commit()
+            return int(cur.lastrowid)
+        row = conn.execute(
+            "SELECT id, status FROM outbound_mail WHERE dedupe_key=?", (dedupe_key,)
+        ).fetchone()
+        if requeue and row["status"] in ("sent", "failed"):
+            conn.execute(
+                "UPDATE outbound_mail SET kind=?, ref_id=?, recipient=?, subject=?, "
+                "text_body=?, html_body=?, attachments_json=?, status='queued', "
+                "attempts=0, next_attempt_at=0, via='', last_error='', sent_at=NULL "
+                "WHERE id=?",
+                (*params, row["id"]),
+            )
+            conn.commit()
+        else:
+            log.info(f"Spool dedupe hit for {dedupe_key} (status={row['status']})")
+        return int(row["id"])
+    finally:
+        conn.close()
+
+
+def fetch(ids: list[int]) -> list[dict]:
+    """Delivery state (no bodies) for ``ids``, in the given order."""
+    if not ids:
+        return []
+    conn = _connect()
+    try:
+        marks = ",".join("?" * len(ids))
+        rows = conn.execute(
+            f"SELECT {_RESULT_COLUMNS} FROM outbound_mail WHERE id IN ({marks})", list(ids)
+        ).fetchall()
+    finally:
+        conn.close()
+    by_id = {r["id"]: dict(r) for r in rows}
+    return [by_id[i] for i in ids if i in by_id]
+
+
+def _claim(scope: list[int] | None) -> dict | None:
+    now = time.time()
+    where = "status IN ('queued','sending') AND next_attempt_at <= ?"
+    params: list = [now]
+    if scope is not None:
+        where += f" AND id IN ({','.join('?' * len(scope))})"
+        params.extend(scope)
+    conn = _connect()
+    try:
+        row = conn.execute(
+            "UPDATE outbound_mail SET status='sending', attempts=attempts+1, "
+            "next_attempt_at=? "
+            f"WHERE id = (SELECT id FROM outbound_mail WHERE {where} ORDER BY id LIMIT 1) "
+            "RETURNING *",
+            [now + LEASE_SECONDS, *params],
+        ).fetchone()
+        conn.commit()
+        return dict(row) if row else None
+    finally:
+        conn.close()
+
+
+def _settle(row: dict, ok: bool, detail: str, permanent: bool) -> None:
+    conn = _connect()
+    try:
+        if ok:
+            conn.execute(
+                "UPDATE outbound_mail SET status='sent', via=?, last_error='', sent_at=? WHERE id=?",
+                (detail, datetime.now().isoformat(timespec="seconds"), row["id"]),
+            )
+        elif permanent or row["attempts"] >= MAX_ATTEMPTS:
+            conn.execute(
+                "UPDATE outbound_mail SET status='failed', last_error=? WHERE id=?",
+                (detail, row["id"]),
+            )
+        else:
+            delay = min(BACKOFF_SECONDS * 2 ** (row["attempts"] - 1), MAX_BACKOFF_SECONDS)
+            conn.execute(
+                "UPDATE outbound_mail SET status='queued', next_attempt_at=?, last_error=? WHERE id=?",
+                (time.time() + delay, detail, row["id"]),
+            )
+        conn.commit()
+    finally:
+        conn.close()
+
+
+def _next_due(scope: list[int] | None) -> float | None:
+    where = "status = 'queued'"
+    params: list = []
+    if scope is not None:
+        where += f" AND id IN ({','.join('?' * len(scope))})"
+        params.extend(scope)
+    conn = _connect()
+    try:
+        row = conn.execute(
+            f"SELECT MIN(next_attempt_at) FROM outbound_mail WHERE {where}", params
+        ).fetchone()
+    finally:
+        conn.close()
+    return row[0]
+
+
+def purge(older_than_days: int = RETENTION_DAYS) -> int:
+    """Drop settled rows (and their attachment payloads) past retention."""
+    conn = _connect()
+    try:
+        # created_at is CURRENT_TIMESTAMP (UTC): build the cutoff on the same clock.
+        cur = conn.execute(
+            "DELETE FROM outbound_mail WHERE status IN ('sent','failed') "
+            "AND created_at < datetime('now', ?)",
+            (f"-{int(older_than_days)} days",),
+        )
+        conn.commit()
+        return cur.rowcount or 0
+    finally:
+        conn.close()
+
+
+# ── Transport ──
+
+_http_lock = threading.Lock()
+_http = None
+
+
+def http_client():
+    """Process-wide keep-alive httpx client for SendGrid (thread-safe)."""
+    global _http
+    with _http_lock:
+        if _http is None:
+            import httpx
+            _http = httpx.Client(
+                timeout=30,
+                limits=httpx.Limits(max_keepalive_connections=max(WORKERS, 2)),
+            )
+        return _http
+
+
+def _mime_message(msg: dict, from_addr: str):
+    """text+html alternative, wrapped in multipart/mixed when there are files."""
+    alt = MIMEMultipart("alternative")
+    alt.attach(MIMEText(msg.get("text_body") or "(no content)", "plain"))
+    if msg.get("html_body"):
+        alt.attach(MIMEText(msg["html_body"], "html"))
+    attachments = [a for a in msg.get("attachments") or [] if a.get("content")]
+    if attachments:
+        outer = MIMEMultipart("mixed")
+        outer.attach(alt)
+        for a in attachments:
+            part = MIMEBase(*a.get("mime", "application/octet-stream").split("/", 1))
+            part.set_payload(a["content"])
+            encoders.encode_base64(part)
+            part.add_header("Content-Disposition", f'attachment; filename="{a["filename"]}"')
+            outer.attach(part)
+    else:
+        outer = alt
+    outer["Subject"] = msg.get("subject", "")
+    outer["From"] = from_addr
+    outer["To"] = ", ".join(msg["to"])
+    return outer
+
+
+def _sendgrid_payload(msg: dict, from_addr: str) -> dict:
+    content = []
+    if msg.get("text_body"):
+        content.append({"type": "text/plain", "value": msg["text_body"]})
+    if msg.get("html_body"):
+        content.append({"type": "text/html", "value": msg["html_body"]})
+    if not content:
+        content.append({"type": "text/plain", "value": "(no content)"})
+    payload = {
+        "personalizations": [{"to": [{"email": addr} for addr in msg["to"]]}],
+        "from": {"email": from_addr, "name": "MedPharma Hub"},
+        "subject": msg.get("subject", ""),
+        "content": content,
+    }
+    attachments = [a for a in msg.get("attachments") or [] if a.get("content")]
+    if attachments:
+        payload["attachments"] = [
+            {
+                "content": base64.b64encode(a["content"]).decode("ascii"),
+                "filename": a["filename"],
+                "type": a.get("mime", "application/octet-stream"),
+                "disposition": "attachment",
+            }
+            for a in attachments
+        ]
+    return payload
+
+
+class MailTransport:
+    """One sender's delivery channel: SendGrid over the shared keep-alive
+    client, falling back to an SMTP session that is opened on first use and
+    reused for every later message until ``close()``."""
+
+    def __init__(self, cfg: dict, smtp_timeout: float = 30):
+        self.cfg = cfg
+        self.smtp_timeout = smtp_timeout
+        self._smtp: smtplib.SMTP | None = None
+        self.smtp_connects = 0
+
+    def _smtp_configured(self) -> bool:
+        return bool(self.cfg.get("SMTP_HOST") and self.cfg.get("SMTP_USER") and self.cfg.get("SMTP_PASS"))
+
+    def _smtp_session(self) -> smtplib.SMTP:
+        if self._smtp is None:
+            server = smtplib.SMTP(self.cfg["SMTP_HOST"], int(self.cfg["SMTP_PORT"]), timeout=self.smtp_timeout)
+            try:
+                server.ehlo()
+                if server.has_extn("starttls"):
+                    server.starttls()
+                    server.ehlo()
+                server.login(self.cfg["SMTP_USER"], self.cfg["SMTP_PASS"])
+            except Exception:
+                server.close()
+                raise
+            self._smtp = server
+            self.smtp_connects += 1
+        return self._smtp
+
+    def _drop_smtp(self) -> None:
+        if self._smtp is not None:
+            try:
+                self._smtp.quit()
+            except Exception:
+                self._smtp.close()
+            self._smtp = None
+
+    def close(self) -> None:
+        self._drop_smtp()
+
+    def _send_smtp(self, msg: dict) -> None:
+        from_addr = self.cfg.get("SMTP_USER") or self.cfg.get("SENDGRID_FROM", "")
+        raw = _mime_message(msg, from_addr).as_string()
+        for attempt in (1, 2):
+            try:
+                self._smtp_session().sendmail(from_addr, msg["to"], raw)
+                return
+            except (smtplib.SMTPServerDisconnected, ConnectionError):
+                # An idle reused session timed out server-side - reconnect once.
+                self._drop_smtp()
+                if attempt == 2:
+                    raise
+
+    def send(self, msg: dict) -> tuple[bool, str, bool]:
+        """Deliver ``msg`` ({to: [..], subject, text_body, html_body,
+        attachments}). Returns (sent, via-or-error, permanent_failure)."""
+        sg_key = self.cfg.get("SENDGRID_API_KEY")
+        sg_error = ""
+        if sg_key:
+            try:
+                resp = http_client().post(
+                    SENDGRID_URL,
+                    json=_sendgrid_payload(msg, self.cfg.get("SENDGRID_FROM", "")),
+                    headers={"Authorization": f"Bearer {sg_key}"},
+                )
+                if resp.status_code in (200, 202):
+                    return True, "sendgrid", False
+                sg_error = f"SendGrid {resp.status_code}: {resp.text[:300]}"
+            except Exception as e:
+                sg_error = f"SendGrid error: {e}"
+            log.error(f"{sg_error} (to={', '.join(msg['to'])})")
+
+        if not self._smtp_configured():
+            return False, sg_error or NO_PROVIDER, not sg_key
+
+        try:
+            self._send_smtp(msg)
+            return True, "smtp", False
+        except smtplib.SMTPRecipientsRefused as e:
+            codes = [code for code, _ in e.recipients.values()]
+            return False, f"smtp error: {e}", bool(codes) and min(codes) >= 500
+        except smtplib.SMTPResponseException as e:
+            self._drop_smtp()
+            return False, f"smtp error: {e}", e.smtp_code >= 500 and e.smtp_code != 535
+        except Exception as e:
+            self._drop_smtp()
+            return False, f"smtp error: {e}", False
+
+
+_default_lock = threading.Lock()
+_default_transport: MailTransport | None = None
+
+
+def send_now(to: list[str], subject: str, text_body: str = "", html_body: str = "",
+             attachments: list | None = None, cfg: dict | None = None) -> tuple[bool, str]:
+    """Immediate (unspooled) send over a process-wide reused transport.
+    Used by the ad-hoc notification helpers; reports go through the spool."""
+    global _default_transport
+    cfg = cfg or _live_config()
+    msg = {"to": list(to), "subject": subject, "text_body": text_body,
+           "html_body": html_body, "attachments": attachments or []}
+    with _default_lock:
+        if _default_transport is None or _default_transport.cfg != cfg:
+            if _default_transport is not None:
+                _default_transport.close()
+            _default_transport = MailTransport(cfg)
+        ok, detail, _ = _default_transport.send(msg)
+    return ok, detail
+
+
+def _live_config() -> dict:
+    from app.notifications import _live_config as _cfg
+    return _cfg()
+
+
+# ── Drain ──
+
+def _row_message(row: dict) -> dict:
+    return {
+        "to": [row["recipient"]],
+        "subject": row["subject"],
+        "text_body": row["text_body"],
+        "html_body": row["html_body"],
+        "attachments": [
+            {"filename": a["filename"], "mime": a["mime"], "content": base64.b64decode(a["content"])}
+            for a in json.loads(row["attachments_json"] or "[]")
+        ],
+    }
+
+
+def _worker(cfg: dict, scope: list[int] | None) -> list[dict]:
+    transport = MailTransport(cfg)
+    touched = []
+    try:
+        while True:
+            row = _claim(scope)
+            if row is None:
+                return touched
+            try:
+                ok, detail, permanent = transport.send(_row_message(row))
+            except Exception as e:
+                ok, detail, permanent = False, f"exception: {e}", False
+            _settle(row, ok, detail, permanent)
+            if ok:
+                log.info(f"Spool #{row['id']} sent via {detail} to {row['recipient']}: {row['subject']}")
+            else:
+                log.error(f"Spool #{row['id']} to {row['recipient']} failed "
+                          f"(attempt {row['attempts']}): {detail}")
+            touched.append({"id": row["id"], "kind": row["kind"], "ref_id": row["ref_id"]})
+    finally:
+        transport.close()
+
+
+def delivery_status(rows: list[dict]) -> str:
+    """Aggregate status for one report's spool rows (eod_reports vocabulary)."""
+    sent = [r for r in rows if r["status"] == "sent"]
+    failed = [r for r in rows if r["status"] == "failed"]
+    if any(r["status"] in ("queued", "sending") for r in rows):
+        return "retrying"
+    if sent and not failed:
+        return "delivered"
+    if sent:
+        return "partial"
+    if failed:
+        err = (failed[0].get("last_error") or "").lower()
+        if "not configured" in err or "no provider" in err or "missing" in err:
+            return "no_provider"
+        return "failed"
+    return "unknown"
+
+
+def _write_back_eod_status(ref_ids: set[int]) -> None:
+    from app.client_db import update_eod_report_email_status
+    conn = _connect()
+    try:
+        for ref_id in ref_ids:
+            rows = [dict(r) for r in conn.execute(
+                f"SELECT {_RESULT_COLUMNS} FROM outbound_mail WHERE kind='eod_report' AND ref_id=?",
+                (ref_id,),
+            ).fetchall()]
+            update_eod_report_email_status(
+                ref_id, delivery_status(rows), [r["recipient"] for r in rows if r["status"] == "sent"]
+            )
+    finally:
+        conn.close()
+
+
+def drain(ids: list[int] | None = None, *, workers: int | None = None,
+          wait_seconds: float = 0.0, cfg: dict | None = None) -> list[dict]:
+    """Deliver due spool rows with a bounded pool of ``workers`` senders.
+
+    ``ids`` limits the drain to one caller's batch (None = everything due).
+    With ``wait_seconds`` the drain sleeps through retry backoff for rows
+    still queued, up to that long; anything left is picked up by a later
+    ``drain()``.  Returns the final state of ``ids`` (or of every row touched).
+    """
+    if ids is not None and not ids:
+        return []
+    cfg = cfg or _live_config()
+    scope = list(ids) if ids is not None else None
+    workers = max(1, workers or WORKERS)
+    deadline = time.time() + max(0.0, wait_seconds)
+    touched: dict[int, dict] = {}
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="mail-spool") as pool:
+        while True:
+            for batch in pool.map(lambda _: _worker(cfg, scope), range(workers)):
+                touched.update((t["id"], t) for t in batch)
+            due = _next_due(scope)
+            if due is None or due > deadline:
+                break
+            time.sleep(max(0.0, due - time.time()))
+
+    eod_refs = {t["ref_id"] for t in touched.values() if t["kind"] == "eod_report" and t["ref_id"]}
+    if eod_refs:
+        try:
+            _write_back_eod_status(eod_refs)
+        except Exception:
+            log.exception("EOD delivery status write-back failed for %s", sorted(eod_refs))
+    return fetch(scope if scope is not None else sorted(touched))
+
+
+def drain_due() -> dict:
+    """Scheduler entry point: retry whatever is due and prune old rows."""
+    rows = drain()
+    purged = purge()
+    sent = sum(1 for r in rows if r["status"] == "sent")
+    if rows or purged:
+        log.info(f"Mail spool drain: attempted={len(rows)} sent={sent} purged={purged}")
+    return {"attempted": len(rows), "sent": sent, "purged": purged}
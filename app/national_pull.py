@@ -48,6 +48,8 @@ PER_STATE = int(os.environ.get("NATIONAL_PULL_PER_STATE", "30"))
 NEW_ONLY = os.environ.get("NATIONAL_PULL_NEW_ONLY", "0") == "1"
 NEW_DAYS = int(os.environ.get("NATIONAL_PULL_NEW_DAYS", "90"))
 DB_PATH = os.environ.get("DB_PATH", CONFIG_DB_PATH)
+# Seconds of enrichment per scheduler tick (0 = run the whole pull in one go).
+TICK_BUDGET_SECONDS = float(os.environ.get("NATIONAL_PULL_TICK_SECONDS", "0") or "0")
 
 # Daily national pull defaults to high-quality output.
 # QUALITY_FIRST keeps rows with at least a live website, CLIA, or any email.
@@ -102,12 +104,22 @@ async def _run_pull_async(
     states: list[str] | None = None,
     per_state: int | None = None,
     specialty: str | None = None,
+    budget_seconds: float | None = None,
 ) -> dict[str, Any]:
-    from app.bulk_prospector import prospect_multi_state, _enrich_dm_only
+    """Run (or resume) today's pull through the staged hunt pipeline.
+
+    Checkpoints live under ``national:<specialty>:<date>``, so with
+    ``budget_seconds`` each call advances the pull and the next call picks up
+    where it stopped. The CSV is rewritten with every row finished so far
+    after each call so the UI always has the latest partial pull.
+    """
+    from app.hunt_pipeline import HuntPipeline
 
     use_states = [s.upper() for s in states] if states else US_STATES_PLUS
     use_per_state = int(per_state) if per_state else PER_STATE
     use_specialty = (specialty or SPECIALTY).strip()
+    if budget_seconds is None:
+        budget_seconds = TICK_BUDGET_SECONDS or None
 
     t0 = time.time()
     log.info(f"[national-pull] start specialty={use_specialty} per_state={use_per_state} states={len(use_states)}")
@@ -115,59 +127,42 @@ async def _run_pull_async(
     date_str = datetime.now().strftime("%Y%m%d")
     csv_path = os.path.join(OUT_DIR, f"leads_national_{use_specialty}_{date_str}.csv")
 
-    all_rows: list[dict] = []
-    headers: list[str] = []
-    summary_total: dict[str, Any] = {}
-    states_done: list[str] = []
-
-    for st in use_states:
-        try:
-            ts = time.time()
-            prospects = await prospect_multi_state(
-                states=[st], specialty=use_specialty,
-                per_state=use_per_state, new_only=NEW_ONLY, new_days=NEW_DAYS,
-            )
-            if not prospects:
-                log.info(f"[national-pull] {st}: 0 prospects")
-                states_done.append(st)
-                continue
-            res = await _enrich_dm_only(prospects, fast=True)
-            rows = res.get("rows") or []
-            summ = res.get("summary") or {}
-            log.info(f"[national-pull] {st}: {len(prospects)} prospects -> {len(rows)} rows in {time.time()-ts:.1f}s")
-            if rows:
-                all_rows.extend(rows)
-                if not headers:
-                    headers = list(rows[0].keys())
-                # Checkpoint: rewrite CSV + record after every state
-                all_rows.sort(key=lambda r: -int(r.get("Heat Score") or 0))
-                # Ensure consistent header set (union)
-                hset = list(headers)
-                for r in all_rows:
-                    for k in r.keys():
-                        if k not in hset:
-                            hset.append(k)
-                headers = hset
-                with open(csv_path, "w", newline="", encoding="utf-8") as f:
-                    w = csv.DictWriter(f, fieldnames=headers, extrasaction="ignore")
-                    w.writeheader()
-                    for r in all_rows:
-                        w.writerow(r)
-                # Merge summary counters
-                for k, v in summ.items():
-                    if isinstance(v, (int, float)):
-                        summary_total[k] = summary_total.get(k, 0) + v
-                _record_pull(date_str, csv_path, len(all_rows), summary_total, use_specialty)
-            states_done.append(st)
-        except Exception as e:
-            log.exception(f"[national-pull] state {st} failed: {e}")
-
-    log.info(f"[national-pull] DONE {len(states_done)}/{len(use_states)} states, "
+    pipeline = HuntPipeline(f"national:{use_specialty}:{date_str}", db_path=DB_PATH)
+    try:
+        res = await pipeline.run(
+            use_states, specialty=use_specialty, per_state=use_per_state,
+            new_only=NEW_ONLY, new_days=NEW_DAYS, fast=True,
+            budget_seconds=budget_seconds,
+        )
+    except Exception as e:
+        log.exception(f"[national-pull] pipeline failed: {e}")
+        return {"ok": False, "reason": str(e)}
+
+    all_rows = res.get("rows") or []
+    summary_total = dict(res.get("summary") or {})
+    summary_total["pipeline"] = res.get("pipeline")
+    if all_rows:
+        # Union of headers across rows, in first-seen order
+        headers: list[str] = []
+        for r in all_rows:
+            for k in r.keys():
+                if k not in headers:
+                    headers.append(k)
+        with open(csv_path, "w", newline="", encoding="utf-8") as f:
+            w = csv.DictWriter(f, fieldnames=headers, extrasaction="ignore")
+            w.writeheader()
+            for r in all_rows:
+                w.writerow(r)
+        _record_pull(date_str, csv_path, len(all_rows), summary_total, use_specialty)
+
+    log.info(f"[national-pull] {'DONE' if res.get('complete') else 'PARTIAL'} "
              f"{len(all_rows)} rows -> {csv_path} total {time.time()-t0:.1f}s")
     if not all_rows:
-        return {"ok": False, "reason": "no enriched rows", "states_done": states_done}
+        return {"ok": False, "reason": "no enriched rows", "complete": res.get("complete"),
+                "pipeline": res.get("pipeline")}
     return {"ok": True, "csv_path": csv_path, "row_count": len(all_rows),
-            "summary": summary_total, "states_done": states_done}
+            "summary": summary_total, "complete": res.get("complete"),
+            "pipeline": res.get("pipeline")}
 
 
 def run_national_pull_job() -> None:
@@ -34,6 +34,7 @@ from datetime import datetime
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
 
+from app.ai_narrative import narrative_metrics
 from app.config import business_now, business_today_iso
 
 log = logging.getLogger("notifications")
@@ -297,20 +298,15 @@ Do NOT use bullet points; write in paragraph form. Do not include any greeting.
     if not OPENAI_API_KEY:
         return _rule_based_summary(username, session_hrs, benchmarks_data, overall_pct)
 
-    try:
-        from openai import OpenAI
-        client = OpenAI(api_key=OPENAI_API_KEY)
-        resp = client.chat.completions.create(
-            model="gpt-4o-mini",
-            messages=[{"role": "system", "content": "You are a healthcare RCM operations team lead."},
-                      {"role": "user", "content": prompt}],
-            max_tokens=350,
-            temperature=0.7,
-        )
-        return resp.choices[0].message.content.strip()
-    except Exception as e:
-        log.error(f"OpenAI productivity analysis failed: {e}")
-        return _rule_based_summary(username, session_hrs, benchmarks_data, overall_pct)
+    from app.ai_narrative import complete
+    text, _source = complete(
+        "productivity",
+        [{"role": "system", "content": "You are a healthcare RCM operations team lead."},
+         {"role": "user", "content": prompt}],
+        lambda: _rule_based_summary(username, session_hrs, benchmarks_data, overall_pct),
+        max_tokens=350,
+    )
+    return text
 
 
 def _rule_based_summary(username: str, session_hrs: float,
@@ -724,7 +720,7 @@ def flush_and_notify(username: str):
 # ── Send helpers ──
 
 def _send_email(subject: str, body: str, html_body: str = ""):
-    """Send email notification via SendGrid v3 API.
+    """Send email notification via SendGrid v3 API (SMTP fallback).
     Uses _live_config() to read credentials fresh (avoids stale cache)."""
     cfg = _live_config()
     if cfg["IN_APP_ONLY_MODE"]:
@@ -732,75 +728,22 @@ def _send_email(subject: str, body: str, html_body: str = ""):
         return
 
     emails = cfg["NOTIFY_EMAILS"]
-    sg_key = cfg["SENDGRID_API_KEY"]
-    sg_from = cfg["SENDGRID_FROM"]
-    smtp_h = cfg["SMTP_HOST"]
-    smtp_p = cfg["SMTP_PORT"]
-    smtp_u = cfg["SMTP_USER"]
-    smtp_pw = cfg["SMTP_PASS"]
-
     if not emails:
         log.debug("Email notification skipped - NOTIFY_EMAILS not configured")
         return
 
-    # Primary: SendGrid
-    if sg_key:
-        try:
-            import httpx
-            content = []
-            if body:
-                content.append({"type": "text/plain", "value": body})
-            if html_body:
-                content.append({"type": "text/html", "value": html_body})
-            if not content:
-                content.append({"type": "text/plain", "value": "(no content)"})
-
-            recipients = [{"email": addr} for addr in emails]
-            payload = {
-                "personalizations": [{"to": recipients}],
-                "from": {"email": sg_from, "name": "MedPharma Hub"},
-                "subject": subject,
-                "content": content,
-            }
-            resp = httpx.post(
-                "https://api.sendgrid.com/v3/mail/send",
-                json=payload,
-                headers={
-                    "Authorization": f"Bearer {sg_key}",
-                    "Content-Type": "application/json",
-                },
-                timeout=15,
-            )
-            if resp.status_code in (200, 202):
-                log.info(f"Email sent via SendGrid to {', '.join(emails)}: {subject}")
-                return
-            log.error(f"SendGrid failed ({resp.status_code}): {resp.text}")
-        except Exception as e:
-            log.error(f"Failed to send email via SendGrid: {e}")
-
-    # Fallback: SMTP
-    if not smtp_h or not smtp_u or not smtp_pw:
-        log.error("Email notification skipped - no working provider configured (SendGrid/SMTP)")
-        return
-
+    # SendGrid first, SMTP fallback - both over connections reused across
+    # calls (see app.mail_spool.send_now).
+    from app.mail_spool import send_now
     try:
-        msg = MIMEMultipart("alternative")
-        msg["Subject"] = subject
-        msg["From"] = smtp_u or sg_from
-        msg["To"] = ", ".join(emails)
-
-        plain = body or "(no content)"
-        msg.attach(MIMEText(plain, "plain"))
-        if html_body:
-            msg.attach(MIMEText(html_body, "html"))
-
-        with smtplib.SMTP(smtp_h, smtp_p, timeout=20) as server:
-            server.starttls()
-            server.login(smtp_u, smtp_pw)
-            server.sendmail(msg["From"], emails, msg.as_string())
-        log.info(f"Email sent via SMTP to {', '.join(emails)}: {subject}")
+        ok, via = send_now(emails, subject, body, html_body, cfg=cfg)
     except Exception as e:
-        log.error(f"Failed to send email via SMTP: {e}")
+        log.error(f"Failed to send email: {e}")
+        return
+    if ok:
+        log.info(f"Email sent via {'SendGrid' if via == 'sendgrid' else 'SMTP'} to {', '.join(emails)}: {subject}")
+    else:
+        log.error(f"Email notification not delivered: {via}")
 
 
 def _send_sms(message: str):
@@ -1185,6 +1128,7 @@ def get_notification_status() -> dict:
         "notify_on_users": sorted(list(NOTIFY_ON_USERS)),
         "in_app_only_mode": cfg["IN_APP_ONLY_MODE"],
         "delivery_mode": "in_app_only" if cfg["IN_APP_ONLY_MODE"] else "external",
+        "ai_narrative": narrative_metrics(),
     }
 
 
@@ -1286,20 +1230,15 @@ Keep it professional and data-driven. No greeting, no bullet points - paragraph
     if not OPENAI_API_KEY:
         return _rule_based_account_summary(d)
 
-    try:
-        from openai import OpenAI
-        client = OpenAI(api_key=OPENAI_API_KEY)
-        resp = client.chat.completions.create(
-            model="gpt-4o-mini",
-            messages=[{"role": "system", "content": "You are a healthcare RCM executive."},
-                      {"role": "user", "content": prompt}],
-            max_tokens=400,
-            temperature=0.7,
-        )
-        return resp.choices[0].message.content.strip()
-    except Exception as e:
-        log.error(f"OpenAI account summary failed: {e}")
-        return _rule_based_account_summary(d)
+    from app.ai_narrative import complete
+    text, _source = complete(
+        "account_summary",
+        [{"role": "system", "content": "You are a healthcare RCM executive."},
+         {"role": "user", "content": prompt}],
+        lambda: _rule_based_account_summary(d),
+        max_tokens=400,
+    )
+    return text
 
 
 def _rule_based_account_summary(d: dict) -> str:
@@ -1607,110 +1546,21 @@ def _send_email_to(to_email: str, subject: str, body: str, html_body: str = "",
     if not to_email:
         return False, "missing recipient"
     cfg = _live_config()
-    attachments = attachments or []
-
-    # Primary: SendGrid
-    sg_key = cfg["SENDGRID_API_KEY"]
-    sg_from = cfg["SENDGRID_FROM"]
-    if sg_key:
-        try:
-            import httpx, base64 as _b64
-            content = []
-            if body:
-                content.append({"type": "text/plain", "value": body})
-            if html_body:
-                content.append({"type": "text/html", "value": html_body})
-            if not content:
-                content.append({"type": "text/plain", "value": "(no content)"})
-
-            payload = {
-                "personalizations": [{"to": [{"email": to_email}]}],
-                "from": {"email": sg_from, "name": "MedPharma Hub"},
-                "subject": subject,
-                "content": content,
-            }
-            if attachments:
-                payload["attachments"] = [
-                    {
-                        "content": _b64.b64encode(a["content"]).decode("ascii"),
-                        "filename": a["filename"],
-                        "type": a.get("mime", "application/octet-stream"),
-                        "disposition": "attachment",
-                    }
-                    for a in attachments if a.get("content")
-                ]
-            resp = httpx.post(
-                "https://api.sendgrid.com/v3/mail/send",
-                json=payload,
-                headers={
-                    "Authorization": f"Bearer {sg_key}",
-                    "Content-Type": "application/json",
-                },
-                timeout=30,
-            )
-            if resp.status_code in (200, 202):
-                log.info(f"Email sent to {to_email}: {subject}")
-                return True, "sendgrid"
-            log.error(f"SendGrid failed ({resp.status_code}): {resp.text}")
-        except Exception as e:
-            log.error(f"Failed to send email to {to_email} via SendGrid: {e}")
-
-    # Fallback: SMTP
-    smtp_h = cfg["SMTP_HOST"]
-    smtp_p = cfg["SMTP_PORT"]
-    smtp_u = cfg["SMTP_USER"]
-    smtp_pw = cfg["SMTP_PASS"]
-    if not smtp_h or not smtp_u or not smtp_pw:
-        log.error("Email skipped - no working provider configured (SendGrid/SMTP)")
-        return False, "no provider configured (SendGrid/SMTP env vars missing)"
 
+    # SendGrid first, SMTP fallback - over the keep-alive client / reused
+    # SMTP session in app.mail_spool rather than a new connection per call.
+    from app.mail_spool import send_now
     try:
-        # If we have attachments, use a mixed multipart wrapper so the
-        # text+html alternative still renders inline while the file rides
-        # alongside it.
-        if attachments:
-            from email.mime.base import MIMEBase
-            from email import encoders as _encoders
-            outer = MIMEMultipart("mixed")
-            outer["Subject"] = subject
-            outer["From"] = smtp_u or sg_from
-            outer["To"] = to_email
-            alt = MIMEMultipart("alternative")
-            alt.attach(MIMEText(body or "(no content)", "plain"))
-            if html_body:
-                alt.attach(MIMEText(html_body, "html"))
-            outer.attach(alt)
-            for a in attachments:
-                if not a.get("content"):
-                    continue
-                part = MIMEBase(*a.get("mime", "application/octet-stream").split("/", 1))
-                part.set_payload(a["content"])
-                _encoders.encode_base64(part)
-                part.add_header(
-                    "Content-Disposition",
-                    f'attachment; filename="{a["filename"]}"',
-                )
-                outer.attach(part)
-            msg = outer
-        else:
-            msg = MIMEMultipart("alternative")
-            msg["Subject"] = subject
-            msg["From"] = smtp_u or sg_from
-            msg["To"] = to_email
-            plain = body or "(no content)"
-            msg.attach(MIMEText(plain, "plain"))
-            if html_body:
-                msg.attach(MIMEText(html_body, "html"))
-
-        with smtplib.SMTP(smtp_h, smtp_p, timeout=30) as server:
-            server.starttls()
-            server.login(smtp_u, smtp_pw)
-            server.sendmail(msg["From"], [to_email], msg.as_string())
-        log.info(f"Email sent via SMTP to {to_email}: {subject}")
-        return True, "smtp"
+        sent, via = send_now([to_email], subject, body, html_body,
+                             attachments=attachments, cfg=cfg)
     except Exception as e:
-        log.error(f"Failed to send email to {to_email} via SMTP: {e}")
+        log.error(f"Failed to send email to {to_email}: {e}")
         return False, f"smtp error: {e}"
+    if sent:
+        log.info(f"Email sent via {via} to {to_email}: {subject}")
+    else:
+        log.error(f"Email to {to_email} not delivered: {via}")
+    return sent, via
 
 
 def send_team_progress_reports():
@@ -2254,10 +2104,10 @@ def send_eod_team_report(report_date: str = None, force: bool = False) -> dict:
     Default recipients: lexi@medprosc.com + eric@medprosc.com
     (override with EOD_REPORT_EMAIL, comma-separated).
 
-    Each recipient is sent individually via _send_email_to so SendGrid
-    delivery is per-recipient (we can see who bounced).
+    Each recipient gets its own outbound_mail spool row so delivery is
+    per-recipient (we can see who bounced) and transient failures retry.
 
-    Returns a delivery report dict {date, recipients, sent, failed,
+    Returns a delivery report dict {date, recipients, sent, failed, queued,
     headlines, user_count}.
     """
     from datetime import datetime as _dt
@@ -2359,43 +2209,48 @@ def send_eod_team_report(report_date: str = None, force: bool = False) -> dict:
         return {"ok": False, "error": "no recipients", "date": report_date,
                 "archive_id": archive_id}
 
-    for to_email in recipients:
-        try:
-            ok_sent, via = _send_email_to(to_email, subject, text_body, html_body)
-        except Exception as e:
-            log.error(f"EOD report send to {to_email} crashed: {e}")
-            failed.append({"email": to_email, "error": str(e), "via": "exception"})
-            continue
-        if ok_sent:
-            sent.append({"email": to_email, "via": via})
+    # Spool one row per recipient (deduped per date so a double-fired
+    # scheduler never mails twice; a manual force resend requeues), then
+    # drain them in parallel over reused connections.
+    queued = []
+    try:
+        from app import mail_spool
+        ids = [
+            mail_spool.enqueue(
+                to_email, subject, text_body, html_body,
+                dedupe_key=f"eod_report:{report_date}:{to_email.lower()}",
+                kind="eod_report", ref_id=archive_id or None, requeue=force,
+            )
+            for to_email in recipients
+        ]
+        rows = mail_spool.drain(ids, wait_seconds=mail_spool.SYNC_WAIT_SECONDS)
+    except Exception as e:
+        log.exception("EOD report spool failed for %s", report_date)
+        rows = [{"recipient": r, "status": "failed", "via": "", "last_error": f"exception: {e}"}
+                for r in recipients]
+    for row in rows:
+        if row["status"] == "sent":
+            sent.append({"email": row["recipient"], "via": row["via"]})
+        elif row["status"] == "failed":
+            failed.append({"email": row["recipient"], "via": row["last_error"]})
         else:
-            failed.append({"email": to_email, "via": via})
+            queued.append({"email": row["recipient"], "via": f"retrying: {row['last_error']}"})
 
     # Update archive with final delivery status so the in-app history view
-    # tells the operator exactly what happened.
+    # tells the operator exactly what happened. Rows still retrying update
+    # it again from the spool when they settle.
     try:
         from app.client_db import update_eod_report_email_status
+        from app.mail_spool import delivery_status
         if archive_id:
-            if sent and not failed:
-                final_status = "delivered"
-            elif sent and failed:
-                final_status = "partial"
-            elif failed:
-                # Distinguish "no provider configured" from "provider rejected".
-                via0 = (failed[0].get("via") or "").lower()
-                if "not configured" in via0 or "no provider" in via0 or "missing" in via0:
-                    final_status = "no_provider"
-                else:
-                    final_status = "failed"
-            else:
-                final_status = "unknown"
-            update_eod_report_email_status(archive_id, final_status,
+            update_eod_report_email_status(archive_id, delivery_status(rows),
                                            [s.get("email") for s in sent])
     except Exception:
         log.exception("update_eod_report_email_status failed for %s", archive_id)
 
     log.info(
         f"EOD report dispatched for {report_date}: sent={len(sent)} failed={len(failed)} "
+        f"retrying={len(queued)} "
         f"users={len(report.get('users', []))} archive_id={archive_id}"
     )
     return {
@@ -2405,6 +2260,7 @@ def send_eod_team_report(report_date: str = None, force: bool = False) -> dict:
         "recipients": recipients,
         "sent": sent,
         "failed": failed,
+        "queued": queued,
         "user_count": len(report.get("users", [])),
         "headlines": headlines,
     }
@@ -2939,6 +2795,19 @@ def _render_client_daily_report_html(report: dict) -> tuple[str, str]:
     return text_body, html_body
 
 
+def _client_report_xlsx(report: dict) -> bytes:
+    """XLSX attachment for a client daily report, served from the report
+    artifact cache when the same report (ignoring its ``generated_at``
+    stamp) was already rendered - re-sends and catch-up runs skip openpyxl."""
+    import hashlib
+    from app.report_cache import artifact_key, get_or_render
+    body = {k: v for k, v in report.items() if k != "generated_at"}
+    digest = hashlib.sha1(json.dumps(body, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+    key = artifact_key("xlsx", report.get("client_id") or 0, None, report.get("report_date"), digest)
+    data, _hit = get_or_render(key, lambda: _build_client_report_xlsx(report))
+    return data
+
+
 def _build_client_report_xlsx(report: dict) -> bytes:
     """Build an .xlsx workbook with one sheet per non-empty production
     section. Returns the raw bytes so the email layer can attach it.
@@ -3076,17 +2945,16 @@ def _client_report_recipients(report: dict) -> list[str]:
     return out
 
 
-def send_client_daily_report(client_id: int, report_date: str = None,
-                             force: bool = False, demo: bool = False) -> dict:
-    """Compose + email the per-client daily production report (with Excel).
+def _compose_client_daily_report(client_id: int, report_date: str = None,
+                                 force: bool = False, demo: bool = False,
+                                 snapshot: dict = None) -> dict:
+    """Build, render and attach one client's daily report.
 
-    Args:
-        client_id:   PK of the client.
-        report_date: YYYY-MM-DD (defaults to today).
-        force:       send even when there's zero activity.
-        demo:        ignore the DB and use a populated showcase payload.
+    ``snapshot`` is a shared client_db.build_daily_activity_snapshot for the
+    date (the nightly fan-out reads the day once for every client).
 
-    Returns delivery report dict (sent / failed / recipients / headlines).
+    Returns ``{"result": {...}}`` when there is nothing to send (error, no
+    activity, no recipients); otherwise the message parts + recipients.
     """
     from datetime import datetime as _dt
     if demo:
@@ -3096,23 +2964,29 @@ def send_client_daily_report(client_id: int, report_date: str = None,
             from app.client_db import get_client_daily_report
         except Exception as e:
             log.error(f"client_db.get_client_daily_report import failed: {e}")
-            return {"ok": False, "error": str(e), "client_id": client_id}
+            return {"result": {"ok": False, "error": str(e), "client_id": client_id}}
         if not report_date:
             report_date = business_today_iso()
-        report = get_client_daily_report(client_id, report_date)
+        report = get_client_daily_report(client_id, report_date, snapshot=snapshot)
         if not report or not report.get("ok"):
-            return {"ok": False, "error": (report or {}).get("error", "no report"),
-                    "client_id": client_id}
+            return {"result": {"ok": False, "error": (report or {}).get("error", "no report"),
+                               "client_id": client_id}}
 
     headlines = report.get("headlines", {}) or {}
     has_activity = any(v for v in headlines.values() if isinstance(v, (int, float)) and v)
     if not force and not demo and not has_activity:
         log.info(f"Client {client_id} report skipped - no activity for {report.get('report_date')}")
-        return {"ok": True, "skipped": "no activity", "client_id": client_id,
-                "date": report.get("report_date")}
+        return {"result": {"ok": True, "skipped": "no activity", "client_id": client_id,
+                           "date": report.get("report_date")}}
+
+    recipients = _client_report_recipients(report)
+    if not recipients:
+        log.warning(f"Client {client_id} report has no deliverable recipients")
+        return {"result": {"ok": False, "error": "no recipients", "client_id": client_id,
+                           "date": report.get("report_date")}}
 
     text_body, html_body = _render_client_daily_report_html(report)
-    xlsx_bytes = _build_client_report_xlsx(report)
+    xlsx_bytes = _client_report_xlsx(report)
 
     try:
         d_long = _dt.strptime(report["report_date"], "%Y-%m-%d").strftime("%a %b %d, %Y")
@@ -3136,71 +3010,163 @@ def send_client_daily_report(client_id: int, report_date: str = None,
             "mime":     "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
         })
 
-    recipients = _client_report_recipients(report)
-    if not recipients:
-        log.warning(f"Client {client_id} report has no deliverable recipients")
-        return {"ok": False, "error": "no recipients", "client_id": client_id,
-                "date": report.get("report_date")}
+    return {
+        "report": report,
+        "subject": subject,
+        "text_body": text_body,
+        "html_body": html_body,
+        "attachments": attachments,
+        "recipients": recipients,
+    }
 
-    sent, failed = [], []
-    for to_email in recipients:
-        try:
-            ok_sent, via = _send_email_to(to_email, subject, text_body, html_body,
-                                          attachments=attachments)
-        except Exception as e:
-            log.error(f"Client report send to {to_email} crashed: {e}")
-            failed.append({"email": to_email, "via": f"exception: {e}"})
-            continue
-        if ok_sent:
-            sent.append({"email": to_email, "via": via})
-        else:
-            failed.append({"email": to_email, "via": via})
 
+def _enqueue_client_daily_report(client_id: int, msg: dict,
+                                 force: bool = False, demo: bool = False) -> list[int]:
+    """Spool one row per recipient. Deduped per (client, date, recipient)
+    unless this is a demo; ``force`` requeues an already-settled send."""
+    from app import mail_spool
+    date = msg["report"].get("report_date", "")
+    return [
+        mail_spool.enqueue(
+            to_email, msg["subject"], msg["text_body"], msg["html_body"],
+            attachments=msg["attachments"],
+            dedupe_key=None if demo else f"client_report:{client_id}:{date}:{to_email}",
+            kind="client_report", ref_id=client_id, requeue=force,
+        )
+        for to_email in msg["recipients"]
+    ]
+
+
+def _client_report_delivery(client_id: int, msg: dict, rows: list[dict],
+                            demo: bool = False) -> dict:
+    report = msg["report"]
+    sent, failed, pending = [], [], []
+    for row in rows:
+        if row["status"] == "sent":
+            sent.append({"email": row["recipient"], "via": row["via"]})
+        elif row["status"] == "failed":
+            failed.append({"email": row["recipient"], "via": row["last_error"]})
+        else:
+            # Still queued / being retried by the spool: not a failure yet.
+            pending.append({"email": row["recipient"],
+                            "via": f"retrying: {row['last_error']}" if row.get("last_error") else "queued"})
+    xlsx_len = sum(len(a["content"]) for a in msg["attachments"])
     log.info(
-        f"Client {client_id} ({company}) report dispatched: "
-        f"sent={len(sent)} failed={len(failed)} attachment={'yes' if xlsx_bytes else 'no'}"
+        f"Client {client_id} ({report.get('company', '')}) report dispatched: "
+        f"sent={len(sent)} failed={len(failed)} pending={len(pending)} "
+        f"attachment={'yes' if xlsx_len else 'no'}"
     )
     return {
         "ok": True,
         "demo": demo,
         "client_id": client_id,
-        "company": company,
+        "company": report.get("company", ""),
         "date": report.get("report_date"),
-        "recipients": recipients,
+        "recipients": msg["recipients"],
         "sent": sent,
         "failed": failed,
-        "attachment_bytes": len(xlsx_bytes) if xlsx_bytes else 0,
-        "headlines": headlines,
+        "pending": pending,
+        "attachment_bytes": xlsx_len,
+        "headlines": report.get("headlines", {}) or {},
     }
 
 
+def send_client_daily_report(client_id: int, report_date: str = None,
+                             force: bool = False, demo: bool = False) -> dict:
+    """Compose + email the per-client daily production report (with Excel).
+
+    Args:
+        client_id:   PK of the client.
+        report_date: YYYY-MM-DD (defaults to today).
+        force:       send even when there's zero activity (and resend a
+                     report that already went out for this date).
+        demo:        ignore the DB and use a populated showcase payload.
+
+    Returns delivery report dict (sent / failed / recipients / headlines).
+    """
+    from app import mail_spool
+    msg = _compose_client_daily_report(client_id, report_date, force=force, demo=demo)
+    if "result" in msg:
+        return msg["result"]
+    try:
+        ids = _enqueue_client_daily_report(client_id, msg, force=force, demo=demo)
+        rows = mail_spool.drain(ids, wait_seconds=mail_spool.SYNC_WAIT_SECONDS)
+    except Exception as e:
+        log.error(f"Client report spool for {client_id} crashed: {e}")
+        rows = [{"recipient": r, "status": "failed", "via": "", "last_error": f"exception: {e}"}
+                for r in msg["recipients"]]
+    return _client_report_delivery(client_id, msg, rows, demo=demo)
+
+
 def send_all_client_daily_reports(report_date: str = None, force: bool = False) -> dict:
     """Iterate every opted-in client (has email + daily_report_optin=1)
-    and dispatch their per-client production report. Used by the 6:30 PM
+    and dispatch their per-client production report. Used by the 9:10 PM
     EST scheduler so the admin doesn't have to push a button per client.
+
+    The day's activity is read once into a shared snapshot; reports are
+    then composed in parallel (bounded by MAIL_SPOOL_WORKERS), every
+    recipient is spooled, and one drain delivers the lot over reused
+    connections.
     """
+    from concurrent.futures import ThreadPoolExecutor
+    from app import mail_spool
     try:
-        from app.client_db import list_clients_optin_for_daily_report
+        from app.client_db import (
+            CLIENT_REPORT_SOURCES,
+            build_daily_activity_snapshot,
+            list_clients_optin_for_daily_report,
+        )
     except Exception as e:
         log.error(f"list_clients_optin_for_daily_report import failed: {e}")
         return {"ok": False, "error": str(e)}
 
     clients = list_clients_optin_for_daily_report()
-    results = []
-    sent_total = failed_total = skipped = 0
-    for c in clients:
+    snapshot = None
+    if clients:
+        try:
+            snapshot = build_daily_activity_snapshot(
+                report_date or business_today_iso(), sources=CLIENT_REPORT_SOURCES)
+        except Exception:
+            log.exception("Daily activity snapshot failed; reports will read per client")
+
+    def _compose(c):
         try:
-            result = send_client_daily_report(c["client_id"],
-                                              report_date=report_date,
-                                              force=force, demo=False)
+            msg = _compose_client_daily_report(c["client_id"], report_date=report_date,
+                                               force=force, snapshot=snapshot)
+            if "result" not in msg:
+                msg["ids"] = _enqueue_client_daily_report(c["client_id"], msg, force=force)
+            return msg
         except Exception as e:
             log.error(f"send_client_daily_report({c['client_id']}) crashed: {e}")
-            result = {"ok": False, "error": str(e), "client_id": c["client_id"]}
+            return {"result": {"ok": False, "error": str(e), "client_id": c["client_id"]}}
+
+    with ThreadPoolExecutor(max_workers=max(1, mail_spool.WORKERS),
+                            thread_name_prefix="client-report") as pool:
+        composed = list(pool.map(_compose, clients))
+
+    all_ids = [i for msg in composed for i in msg.get("ids", [])]
+    try:
+        by_id = {r["id"]: r for r in mail_spool.drain(all_ids, wait_seconds=mail_spool.SYNC_WAIT_SECONDS)}
+    except Exception as e:
+        log.error(f"Client report spool drain crashed: {e}")
+        by_id = {}
+
+    results = []
+    sent_total = failed_total = pending_total = skipped = 0
+    for c, msg in zip(clients, composed):
+        if "result" in msg:
+            result = msg["result"]
+        else:
+            rows = [by_id.get(i) or {"recipient": to, "status": "failed", "via": "",
+                                     "last_error": "spool drain failed"}
+                    for i, to in zip(msg["ids"], msg["recipients"])]
+            result = _client_report_delivery(c["client_id"], msg, rows)
         if result.get("skipped"):
             skipped += 1
         else:
             sent_total += len(result.get("sent") or [])
             failed_total += len(result.get("failed") or [])
+            pending_total += len(result.get("pending") or [])
         results.append({
             "client_id": c["client_id"],
             "company":   c["company"],
@@ -3208,10 +3174,12 @@ def send_all_client_daily_reports(report_date: str = None, force: bool = False)
             "skipped":   result.get("skipped"),
             "sent":      len(result.get("sent") or []),
             "failed":    len(result.get("failed") or []),
+            "pending":   len(result.get("pending") or []),
         })
     log.info(
         f"Client report fan-out complete: "
-        f"clients={len(clients)} sent={sent_total} failed={failed_total} skipped={skipped}"
+        f"clients={len(clients)} sent={sent_total} failed={failed_total} "
+        f"pending={pending_total} skipped={skipped}"
     )
     return {
         "ok": True,
@@ -3219,6 +3187,7 @@ def send_all_client_daily_reports(report_date: str = None, force: bool = False)
         "client_count":  len(clients),
         "sent_total":    sent_total,
         "failed_total":  failed_total,
+        "pending_total": pending_total,
         "skipped":       skipped,
         "results":       results,
     }
@@ -3554,6 +3523,30 @@ def _scheduled_reimport_all_claims():
         return {"ok": False}
 
 
+def _drain_mail_spool():
+    try:
+        from app.mail_spool import drain_due
+        return drain_due()
+    except Exception:
+        log.exception("mail spool drain failed")
+
+
+def _compact_activity_events():
+    try:
+        from app.client_db import compact_activity_events
+        return compact_activity_events()
+    except Exception:
+        log.exception("activity compaction failed")
+
+
+def _run_db_backup():
+    try:
+        from app.db_backup import create_backup
+        return create_backup("scheduled")
+    except Exception:
+        log.exception("scheduled DB backup failed")
+
+
 def start_daily_scheduler():
     """
         Start APScheduler to fire:
@@ -3645,6 +3638,36 @@ def start_daily_scheduler():
             replace_existing=True,
         )
 
+        # Every 5 min - retry spooled report emails whose backoff has expired
+        # (and prune settled spool rows past retention).
+        scheduler.add_job(
+            _drain_mail_spool,
+            IntervalTrigger(minutes=5, timezone=est),
+            id="mail_spool_drain",
+            name="Every 5 min Outbound Mail Spool Retry",
+            replace_existing=True,
+        )
+
+        # 3:30 AM EST daily - drop raw activity events / hourly rollups past
+        # their retention tier (the daily rollup keeps the counts).
+        scheduler.add_job(
+            _compact_activity_events,
+            CronTrigger(hour=3, minute=30, timezone=est),
+            id="activity_compaction",
+            name="3:30 AM EST Activity Event Retention",
+            replace_existing=True,
+        )
+
+        # Every BACKUP_INTERVAL_HOURS - online DB snapshot + age-tier pruning
+        from app.db_backup import INTERVAL_HOURS as _backup_hours
+        scheduler.add_job(
+            _run_db_backup,
+            IntervalTrigger(hours=_backup_hours, timezone=est),
+            id="db_backup",
+            name=f"Every {_backup_hours:g}h Online DB Backup",
+            replace_existing=True,
+        )
+
         scheduler.start()
         log.info("Daily scheduler started - 5:00 national pull, 9:00 summary, 9:05 EOD team, 9:10 client reports")
     except ImportError:
@@ -3665,6 +3688,8 @@ def _start_thread_scheduler():
         last_eod_date = None
         last_clients_date = None
         last_catchup_at = None
+        last_compaction_date = None
+        last_backup_at = None
         while True:
             try:
                 # Get current time in US/Eastern
@@ -3700,6 +3725,17 @@ def _start_thread_scheduler():
                     log.info("Thread scheduler firing per-client production reports")
                     send_all_client_daily_reports()
 
+                # 3:30 AM - activity event retention (every day)
+                if now_est.hour == 3 and now_est.minute >= 30 and last_compaction_date != today:
+                    last_compaction_date = today
+                    _compact_activity_events()
+
+                # Every BACKUP_INTERVAL_HOURS - online DB snapshot
+                from app.db_backup import INTERVAL_HOURS as _backup_hours
+                if last_backup_at is None or (now_est - last_backup_at).total_seconds() >= _backup_hours * 3600:
+                    last_backup_at = now_est
+                    _run_db_backup()
+
                 # Every ~5 min - chat catch-up nudge (15-min unread). Runs all
                 # week, not just weekdays, since chat happens any time.
                 if last_catchup_at is None or (now_est - last_catchup_at).total_seconds() >= 300:
@@ -3708,6 +3744,7 @@ def _start_thread_scheduler():
                         send_chat_catchup_reminders()
                     except Exception:
                         log.exception("thread scheduler chat catch-up failed")
+                    _drain_mail_spool()
 
             except Exception as e:
                 log.error(f"Thread scheduler error: {e}")
@@ -0,0 +1,167 @@
+"""
+On-disk cache of rendered report artifacts (client PDF reports, daily-report
+XLSX attachments).
+
+An artifact is keyed by what it was rendered from: the report kind, the
+client, the sub-profile, the period and a data version.  For the client
+PDF the version is that client's per-table write counters
+(``client_db.get_client_data_versions``, bumped by triggers on every insert,
+update and delete) plus the business date, since weekly buckets, MTD/YTD
+windows and the "Generated" line all move with the day.  When nothing the
+report reads has changed, the stored bytes are served without touching
+``_build_section_data`` or reportlab.
+
+  • storage   - one file per key in ``<db dir>/report_cache`` (or
+                ``REPORT_CACHE_DIR``), written to a temp file and renamed
+  • eviction  - least recently served first once the directory exceeds
+                ``REPORT_CACHE_MAX_MB``; a hit refreshes the file's mtime
+  • renders   - concurrent misses for the same key share one render
+
+Configuration via environment variables:
+  REPORT_CACHE_DIR      - artifact directory (default <db dir>/report_cache)
+  REPORT_CACHE_MAX_MB   - size cap in MB (default 200; 0 disables the cache)
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+
+from app.config import DATABASE_PATH
+
+log = logging.getLogger("report_cache")
+
+MAX_BYTES = int(float(os.getenv("REPORT_CACHE_MAX_MB", "200")) * 1024 * 1024)
+
+STATS = {"hits": 0, "misses": 0, "evicted": 0}
+
+_lock = threading.Lock()
+_key_locks: dict[str, threading.Lock] = {}
+
+
+def cache_dir() -> str:
+    return os.getenv("REPORT_CACHE_DIR") or os.path.join(os.path.dirname(DATABASE_PATH), "report_cache")
+
+
+def artifact_key(kind: str, client_id, sub_profile=None, period=None, version=None) -> str:
+    """Stable file name for one rendered artifact, e.g. ``pdf_12_<sha1>``."""
+    raw = json.dumps([kind, client_id, sub_profile or "", period or "", version],
+                     sort_keys=True, default=str)
+    return f"{kind}_{client_id}_{hashlib.sha1(raw.encode()).hexdigest()}"
+
+
+def _path(key: str) -> str:
+    return os.path.join(cache_dir(), key)
+
+
+def get_artifact(key: str):
+    """Cached bytes for ``key`` or None. A hit marks the file recently used."""
+    path = _path(key)
+    try:
+        with open(path, "rb") as f:
+            data = f.read()
+        os.utime(path)
+    except OSError:
+        return None
+    return data
+
+
+def put_artifact(key: str, data: bytes) -> None:
+    d = cache_dir()
+    os.makedirs(d, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=d, prefix=".tmp_")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp, _path(key))
+    except Exception:
+        try:
+            os.remove(tmp)
+        except OSError:
+            pass
+        raise
+    evict()
+
+
+def evict(max_bytes: int = None) -> list[str]:
+    """Delete least-recently-used artifacts until the directory fits under
+    ``max_bytes``. Returns the removed file names."""
+    cap = MAX_BYTES if max_bytes is None else max_bytes
+    d = cache_dir()
+    try:
+        entries = []
+        for name in os.listdir(d):
+            if name.startswith(".tmp_"):
+                continue
+            st = os.stat(os.path.join(d, name))
+            entries.append((st.st_mtime, st.st_size, name))
+    except OSError:
+        return []
+    total = sum(e[1] for e in entries)
+    removed = []
+    for _mtime, size, name in sorted(entries):
+        if total <= cap:
+            break
+        try:
+            os.remove(os.path.join(d, name))
+        except OSError:
+            continue
+        total -= size
+        removed.append(name)
+    if removed:
+        STATS["evicted"] += len(removed)
+        log.info("report cache: evicted %d artifact(s), %d bytes kept", len(removed), total)
+    return removed
+
+
+def get_or_render(key: str, render) -> tuple[bytes, bool]:
+    """Return ``(bytes, hit)``: the cached artifact for ``key``, or the result
+    of ``render()`` (stored for next time). Concurrent callers for the same
+    key wait for the first render instead of rendering again."""
+    if MAX_BYTES <= 0:
+        return render(), False
+    data = get_artifact(key)
+    if data is not None:
+        STATS["hits"] += 1
+        return data, True
+    with _lock:
+        key_lock = _key_locks.setdefault(key, threading.Lock())
+    with key_lock:
+        data = get_artifact(key)
+        if data is not None:
+            STATS["hits"] += 1
+            return data, True
+        STATS["misses"] += 1
+        t = time.perf_counter()
+        data = render()
+        try:
+            if data:
+                put_artifact(key, data)
+        except OSError as exc:
+            log.warning("report cache: could not store %s: %s", key, exc)
+        log.info("report cache: rendered %s in %.3fs", key, time.perf_counter() - t)
+    with _lock:
+        _key_locks.pop(key, None)
+    return data, False
+
+
+def clear() -> int:
+    """Remove every cached artifact. Returns how many were removed."""
+    d = cache_dir()
+    n = 0
+    try:
+        names = os.listdir(d)
+    except OSError:
+        return 0
+    for name in names:
+        try:
+            os.remove(os.path.join(d, name))
+            n += 1
+        except OSError:
+            pass
+    return n
@@ -0,0 +1,137 @@
+"""
+In-process result cache for the dashboard-family endpoints.
+
+/dashboard, /dashboard/client/{id}, /dashboard/filtered, /alerts and
+/report/{client_id} recomputed their KPIs from scratch on every request, so
+several staff watching the same account recomputed identical numbers, and
+the no-store middleware (rightly) keeps browsers and proxies from caching
+anything. This cache sits behind the route, so responses stay no-store and
+always current:
+
+  • key         - (endpoint, params), plus the business day and UTC day for
+                  the date windows the queries compute
+  • tags        - each entry records the write counters of the tables it
+                  reads: that client's ``client_data_versions`` for a scoped
+                  view (plus the global ``clients`` counter), the global
+                  ``data_versions`` for an all-clients view
+  • invalidation - the counters are bumped by triggers on every insert /
+                  update / delete, so every write path - the claim, payment,
+                  credentialing, enrollment and EDI helpers, imports, bulk
+                  updates - invalidates without hooks of its own; an entry is
+                  served only while its counters still match
+  • single flight - concurrent misses for the same key share one compute
+  • LRU         - at most ``RESPONSE_CACHE_SIZE`` entries; callers get a copy
+
+A cached compute may only read tables in its tag set. Anything else (the
+audit_log "actions today" count in get_daily_account_summary, for one) would
+go stale, so those readers stay outside the cache.
+
+Configuration via environment variables:
+  RESPONSE_CACHE       - "0" disables the cache (default on)
+  RESPONSE_CACHE_SIZE  - entries kept (default 256)
+"""
+
+from __future__ import annotations
+
+import copy
+import json
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+
+log = logging.getLogger("response_cache")
+
+ENABLED = os.getenv("RESPONSE_CACHE", "1").strip().lower() not in ("0", "false", "no", "off")
+SIZE = int(os.getenv("RESPONSE_CACHE_SIZE", "256"))
+
+# What the dashboard family reads; alerts pass a narrower set.
+DASHBOARD_TABLES = ("clients", "claims_master", "payments", "credentialing", "enrollment", "edi_setup")
+
+STATS = {"hits": 0, "misses": 0, "stale": 0}
+
+_lock = threading.Lock()
+_key_locks: dict = {}
+_entries: "OrderedDict[str, tuple]" = OrderedDict()
+
+
+def _tag(client_id, tables) -> tuple:
+    from app.client_db import get_client_data_versions, get_data_versions, get_db
+    conn = get_db()
+    try:
+        if client_id is None:
+            versions = get_data_versions(tables, conn=conn)
+        else:
+            versions = get_client_data_versions(client_id, tables, conn=conn)
+            versions["*clients"] = get_data_versions(("clients",), conn=conn)["clients"]
+    finally:
+        conn.close()
+    return tuple(sorted(versions.items()))
+
+
+def _key(endpoint: str, params: dict) -> str:
+    from app.client_db import DATABASE_PATH
+    from app.config import business_today_iso
+    return json.dumps([DATABASE_PATH, endpoint, params, business_today_iso(),
+                       time.strftime("%Y-%m-%d", time.gmtime())], sort_keys=True, default=str)
+
+
+def _lookup(key: str, tag: tuple):
+    with _lock:
+        entry = _entries.get(key)
+        if entry is None:
+            return None
+        if entry[0] != tag:
+            del _entries[key]
+            STATS["stale"] += 1
+            return None
+        _entries.move_to_end(key)
+        STATS["hits"] += 1
+        return entry[1]
+
+
+def result(endpoint: str, params: dict, compute, *, client_id=None, tables=DASHBOARD_TABLES):
+    """``compute()`` for ``(endpoint, params)``, served from memory while the
+    tables it reads (for ``client_id``, or every client when None) are
+    unchanged. The caller owns the returned object."""
+    if not ENABLED or SIZE <= 0:
+        return compute()
+    key = _key(endpoint, params)
+    tag = _tag(client_id, tables)
+    value = _lookup(key, tag)
+    if value is not None:
+        return copy.deepcopy(value)
+    with _lock:
+        key_lock = _key_locks.setdefault(key, threading.Lock())
+    computed = False
+    with key_lock:
+        value = _lookup(key, tag)
+        if value is None:
+            with _lock:
+                STATS["misses"] += 1
+            t = time.perf_counter()
+            value = compute()
+            computed = True
+            log.debug("response cache: computed %s in %.3fs", endpoint, time.perf_counter() - t)
+            with _lock:
+                # A write while computing bumped the counters past ``tag``;
+                # the entry then never matches and is recomputed.
+                _entries[key] = (tag, copy.deepcopy(value))
+                _entries.move_to_end(key)
+                while len(_entries) > SIZE:
+                    _entries.popitem(last=False)
+    with _lock:
+        _key_locks.pop(key, None)
+    return value if computed else copy.deepcopy(value)
+
+
+def clear() -> None:
+    """Drop every entry (a restored database's counters go backwards)."""
+    with _lock:
+        _entries.clear()
+
+
+def response_cache_stats() -> dict:
+    with _lock:
+        return {**STATS, "entries": len(_entries), "size": SIZE, "enabled": ENABLED}
@@ -14,6 +14,19 @@ Key resolution (first match wins):
     3. HUB_SECRET env var, HKDF-stretched to a Fernet key (last-resort
        fallback so encryption never silently degrades to plaintext).
 
+Decrypt cache:
+    Chat polling re-reads the same page of up to 200 messages for every open
+    tab, so `decrypt_message` / `decrypt_many` keep a bounded, process-local
+    LRU of plaintexts keyed by (message id, SHA-256 of the stored ciphertext).
+    It lives only in this process's memory - it is never written to disk,
+    the database or any log - and `clear_decrypt_cache()` drops it.
+    CHAT_DECRYPT_CACHE_SIZE sets the entry cap (default 2000; 0 disables).
+
+Mention index:
+    `decrypt_mentions` reads the @handle ciphertext earlier builds wrote to
+    chat_messages.mentions_enc. Only the one-time chat_mentions backfill
+    calls it; new messages resolve mentions straight into chat_mentions.
+
 This module intentionally degrades to a best-effort passthrough only when the
 `cryptography` package is missing AND no key material is available — that
 combination would only happen in a misconfigured dev shell and is loud-logged.
@@ -25,6 +38,7 @@ import hashlib
 import logging
 import os
 import threading
+from collections import OrderedDict
 from pathlib import Path
 
 log = logging.getLogger(__name__)
@@ -37,6 +51,11 @@ _cipher = None        # cached Fernet instance (or None if unavailable)
 _init_done = False
 _init_warning_emitted = False
 
+DECRYPT_CACHE_SIZE = int(os.getenv("CHAT_DECRYPT_CACHE_SIZE", "2000"))
+_plain_lock = threading.Lock()
+_plain: "OrderedDict[tuple, str]" = OrderedDict()
+_plain_stats = {"hits": 0, "misses": 0}
+
 
 def _resolve_data_dir() -> Path:
     """Return the directory to drop the auto-generated chat key into.
@@ -193,15 +212,7 @@ def encrypt_message(plaintext: str) -> str:
         return plaintext
 
 
-def decrypt_message(stored: str | None) -> str:
-    """Reverse of `encrypt_message`. Returns plaintext. Passes through any
-    value that is missing the prefix (legacy plaintext rows)."""
-    if stored is None:
-        return ""
-    if not isinstance(stored, str):
-        stored = str(stored)
-    if not stored.startswith(CHAT_BODY_PREFIX):
-        return stored
+def _decrypt_token(stored: str) -> str:
     cipher = _get_cipher()
     if not cipher:
         # We literally cannot read this row — return a placeholder so the UI
@@ -215,6 +226,76 @@ def decrypt_message(stored: str | None) -> str:
         return _PHI_SAFE_PLACEHOLDER
 
 
+def _cache_key(message_id, stored: str) -> tuple:
+    return (int(message_id or 0), hashlib.sha256(stored.encode("ascii", "replace")).digest())
+
+
+def decrypt_message(stored: str | None, message_id: int | None = None) -> str:
+    """Reverse of `encrypt_message`. Returns plaintext. Passes through any
+    value that is missing the prefix (legacy plaintext rows). Pass the row's
+    ``message_id`` when known so repeat reads hit the decrypt cache under it."""
+    return decrypt_many([(message_id, stored)])[0]
+
+
+def decrypt_many(items) -> list[str]:
+    """Decrypt ``[(message_id, stored), ...]`` in one pass: cached plaintexts
+    are served under a single lock acquisition, only the misses run Fernet,
+    and the results come back in input order."""
+    items = list(items)
+    out: list = [None] * len(items)
+    misses = []
+    with _plain_lock:
+        for i, (mid, stored) in enumerate(items):
+            if stored is None:
+                out[i] = ""
+                continue
+            if not isinstance(stored, str):
+                stored = str(stored)
+            if not stored.startswith(CHAT_BODY_PREFIX):
+                out[i] = stored
+                continue
+            key = _cache_key(mid, stored)
+            hit = _plain.get(key) if DECRYPT_CACHE_SIZE > 0 else None
+            if hit is not None:
+                _plain.move_to_end(key)
+                _plain_stats["hits"] += 1
+                out[i] = hit
+            else:
+                misses.append((i, key, stored))
+        _plain_stats["misses"] += len(misses)
+    if not misses:
+        return out
+    fresh = []
+    for i, key, stored in misses:
+        out[i] = _decrypt_token(stored)
+        if out[i] != _PHI_SAFE_PLACEHOLDER:
+            fresh.append((key, out[i]))
+    if fresh and DECRYPT_CACHE_SIZE > 0:
+        with _plain_lock:
+            for key, text in fresh:
+                _plain[key] = text
+                _plain.move_to_end(key)
+            while len(_plain) > DECRYPT_CACHE_SIZE:
+                _plain.popitem(last=False)
+    return out
+
+
+def clear_decrypt_cache() -> None:
+    with _plain_lock:
+        _plain.clear()
+
+
+def decrypt_cache_stats() -> dict:
+    """Counters only — never any cached text."""
+    with _plain_lock:
+        return {**_plain_stats, "entries": len(_plain), "max_entries": DECRYPT_CACHE_SIZE}
+
+
+def decrypt_mentions(stored: str | None, message_id: int | None = None) -> set[str]:
+    text = decrypt_message(stored, message_id) if stored else ""
+    return set() if text == _PHI_SAFE_PLACEHOLDER else set(text.split())
+
+
 def phi_safe_preview(plaintext: str, max_len: int = 0) -> str:
     """Return a length-only marker safe to drop in audit logs / activity
     feeds / email notification bodies. `max_len` is accepted for future use
@@ -0,0 +1,161 @@
+"""
+Startup step timings and the data-repair registry.
+
+Every boot used to re-run six whole-table repair passes before the hub
+answered health checks.  Each repair here names the tables it reads; it
+runs only when one of them was written since its last run (the per-table
+write counters in ``data_versions``, bumped by triggers) or when its
+``version`` is bumped after a logic change.  Schema migrations are handled
+by ``_run_migration_once`` in client_db and run once.
+
+Each startup step — backup, schema init, each repair — is timed, logged and
+kept in ``STARTUP_STEPS`` for ``/readyz``.
+
+Eligibility, PDF/XLSX, AI and import-parser libraries are imported inside
+the functions that use them, so ``import app.hub_app`` stays cheap
+(test_import_time.py holds it to a budget).  Once startup finishes they are
+imported on a background thread (``prewarm_lazy_imports``) so the first
+eligibility check or PDF export doesn't pay for the import either.
+
+Configuration via environment variables:
+  STARTUP_REPAIRS_FORCE  - "1" runs every repair regardless of watermarks
+  STARTUP_PREWARM        - "0" disables the background import pre-warm
+  STARTUP_PREWARM_DELAY  - seconds to wait before pre-warming (default 2),
+                           so uvicorn binds the port first
+"""
+
+from __future__ import annotations
+
+import importlib
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+log = logging.getLogger("startup")
+
+STARTUP_STEPS: list[dict] = []
+
+PREWARM_DELAY = float(os.getenv("STARTUP_PREWARM_DELAY", "2"))
+
+# Deferred imports, roughly in order of how soon a user is likely to need them.
+PREWARM_MODULES = (
+    "rule_intercept",
+    "app.security",
+    "openpyxl",
+    "xlrd",
+    "eligibility_hybrid.rules",
+    "eligibility_hybrid.policy",
+    "eligibility_hybrid.batch",
+    "eligibility_hybrid.stedi",
+    "eligibility_hybrid.hets",
+    "eligibility_hybrid.pverify",
+    "eligibility_hybrid.lab_report",
+    "reportlab.platypus",
+    "numpy",
+    "pypdf",
+    "docx",
+    "openai",
+)
+
+PREWARM_STATE: dict = {"status": "idle", "seconds": 0.0, "modules": {}}
+
+
+def _repairs():
+    """(name, version, watched tables, callable, summary) in run order."""
+    from app import client_db as db
+    from app.client_routes import auto_import_pending_claim_files, auto_import_pending_payment_files
+    return (
+        ("normalize_claim_statuses", 1, ("claims_master",), db.normalize_claim_statuses,
+         "normalized {} claim status value(s)"),
+        ("backfill_missing_bill_dates", 1, ("claims_master",), db.backfill_missing_bill_dates,
+         "backfilled Bill Date on {} billed claim(s)"),
+        ("backfill_dos_from_claim_key", 1, ("claims_master",), db.backfill_dos_from_claim_key,
+         "recovered DOS from accession on {} claim(s)"),
+        ("auto_import_pending_claim_files", 1, ("client_files",), auto_import_pending_claim_files,
+         "auto-import sweep {}"),
+        ("auto_import_pending_payment_files", 1, ("client_files",), auto_import_pending_payment_files,
+         "deposit/ERA sweep {}"),
+        ("dedupe_resubmitted_claims", 1, ("claims_master",), db.dedupe_resubmitted_claims,
+         "collapsed {} duplicate resubmitted claim line(s)"),
+    )
+
+
+@contextmanager
+def startup_step(name: str, kind: str = "step"):
+    """Time one startup step and record it in STARTUP_STEPS. The yielded
+    dict can be updated with ``status`` / ``result``."""
+    entry = {"name": name, "kind": kind, "status": "ok"}
+    t = time.perf_counter()
+    try:
+        yield entry
+    except Exception as exc:
+        entry["status"] = "failed"
+        entry["error"] = f"{type(exc).__name__}: {exc}"
+        raise
+    finally:
+        entry["seconds"] = round(time.perf_counter() - t, 3)
+        STARTUP_STEPS.append(entry)
+        log.info("startup %s %s: %s in %.3fs", kind, name, entry["status"], entry["seconds"])
+
+
+def run_startup_repairs(force: bool = None) -> list[dict]:
+    """Run every registered repair whose watched tables changed. A failing
+    repair is logged and recorded; the rest still run."""
+    from app.client_db import run_repair_if_dirty
+    if force is None:
+        force = os.getenv("STARTUP_REPAIRS_FORCE", "") == "1"
+    out = []
+    for name, version, watches, fn, summary in _repairs():
+        try:
+            with startup_step(name, kind="repair") as entry:
+                step = run_repair_if_dirty(name, fn, watches=watches, version=version, force=force)
+                entry["status"] = step["status"]
+                entry["result"] = step["result"]
+                if step["status"] == "ran":
+                    log.info("✅ %s", summary.format(step["result"]))
+        except Exception as exc:
+            log.error(f"Startup error: {name} failed: {exc}")
+        out.append(STARTUP_STEPS[-1])
+    return out
+
+
+def _prewarm(modules, delay):
+    if delay:
+        time.sleep(delay)
+    PREWARM_STATE["status"] = "running"
+    t = time.perf_counter()
+    for name in modules:
+        m = time.perf_counter()
+        try:
+            importlib.import_module(name)
+            PREWARM_STATE["modules"][name] = round(time.perf_counter() - m, 3)
+        except Exception as exc:
+            # Optional dependency (e.g. openai on a box without an API key
+            # configured); the feature that needs it reports the error.
+            PREWARM_STATE["modules"][name] = f"{type(exc).__name__}: {exc}"
+    PREWARM_STATE["seconds"] = round(time.perf_counter() - t, 3)
+    PREWARM_STATE["status"] = "done"
+    log.info("startup prewarm: %d module(s) in %.3fs", len(modules), PREWARM_STATE["seconds"])
+
+
+def prewarm_lazy_imports(modules=PREWARM_MODULES, delay: float = None):
+    """Import the deferred heavy modules on a daemon thread. Returns the
+    thread, or None when STARTUP_PREWARM=0."""
+    if os.getenv("STARTUP_PREWARM", "1") == "0":
+        PREWARM_STATE["status"] = "disabled"
+        return None
+    PREWARM_STATE.update(status="pending", seconds=0.0, modules={})
+    th = threading.Thread(target=_prewarm, args=(tuple(modules), PREWARM_DELAY if delay is None else delay),
+                          name="startup-prewarm", daemon=True)
+    th.start()
+    return th
+
+
+def startup_report() -> dict:
+    return {
+        "total_seconds": round(sum(s["seconds"] for s in STARTUP_STEPS), 3),
+        "steps": list(STARTUP_STEPS),
+        "prewarm": {**PREWARM_STATE, "modules": dict(PREWARM_STATE["modules"])},
+    }
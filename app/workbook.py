@@ -0,0 +1,368 @@
+"""
+Parse-once spreadsheet model shared by the upload classifiers and importers.
+
+An upload used to be parsed several times in a row: the deposit-register
+check, the row count, category inference, the template matchers, the SVD
+batch guards and finally the importer each opened the bytes again. A
+``ParsedWorkbook`` is built once per file and holds everything they need:
+
+  • sheets      - (name, typed cell matrix) per sheet; xlsx/ods/xls values
+                  keep their types (xls date serials become datetimes),
+                  CSV cells are strings
+  • header rows - the smart header detection, computed lazily per sheet
+  • row dicts   - ``rows(combine_sheets)`` builds fresh header-keyed rows
+                  from the matrix on each call (they are not kept: the dicts
+                  would double the workbook's memory)
+  • memo        - ``memo(name, fn)`` caches any other derived result
+                  (template matches, batch-sheet scans) on the workbook
+
+``parse_workbook(content, ext)`` keeps the most recent workbooks in an LRU
+keyed by the SHA-1 of the bytes, so every helper that receives the same
+upload - and the sweep jobs that re-read stored files - share one parse. The
+LRU is budgeted on each workbook's estimated in-memory size (a parsed matrix
+runs 10-25x its compressed xlsx source), measured from a row sample.
+
+Configuration via environment variables:
+  WORKBOOK_CACHE_SIZE    - parsed workbooks kept in memory (default 16; 0 disables)
+  WORKBOOK_CACHE_MAX_MB  - cap on the estimated memory of the cached workbooks
+                           (default 128); the newest workbook is always kept
+"""
+
+from __future__ import annotations
+
+import csv
+import hashlib
+import io
+import os
+import sys
+import threading
+from collections import OrderedDict, defaultdict
+
+CACHE_SIZE = int(os.getenv("WORKBOOK_CACHE_SIZE", "16"))
+CACHE_MAX_BYTES = int(float(os.getenv("WORKBOOK_CACHE_MAX_MB", "128")) * 1024 * 1024)
+_SIZE_SAMPLE_ROWS = 200
+
+STATS = {"parses": 0, "hits": 0}
+_cache: "OrderedDict[tuple[str, str], ParsedWorkbook]" = OrderedDict()
+_lock = threading.Lock()
+
+
+def _kind(ext: str) -> str:
+    e = (ext or "").lower()
+    if e == ".csv":
+        return "csv"
+    if e == ".xls":
+        return "xls"
+    if e in (".ods", ".odf"):
+        return "ods"
+    return "xlsx"
+
+
+def _filled(c) -> bool:
+    return c is not None and bool(str(c).strip())
+
+
+def _estimate_bytes(sheets) -> int:
+    """Approximate memory held by the sheets' cell matrices, from up to
+    _SIZE_SAMPLE_ROWS evenly spaced rows per sheet."""
+    total = 0
+    for s in sheets:
+        n = len(s.cells)
+        if not n:
+            continue
+        step = max(1, n // _SIZE_SAMPLE_ROWS)
+        sample = s.cells[::step]
+        per_row = sum(sys.getsizeof(r) + sum(sys.getsizeof(c) for c in r if c is not None)
+                      for r in sample) / len(sample)
+        total += int(per_row * n) + 8 * n
+    return total
+
+
+class Sheet:
+    """One sheet: its name and the full typed cell matrix (row tuples)."""
+
+    __slots__ = ("name", "cells", "kind", "_header_index", "_headers")
+
+    def __init__(self, name: str, cells: list[tuple], kind: str):
+        self.name = name
+        self.cells = cells
+        self.kind = kind
+        self._header_index = None
+        self._headers = None
+
+    @property
+    def header_index(self) -> int:
+        """The most label-like row within the first 10 (skips title and blank
+        rows above the real header). CSV needs 2 filled cells and counts any
+        non-numeric text; typed formats need 3 filled cells and count strings."""
+        if self._header_index is None:
+            if self.kind == "csv":
+                best_idx, best_score, min_filled = 0, -1, 2
+
+                def is_text(c):
+                    return _filled(c) and not (str(c).strip().replace(",", "").replace(".", "")
+                                               .replace("$", "").replace("-", "").isdigit())
+            else:
+                best_idx, best_score, min_filled = 0, 0, 3
+
+                def is_text(c):
+                    return isinstance(c, str) and bool(c.strip())
+            for idx, row in enumerate(self.cells[:10]):
+                non_empty = sum(1 for c in row if _filled(c))
+                score = sum(1 for c in row if is_text(c)) * 2 + non_empty
+                if non_empty >= min_filled and score > best_score:
+                    best_score, best_idx = score, idx
+            self._header_index = best_idx
+        return self._header_index
+
+    @property
+    def headers(self) -> list[str]:
+        if self._headers is None:
+            if not self.cells:
+                self._headers = []
+            else:
+                row = self.cells[self.header_index]
+                if self.kind == "xlsx":
+                    self._headers = [str(c).strip() if c else "" for c in row]
+                else:
+                    self._headers = [str(c).strip() if c is not None else "" for c in row]
+        return self._headers
+
+    def data_rows(self) -> list[dict]:
+        """Non-blank rows below the header, keyed by header text."""
+        hdrs = self.headers
+        return [dict(zip(hdrs, r)) for r in self.cells[self.header_index + 1:]
+                if any(_filled(c) for c in r)]
+
+
+class ParsedWorkbook:
+    """Every sheet of one uploaded spreadsheet, parsed once."""
+
+    def __init__(self, kind: str, sheets: list[Sheet], digest: str = "", size: int = 0):
+        self.kind = kind
+        self.sheets = sheets
+        self.digest = digest
+        self.size = size
+        self.footprint = _estimate_bytes(sheets)
+        self._memo: dict[str, object] = {}
+        self._lock = threading.Lock()
+
+    def sheet_rows(self) -> list[tuple[str, list[tuple]]]:
+        """[(sheet_name, [row_tuples...]), ...] - the raw matrices."""
+        return [(s.name, s.cells) for s in self.sheets]
+
+    def rows(self, combine_sheets: bool = True) -> list[dict]:
+        """Header-keyed rows. With ``combine_sheets`` the sheets sharing the
+        most common header structure are concatenated (multi-tab claim files);
+        otherwise the single sheet with the most rows wins. Each call builds
+        fresh dicts so importers may annotate them freely."""
+        return self._build_rows(combine_sheets)
+
+    def _build_rows(self, combine_sheets: bool) -> list[dict]:
+        if self.kind == "csv":
+            return self.sheets[0].data_rows() if self.sheets and self.sheets[0].cells else []
+        sheet_results = []
+        for s in self.sheets:
+            if not s.cells or (self.kind == "xls" and len(s.cells) < 2):
+                continue
+            hdrs = s.headers
+            if sum(1 for h in hdrs if h) < 2:
+                continue
+            srows = s.data_rows()
+            if srows:
+                hdr_key = tuple(sorted(h.lower() for h in hdrs if h))
+                sheet_results.append((hdr_key, srows))
+        if not sheet_results:
+            return []
+        if combine_sheets:
+            groups = defaultdict(list)
+            for hdr_key, srows in sheet_results:
+                groups[hdr_key].extend(srows)
+            return max(groups.values(), key=len)
+        return max(sheet_results, key=lambda x: len(x[1]))[1]
+
+    def __getstate__(self):
+        # Picklable so a worker process can build it (app.ingest.parse_ahead).
+        state = dict(self.__dict__)
+        state.pop("_lock", None)
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    def memo(self, name: str, fn):
+        """Compute ``fn()`` once per workbook and keep the result."""
+        with self._lock:
+            if name in self._memo:
+                return self._memo[name]
+        value = fn()
+        with self._lock:
+            return self._memo.setdefault(name, value)
+
+
+# ─── Loaders ──────────────────────────────────────────────────────────────────
+
+def _load_csv(content: bytes) -> list[Sheet]:
+    # Decode tolerantly: strip a BOM if present, fall back through encodings
+    # so files exported from Excel/Windows/Mac all parse.
+    text = None
+    for enc in ("utf-8-sig", "utf-8", "latin-1"):
+        try:
+            text = content.decode(enc)
+            break
+        except Exception:
+            continue
+    if text is None:
+        text = content.decode("utf-8", errors="replace")
+    # Detect the delimiter — exports aren't always comma-separated
+    # (semicolon in many locales, tab/pipe from some systems).
+    sample = text[:8192]
+    delim = ","
+    try:
+        delim = csv.Sniffer().sniff(sample, delimiters=",;\t|").delimiter
+    except Exception:
+        first_line = next((ln for ln in sample.splitlines() if ln.strip()), "")
+        if first_line:
+            delim = max(",;\t|", key=first_line.count)
+    cells = [tuple(r) for r in csv.reader(io.StringIO(text), delimiter=delim)]
+    return [Sheet("sheet1", cells, "csv")]
+
+
+def _load_xls(content: bytes) -> list[Sheet]:
+    # Legacy Excel (BIFF) — xlrd; date serials become datetimes.
+    import xlrd
+    wb = xlrd.open_workbook(file_contents=content)
+    sheets = []
+    for sidx in range(wb.nsheets):
+        ws = wb.sheet_by_index(sidx)
+        cells = []
+        for ri in range(ws.nrows):
+            row = []
+            for cell in ws.row(ri):
+                if cell.ctype == xlrd.XL_CELL_DATE:
+                    try:
+                        row.append(xlrd.xldate_as_datetime(cell.value, wb.datemode))
+                        continue
+                    except Exception:
+                        pass
+                row.append(cell.value)
+            cells.append(tuple(row))
+        sheets.append(Sheet(ws.name, cells, "xls"))
+    return sheets
+
+
+def _load_ods(content: bytes) -> list[Sheet]:
+    # OpenDocument spreadsheets — parse content.xml from the zip package.
+    import xml.etree.ElementTree as _et
+    import zipfile as _zipfile
+
+    ns = {
+        "table": "urn:oasis:names:tc:opendocument:xmlns:table:1.0",
+        "text": "urn:oasis:names:tc:opendocument:xmlns:text:1.0",
+        "office": "urn:oasis:names:tc:opendocument:xmlns:office:1.0",
+    }
+    a_name = "{urn:oasis:names:tc:opendocument:xmlns:table:1.0}name"
+    a_row_rep = "{urn:oasis:names:tc:opendocument:xmlns:table:1.0}number-rows-repeated"
+    a_col_rep = "{urn:oasis:names:tc:opendocument:xmlns:table:1.0}number-columns-repeated"
+    a_str = "{urn:oasis:names:tc:opendocument:xmlns:office:1.0}string-value"
+    a_date = "{urn:oasis:names:tc:opendocument:xmlns:office:1.0}date-value"
+    a_val = "{urn:oasis:names:tc:opendocument:xmlns:office:1.0}value"
+
+    try:
+        with _zipfile.ZipFile(io.BytesIO(content)) as zf:
+            xml_bytes = zf.read("content.xml")
+    except Exception as exc:
+        raise ValueError(f"Cannot read OpenDocument file: {exc}") from exc
+
+    root = _et.fromstring(xml_bytes)
+    sheets = []
+    for table in root.findall(".//table:table", ns):
+        cells = []
+        for tr in table.findall("table:table-row", ns):
+            row_repeat = int(tr.attrib.get(a_row_rep, "1") or "1")
+            row_vals = []
+            for cell in tr:
+                if not (cell.tag.endswith("table-cell") or cell.tag.endswith("covered-table-cell")):
+                    continue
+                col_repeat = int(cell.attrib.get(a_col_rep, "1") or "1")
+                parts = []
+                for p in cell.findall(".//text:p", ns):
+                    txt = "".join(p.itertext()).strip()
+                    if txt:
+                        parts.append(txt)
+                v = " ".join(parts).strip()
+                if not v:
+                    v = (cell.attrib.get(a_str) or cell.attrib.get(a_date) or cell.attrib.get(a_val) or "")
+                row_vals.extend([v] * max(1, col_repeat))
+            if not row_vals:
+                continue
+            for _ in range(max(1, row_repeat)):
+                cells.append(tuple(row_vals))
+        sheets.append(Sheet(table.attrib.get(a_name, f"sheet{len(sheets) + 1}"), cells, "ods"))
+    return sheets
+
+
+def _load_xlsx(content: bytes) -> list[Sheet]:
+    import openpyxl
+    try:
+        wb = openpyxl.load_workbook(io.BytesIO(content), read_only=True, data_only=True)
+    except Exception as exc:
+        raise ValueError(f"Cannot read Excel file: {exc}. If this is a .xls file, rename to .xls extension.") from exc
+    try:
+        return [Sheet(sn, list(wb[sn].iter_rows(values_only=True)), "xlsx") for sn in wb.sheetnames]
+    finally:
+        wb.close()
+
+
+_LOADERS = {"csv": _load_csv, "xls": _load_xls, "ods": _load_ods, "xlsx": _load_xlsx}
+
+
+def read_workbook(content: bytes, ext: str) -> ParsedWorkbook:
+    """Parse ``content`` without consulting the cache. Raises on unreadable files."""
+    kind = _kind(ext)
+    with _lock:
+        STATS["parses"] += 1
+    return ParsedWorkbook(kind, _LOADERS[kind](content), size=len(content))
+
+
+def parse_workbook(content, ext: str) -> ParsedWorkbook:
+    """The shared ``ParsedWorkbook`` for ``content`` (bytes, or an already
+    parsed workbook which is returned as-is). Parse errors propagate and are
+    not cached."""
+    if isinstance(content, ParsedWorkbook):
+        return content
+    key = (hashlib.sha1(content).hexdigest(), _kind(ext))
+    with _lock:
+        wb = _cache.get(key)
+        if wb is not None:
+            _cache.move_to_end(key)
+            STATS["hits"] += 1
+            return wb
+    return remember(content, ext, read_workbook(content, ext), key=key)
+
+
+def remember(content: bytes, ext: str, wb: ParsedWorkbook, key: tuple = None) -> ParsedWorkbook:
+    """Store a workbook parsed elsewhere (e.g. in a worker process) as the
+    shared parse of ``content``; returns the cached instance."""
+    key = key or (hashlib.sha1(content).hexdigest(), _kind(ext))
+    wb.digest = key[0]
+    if CACHE_SIZE > 0:
+        with _lock:
+            wb = _cache.setdefault(key, wb)
+            _cache.move_to_end(key)
+            total = sum(w.footprint for w in _cache.values())
+            while len(_cache) > 1 and (len(_cache) > CACHE_SIZE or total > CACHE_MAX_BYTES):
+                total -= _cache.popitem(last=False)[1].footprint
+    return wb
+
+
+def workbook_stats() -> dict:
+    with _lock:
+        return {**STATS, "cached": len(_cache), "cached_bytes": sum(w.footprint for w in _cache.values()),
+                "cache_size": CACHE_SIZE}
+
+
+def clear_cache() -> None:
+    with _lock:
+        _cache.clear()
@@ -11,7 +11,7 @@ import sqlite3
 from collections import Counter
 
 from app.backup_people import find_backup_people
-from app.config import DATABASE_PATH
+from app.database import iter_lead_email_candidates, iter_saved_leads
 from app.email_finder import _is_generic_company_mailbox, _is_quality_email
 from app.email_verifier import verify_batch
 from app.linkedin_resolver import (
@@ -123,39 +123,12 @@ def _candidate_rank(row: sqlite3.Row) -> tuple[int, int, int, int]:
 
 def _best_rows() -> list[dict]:
     national = _load_national_rows()
-    conn = sqlite3.connect(DATABASE_PATH)
-    conn.row_factory = sqlite3.Row
-
-    rows = conn.execute(
-        """
-        SELECT
-            sl.npi,
-            sl.organization_name,
-            sl.city,
-            sl.state,
-            sl.phone,
-            sl.lead_score,
-            sl.tags,
-            sl.notes,
-            sl.taxonomy_desc,
-            le.email,
-            le.first_name,
-            le.last_name,
-            le.position,
-            le.confidence,
-            le.source,
-            le.domain
-        FROM saved_leads sl
-        JOIN lead_emails le ON le.npi = sl.npi
-        ORDER BY sl.npi, le.confidence DESC, le.id ASC
-        """
-    ).fetchall()
-    conn.close()
-
     best_person: dict[str, sqlite3.Row] = {}
     best_generic: dict[str, sqlite3.Row] = {}
 
-    for row in rows:
+    # Streamed off one cursor (ordered by npi) instead of fetchall() of the
+    # whole saved_leads x lead_emails join.
+    for row in iter_lead_email_candidates():
         npi = str(row["npi"] or "").strip()
         email = str(row["email"] or "").strip().lower()
         if not npi or not email:
@@ -333,36 +306,20 @@ def _apply_mx_gate(rows: list[dict]) -> list[dict]:
     return gated
 
 
-def _saved_lead_candidates() -> list[sqlite3.Row]:
-    conn = sqlite3.connect(DATABASE_PATH)
-    conn.row_factory = sqlite3.Row
-    rows = conn.execute(
-        """
-        SELECT
-            npi,
-            organization_name,
-            first_name,
-            last_name,
-            credential,
-            taxonomy_desc,
-            address_line1,
-            city,
-            state,
-            zip_code,
-            phone,
-            lead_score,
-            notes,
-            tags
-        FROM saved_leads
-        WHERE organization_name != ''
-        ORDER BY lead_score DESC, updated_at DESC, created_at DESC
-        """
-    ).fetchall()
-    conn.close()
-    return rows
-
-
-def _fallback_contact_title(lead: sqlite3.Row, national: dict) -> str:
+def _saved_lead_candidates(limit: int = MAX_LINKEDIN_CANDIDATES_TO_SCAN):
+    """Best-scored saved leads with an org name, paged off the
+    (lead_score, id) index rather than loading the whole table."""
+    taken = 0
+    for lead in iter_saved_leads(batch_size=min(limit, 500)):
+        if not str(lead.get("organization_name") or "").strip():
+            continue
+        yield lead
+        taken += 1
+        if taken >= limit:
+            return
+
+
+def _fallback_contact_title(lead: dict, national: dict) -> str:
     title = str(national.get("contact_title") or "").strip()
     if title:
         return title
@@ -375,7 +332,7 @@ def _build_linkedin_fallback_rows(email_rows: list[dict]) -> list[dict]:
     fallback_rows: list[dict] = []
     seen_org_keys: set[tuple[str, str, str]] = set()
 
-    for lead in _saved_lead_candidates()[:MAX_LINKEDIN_CANDIDATES_TO_SCAN]:
+    for lead in _saved_lead_candidates():
         npi = str(lead["npi"] or "").strip()
         if not npi or npi in covered_npis:
             continue
@@ -13,7 +13,7 @@ from datetime import datetime
 ROOT = os.path.dirname(os.path.abspath(__file__))
 sys.path.insert(0, ROOT)
 
-from app.database import init_db, save_lead, get_db, _run_write_with_retry  # noqa: E402
+from app.database import init_db, save_leads_bulk, get_db  # noqa: E402
 
 SRC = os.path.join(ROOT, "output", "labs_routed_full.csv")
 if not os.path.exists(SRC):
@@ -34,9 +34,7 @@ print(f"[FILTER] {len(rows)} have NPI + valid tier")
 TIER_RANK = {"A": 0, "B": 1, "C": 2}
 rows.sort(key=lambda r: (TIER_RANK.get(r.get("tier"), 9), -int(r.get("rule_score") or 0)))
 
-inserted = 0
-skipped = 0
-for r in rows:
+def _lead(r: dict) -> dict:
     try:
         score = int(r.get("rule_score") or 0)
     except ValueError:
@@ -48,7 +46,7 @@ for r in rows:
         f"Lab Type: {r.get('lab_type','')} | "
         f"Signals: {r.get('signals','')}"
     )
-    lead = {
+    return {
         "npi": r.get("npi"),
         "organization_name": r.get("org_name", ""),
         "first_name": "",
@@ -71,13 +69,14 @@ for r in rows:
         "tags": tags,
         "source": "rule-intercept",
     }
-    try:
-        save_lead(lead)
-        inserted += 1
-    except Exception as exc:
-        skipped += 1
-        if skipped <= 3:
-            print(f"  skip {r.get('npi')}: {exc}")
+
+
+outcomes = save_leads_bulk(_lead(r) for r in rows)
+inserted = sum(1 for o in outcomes if o["status"] == "saved")
+failed = [o for o in outcomes if o["status"] != "saved"]
+skipped = len(failed)
+for o in failed[:3]:
+    print(f"  skip {o['npi']}: {o['error']}")
 
 # Verify
 conn = get_db()
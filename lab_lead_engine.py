@@ -11,16 +11,25 @@ One-file pipeline:
 4. Compute Money / Pain / Fit scores.
 5. Export scored leads and Apollo-ready enrichment file.
 
+All per-row work is vectorized (compiled regex alternations, explicit-format
+date parsing, whole-column score arithmetic) and the NPI extract is read in
+chunks with only the mapped columns, so a full national NPPES file fits in
+memory. Parquet copies are written next to each CSV when pyarrow is present.
+
 Requirements:
-    pip install pandas python-dateutil
+    pip install pandas            (pyarrow optional, for Parquet output)
 
 Run:
     python lab_lead_engine.py
 """
 
 import os
+import re
+
+import numpy as np
 import pandas as pd
-from dateutil import parser as dateparser
+
+from lead_engine_common import keyword_regex, write_table
 
 # -------------------------------------------------------------------
 # 0. CONFIG
@@ -46,14 +55,34 @@ URGENT_CARE_KEYWORDS = ["urgent care"]
 ASC_KEYWORDS = ["ambulatory surgical center", "asc"]
 HEALTH_SYSTEM_KEYWORDS = ["hospital", "health system", "medical center"]
 
+# Rows per chunk when streaming large extracts (NPPES is ~8M rows x 330 cols).
+CHUNK_ROWS = 250_000
+
+# Date layouts seen in state licensing files, tried in order before a
+# last-resort mixed-format parse.
+DATE_FORMATS = ["%Y-%m-%d", "%m/%d/%Y", "%Y%m%d", "%m-%d-%Y", "%m/%d/%y", "%Y-%m-%d %H:%M:%S"]
+
 # -------------------------------------------------------------------
 # 1. UTILITIES
 # -------------------------------------------------------------------
 
-def safe_read_csv(path_or_url: str) -> pd.DataFrame:
+def safe_read_csv(path_or_url: str, usecols=None, chunk_filter=None) -> pd.DataFrame:
+    """Read a CSV as strings in CHUNK_ROWS chunks.
+
+    ``usecols`` limits parsing to the needed columns; ``chunk_filter`` (a
+    DataFrame -> DataFrame callable) drops unwanted rows per chunk so peak
+    memory tracks the kept rows, not the file size.
+    """
     print(f"[LOAD] {path_or_url}")
     try:
-        return pd.read_csv(path_or_url, dtype=str, low_memory=False)
+        reader = pd.read_csv(
+            path_or_url, dtype=str, usecols=usecols,
+            chunksize=CHUNK_ROWS, low_memory=False,
+        )
+        chunks = [chunk_filter(c) if chunk_filter else c for c in reader]
+        if not chunks:
+            return pd.DataFrame()
+        return pd.concat(chunks, ignore_index=True)
     except Exception as e:
         print(f"[WARN] Failed to read {path_or_url}: {e}")
         return pd.DataFrame()
@@ -70,24 +99,78 @@ def contains_any(text, keywords):
     return any(k.lower() in t for k in keywords)
 
 
+def col_contains(series: pd.Series, pattern: re.Pattern) -> pd.Series:
+    """Vectorized ``contains_any`` over a column; missing values never match."""
+    return series.astype(object).fillna("").astype(str).str.contains(pattern, na=False)
+
+
+def norm_col(df: pd.DataFrame, col) -> pd.Series:
+    """Column as stripped strings ('' when the column or value is missing)."""
+    if col is None or col not in df.columns:
+        return pd.Series("", index=df.index, dtype=object)
+    return df[col].astype(object).fillna("").astype(str).str.strip()
+
+
 def parse_date_safe(val):
     if pd.isna(val) or str(val).strip() == "":
         return None
-    try:
-        return dateparser.parse(str(val), fuzzy=True)
-    except Exception:
-        return None
+    parsed = parse_dates(pd.Series([str(val)]))[0]
+    return None if pd.isna(parsed) else parsed.to_pydatetime()
+
+
+def parse_dates(series: pd.Series) -> pd.Series:
+    """Parse a column with DATE_FORMATS (explicit, fast); NaT when unparseable."""
+    text = series.fillna("").astype(str).str.strip()
+    out = pd.Series(pd.NaT, index=series.index, dtype="datetime64[ns]")
+    todo = text != ""
+    for fmt in DATE_FORMATS:
+        if not todo.any():
+            break
+        parsed = pd.to_datetime(text[todo], format=fmt, errors="coerce")
+        hit = parsed.notna()
+        out.loc[parsed.index[hit]] = parsed[hit]
+        todo.loc[parsed.index[hit]] = False
+    if todo.any():
+        parsed = pd.to_datetime(text[todo], format="mixed", errors="coerce")
+        out.loc[parsed.index] = parsed
+    return out
+
+
+def _find_col(df_cols, candidates):
+    for c in candidates:
+        if c in df_cols:
+            return c
+    return None
+
+
+def _as_category(df: pd.DataFrame, cols) -> pd.DataFrame:
+    for c in cols:
+        if c in df.columns:
+            df[c] = df[c].astype("category")
+    return df
+
+
+_NPI_FILTER_RE = keyword_regex(LAB_TAXONOMY_KEYWORDS + URGENT_CARE_KEYWORDS + ASC_KEYWORDS)
+_LAB_RE = keyword_regex(LAB_TAXONOMY_KEYWORDS)
+_URGENT_RE = keyword_regex(URGENT_CARE_KEYWORDS)
+_ASC_RE = keyword_regex(ASC_KEYWORDS)
+_HEALTH_SYSTEM_RE = keyword_regex(HEALTH_SYSTEM_KEYWORDS)
+_HIGH_RE = re.compile("high", re.IGNORECASE)
+_LICENSE_PAIN_RE = re.compile("probation|suspend|revok|discipline|conditional", re.IGNORECASE)
 
 
 # -------------------------------------------------------------------
 # 2. LOADERS
 # -------------------------------------------------------------------
 
-def load_npi(path_or_url: str) -> pd.DataFrame:
-    df = safe_read_csv(path_or_url)
-    if df.empty:
-        return df
+def _read_header(path_or_url: str) -> list:
+    try:
+        return list(pd.read_csv(path_or_url, nrows=0).columns)
+    except Exception:
+        return []
+
 
+def load_npi(path_or_url: str) -> pd.DataFrame:
     col_map_candidates = {
         "NPI": ["NPI", "npi"],
         "ORG_NAME": [
@@ -125,36 +208,38 @@ def load_npi(path_or_url: str) -> pd.DataFrame:
         ]
     }
 
-    def find_col(df_cols, candidates):
-        for c in candidates:
-            if c in df_cols:
-                return c
-        return None
-
-    cols = df.columns
-    mapped = {k: find_col(cols, v) for k, v in col_map_candidates.items()}
-
-    if "Entity Type Code" in cols:
-        df = df[df["Entity Type Code"].astype(str) == "2"]
-
-    df_out = pd.DataFrame()
-    df_out["npi"] = df.get(mapped["NPI"], pd.Series(dtype=str)).astype(str)
-    df_out["org_name"] = df.get(mapped["ORG_NAME"], "").astype(str).map(normalize_str)
-    df_out["addr1"] = df.get(mapped["ADDR1"], "").astype(str).map(normalize_str)
-    df_out["city"] = df.get(mapped["CITY"], "").astype(str).map(normalize_str)
-    df_out["state"] = df.get(mapped["STATE"], "").astype(str).map(normalize_str)
-    df_out["zip"] = df.get(mapped["ZIP"], "").astype(str).map(normalize_str)
-    df_out["taxonomy"] = df.get(mapped["TAXONOMY"], "").astype(str).map(normalize_str)
+    cols = _read_header(path_or_url)
+    if not cols:
+        print(f"[WARN] Failed to read {path_or_url}")
+        return pd.DataFrame()
+    mapped = {k: _find_col(cols, v) for k, v in col_map_candidates.items()}
+    has_entity = "Entity Type Code" in cols
+    usecols = {c for c in mapped.values() if c} | ({"Entity Type Code"} if has_entity else set())
+    tax_col = mapped["TAXONOMY"]
+
+    def _keep(chunk: pd.DataFrame) -> pd.DataFrame:
+        mask = pd.Series(True, index=chunk.index)
+        if has_entity:
+            mask &= chunk["Entity Type Code"].astype(str) == "2"
+        mask &= col_contains(norm_col(chunk, tax_col), _NPI_FILTER_RE)
+        return chunk[mask]
+
+    df = safe_read_csv(path_or_url, usecols=sorted(usecols), chunk_filter=_keep)
+    if df.empty:
+        return df
 
-    mask = (
-        df_out["taxonomy"].str.lower().apply(
-            lambda t: contains_any(t, LAB_TAXONOMY_KEYWORDS + URGENT_CARE_KEYWORDS + ASC_KEYWORDS)
-        )
-    )
-    df_out = df_out[mask].reset_index(drop=True)
+    df_out = pd.DataFrame(index=df.index)
+    df_out["npi"] = norm_col(df, mapped["NPI"])
+    df_out["org_name"] = norm_col(df, mapped["ORG_NAME"])
+    df_out["addr1"] = norm_col(df, mapped["ADDR1"])
+    df_out["city"] = norm_col(df, mapped["CITY"])
+    df_out["state"] = norm_col(df, mapped["STATE"])
+    df_out["zip"] = norm_col(df, mapped["ZIP"])
+    df_out["taxonomy"] = norm_col(df, tax_col)
+    df_out = df_out.reset_index(drop=True)
 
     df_out["source_npi"] = True
-    return df_out
+    return _as_category(df_out, ["state", "taxonomy"])
 
 
 def load_clia(path_or_url: str) -> pd.DataFrame:
@@ -173,27 +258,20 @@ def load_clia(path_or_url: str) -> pd.DataFrame:
         "COMPLEXITY": ["Complexity", "complexity"],
     }
 
-    def find_col(df_cols, candidates):
-        for c in candidates:
-            if c in df_cols:
-                return c
-        return None
-
-    cols = df.columns
-    mapped = {k: find_col(cols, v) for k, v in col_map_candidates.items()}
+    mapped = {k: _find_col(df.columns, v) for k, v in col_map_candidates.items()}
 
-    df_out = pd.DataFrame()
-    df_out["clia"] = df.get(mapped["CLIA"], "").astype(str).map(normalize_str)
-    df_out["lab_name"] = df.get(mapped["LAB_NAME"], "").astype(str).map(normalize_str)
-    df_out["addr1"] = df.get(mapped["ADDR1"], "").astype(str).map(normalize_str)
-    df_out["city"] = df.get(mapped["CITY"], "").astype(str).map(normalize_str)
-    df_out["state"] = df.get(mapped["STATE"], "").astype(str).map(normalize_str)
-    df_out["zip"] = df.get(mapped["ZIP"], "").astype(str).map(normalize_str)
-    df_out["lab_type"] = df.get(mapped["LAB_TYPE"], "").astype(str).map(normalize_str)
-    df_out["complexity"] = df.get(mapped["COMPLEXITY"], "").astype(str).map(normalize_str)
+    df_out = pd.DataFrame(index=df.index)
+    df_out["clia"] = norm_col(df, mapped["CLIA"])
+    df_out["lab_name"] = norm_col(df, mapped["LAB_NAME"])
+    df_out["addr1"] = norm_col(df, mapped["ADDR1"])
+    df_out["city"] = norm_col(df, mapped["CITY"])
+    df_out["state"] = norm_col(df, mapped["STATE"])
+    df_out["zip"] = norm_col(df, mapped["ZIP"])
+    df_out["lab_type"] = norm_col(df, mapped["LAB_TYPE"])
+    df_out["complexity"] = norm_col(df, mapped["COMPLEXITY"])
 
     df_out["source_clia"] = True
-    return df_out
+    return _as_category(df_out, ["state", "lab_type", "complexity"])
 
 
 def load_state_license(path_or_url: str) -> pd.DataFrame:
@@ -214,30 +292,23 @@ def load_state_license(path_or_url: str) -> pd.DataFrame:
         "EXPIRY_DATE": ["Expiration Date", "Expiry Date", "expiry_date"],
     }
 
-    def find_col(df_cols, candidates):
-        for c in candidates:
-            if c in df_cols:
-                return c
-        return None
-
-    cols = df.columns
-    mapped = {k: find_col(cols, v) for k, v in col_map_candidates.items()}
+    mapped = {k: _find_col(df.columns, v) for k, v in col_map_candidates.items()}
 
-    df_out = pd.DataFrame()
-    df_out["license_id"] = df.get(mapped["LICENSE_ID"], "").astype(str).map(normalize_str)
-    df_out["facility_name"] = df.get(mapped["FACILITY_NAME"], "").astype(str).map(normalize_str)
-    df_out["addr1"] = df.get(mapped["ADDR1"], "").astype(str).map(normalize_str)
-    df_out["city"] = df.get(mapped["CITY"], "").astype(str).map(normalize_str)
-    df_out["state"] = df.get(mapped["STATE"], "").astype(str).map(normalize_str)
-    df_out["zip"] = df.get(mapped["ZIP"], "").astype(str).map(normalize_str)
-    df_out["license_status"] = df.get(mapped["LICENSE_STATUS"], "").astype(str).map(normalize_str)
-    df_out["license_type"] = df.get(mapped["LICENSE_TYPE"], "").astype(str).map(normalize_str)
+    df_out = pd.DataFrame(index=df.index)
+    df_out["license_id"] = norm_col(df, mapped["LICENSE_ID"])
+    df_out["facility_name"] = norm_col(df, mapped["FACILITY_NAME"])
+    df_out["addr1"] = norm_col(df, mapped["ADDR1"])
+    df_out["city"] = norm_col(df, mapped["CITY"])
+    df_out["state"] = norm_col(df, mapped["STATE"])
+    df_out["zip"] = norm_col(df, mapped["ZIP"])
+    df_out["license_status"] = norm_col(df, mapped["LICENSE_STATUS"])
+    df_out["license_type"] = norm_col(df, mapped["LICENSE_TYPE"])
 
-    df_out["issue_date"] = df.get(mapped["ISSUE_DATE"], "").map(parse_date_safe)
-    df_out["expiry_date"] = df.get(mapped["EXPIRY_DATE"], "").map(parse_date_safe)
+    df_out["issue_date"] = parse_dates(norm_col(df, mapped["ISSUE_DATE"]))
+    df_out["expiry_date"] = parse_dates(norm_col(df, mapped["EXPIRY_DATE"]))
 
     df_out["source_state"] = True
-    return df_out
+    return _as_category(df_out, ["state", "license_status", "license_type"])
 
 
 def load_cms_denials(path_or_url: str) -> pd.DataFrame:
@@ -254,27 +325,25 @@ def load_cms_denials(path_or_url: str) -> pd.DataFrame:
         "PERIOD": ["Period", "period"],
     }
 
-    def find_col(df_cols, candidates):
-        for c in candidates:
-            if c in df_cols:
-                return c
-        return None
+    mapped = {k: _find_col(df.columns, v) for k, v in col_map_candidates.items()}
 
-    cols = df.columns
-    mapped = {k: find_col(cols, v) for k, v in col_map_candidates.items()}
+    def _num(key):
+        col = mapped[key]
+        if col is None:
+            return pd.Series(0.0, index=df.index)
+        return pd.to_numeric(df[col], errors="coerce").fillna(0).astype("float64")
 
-    df_out = pd.DataFrame()
-    df_out["npi"] = df.get(mapped["NPI"], "").astype(str).map(normalize_str)
-    df_out["clia"] = df.get(mapped["CLIA"], "").astype(str).map(normalize_str)
-    df_out["total_claims"] = pd.to_numeric(df.get(mapped["TOTAL_CLAIMS"], 0), errors="coerce").fillna(0)
-    df_out["denied_claims"] = pd.to_numeric(df.get(mapped["DENIED_CLAIMS"], 0), errors="coerce").fillna(0)
-    df_out["denied_amount"] = pd.to_numeric(df.get(mapped["DENIAL_AMOUNT"], 0), errors="coerce").fillna(0)
-    df_out["period"] = df.get(mapped["PERIOD"], "").astype(str).map(normalize_str)
+    df_out = pd.DataFrame(index=df.index)
+    df_out["npi"] = norm_col(df, mapped["NPI"])
+    df_out["clia"] = norm_col(df, mapped["CLIA"])
+    df_out["total_claims"] = _num("TOTAL_CLAIMS")
+    df_out["denied_claims"] = _num("DENIED_CLAIMS")
+    df_out["denied_amount"] = _num("DENIAL_AMOUNT")
+    df_out["period"] = norm_col(df, mapped["PERIOD"])
 
-    df_out["denial_rate"] = df_out.apply(
-        lambda r: (r["denied_claims"] / r["total_claims"]) if r["total_claims"] > 0 else 0,
-        axis=1
-    )
+    total = df_out["total_claims"].to_numpy()
+    denied = df_out["denied_claims"].to_numpy()
+    df_out["denial_rate"] = np.divide(denied, total, out=np.zeros_like(denied), where=total > 0)
 
     df_out["source_cms_denials"] = True
     return df_out
@@ -284,21 +353,23 @@ def load_cms_denials(path_or_url: str) -> pd.DataFrame:
 # 3. MERGE & SCORING
 # -------------------------------------------------------------------
 
+def location_key(df: pd.DataFrame) -> pd.Series:
+    """city|state|zip5, lower-cased — the facility join key across sources."""
+    return (
+        norm_col(df, "city").str.lower() + "|" +
+        norm_col(df, "state").str.lower() + "|" +
+        norm_col(df, "zip").str[:5]
+    )
+
+
 def merge_facilities(npi_df, clia_df, state_df, denials_df) -> pd.DataFrame:
     base = npi_df.copy()
+    if not base.empty:
+        base["merge_key"] = location_key(base)
 
     if not clia_df.empty:
         clia_df_key = clia_df.copy()
-        clia_df_key["merge_key"] = (
-            clia_df_key["city"].str.lower().fillna("") + "|" +
-            clia_df_key["state"].str.lower().fillna("") + "|" +
-            clia_df_key["zip"].str[:5].fillna("")
-        )
-        base["merge_key"] = (
-            base["city"].str.lower().fillna("") + "|" +
-            base["state"].str.lower().fillna("") + "|" +
-            base["zip"].str[:5].fillna("")
-        )
+        clia_df_key["merge_key"] = location_key(clia_df_key)
         base = base.merge(
             clia_df_key.drop_duplicates(subset=["merge_key"]),
             on="merge_key",
@@ -308,20 +379,10 @@ def merge_facilities(npi_df, clia_df, state_df, denials_df) -> pd.DataFrame:
 
     if not state_df.empty:
         state_df_key = state_df.copy()
-        state_df_key["merge_key2"] = (
-            state_df_key["city"].str.lower().fillna("") + "|" +
-            state_df_key["state"].str.lower().fillna("") + "|" +
-            state_df_key["zip"].str[:5].fillna("")
-        )
-        base["merge_key2"] = (
-            base["city"].str.lower().fillna("") + "|" +
-            base["state"].str.lower().fillna("") + "|" +
-            base["zip"].str[:5].fillna("")
-        )
+        state_df_key["merge_key"] = location_key(state_df_key)
         base = base.merge(
-            state_df_key.drop_duplicates(subset=["merge_key2"]),
-            left_on="merge_key2",
-            right_on="merge_key2",
+            state_df_key.drop_duplicates(subset=["merge_key"]),
+            on="merge_key",
             how="left",
             suffixes=("", "_state")
         )
@@ -334,11 +395,39 @@ def merge_facilities(npi_df, clia_df, state_df, denials_df) -> pd.DataFrame:
             suffixes=("", "_denial")
         )
 
-    for col in ["merge_key", "merge_key2"]:
-        if col in base.columns:
-            base.drop(columns=[col], inplace=True)
+    if "merge_key" in base.columns:
+        base.drop(columns=["merge_key"], inplace=True)
+
+    return _fill_unmatched(base)
+
+
+def _fill_unmatched(df: pd.DataFrame) -> pd.DataFrame:
+    """Blank the text columns a left merge left as NaN for unmatched rows.
+
+    Loaders emit '' for missing values; without this an NPI row with no CLIA
+    (or state) match would carry NaN, which ``str()`` turns into "nan" in the
+    routed rows and exports.
+    """
+    for c in df.columns:
+        col = df[c]
+        if not col.isna().any():
+            continue
+        if c.startswith("source_"):
+            df[c] = col.fillna(False).astype(bool)
+        elif isinstance(col.dtype, pd.CategoricalDtype):
+            if "" not in col.cat.categories:
+                col = col.cat.add_categories([""])
+            df[c] = col.fillna("")
+        elif col.dtype == object or pd.api.types.is_string_dtype(col.dtype):
+            df[c] = col.fillna("")
+    return df
+
 
-    return base
+def _bucket(values: pd.Series, bins) -> np.ndarray:
+    """Score 0..len(bins)-2 for the right-closed bin each value falls in."""
+    arr = pd.to_numeric(values, errors="coerce").fillna(0).to_numpy(dtype="float64")
+    idx = np.searchsorted(np.asarray(bins, dtype="float64"), arr, side="left") - 1
+    return np.clip(idx, 0, len(bins) - 2)
 
 
 def score_facilities(df: pd.DataFrame) -> pd.DataFrame:
@@ -349,46 +438,25 @@ def score_facilities(df: pd.DataFrame) -> pd.DataFrame:
             return df[name]
         return pd.Series([default] * len(df), index=df.index)
 
-    df["money_score"] = 0
-    df.loc[_col("complexity").astype(str).str.lower().str.contains("high", na=False), "money_score"] += 3
-    df.loc[_col("clia").astype(str).str.len() > 0, "money_score"] += 2
-    df["money_score"] += pd.cut(
-        pd.to_numeric(_col("total_claims", 0), errors="coerce").fillna(0),
-        bins=[-1, 0, 1000, 10000, 100000, float("inf")],
-        labels=[0, 1, 2, 3, 4]
-    ).astype(int)
-
-    df["pain_score"] = 0
-    df["pain_score"] += pd.cut(
-        pd.to_numeric(_col("denial_rate", 0.0), errors="coerce").fillna(0.0),
-        bins=[-0.01, 0.05, 0.10, 0.20, 1.0],
-        labels=[0, 1, 2, 3]
-    ).astype(int)
-    df["pain_score"] += pd.cut(
-        pd.to_numeric(_col("denied_amount", 0.0), errors="coerce").fillna(0.0),
-        bins=[-1, 0, 10000, 100000, 1000000, float("inf")],
-        labels=[0, 1, 2, 3, 4]
-    ).astype(int)
-    license_status = _col("license_status").astype(str).str.lower()
-    df.loc[license_status.str.contains("probation|suspend|revok|discipline|conditional", na=False), "pain_score"] += 3
-
-    df["fit_score"] = 0
-    df.loc[
-        _col("taxonomy").astype(str).str.lower().apply(lambda t: contains_any(t, LAB_TAXONOMY_KEYWORDS)),
-        "fit_score"
-    ] += 3
-    df.loc[
-        _col("taxonomy").astype(str).str.lower().apply(lambda t: contains_any(t, URGENT_CARE_KEYWORDS)),
-        "fit_score"
-    ] += 2
-    df.loc[
-        _col("taxonomy").astype(str).str.lower().apply(lambda t: contains_any(t, ASC_KEYWORDS)),
-        "fit_score"
-    ] += 2
-    df.loc[
-        _col("org_name").astype(str).str.lower().apply(lambda t: contains_any(t, HEALTH_SYSTEM_KEYWORDS)),
-        "fit_score"
-    ] += 2
+    money = 3 * col_contains(_col("complexity"), _HIGH_RE).to_numpy(dtype="int64")
+    # Only a real CLIA number earns the points. The row-wise scorer this
+    # replaced ran astype(str) over merge NaNs, so unmatched facilities read
+    # as "nan" and were credited too.
+    money += 2 * (norm_col(df, "clia").str.len() > 0).to_numpy(dtype="int64")
+    money += _bucket(_col("total_claims", 0), [-1, 0, 1000, 10000, 100000, float("inf")])
+    df["money_score"] = money
+
+    pain = _bucket(_col("denial_rate", 0.0), [-0.01, 0.05, 0.10, 0.20, 1.0])
+    pain += _bucket(_col("denied_amount", 0.0), [-1, 0, 10000, 100000, 1000000, float("inf")])
+    pain += 3 * col_contains(_col("license_status"), _LICENSE_PAIN_RE).to_numpy(dtype="int64")
+    df["pain_score"] = pain
+
+    taxonomy = _col("taxonomy")
+    fit = 3 * col_contains(taxonomy, _LAB_RE).to_numpy(dtype="int64")
+    fit += 2 * col_contains(taxonomy, _URGENT_RE).to_numpy(dtype="int64")
+    fit += 2 * col_contains(taxonomy, _ASC_RE).to_numpy(dtype="int64")
+    fit += 2 * col_contains(_col("org_name"), _HEALTH_SYSTEM_RE).to_numpy(dtype="int64")
+    df["fit_score"] = fit
 
     df["total_score"] = df["money_score"] + df["pain_score"] + df["fit_score"]
     return df
@@ -465,17 +533,17 @@ def main():
     scored = scored.sort_values("total_score", ascending=False).reset_index(drop=True)
 
     full_path = os.path.join(OUTPUT_DIR, "labs_scored.csv")
-    scored.to_csv(full_path, index=False)
+    write_table(scored, full_path)
     print(f"[OUT] Full scored labs: {full_path}")
 
     top50 = scored.head(50)
     top50_path = os.path.join(OUTPUT_DIR, "labs_top_50.csv")
-    top50.to_csv(top50_path, index=False)
+    write_table(top50, top50_path)
     print(f"[OUT] Top 50 labs: {top50_path}")
 
     apollo = build_apollo_export(scored)
     apollo_path = os.path.join(OUTPUT_DIR, "labs_apollo_companies.csv")
-    apollo.to_csv(apollo_path, index=False)
+    write_table(apollo, apollo_path)
     print(f"[OUT] Apollo company export: {apollo_path}")
 
     print("\n[NOTE] Next steps:")
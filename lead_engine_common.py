@@ -0,0 +1,36 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Helpers shared by lab_lead_engine.py and local_lead_engine.py.
+
+  • keyword_regex  - one compiled, case-insensitive alternation for a keyword list
+  • write_table    - write a CSV plus a Parquet twin when a Parquet engine is installed
+"""
+
+import os
+import re
+
+import pandas as pd
+
+
+def keyword_regex(keywords) -> re.Pattern:
+    """One compiled, case-insensitive alternation for a keyword list."""
+    return re.compile("|".join(re.escape(k) for k in keywords), re.IGNORECASE)
+
+
+def write_table(df: pd.DataFrame, csv_path: str) -> None:
+    """Write ``csv_path`` and, when a Parquet engine is installed, a .parquet twin.
+
+    The CSV is the real output; a column Arrow cannot type (mixed str / int,
+    say) only skips the twin instead of aborting the run."""
+    df.to_csv(csv_path, index=False)
+    parquet_path = os.path.splitext(csv_path)[0] + ".parquet"
+    try:
+        df.to_parquet(parquet_path, index=False)
+    except ImportError:
+        pass
+    except (ValueError, TypeError, NotImplementedError) as e:
+        # pyarrow's ArrowInvalid / ArrowTypeError / ArrowNotImplementedError
+        # subclass these, so no pyarrow import is needed here.
+        print(f"[WARN] Skipped {parquet_path}: {e}")
@@ -22,8 +22,11 @@ Usage:
 """
 
 import os
+
 import pandas as pd
 
+from lead_engine_common import keyword_regex, write_table
+
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 OUTPUT_DIR = os.path.join(BASE_DIR, "output")
 
@@ -39,6 +42,9 @@ if not os.path.exists(ROUTED_FILE):
             break
 APOLLO_FILE = os.path.join(BASE_DIR, "labs_apollo_companies.csv")
 
+# Rows per chunk when reading large routed files.
+CHUNK_ROWS = 250_000
+
 
 # -------------------------------------------------------------------
 # UTILITIES
@@ -50,7 +56,8 @@ def safe_read_csv(path: str) -> pd.DataFrame:
         print(f"[WARN] File not found: {path}")
         return pd.DataFrame()
     try:
-        return pd.read_csv(path, dtype=str, low_memory=False)
+        chunks = list(pd.read_csv(path, dtype=str, chunksize=CHUNK_ROWS, low_memory=False))
+        return pd.concat(chunks, ignore_index=True) if chunks else pd.DataFrame()
     except Exception as e:
         print(f"[WARN] Failed to read {path}: {e}")
         return pd.DataFrame()
@@ -67,6 +74,11 @@ def contains_any(text: str, keywords) -> bool:
     return any(k.lower() in t for k in keywords)
 
 
+def normalize_frame(df: pd.DataFrame) -> pd.DataFrame:
+    """Vectorized ``normalize_str`` over every column."""
+    return df.apply(lambda col: col.fillna("").astype(str).str.strip())
+
+
 def to_numeric_safe(series, default=0.0):
     return pd.to_numeric(series, errors="coerce").fillna(default)
 
@@ -131,6 +143,11 @@ URGENT_CARE_KEYWORDS = ["urgent care"]
 ASC_KEYWORDS = ["asc", "ambulatory surgery", "ambulatory surgical center"]
 HEALTH_SYSTEM_KEYWORDS = ["health system", "hospital", "medical center", "clinic system"]
 
+_LAB_RE = keyword_regex(LAB_KEYWORDS)
+_URGENT_RE = keyword_regex(URGENT_CARE_KEYWORDS)
+_ASC_RE = keyword_regex(ASC_KEYWORDS)
+_HEALTH_SYSTEM_RE = keyword_regex(HEALTH_SYSTEM_KEYWORDS)
+
 
 def score_money(df: pd.DataFrame, schema: dict) -> pd.Series:
     score = pd.Series(0, index=df.index, dtype="int64")
@@ -189,10 +206,10 @@ def score_fit(df: pd.DataFrame, schema: dict) -> pd.Series:
 
     if schema["type"]:
         t = df[schema["type"]].fillna("").astype(str).str.lower()
-        score += 3 * t.apply(lambda x: contains_any(x, LAB_KEYWORDS)).astype(int)
-        score += 2 * t.apply(lambda x: contains_any(x, URGENT_CARE_KEYWORDS)).astype(int)
-        score += 2 * t.apply(lambda x: contains_any(x, ASC_KEYWORDS)).astype(int)
-        score += 2 * t.apply(lambda x: contains_any(x, HEALTH_SYSTEM_KEYWORDS)).astype(int)
+        score += 3 * t.str.contains(_LAB_RE, na=False).astype(int)
+        score += 2 * t.str.contains(_URGENT_RE, na=False).astype(int)
+        score += 2 * t.str.contains(_ASC_RE, na=False).astype(int)
+        score += 2 * t.str.contains(_HEALTH_SYSTEM_RE, na=False).astype(int)
 
     if schema["priority"]:
         pr = df[schema["priority"]].fillna("").astype(str).str.lower()
@@ -249,9 +266,7 @@ def main():
 
     apollo_existing = safe_read_csv(APOLLO_FILE)
 
-    routed = routed.copy()
-    for c in routed.columns:
-        routed[c] = routed[c].map(normalize_str)
+    routed = normalize_frame(routed)
 
     schema = detect_schema(routed)
     print("[INFO] Detected schema:")
@@ -266,17 +281,17 @@ def main():
     routed_scored = routed.sort_values("total_score", ascending=False).reset_index(drop=True)
 
     full_path = os.path.join(OUTPUT_DIR, "labs_scored_local.csv")
-    routed_scored.to_csv(full_path, index=False)
+    write_table(routed_scored, full_path)
     print(f"[OUT] Full scored leads: {full_path}")
 
     top50 = routed_scored.head(50)
     top50_path = os.path.join(OUTPUT_DIR, "labs_top_50_local.csv")
-    top50.to_csv(top50_path, index=False)
+    write_table(top50, top50_path)
     print(f"[OUT] Top 50 leads: {top50_path}")
 
     apollo_export = build_apollo_export(routed_scored, schema, apollo_existing)
     apollo_export_path = os.path.join(OUTPUT_DIR, "labs_apollo_companies_enriched.csv")
-    apollo_export.to_csv(apollo_export_path, index=False)
+    write_table(apollo_export, apollo_export_path)
     print(f"[OUT] Apollo company export: {apollo_export_path}")
 
     print("\n[NOTE] Next steps:")
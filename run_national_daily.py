@@ -13,6 +13,7 @@ from __future__ import annotations
 
 import asyncio
 import csv
+import json
 import os
 import sys
 import time
@@ -20,7 +21,7 @@ from datetime import datetime
 
 sys.path.insert(0, "/workspaces/MedPharma")
 
-from app.bulk_prospector import prospect_multi_state, _enrich_dm_only
+from app.hunt_pipeline import HuntPipeline
 
 US_STATES_50 = [
     "AL","AK","AZ","AR","CA","CO","CT","DE","FL","GA",
@@ -39,6 +40,10 @@ NEW_DAYS = int(os.environ.get("NEW_DAYS", "90"))
 TOP_N = int(os.environ.get("TOP_N", "500"))
 OUT_DIR = os.environ.get("OUT_DIR", "/tmp")
 STATES = os.environ.get("STATES", "").strip()
+# Checkpoint key — re-running with the same key resumes the pull.
+RUN_KEY = os.environ.get("RUN_KEY", "").strip()
+# Seconds of enrichment per invocation (0 = run to completion).
+TICK_SECONDS = float(os.environ.get("TICK_SECONDS", "0") or "0")
 
 
 async def main() -> int:
@@ -49,32 +54,41 @@ async def main() -> int:
     print(f"  per_state: {PER_STATE}  (max raw = {len(states)*PER_STATE})")
     print(f"  new_only:  {NEW_ONLY}  new_days={NEW_DAYS}")
 
+    date = datetime.now().strftime("%Y%m%d")
+    run_key = RUN_KEY or f"national-daily:{SPECIALTY}:{date}"
+    print(f"  run_key:   {run_key}")
+
     t0 = time.time()
-    prospects = await prospect_multi_state(
-        states=states, specialty=SPECIALTY, per_state=PER_STATE,
+    print(f"[{datetime.now():%H:%M:%S}] Running staged pipeline (resumes from checkpoints)...")
+    result = await HuntPipeline(run_key).run(
+        states, specialty=SPECIALTY, per_state=PER_STATE,
         new_only=NEW_ONLY, new_days=NEW_DAYS,
+        budget_seconds=TICK_SECONDS or None,
     )
-    print(f"[{datetime.now():%H:%M:%S}] NPPES pulled {len(prospects)} unique prospects in {time.time()-t0:.1f}s")
-
-    if not prospects:
-        print("NO PROSPECTS — abort"); return 1
-
-    t1 = time.time()
-    print(f"[{datetime.now():%H:%M:%S}] Enriching all rows...")
-    result = await _enrich_dm_only(prospects)
     rows = result.get("rows") or []
     summary = result.get("summary") or {}
-    print(f"[{datetime.now():%H:%M:%S}] Enriched {len(rows)} rows in {time.time()-t1:.1f}s")
+    pipeline = result.get("pipeline") or {}
+    print(f"[{datetime.now():%H:%M:%S}] {len(rows)} rows in {time.time()-t0:.1f}s")
     print(f"  summary: {summary}")
+    print("\n=== STAGES ===")
+    for st in pipeline.get("stages") or []:
+        print(f"  {st['stage']:<10} processed={st['processed']:<5} resumed={st['resumed']:<5} "
+              f"failed={st['failed']:<4} {st['throughput_per_s']}/s avg={st['avg_ms']}ms p95={st['p95_ms']}ms")
+
+    if not result.get("complete"):
+        print(f"\nPARTIAL — re-run with RUN_KEY={run_key} to resume")
+        return 0
 
     if not rows:
         print("NO ROWS — abort"); return 1
 
     rows.sort(key=lambda r: -int(r.get("Heat Score") or 0))
 
-    date = datetime.now().strftime("%Y%m%d")
     full_path = os.path.join(OUT_DIR, f"leads_national_{SPECIALTY}_{date}.csv")
     top_path  = os.path.join(OUT_DIR, f"leads_top{TOP_N}_{SPECIALTY}_{date}.csv")
+    stages_path = os.path.join(OUT_DIR, f"leads_pipeline_{SPECIALTY}_{date}.json")
+    with open(stages_path, "w", encoding="utf-8") as f:
+        json.dump(pipeline, f, indent=2)
 
     headers = list(rows[0].keys())
     with open(full_path, "w", newline="", encoding="utf-8") as f:
@@ -117,6 +131,7 @@ async def main() -> int:
     print(f"\n=== DONE in {time.time()-t0:.1f}s ===")
     print(f"  full: {full_path}  ({len(rows)} rows)")
     print(f"  top:  {top_path}  ({min(TOP_N,len(rows))} rows)")
+    print(f"  stages: {stages_path}")
     return 0
 
 
@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+"""Benchmark the Team Production report on a large synthetic book.
+
+Usage:
+    python scripts/bench_analytics.py                     # 200k claims
+    python scripts/bench_analytics.py --claims 1000000 --production 200000
+
+Builds a throwaway hub DB, loads claims and team_production rows, then times
+the report for a sweep of date windows (what the admin's date picker issues)
+through the columnar analytics cache and through the SQL path on the same
+data, plus the cost of the first (cold) load and of a one-client reload
+after a write.
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+_TMP = tempfile.mkdtemp(prefix="analytics_bench_")
+os.environ["DB_PATH"] = os.path.join(_TMP, "hub.db")
+
+from app import analytics  # noqa: E402
+from app import client_db as db  # noqa: E402
+
+_OWNERS = ["susan", "Susan", "melissa", "Melissa", "jessica", "eric", "Outside Biller", ""]
+_UPLOADERS = ["susan@medprosc.com", "melissa@medprosc.com", "admin", ""]
+_STATUSES = ["Submitted", "Paid", "Denied", "Appeals", "Pending", ""]
+_CATEGORIES = ["Billing", "Posting", "Follow-up", "Calls", "Eligibility"]
+_START = date(2025, 1, 1)
+
+
+def _load(claims: int, production: int, clients: int) -> list[int]:
+    rnd = random.Random(11)
+    db._CLIENTS_SEED_PATH = os.path.join(_TMP, "clients_seed.json")
+    db.init_client_hub_db()
+    conn = db.get_db()
+    cur = conn.cursor()
+    cur.execute("PRAGMA foreign_keys = OFF")
+    client_ids = []
+    for i in range(clients):
+        cur.execute("INSERT INTO clients (username, password, salt, company, role) "
+                    "VALUES (?,?,?,?,'client')", (f"bench{i}", "x", "x", f"Bench Lab {i}"))
+        client_ids.append(cur.lastrowid)
+
+    def day(lo, hi):
+        return (_START + timedelta(days=rnd.randint(lo, hi))).isoformat()
+
+    batch = []
+    for i in range(claims):
+        status = rnd.choice(_STATUSES)
+        batch.append((
+            rnd.choice(client_ids), f"CLM-{i:07d}", day(0, 540), day(2, 545),
+            day(20, 560) if status in ("Denied", "Appeals") else "",
+            day(30, 580) if status == "Paid" else "", status, rnd.randint(50, 5000),
+            rnd.randint(20, 3000) if status == "Paid" else 0, rnd.choice([0, 0, rnd.randint(1, 900)]),
+            rnd.choice(_OWNERS), rnd.choice(_UPLOADERS),
+        ))
+        if len(batch) == 50_000:
+            _insert_claims(cur, batch)
+            batch = []
+    if batch:
+        _insert_claims(cur, batch)
+    cur.executemany(
+        "INSERT INTO team_production (client_id, work_date, username, category, quantity, time_spent) "
+        "VALUES (?,?,?,?,?,?)",
+        [(rnd.choice(client_ids), day(0, 560), rnd.choice(["susan", "melissa", "jessica"]),
+          rnd.choice(_CATEGORIES), rnd.randint(1, 40), round(rnd.uniform(0.25, 4), 2))
+         for _ in range(production)])
+    conn.commit()
+    conn.close()
+    return client_ids
+
+
+def _insert_claims(cur, batch) -> None:
+    cur.executemany(
+        "INSERT INTO claims_master (client_id, ClaimKey, DOS, BillDate, DeniedDate, PaidDate, "
+        "ClaimStatus, ChargeAmount, PaidAmount, BalanceRemaining, Owner, uploaded_by) "
+        "VALUES (?,?,?,?,?,?,?,?,?,?,?,?)", batch)
+
+
+def _windows(count: int) -> list[tuple[str, str]]:
+    rnd = random.Random(3)
+    out = []
+    for _ in range(count):
+        lo = _START + timedelta(days=rnd.randint(0, 520))
+        out.append((lo.isoformat(), (lo + timedelta(days=rnd.choice([0, 6, 13, 30, 90]))).isoformat()))
+    return out
+
+
+def _sweep(windows) -> float:
+    t = time.perf_counter()
+    for lo, hi in windows:
+        db.get_production_report(start_date=lo, end_date=hi)
+    return (time.perf_counter() - t) / len(windows) * 1000
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--claims", type=int, default=200_000)
+    ap.add_argument("--production", type=int, default=50_000)
+    ap.add_argument("--clients", type=int, default=40)
+    ap.add_argument("--windows", type=int, default=10)
+    args = ap.parse_args()
+
+    if not analytics.available():
+        print("numpy is not installed (or ANALYTICS_CACHE=0); nothing to compare")
+        return 1
+    t = time.perf_counter()
+    client_ids = _load(args.claims, args.production, args.clients)
+    print(f"loaded {args.claims:,} claims + {args.production:,} production rows "
+          f"in {time.perf_counter() - t:.1f}s -> {os.environ['DB_PATH']}")
+    windows = _windows(args.windows)
+
+    t = time.perf_counter()
+    db.get_production_report(start_date=windows[0][0], end_date=windows[0][1])
+    cold = (time.perf_counter() - t) * 1000
+    columnar = _sweep(windows)
+
+    db.create_claim({"client_id": client_ids[0], "ClaimKey": "CLM-bench-write",
+                     "BillDate": windows[0][0], "ChargeAmount": 100, "Owner": "susan"})
+    t = time.perf_counter()
+    db.get_production_report(start_date=windows[0][0], end_date=windows[0][1])
+    reload_ms = (time.perf_counter() - t) * 1000
+
+    analytics.ENABLED = False
+    sql = _sweep(windows)
+    analytics.ENABLED = True
+
+    stats = analytics.analytics_stats()
+    print(f"\n  cold load + first report   {cold:9.1f} ms")
+    print(f"  report after one write     {reload_ms:9.1f} ms  (one client partition reloaded)")
+    print(f"  per window, columnar       {columnar:9.1f} ms")
+    print(f"  per window, SQL path       {sql:9.1f} ms  ({sql / max(columnar, 1e-9):.1f}x)")
+    print(f"\n  partitions loaded {stats['partition_loads']}, rows {stats['rows_loaded']:,}, "
+          f"load {stats['load_seconds']}s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""Benchmark global_search on a large synthetic claims book.
+
+Usage:
+    python scripts/bench_global_search.py                 # 200k claims
+    python scripts/bench_global_search.py --claims 1000000
+
+Builds a throwaway hub DB, loads claims / providers / credentialing through
+the search_index triggers, then times search-as-you-type (one query per
+keystroke) against the indexed path and the legacy LIKE scan on the same
+data so the speed-up is measured rather than assumed.
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+_TMP = tempfile.mkdtemp(prefix="search_bench_")
+os.environ["DB_PATH"] = os.path.join(_TMP, "hub.db")
+
+from app import client_db as db  # noqa: E402
+
+_PAYORS = ["Aetna", "Cigna", "Humana", "UnitedHealthcare", "BCBS Florida", "Medicare", "Ambetter"]
+_FIRST = ["Jane", "John", "Maria", "Luis", "Aisha", "Wei", "Olga", "Kwame", "Priya", "Sam"]
+_LAST = ["Roe", "Smith", "Garcia", "Nguyen", "Okafor", "Kowalski", "Patel", "Haddad", "Brown"]
+_DENIALS = ["Timely filing", "Missing modifier", "Non-covered service", "Eligibility", ""]
+_TYPED = ["CLM-0447", "W8821", "kessler", "aetna garcia", "timely"]
+
+
+def _load(claims: int, clients: int) -> None:
+    rnd = random.Random(11)
+    db._CLIENTS_SEED_PATH = os.path.join(_TMP, "clients_seed.json")
+    db.init_client_hub_db()
+    conn = db.get_db()
+    cur = conn.cursor()
+    cur.execute("PRAGMA foreign_keys = OFF")
+    client_ids = []
+    for i in range(clients):
+        cur.execute("INSERT INTO clients (username, password, salt, company, role) "
+                    "VALUES (?,?,?,?,'client')", (f"bench{i}", "x", "x", f"Bench Lab {i}"))
+        client_ids.append(cur.lastrowid)
+    batch = []
+    for i in range(claims):
+        batch.append((
+            rnd.choice(client_ids), f"CLM-{i:07d}", f"W{rnd.randint(10**7, 10**8 - 1)}",
+            f"{rnd.choice(_FIRST)} {rnd.choice(_LAST)}", rnd.choice(_PAYORS),
+            f"Dr {rnd.choice(_LAST)}", rnd.choice(_DENIALS), rnd.randint(50, 5000),
+        ))
+        if len(batch) == 50_000:
+            _insert_claims(cur, batch)
+            batch = []
+    if batch:
+        _insert_claims(cur, batch)
+    cur.executemany(
+        "INSERT INTO providers (client_id, ProviderName, NPI, Specialty) VALUES (?,?,?,?)",
+        [(rnd.choice(client_ids), f"Dr {rnd.choice(_FIRST)} {rnd.choice(_LAST)}",
+          str(rnd.randint(10**9, 10**10 - 1)), "Pathology") for _ in range(claims // 100)],
+    )
+    conn.commit()
+    cur.execute("INSERT INTO search_index(search_index) VALUES ('optimize')")
+    conn.commit()
+    conn.close()
+
+
+def _insert_claims(cur, batch) -> None:
+    cur.executemany(
+        "INSERT INTO claims_master (client_id, ClaimKey, PatientID, PatientName, Payor, "
+        "ProviderName, DenialReason, ChargeAmount) VALUES (?,?,?,?,?,?,?,?)", batch)
+
+
+def _time(fn, query: str, repeat: int) -> float:
+    t = time.perf_counter()
+    for _ in range(repeat):
+        fn(query)
+    return (time.perf_counter() - t) / repeat * 1000
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--claims", type=int, default=200_000)
+    ap.add_argument("--clients", type=int, default=40)
+    ap.add_argument("--repeat", type=int, default=5)
+    args = ap.parse_args()
+
+    t = time.perf_counter()
+    _load(args.claims, args.clients)
+    print(f"loaded {args.claims:,} claims (indexed by trigger) in {time.perf_counter() - t:.1f}s "
+          f"-> {os.environ['DB_PATH']}")
+
+    def indexed(q):
+        return db.global_search(q, client_id=None, limit=30)
+
+    def legacy(q):
+        conn = db.get_db()
+        try:
+            return db._global_search_like(conn, q, None, 30, 0)
+        finally:
+            conn.close()
+
+    print(f"\n  {'keystroke':<16} {'fts5 ms':>9} {'like ms':>9}")
+    totals = [0.0, 0.0]
+    for word in _TYPED:
+        for n in range(db._SEARCH_MIN_TERM, len(word) + 1):
+            q = word[:n]
+            f, s = _time(indexed, q, args.repeat), _time(legacy, q, args.repeat)
+            totals[0] += f
+            totals[1] += s
+            print(f"  {q:<16} {f:9.2f} {s:9.2f}")
+    print(f"\n  total per-keystroke ms: fts5 {totals[0]:.1f}  like {totals[1]:.1f}  "
+          f"({totals[1] / max(totals[0], 1e-9):.1f}x)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""Benchmark lab_lead_engine on a national-size NPI extract.
+
+Usage:
+    python scripts/bench_lab_lead_engine.py                 # synthetic, 1M rows
+    python scripts/bench_lab_lead_engine.py --rows 8000000  # full NPPES size
+    python scripts/bench_lab_lead_engine.py --npi /data/npidata_pfile.csv
+
+Times load / merge / score / export for the vectorized engine and, on the
+same merged frame, the legacy row-wise scoring (per-cell contains_any via
+.apply) so the speed-up is measured rather than assumed.
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pandas as pd  # noqa: E402
+
+import lab_lead_engine as engine  # noqa: E402
+
+_TAXONOMIES = [
+    "Clinical Medical Laboratory", "Pathology, Clinical Pathology", "Urgent Care",
+    "Ambulatory Surgical Center", "Family Medicine", "Internal Medicine",
+    "Pharmacy", "Physical Therapist", "Hospital, General Acute Care",
+]
+_CITIES = ["TAMPA", "MIAMI", "AUSTIN", "DALLAS", "ATLANTA", "DENVER", "PHOENIX", "BOSTON"]
+_STATES = ["FL", "TX", "GA", "CO", "AZ", "MA", "NY", "CA"]
+
+
+def _synthetic_npi(path: str, rows: int) -> None:
+    """Write an NPPES-shaped CSV (real column names + filler columns)."""
+    rnd = random.Random(7)
+    chunk = 200_000
+    header = True
+    for start in range(0, rows, chunk):
+        n = min(chunk, rows - start)
+        df = pd.DataFrame({
+            "NPI": [str(1_000_000_000 + start + i) for i in range(n)],
+            "Entity Type Code": [rnd.choice("12") for _ in range(n)],
+            "Provider Organization Name (Legal Business Name)": [
+                rnd.choice(["ACME LABS LLC", "CITY MEDICAL CENTER", "SUNRISE CLINIC", ""]) for _ in range(n)],
+            "Provider First Line Business Practice Location Address": ["100 MAIN ST"] * n,
+            "Provider Business Practice Location Address City Name": [rnd.choice(_CITIES) for _ in range(n)],
+            "Provider Business Practice Location Address State Name": [rnd.choice(_STATES) for _ in range(n)],
+            "Provider Business Practice Location Address Postal Code": [
+                f"{rnd.randint(10000, 99999)}{rnd.randint(1000, 9999)}" for _ in range(n)],
+            "Healthcare Provider Taxonomy Description_1": [rnd.choice(_TAXONOMIES) for _ in range(n)],
+            **{f"Filler {k}": [""] * n for k in range(20)},
+        })
+        df.to_csv(path, mode="w" if header else "a", header=header, index=False)
+        header = False
+
+
+def _legacy_score(df: pd.DataFrame) -> pd.Series:
+    """Pre-vectorization fit scoring: one Python call per cell."""
+    tax = df["taxonomy"].astype(str).str.lower()
+    org = df["org_name"].astype(str).str.lower()
+    fit = 3 * tax.apply(lambda t: engine.contains_any(t, engine.LAB_TAXONOMY_KEYWORDS)).astype(int)
+    fit += 2 * tax.apply(lambda t: engine.contains_any(t, engine.URGENT_CARE_KEYWORDS)).astype(int)
+    fit += 2 * tax.apply(lambda t: engine.contains_any(t, engine.ASC_KEYWORDS)).astype(int)
+    fit += 2 * org.apply(lambda t: engine.contains_any(t, engine.HEALTH_SYSTEM_KEYWORDS)).astype(int)
+    return fit
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--npi", help="path to a real NPPES extract (skips synthesis)")
+    ap.add_argument("--rows", type=int, default=1_000_000)
+    args = ap.parse_args()
+
+    tmp = tempfile.mkdtemp(prefix="lle_bench_")
+    npi_path = args.npi
+    if not npi_path:
+        npi_path = os.path.join(tmp, "npi.csv")
+        t = time.perf_counter()
+        _synthetic_npi(npi_path, args.rows)
+        print(f"synthesized {args.rows:,} rows in {time.perf_counter() - t:.1f}s -> {npi_path}")
+
+    timings: dict[str, float] = {}
+
+    t = time.perf_counter()
+    npi_df = engine.load_npi(npi_path)
+    timings["load_npi"] = time.perf_counter() - t
+
+    t = time.perf_counter()
+    merged = engine.merge_facilities(npi_df, pd.DataFrame(), pd.DataFrame(), pd.DataFrame())
+    timings["merge"] = time.perf_counter() - t
+
+    t = time.perf_counter()
+    scored = engine.score_facilities(merged)
+    timings["score"] = time.perf_counter() - t
+
+    t = time.perf_counter()
+    legacy_fit = _legacy_score(merged)
+    timings["score_legacy_fit_only"] = time.perf_counter() - t
+    assert (legacy_fit.to_numpy() == scored["fit_score"].to_numpy()).all(), "fit score mismatch"
+
+    t = time.perf_counter()
+    engine.write_table(scored, os.path.join(tmp, "labs_scored.csv"))
+    timings["export_csv_parquet"] = time.perf_counter() - t
+
+    print(f"\nkept rows: {len(npi_df):,}  memory: {npi_df.memory_usage(deep=True).sum() / 1e6:.1f} MB")
+    for k, v in timings.items():
+        print(f"  {k:<24} {v:8.2f}s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""Hub database backups: take, list, verify and restore snapshots.
+
+WHY: the hub used to shutil.copy2 the live leads.db on every startup, which is
+not safe while another process writes and kept 20 full uncompressed copies on
+a 1 GB disk. app/db_backup.py snapshots through the SQLite backup API,
+compresses the copy and prunes by age tier; this is its command line.
+
+USAGE (Render Shell or locally):
+    DB_PATH=/data/leads.db python3 scripts/db_backup.py backup
+    DB_PATH=/data/leads.db python3 scripts/db_backup.py list
+    DB_PATH=/data/leads.db python3 scripts/db_backup.py verify leads_20261019_030000.db.gz
+    DB_PATH=/data/leads.db python3 scripts/db_backup.py restore leads_20261019_030000.db.gz --yes
+
+restore verifies the snapshot (PRAGMA integrity_check) and takes a
+pre_restore snapshot of the live DB before overwriting it. Stop the hub first.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import db_backup  # noqa: E402
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser()
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    sub.add_parser("backup")
+    sub.add_parser("list")
+    sub.add_parser("prune")
+    v = sub.add_parser("verify")
+    v.add_argument("file")
+    r = sub.add_parser("restore")
+    r.add_argument("file")
+    r.add_argument("--yes", action="store_true", help="required: overwrite the live DB")
+    args = ap.parse_args()
+
+    if args.cmd == "backup":
+        out = db_backup.create_backup("manual")
+    elif args.cmd == "list":
+        for b in db_backup.list_backups():
+            flag = " keep" if b["keep"] else ""
+            print(f"{b['taken_at']:%Y-%m-%d %H:%M:%S}  {b['size_bytes']:>14,}  {b['file']}{flag}")
+        return 0
+    elif args.cmd == "prune":
+        out = {"removed": db_backup.prune_backups()}
+    elif args.cmd == "verify":
+        out = db_backup.verify_backup(args.file)
+    else:
+        if not args.yes:
+            print("restore overwrites the live database; re-run with --yes")
+            return 2
+        out = db_backup.restore_backup(args.file)
+    print(json.dumps(out, indent=2, default=str))
+    return 0 if out.get("ok", True) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
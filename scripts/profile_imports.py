@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""Summarize ``python -X importtime`` for the hub entry point.
+
+WHY: every hub deploy and restart pays for importing app.hub_app before the
+port is bound. Eligibility, PDF/XLSX, AI and import-parser libraries are
+meant to load on first use (or on the startup pre-warm thread), not at
+import. This shows where import time goes and flags any heavy module that
+has crept back into the import graph; test_import_time.py enforces the same
+rules with a budget.
+
+USAGE:
+    python3 scripts/profile_imports.py
+    python3 scripts/profile_imports.py --module app.client_routes --top 40
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Top-level packages that must not be imported by ``import app.hub_app``.
+HEAVY_MODULES = (
+    "openpyxl", "xlrd", "reportlab", "pypdf", "docx", "openai",
+    "eligibility_hybrid", "rule_intercept", "cryptography", "pandas",
+    "numpy",
+)
+
+
+def profile_import(module: str = "app.hub_app") -> list[dict]:
+    """Import ``module`` in a fresh interpreter under -X importtime and
+    return one row per module: name, depth, self_us, cumulative_us."""
+    env = dict(os.environ, STARTUP_PREWARM="0")
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT, env=env, capture_output=True, text=True, check=True,
+    )
+    rows = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        self_us, cum_us, name = line[len("import time:"):].split("|", 2)
+        if not self_us.strip().isdigit():
+            continue    # the header row
+        name = name[1:]   # one separator space, then two per nesting level
+        depth = (len(name) - len(name.lstrip(" "))) // 2
+        rows.append({"name": name.strip(), "depth": depth,
+                     "self_us": int(self_us), "cumulative_us": int(cum_us)})
+    return rows
+
+
+def heavy_loaded(rows: list[dict]) -> list[str]:
+    return sorted({r["name"].split(".")[0] for r in rows} & set(HEAVY_MODULES))
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    ap.add_argument("--module", default="app.hub_app")
+    ap.add_argument("--top", type=int, default=25)
+    args = ap.parse_args()
+
+    rows = profile_import(args.module)
+    target = next(r for r in rows if r["name"] == args.module)
+    print(f"import {args.module}: {target['cumulative_us'] / 1e6:.3f}s, {len(rows)} modules\n")
+
+    print(f"{'self ms':>9} {'cum ms':>9}  module (by cumulative)")
+    for r in sorted(rows, key=lambda r: -r["cumulative_us"])[:args.top]:
+        print(f"{r['self_us'] / 1e3:9.1f} {r['cumulative_us'] / 1e3:9.1f}  {'  ' * r['depth']}{r['name']}")
+
+    print(f"\n{'self ms':>9}  module (by self time)")
+    for r in sorted(rows, key=lambda r: -r["self_us"])[:args.top]:
+        print(f"{r['self_us'] / 1e3:9.1f}  {r['name']}")
+
+    heavy = heavy_loaded(rows)
+    if heavy:
+        print(f"\nheavy modules imported eagerly: {', '.join(heavy)}")
+        return 1
+    print("\nno heavy modules imported eagerly")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
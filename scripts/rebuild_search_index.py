@@ -0,0 +1,37 @@
+#!/usr/bin/env python3
+"""Rebuild the hub's global-search index (search_index, FTS5 trigram).
+
+WHY: search_index is normally kept current by triggers on claims_master,
+providers, credentialing, enrollment and edi_setup. Rows written while those
+triggers did not exist (a restored backup, an external bulk load, a DB from
+before the index shipped) are invisible to the header search until the index
+is rebuilt.
+
+USAGE (Render Shell or locally):
+    DB_PATH=/data/leads.db python3 scripts/rebuild_search_index.py
+"""
+from __future__ import annotations
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import client_db  # noqa: E402
+
+
+def main() -> int:
+    t = time.perf_counter()
+    counts = client_db.rebuild_search_index()
+    if not counts:
+        print("search_index unavailable: this SQLite build has no FTS5 trigram tokenizer")
+        return 1
+    for etype, n in counts.items():
+        print(f"  {etype:<14} {n:>9,}")
+    print(f"rebuilt {sum(counts.values()):,} documents in {time.perf_counter() - t:.2f}s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,132 @@
+"""Buffered activity writer: events queue in memory and land in one
+transaction per flush, which also advances user_presence and the hourly /
+daily rollups; compaction drops raw events the rollups already count."""
+import importlib
+import os
+import sys
+from datetime import datetime, timedelta
+
+import pytest
+
+
+@pytest.fixture
+def client_db(tmp_path, monkeypatch):
+    os.environ["DB_PATH"] = str(tmp_path / "hub.db")
+    for mod in ("app.config", "app.client_db"):
+        if mod in sys.modules:
+            importlib.reload(sys.modules[mod])
+    db = importlib.import_module("app.client_db")
+    db = importlib.reload(db)
+    db._CLIENTS_SEED_PATH = str(tmp_path / "clients_seed.json")
+    db.init_client_hub_db()
+    # Keep the background flusher out of the way; tests flush explicitly.
+    monkeypatch.setattr(db, "_ensure_activity_flusher", lambda: None)
+    return db
+
+
+def _at(db, monkeypatch, when):
+    class _Frozen(datetime):
+        @classmethod
+        def now(cls, tz=None):
+            return when
+    monkeypatch.setattr(db, "datetime", _Frozen)
+
+
+def _count(db, sql, params=()):
+    conn = db.get_db()
+    try:
+        return conn.execute(sql, params).fetchone()[0]
+    finally:
+        conn.close()
+
+
+def test_events_buffer_until_flush(client_db):
+    client_db.log_activity("Susan", "request", path="/claims", client_id=7)
+    client_db.log_activity("susan", "heartbeat", path="/claims")
+    assert _count(client_db, "SELECT COUNT(*) FROM activity_events") == 0
+
+    assert client_db.flush_activity_buffer() == 2
+    assert client_db.flush_activity_buffer() == 0
+    assert _count(client_db, "SELECT COUNT(*) FROM activity_events") == 2
+    assert _count(client_db, "SELECT SUM(events) FROM activity_rollup_hourly") == 2
+    assert _count(client_db, "SELECT client_id FROM activity_rollup_daily WHERE event_type='request'") == 7
+
+
+def test_readers_see_unflushed_events(client_db):
+    client_db.log_activity("susan", "request", path="/claims")
+    assert [r["username"] for r in client_db.get_live_users()] == ["susan"]
+
+
+def test_presence_matches_per_event_gap_rule(client_db, monkeypatch):
+    t0 = datetime(2026, 10, 14, 9, 0, 0)
+    steps = [(0, "login"), (60, "heartbeat"), (120, "request"),
+             (120 + 600, "request"), (120 + 660, "heartbeat")]
+    for i, (offset, kind) in enumerate(steps):
+        _at(client_db, monkeypatch, t0 + timedelta(seconds=offset))
+        client_db.log_activity("jessica", kind, path="/eligibility")
+        if i == 2:
+            client_db.flush_activity_buffer()   # split across two batches
+    client_db.flush_activity_buffer()
+
+    day = client_db.get_productivity_report("2026-10-14", "2026-10-14")["daily"][0]
+    assert day["active_seconds"] == 60 + 60 + 60
+    assert day["idle_seconds"] == 600
+    assert day["action_count"] == 3
+    assert day["first_seen_at"] == "2026-10-14T09:00:00"
+    assert day["last_seen_at"] == "2026-10-14T09:13:00"
+
+
+def test_compaction_keeps_rollup_backed_views(client_db, monkeypatch):
+    old = datetime.now() - timedelta(days=40)
+    _at(client_db, monkeypatch, old)
+    for _ in range(3):
+        client_db.log_activity("melissa", "request", path="/payments")
+    client_db.flush_activity_buffer()
+    monkeypatch.setattr(client_db, "datetime", datetime)
+    client_db.log_activity("melissa", "request", path="/claims")
+
+    out = client_db.compact_activity_events(raw_retain_days=30, hourly_retain_days=30)
+    assert out["raw_deleted"] == 3 and out["hourly_deleted"] == 1
+    assert _count(client_db, "SELECT COUNT(*) FROM activity_events") == 1
+
+    day = old.strftime("%Y-%m-%d")
+    report = client_db.get_productivity_report(day, datetime.now().strftime("%Y-%m-%d"))
+    assert {r["path"]: r["hits"] for r in report["top_paths"]} == {"/payments": 3, "/claims": 1}
+    snap = client_db.build_daily_activity_snapshot(day, sources=["pageviews"])
+    assert snap["rows"]["pageviews"][0]["hits"] == 3
+
+
+def test_backfill_counts_legacy_raw_rows(client_db):
+    conn = client_db.get_db()
+    conn.execute(
+        "INSERT INTO activity_events (occurred_at, username, event_type, path) "
+        "VALUES ('2026-01-05T10:15:00','Eric','request','/x')"
+    )
+    conn.execute("DELETE FROM app_migrations WHERE key='activity_rollups_backfill_v1'")
+    conn.commit()
+    conn.close()
+    client_db.init_client_hub_db()
+    assert _count(client_db, "SELECT events FROM activity_rollup_hourly "
+                             "WHERE hour='2026-01-05T10:00:00' AND username='eric'") == 1
+
+
+def test_failed_flush_requeues_keeping_the_newest(client_db, monkeypatch):
+    from collections import deque
+    monkeypatch.setattr(client_db, "_activity_buffer", deque(maxlen=3))
+    for path in ("/a", "/b"):
+        client_db.log_activity("melissa", "request", path=path)
+    real_get_db = client_db.get_db
+
+    def _failing_get_db():
+        for path in ("/c", "/d"):                  # arrive while the flush runs
+            client_db.log_activity("melissa", "request", path=path)
+        raise RuntimeError("database is locked")
+
+    monkeypatch.setattr(client_db, "get_db", _failing_get_db)
+    dropped = client_db._activity_stats["dropped"]
+    assert client_db.flush_activity_buffer() == 0
+    assert [e[5] for e in client_db._activity_buffer] == ["/b", "/c", "/d"]
+    assert client_db._activity_stats["dropped"] == dropped + 1
+
+    monkeypatch.setattr(client_db, "get_db", real_get_db)
+    assert client_db.flush_activity_buffer() == 3
@@ -0,0 +1,81 @@
+"""AI narratives: identical figures reuse the cached completion, concurrent
+identical requests share one model call, and a timeout falls back to the
+rule-based text without caching it."""
+import importlib
+import threading
+import time
+
+import pytest
+
+
+@pytest.fixture
+def narr(monkeypatch):
+    mod = importlib.reload(importlib.import_module("app.ai_narrative"))
+    calls = []
+
+    def fake_call(messages, model, max_tokens, temperature, timeout):
+        calls.append(messages[-1]["content"])
+        time.sleep(0.05)
+        return f"AI: {messages[-1]['content']}", {"prompt_tokens": 10, "completion_tokens": 5}
+
+    monkeypatch.setattr(mod, "_call_openai", fake_call)
+    mod.calls = calls
+    return mod
+
+
+def _msgs(figures):
+    return [{"role": "system", "content": "analyst"}, {"role": "user", "content": figures}]
+
+
+def test_same_figures_hit_the_cache(narr):
+    assert narr.complete("client_report", _msgs("AR $10"), lambda: "rule") == ("AI: AR $10", "model")
+    assert narr.complete("client_report", _msgs("AR $10"), lambda: "rule") == ("AI: AR $10", "cache")
+    assert narr.complete("client_report", _msgs("AR $11"), lambda: "rule")[1] == "model"
+    assert len(narr.calls) == 2
+
+    m = narr.narrative_metrics()["by_kind"]["client_report"]
+    assert m["calls"] == 2 and m["hits"] == 1
+    assert m["prompt_tokens"] == 20 and m["completion_tokens"] == 10
+    assert m["latency_ms_avg"] >= 40
+
+
+def test_concurrent_identical_requests_share_one_call(narr):
+    out = []
+    threads = [threading.Thread(target=lambda: out.append(
+        narr.complete("productivity", _msgs("susan 7.5h"), lambda: "rule"))) for _ in range(5)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert len(narr.calls) == 1
+    assert {text for text, _ in out} == {"AI: susan 7.5h"}
+    m = narr.narrative_metrics()["by_kind"]["productivity"]
+    assert m["calls"] == 1 and m["coalesced"] + m["hits"] == 4
+
+
+def test_timeout_falls_back_and_is_retried(narr, monkeypatch):
+    class APITimeoutError(Exception):
+        pass
+
+    def slow(*a, **k):
+        raise APITimeoutError("Request timed out.")
+
+    monkeypatch.setattr(narr, "_call_openai", slow)
+    assert narr.complete("account_summary", _msgs("AR $5"), lambda: "rule text") == ("rule text", "fallback")
+    m = narr.narrative_metrics()["by_kind"]["account_summary"]
+    assert m["timeouts"] == 1 and m["fallbacks"] == 1
+
+    monkeypatch.setattr(narr, "_call_openai", lambda *a, **k: ("fresh", {}))
+    assert narr.complete("account_summary", _msgs("AR $5"), lambda: "rule text") == ("fresh", "model")
+
+
+def test_timeout_is_sized_to_max_tokens(narr, monkeypatch):
+    seen = []
+    monkeypatch.setattr(narr, "_call_openai",
+                        lambda m, model, max_tokens, t, timeout: seen.append(timeout) or ("ok", {}))
+    narr.complete("productivity", _msgs("short"), lambda: "rule", max_tokens=350)
+    narr.complete("client_report", _msgs("long"), lambda: "rule", max_tokens=2000)
+    narr.complete("client_report", _msgs("pinned"), lambda: "rule", max_tokens=2000, timeout=5)
+    assert seen[0] >= narr.TIMEOUT_SECONDS
+    assert seen[1] > seen[0] and seen[1] == narr.timeout_for(2000)
+    assert seen[2] == 5
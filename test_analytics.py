@@ -0,0 +1,108 @@
+"""Columnar analytics cache: the Team Production report's vectorized rollups
+match the SQL/row-loop path they short-circuit, and a write reloads only the
+written client's partition."""
+import importlib
+import os
+import random
+import sys
+from datetime import date, timedelta
+from pathlib import Path
+
+import pytest
+
+pytest.importorskip("numpy")
+
+
+@pytest.fixture
+def db(tmp_path):
+    os.environ["DB_PATH"] = str(tmp_path / "hub.db")
+    for mod in ("app.config", "app.analytics", "app.client_db"):
+        if mod in sys.modules:
+            importlib.reload(sys.modules[mod])
+    importlib.reload(importlib.import_module("app.analytics"))
+    db = importlib.reload(importlib.import_module("app.client_db"))
+    db._CLIENTS_SEED_PATH = str(tmp_path / "clients_seed.json")
+    Path(db._CLIENTS_SEED_PATH).write_text("[]\n", encoding="utf-8")
+    db.init_client_hub_db()
+    return db
+
+
+def _user(db, username, contact):
+    return db.create_client({
+        "username": username, "password": "labpass123", "company": "Lab " + username,
+        "contact_name": contact, "email": f"{username}@example.com", "phone": "555-0",
+        "role": "client"})
+
+
+def _seed(db, rng):
+    users = [_user(db, "paula", "Paula Reyes"), _user(db, "nora", "Nora Quinn"),
+             _user(db, "wendy", "Wendy Hart")]
+    owners = ["paula", "Paula Reyes", "PAULA", "Nora", "wendy", "Susan", "Outside Biller", "", "  ", "rcm", None]
+    uploaders = ["paula", "nora", "admin", "admin@example.com", "", None, "Wendy"]
+    base = date(2026, 3, 1)
+    fmts = (lambda d: d.isoformat(), lambda d: d.isoformat() + " 10:00:00", lambda d: d.strftime("%m/%d/%Y"),
+            lambda d: "", lambda d: "pending")
+    for i in range(160):
+        dos = base + timedelta(days=rng.randint(-120, 90))
+        db.create_claim({
+            "client_id": rng.choice(users), "ClaimKey": f"AN-{i}",
+            "DOS": rng.choice(fmts)(dos), "BillDate": rng.choice(fmts)(dos + timedelta(days=2)),
+            "DeniedDate": rng.choice(fmts[:1] + fmts[3:])(dos + timedelta(days=20)),
+            "PaidDate": rng.choice(fmts)(dos + timedelta(days=30)),
+            "ClaimStatus": rng.choice(["Denied", "appeals", "Paid", "Submitted", ""]),
+            "ChargeAmount": round(rng.uniform(-50, 900), 2), "PaidAmount": rng.choice([0, 0, 12.34, 99.99]),
+            "BalanceRemaining": rng.choice([0, 10.1, 250.55, -3]), "Owner": rng.choice(owners),
+        })
+    conn = db.get_db()
+    for (cid,) in conn.execute("SELECT id FROM claims_master").fetchall():
+        conn.execute("UPDATE claims_master SET uploaded_by=? WHERE id=?", (rng.choice(uploaders), cid))
+    conn.commit()
+    conn.close()
+    for i in range(200):
+        db.add_production_log({
+            "client_id": rng.choice(users), "username": rng.choice(["paula", "Paula", "nora", "wendy"]),
+            "work_date": (base + timedelta(days=rng.randint(-30, 30))).isoformat(),
+            "category": rng.choice(["Billing", "Posting", "Calls", ""]), "quantity": rng.randint(0, 9),
+            "time_spent": round(rng.uniform(0, 3), 2) + i * 1e-4})
+    return users
+
+
+def _both(db, monkeypatch, **kw):
+    fast = db.get_production_report(**kw)
+    monkeypatch.setattr(db.analytics, "ENABLED", False)
+    slow = db.get_production_report(**kw)
+    monkeypatch.setattr(db.analytics, "ENABLED", True)
+    return fast, slow
+
+
+def test_columnar_report_matches_sql_path(db, monkeypatch):
+    users = _seed(db, random.Random(11))
+    windows = [dict(), dict(start_date="2026-03-01", end_date="2026-03-31"),
+               dict(start_date="2026-02-10", end_date="2026-02-10"), dict(end_date="2026-03-15")]
+    for window in windows:
+        for scope in (dict(), dict(client_id=users[0]), dict(username="paula"), dict(username="Nora")):
+            fast, slow = _both(db, monkeypatch, **window, **scope)
+            assert fast == slow, (window, scope)
+    stats = db.analytics.analytics_stats()
+    assert stats["enabled"] and stats["claims_rows"] == 160 and stats["production_rows"] == 200
+
+
+def test_write_reloads_only_that_clients_partition(db, monkeypatch):
+    users = _seed(db, random.Random(5))
+    db.get_production_report(start_date="2026-03-01", end_date="2026-03-31")
+    loads = db.analytics.analytics_stats()["partition_loads"]
+    assert loads == 6                                   # 3 clients x (claims, production)
+
+    db.get_production_report(start_date="2026-02-01", end_date="2026-02-28")
+    assert db.analytics.analytics_stats()["partition_loads"] == loads
+
+    db.create_claim({"client_id": users[1], "ClaimKey": "AN-new", "BillDate": "2026-03-05",
+                     "ChargeAmount": 42.5, "Owner": "nora"})
+    fast, slow = _both(db, monkeypatch, start_date="2026-03-01", end_date="2026-03-31")
+    assert fast == slow
+    assert db.analytics.analytics_stats()["partition_loads"] == loads + 1
+
+    monkeypatch.setattr(db.analytics, "MAX_ROWS", 10)
+    db.add_production_log({"client_id": users[2], "username": "wendy", "work_date": "2026-03-02",
+                           "quantity": 1, "time_spent": 1})
+    assert db.analytics.production_rollups(None, "", "2026-03-01", "2026-03-31") is None
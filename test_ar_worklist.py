@@ -0,0 +1,117 @@
+"""A/R worklist: aging, weighting, bucket rollups and the top-N cut run in
+SQL over trigger-maintained normalized dates, match the per-row Python
+scoring they replaced, and are cached until a claim write."""
+import importlib
+import os
+import random
+import sys
+from datetime import timedelta
+
+import pytest
+
+
+@pytest.fixture
+def db(tmp_path):
+    os.environ["DB_PATH"] = str(tmp_path / "hub.db")
+    for mod in ("app.config", "app.client_db"):
+        if mod in sys.modules:
+            importlib.reload(sys.modules[mod])
+    db = importlib.reload(importlib.import_module("app.client_db"))
+    db._CLIENTS_SEED_PATH = str(tmp_path / "clients_seed.json")
+    db.init_client_hub_db()
+    return db
+
+
+def _client(db, username):
+    return db.create_client({
+        "username": username, "password": "labpass123", "company": username.title(),
+        "contact_name": "Lab", "email": f"{username}@example.com", "phone": "555-0",
+        "role": "client"})
+
+
+def _reference(db, client_id=None, bucket=None, limit=300):
+    """The per-row Python scoring the SQL replaced."""
+    today = db.business_today()
+    rows = [c for c in db.get_claims(client_id) if float(c["BalanceRemaining"] or 0) > 0
+            and c["ClaimStatus"] not in ("Paid", "Closed")]
+    out = []
+    for r in rows:
+        ref = (db._parse_any_date(r["DOS"]) or db._parse_any_date(r["BillDate"])
+               or db._parse_any_date(r["created_at"]))
+        age = max(0, (today - ref).days if ref else 0)
+        bk, age_w = next(((b, w) for d, b, w in db._AR_AGE_STEPS if age <= d), db._AR_AGE_OLDEST)
+        due = db._parse_any_date(r["NextActionDueDate"])
+        overdue = bool(due and due < today)
+        score = float(r["BalanceRemaining"]) * age_w * db._AR_STATUS_WEIGHT.get(r["ClaimStatus"], 1.0) \
+            * (1.25 if overdue else 1.0)
+        out.append((r["ClaimKey"], age, bk, overdue, round(score, 2)))
+    out.sort(key=lambda t: t[4], reverse=True)
+    if bucket:
+        out = [t for t in out if t[2] == bucket]
+    return out[:limit]
+
+
+def test_sql_scoring_matches_python_reference(db):
+    rng = random.Random(7)
+    today = db.business_today()
+    fmts = (lambda d: d.isoformat(), lambda d: d.strftime("%m/%d/%Y"), lambda d: d.strftime("%m/%d/%y"),
+            lambda d: d.strftime("%Y/%m/%d"), lambda d: d.strftime("%d-%m-%Y"), lambda d: "", lambda d: "n/a")
+    statuses = list(db._AR_STATUS_WEIGHT) + ["Paid", "Closed", "Pending Review"]
+    clients = [_client(db, "arone"), _client(db, "artwo")]
+    for i in range(120):
+        dos = today - timedelta(days=rng.randint(-5, 200))
+        due = today + timedelta(days=rng.randint(-20, 20))
+        db.create_claim({
+            "client_id": rng.choice(clients), "ClaimKey": f"AR-{i}",
+            "DOS": rng.choice(fmts)(dos), "BillDate": rng.choice(fmts)(dos + timedelta(days=3)),
+            "ChargeAmount": rng.randint(0, 900) + 0.37, "BalanceRemaining": rng.randint(0, 900) + 0.37,
+            "ClaimStatus": rng.choice(statuses), "NextActionDueDate": rng.choice(fmts)(due),
+        })
+
+    for client_id, bucket, limit in ((None, None, 300), (clients[0], None, 10), (None, "120+", 5),
+                                     (clients[1], "0-30", 300)):
+        got = db.get_ar_worklist(client_id, bucket=bucket, limit=limit)
+        ref = _reference(db, client_id, bucket, limit)
+        assert [(it["ClaimKey"], it["aging_days"], it["aging_bucket"], it["overdue"], it["priority_score"])
+                for it in got["items"]] == ref
+
+    full = db.get_ar_worklist()
+    ref = _reference(db)
+    assert full["total_open_count"] == len(ref)
+    assert sum(b["count"] for b in full["buckets"].values()) == len(ref)
+    for bk in db._AR_BUCKETS:
+        assert full["buckets"][bk]["count"] == sum(1 for t in ref if t[2] == bk)
+
+
+def test_worklist_cached_until_claim_write(db):
+    cid = _client(db, "arcache")
+    today = db.business_today()
+    db.create_claim({"client_id": cid, "ClaimKey": "C-1", "DOS": (today - timedelta(days=10)).isoformat(),
+                     "ChargeAmount": 100, "BalanceRemaining": 100, "ClaimStatus": "Denied"})
+    first = db.get_ar_worklist(cid)
+    assert first["items"][0]["aging_bucket"] == "0-30"
+    first["items"].clear()                                  # callers get their own copy
+    assert db.get_ar_worklist(cid)["items"]
+
+    claim = db.get_claims(cid)[0]
+    old = (today - timedelta(days=95)).strftime("%m/%d/%Y")
+    db.update_claim(claim["id"], {"DOS": old})
+    again = db.get_ar_worklist(cid)
+    assert again["items"][0]["aging_bucket"] == "91-120" and again["buckets"]["91-120"]["count"] == 1
+    conn = db.get_db()
+    assert conn.execute("SELECT age_date FROM claims_ar_dates WHERE claim_id=?",
+                        (claim["id"],)).fetchone()[0] == (today - timedelta(days=95)).isoformat()
+
+    # Dates are refreshed only for claims whose date text changed, and only
+    # after claims_master was written.
+    assert db._refresh_claim_ar_dates(conn) == 0
+    conn.execute("UPDATE claims_master SET NextActionDueDate='01/02/2020' WHERE id=?", (claim["id"],))
+    conn.commit()
+    assert db._refresh_claim_ar_dates(conn) == 1
+    assert db._refresh_claim_ar_dates(conn) == 0
+    assert conn.execute("SELECT due_date FROM claims_ar_dates WHERE claim_id=?",
+                        (claim["id"],)).fetchone()[0] == "2020-01-02"
+    names = {r[0] for r in conn.execute("SELECT name FROM sqlite_master WHERE type='trigger'")}
+    assert not any(n.startswith("trg_claim_ar_dates") for n in names)
+    conn.close()
+    assert db.get_ar_worklist(cid)["items"][0]["overdue"]
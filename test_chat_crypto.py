@@ -0,0 +1,112 @@
+"""Chat decryption: history pages decrypt in one batch through a bounded,
+process-local plaintext cache; mentions are resolved into chat_mentions when
+a message is posted, so the reminder scan never decrypts message bodies."""
+import importlib
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+
+@pytest.fixture
+def chat_env(tmp_path, monkeypatch):
+    os.environ["DB_PATH"] = str(tmp_path / "hub.db")
+    monkeypatch.setenv("CHAT_ENCRYPTION_KEY", "test-chat-passphrase")
+    for mod in ("app.config", "app.security", "app.client_db"):
+        if mod in sys.modules:
+            importlib.reload(sys.modules[mod])
+    security = importlib.reload(importlib.import_module("app.security"))
+    client_db = importlib.reload(importlib.import_module("app.client_db"))
+    client_db._CLIENTS_SEED_PATH = str(tmp_path / "clients_seed.json")
+    Path(client_db._CLIENTS_SEED_PATH).write_text("[]\n", encoding="utf-8")
+    client_db.init_client_hub_db()
+    users = [client_db.create_client({
+        "username": name, "password": f"{name}pass1234", "company": "Chat Lab",
+        "contact_name": name.title(), "email": f"{name}@example.com", "phone": "1",
+        "role": "client"}) for name in ("victor", "susan")]
+    room = client_db.create_room("Billing", created_by="admin", member_user_ids=users)
+    return security, client_db, users, room
+
+
+def _age_messages(client_db, minutes):
+    conn = client_db.get_db()
+    for table in ("chat_messages", "chat_mentions"):
+        conn.execute(f"UPDATE {table} SET created_at=datetime('now', ?)", (f"-{minutes} minutes",))
+    conn.commit()
+    conn.close()
+
+
+def test_history_poll_hits_decrypt_cache(chat_env, monkeypatch):
+    security, client_db, (victor, susan), room = chat_env
+    for i in range(5):
+        client_db.add_room_message(room, victor, "Victor", "member", f"claim note {i}")
+    conn = client_db.get_db()
+    stored = [r[0] for r in conn.execute("SELECT body FROM chat_messages ORDER BY id")]
+    conn.close()
+    assert all(b.startswith(security.CHAT_BODY_PREFIX) for b in stored)
+
+    security.clear_decrypt_cache()
+    first = client_db.list_room_messages(room)
+    assert [m["body"] for m in first] == [f"claim note {i}" for i in range(5)]
+    stats = security.decrypt_cache_stats()
+    assert stats["misses"] == 5 and stats["entries"] == 5
+
+    calls = []
+    real = security._decrypt_token
+    monkeypatch.setattr(security, "_decrypt_token", lambda s: calls.append(s) or real(s))
+    assert client_db.list_room_messages(room) == first          # second poll: no Fernet work
+    assert calls == []
+    assert security.decrypt_cache_stats()["hits"] == 5
+
+    monkeypatch.setattr(security, "DECRYPT_CACHE_SIZE", 3)
+    security.clear_decrypt_cache()
+    client_db.list_room_messages(room)
+    assert security.decrypt_cache_stats()["entries"] == 3
+    assert security.decrypt_many([(1, "legacy plaintext"), (2, None)]) == ["legacy plaintext", ""]
+
+
+def test_mention_reminders_skip_body_decryption(chat_env, monkeypatch):
+    security, client_db, (victor, susan), room = chat_env
+    client_db.add_room_message(room, victor, "Victor", "member", "no mention here")
+    mid = client_db.add_room_message(room, victor, "Victor", "member", "@susan @victor please review")
+    conn = client_db.get_db()
+    legacy_idx = [r[0] for r in conn.execute("SELECT mentions_enc FROM chat_messages")]
+    mentions = [tuple(r) for r in conn.execute("SELECT message_id, user_id, room_id, reminded FROM chat_mentions")]
+    conn.close()
+    assert legacy_idx == [None, None]                          # no per-post mention ciphertext
+    assert mentions == [(mid, susan, room, 0)]                 # the sender never mentions themselves
+
+    _age_messages(client_db, 180)
+    security.clear_decrypt_cache()
+    decrypted = []
+    real = security._decrypt_token
+    monkeypatch.setattr(security, "_decrypt_token", lambda s: decrypted.append(s) or real(s))
+    pending = client_db.list_unread_mention_reminders(active_within_minutes=1)
+    assert [(p["message_id"], p["user_id"], p["email"]) for p in pending] == [(mid, susan, "susan@example.com")]
+    assert decrypted == []
+
+    client_db.mark_chat_reminder_sent(mid, susan)
+    assert client_db.list_unread_mention_reminders(active_within_minutes=1) == []
+
+
+def test_chat_mentions_read_state_and_backfill(chat_env):
+    security, client_db, (victor, susan), room = chat_env
+    mid = client_db.add_room_message(room, victor, "Victor", "member", "@susan see claim")
+    _age_messages(client_db, 180)
+    client_db.mark_room_read(room, susan)
+    assert client_db.list_unread_mention_reminders(active_within_minutes=1) == []
+
+    # Messages written before chat_mentions existed are indexed from the
+    # mention ciphertext (or the body), keeping reminders already sent.
+    legacy = client_db.add_room_message(room, susan, "Susan", "member", "@victor ping")
+    conn = client_db.get_db()
+    conn.execute("DELETE FROM chat_mentions")
+    conn.execute("UPDATE chat_messages SET mentions_enc=? WHERE id=?",
+                 (security.encrypt_message("victor"), legacy))
+    conn.execute("INSERT INTO chat_reminders (message_id, user_id) VALUES (?,?)", (mid, susan))
+    assert client_db._backfill_chat_mentions(conn) == 2
+    rows = sorted(tuple(r) for r in conn.execute("SELECT message_id, user_id, reminded FROM chat_mentions"))
+    conn.commit()
+    conn.close()
+    assert rows == [(mid, susan, 1), (legacy, victor, 0)]
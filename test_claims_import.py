@@ -9,7 +9,7 @@ import pytest
 
 
 @pytest.fixture
-def hub_env(tmp_path):
+def hub_env(tmp_path, monkeypatch):
     os.environ["DB_PATH"] = str(tmp_path / "hub.db")
     for mod in ("app.config", "app.client_db", "app.client_routes", "app.hub_app"):
         if mod in sys.modules:
@@ -21,6 +21,8 @@ def hub_env(tmp_path):
     client_db.init_client_hub_db()
     client_routes = importlib.import_module("app.client_routes")
     client_routes = importlib.reload(client_routes)
+    (tmp_path / "uploads").mkdir()
+    monkeypatch.setattr(client_routes, "UPLOAD_DIR", str(tmp_path / "uploads"))
     return client_db, client_routes
 
 
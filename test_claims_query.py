@@ -0,0 +1,130 @@
+"""Claims query API: keyset pages over (updated_at, id) - over id for full
+walks - with server-side filters, column projection, scope-wide facets and a
+streamed export that honours the same queue visibility rules as GET /claims."""
+import csv
+import importlib
+import io
+import os
+import sys
+
+import pytest
+
+
+@pytest.fixture
+def env(tmp_path):
+    os.environ["DB_PATH"] = str(tmp_path / "hub.db")
+    for mod in ("app.config", "app.client_db", "app.hub_app"):
+        if mod in sys.modules:
+            importlib.reload(sys.modules[mod])
+    cdb = importlib.reload(importlib.import_module("app.client_db"))
+    cdb._CLIENTS_SEED_PATH = str(tmp_path / "clients_seed.json")
+    open(cdb._CLIENTS_SEED_PATH, "w").write("[]\n")
+    cdb.init_client_hub_db()
+    return cdb
+
+
+def _client(db, username, role="client"):
+    return db.create_client({"username": username, "password": f"{username}pass12345",
+                             "company": f"Lab {username}", "contact_name": username,
+                             "email": f"{username}@example.com", "phone": "1", "role": role})
+
+
+def _stamp(db, updated_at):
+    conn = db.get_db()
+    conn.execute("UPDATE claims_master SET updated_at=?", (updated_at,))
+    conn.commit()
+    conn.close()
+
+
+def test_keyset_pages_cover_every_claim_once(env):
+    cid = _client(env, "qa")
+    for i in range(23):
+        env.create_claim({"client_id": cid, "ClaimKey": f"Q-{i:02d}", "ChargeAmount": i})
+    _stamp(env, "2026-10-01 09:00:00")          # every row ties on updated_at
+
+    seen, cursor = [], None
+    while True:
+        page = env.query_claims({"client_id": cid}, limit=5, cursor=cursor,
+                                columns=["ClaimKey"], with_total=cursor is None)
+        if cursor is None:
+            assert page["total"] == 23 and not page["total_capped"]
+        assert set(page["claims"][0]) == {"id", "updated_at", "ClaimKey"}
+        seen += [c["ClaimKey"] for c in page["claims"]]
+        cursor = page["next_cursor"]
+        if not cursor:
+            break
+        if len(seen) == 10:                      # a write between pages
+            env.create_claim({"client_id": cid, "ClaimKey": "LATE", "ChargeAmount": 1})
+    assert sorted(seen) == sorted(f"Q-{i:02d}" for i in range(23))
+    assert [c["ClaimKey"] for c in env.iter_claims({"client_id": cid}, batch=4)][0] == "LATE"
+
+
+def test_iter_claims_survives_edits_between_pages(env):
+    cid = _client(env, "qc")
+    for i in range(10):
+        env.create_claim({"client_id": cid, "ClaimKey": f"Q-{i:02d}", "ChargeAmount": i})
+    _stamp(env, "2026-10-01 09:00:00")
+    first = min(c["id"] for c in env.get_claims(cid))
+
+    seen = []
+    for n, c in enumerate(env.iter_claims({"client_id": cid}, columns=["ClaimKey"], batch=3)):
+        seen.append(c["ClaimKey"])
+        if n == 2:                               # an unseen claim is worked mid-walk
+            env.update_claim(first, {"ClaimStatus": "Denied"})
+    assert sorted(seen) == [f"Q-{i:02d}" for i in range(10)]
+
+
+def test_filters_and_facets(env):
+    cid = _client(env, "qb")
+    rows = [("F-1", "Denied", "susan", "Aetna", "2026-03-01", 50),
+            ("F-2", "Denied", "melissa", "Aetna PPO", "2026-04-01", 500),
+            ("F-3", "Paid", "", "Cigna", "2026-04-15", 0)]
+    for key, status, owner, payer, dos, bal in rows:
+        env.create_claim({"client_id": cid, "ClaimKey": key, "ClaimStatus": status, "Owner": owner,
+                          "Payor": payer, "DOS": dos, "BalanceRemaining": bal, "ChargeAmount": 100,
+                          "PatientName": f"Pat {key}"})
+
+    def keys(**f):
+        return sorted(c["ClaimKey"] for c in env.query_claims({"client_id": cid, **f})["claims"])
+
+    assert keys(status="denied") == ["F-1", "F-2"]
+    assert keys(status="Denied,Paid", payer="aetna") == ["F-1", "F-2"]
+    assert keys(dos_from="2026-04-01", dos_to="2026-04-30") == ["F-2", "F-3"]
+    assert keys(balance_min=10, balance_max=100) == ["F-1"]
+    assert keys(q="pat f-3") == ["F-3"]
+    assert keys(owner_scope={"susan"}) == ["F-1", "F-3"]      # own + unassigned
+
+    page = env.query_claims({"client_id": cid, "status": "Paid"}, with_facets=True)
+    assert page["total"] == 1
+    assert page["facets"]["by_status"] == {"Denied": 2, "Paid": 1}
+    assert page["facets"]["charged"] == 300
+
+    with pytest.raises(ValueError):
+        env.query_claims({}, columns=["nope"])
+    with pytest.raises(ValueError):
+        env.query_claims({}, cursor="garbage")
+
+
+def test_route_scope_and_streamed_export(env):
+    from fastapi.testclient import TestClient
+    hub = importlib.reload(importlib.import_module("app.hub_app"))
+    client = TestClient(hub.app)
+    with client:
+        a, b = _client(env, "qlaba"), _client(env, "qlabb")
+        env.create_claim({"client_id": a, "ClaimKey": "A-1", "ChargeAmount": 10, "ClaimStatus": "Denied"})
+        env.create_claim({"client_id": b, "ClaimKey": "B-1", "ChargeAmount": 20, "ClaimStatus": "Denied"})
+
+        client.post("/hub/api/login", json={"username": "qlaba", "password": "qlabapass12345"})
+        d = client.get(f"/hub/api/claims/query?client_id={b}&facets=1&columns=ClaimKey,client_company").json()
+        assert [c["ClaimKey"] for c in d["claims"]] == ["A-1"]
+        assert d["claims"][0]["client_company"] == "Lab qlaba"
+        assert d["facets"]["total"] == 1
+
+        r = client.get("/hub/api/claims/query/export?format=csv&status=Denied&columns=ClaimKey,ChargeAmount")
+        assert r.status_code == 200
+        assert list(csv.reader(io.StringIO(r.text))) == [["ClaimKey", "ChargeAmount"], ["A-1", "10.0"]]
+
+        x = client.get("/hub/api/claims/query/export?format=xlsx")
+        assert x.status_code == 200 and x.content[:2] == b"PK"
+        assert client.get("/hub/api/claims/query?columns=bogus").status_code == 400
+        client.post("/hub/api/logout")
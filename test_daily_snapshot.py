@@ -0,0 +1,96 @@
+"""Daily activity snapshot: the EOD team report and the per-client reports
+render from one read of the day's rows, and the team rollup folds one grouped
+pass per table into its buckets."""
+import importlib
+import os
+import sys
+from datetime import timedelta
+
+import pytest
+
+
+@pytest.fixture
+def client_db(tmp_path):
+    os.environ["DB_PATH"] = str(tmp_path / "hub.db")
+    for mod in ("app.config", "app.client_db"):
+        if mod in sys.modules:
+            importlib.reload(sys.modules[mod])
+    db = importlib.import_module("app.client_db")
+    db = importlib.reload(db)
+    db._CLIENTS_SEED_PATH = str(tmp_path / "clients_seed.json")
+    db.init_client_hub_db()
+    return db
+
+
+def _client(db, username):
+    return db.create_client({
+        "username": username, "password": "labpass123", "company": f"Lab {username}",
+        "contact_name": f"Lab {username}", "email": f"{username}@example.com",
+        "phone": "555-9", "role": "client",
+    })
+
+
+def _stamp(db, table, key, created, updated=None):
+    conn = db.get_db()
+    conn.execute(f"UPDATE {table} SET created_at=? WHERE ClaimKey=?", (created, key))
+    if table == "claims_master":
+        conn.execute(f"UPDATE {table} SET updated_at=? WHERE ClaimKey=?", (updated or created, key))
+    conn.commit()
+    conn.close()
+
+
+def _seed_day(db, day):
+    a, b = _client(db, "snapa"), _client(db, "snapb")
+    for cid, key, owner in ((a, "A-1", "susan"), (a, "A-2", "jessica"), (b, "B-1", "susan")):
+        db.create_claim({"client_id": cid, "ClaimKey": key, "ChargeAmount": 100,
+                         "ClaimStatus": "Denied", "Owner": owner})
+        _stamp(db, "claims_master", key, f"{day} 15:00:00")
+    db.create_payment({"client_id": a, "ClaimKey": "A-1", "PostDate": day,
+                       "PaymentAmount": 12.5, "PayerType": "Primary", "PostedBy": "melissa"})
+    _stamp(db, "payments", "A-1", f"{day} 16:00:00")
+    return a, b
+
+
+def test_shared_snapshot_matches_per_client_reads(client_db):
+    day = "2026-10-14"
+    a, b = _seed_day(client_db, day)
+    snap = client_db.build_daily_activity_snapshot(day, sources=client_db.CLIENT_REPORT_SOURCES)
+
+    for cid in (a, b):
+        alone = client_db.get_client_daily_report(cid, day)
+        shared = client_db.get_client_daily_report(cid, day, snapshot=snap)
+        alone.pop("generated_at"), shared.pop("generated_at")
+        assert shared == alone
+    assert client_db.get_client_daily_report(a, day, snapshot=snap)["headlines"]["claims_new"] == 2
+
+
+def test_eod_headlines_come_from_snapshot_rows(client_db):
+    day = "2026-10-14"
+    _seed_day(client_db, day)
+    eod = client_db.get_eod_team_report(day)
+    h = eod["headlines"]
+    assert h["claims_new"] == 3 and h["claims_touched"] == 0
+    assert h["payments_posted"] == 1 and h["payments_amount"] == 12.5
+    users = {u["username"]: u for u in eod["users"]}
+    assert users["susan"]["totals"]["Claims"] == 2
+    assert set(users["susan"]["clients"]) == {"Lab snapa", "Lab snapb"}
+
+    # A snapshot for another date is not reused.
+    other = client_db.build_daily_activity_snapshot("2026-10-13")
+    assert client_db.get_eod_team_report(day, snapshot=other)["headlines"] == h
+
+
+def test_weekly_rollup_touched_excludes_same_bucket_creates(client_db):
+    cid = _client(client_db, "snaproll")
+    today = client_db.business_today()
+    monday = today - timedelta(days=today.weekday())
+    last_week = (monday - timedelta(days=3)).isoformat()
+    for key, created in (("W-1", monday), ("W-2", last_week)):
+        client_db.create_claim({"client_id": cid, "ClaimKey": key, "ChargeAmount": 50,
+                                "ClaimStatus": "Open", "Owner": "susan"})
+        _stamp(client_db, "claims_master", key, f"{created} 12:00:00", f"{today} 12:00:00")
+
+    weeks = client_db.get_team_activity_rollup(bucket="week", count=2)["buckets"]
+    assert weeks[-1]["claims_new"] == 1
+    assert weeks[-1]["claims_touched"] == 1   # W-2 only; W-1 was created this week
+    assert weeks[0]["claims_new"] == 1
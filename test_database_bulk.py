@@ -0,0 +1,69 @@
+"""Bulk lead persistence: chunked single-transaction upserts with one outcome
+per input row, and the same email quality gate as the per-record writers."""
+import importlib
+import os
+import sys
+
+import pytest
+
+
+@pytest.fixture
+def database(tmp_path):
+    os.environ["DB_PATH"] = str(tmp_path / "leads.db")
+    for mod in ("app.config", "app.database"):
+        if mod in sys.modules:
+            importlib.reload(sys.modules[mod])
+    db = importlib.import_module("app.database")
+    db.init_db()
+    return db
+
+
+def _lead(npi, **kw):
+    return {"npi": npi, "organization_name": f"Lab {npi}", "state": "FL", "lead_score": 50, **kw}
+
+
+def test_save_leads_bulk_chunks_and_reports_per_row(database):
+    leads = [_lead(str(1000 + i)) for i in range(7)] + [{"organization_name": "no npi"}]
+    out = database.save_leads_bulk(leads, chunk_size=3)
+
+    assert [o["status"] for o in out] == ["saved"] * 7 + ["skipped"]
+    assert all(o["id"] for o in out[:7])
+    assert len(database.get_saved_leads()) == 7
+
+    # Upsert: the same NPI again replaces rather than duplicates.
+    again = database.save_leads_bulk([_lead("1000", lead_score=99)])
+    assert again[0]["status"] == "saved"
+    rows = {r["npi"]: r for r in database.get_saved_leads()}
+    assert len(rows) == 7 and rows["1000"]["lead_score"] == 99
+
+
+def test_save_leads_bulk_skips_only_the_malformed_lead(database):
+    out = database.save_leads_bulk([_lead("2001"), _lead("2002", notes={"not": "bindable"}), _lead("2003")])
+    assert [o["status"] for o in out] == ["saved", "error", "saved"]
+    assert "not supported" in out[1]["error"] and out[1]["id"] is None
+    assert sorted(r["npi"] for r in database.get_saved_leads()) == ["2001", "2003"]
+
+
+def test_save_lead_emails_bulk_applies_quality_gate(database):
+    good = {"email": "jane.doe@acmelab.com", "source": "website", "confidence": 95, "verified": True}
+    weak = {"email": "john.roe@acmelab.com", "source": "website", "confidence": 40, "verified": False}
+    out = database.save_lead_emails_bulk([("1000", [good, weak]), ("2000", [good]), ("1000", [good])])
+
+    assert [o["status"] for o in out] == ["saved", "blocked", "saved", "duplicate"]
+    assert "low-confidence" in out[1]["reason"]
+    assert [e["email"] for e in database.get_lead_emails("1000")] == ["jane.doe@acmelab.com"]
+
+
+def test_save_enrichments_bulk_matches_single_writer(database):
+    data = {
+        "organization_name": "Acme Lab",
+        "service_needs": {"overall_score": 72, "priority": "high", "services_needed": ["billing"],
+                          "billing": {"score": 80, "reasons": ["denials"]}},
+    }
+    database.save_enrichment("1", data)
+    out = database.save_enrichments_bulk([("2", data), ("", data)])
+    assert [o["status"] for o in out] == ["saved", "skipped"]
+
+    one, two = database.get_enrichment("1"), database.get_enrichment("2")
+    for key in ("overall_score", "billing_score", "priority", "services_needed", "billing_reasons"):
+        assert one[key] == two[key]
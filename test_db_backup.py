@@ -0,0 +1,129 @@
+"""Online DB backups: paged backup-API snapshots, compressed, pruned by
+age tier, verified with integrity_check and restorable into the live DB."""
+import importlib
+import os
+import sqlite3
+import sys
+import threading
+import time
+from datetime import datetime, timedelta
+
+import pytest
+
+
+@pytest.fixture
+def backup(tmp_path, monkeypatch):
+    os.environ["DB_PATH"] = str(tmp_path / "leads.db")
+    for mod in ("app.config", "app.client_db", "app.db_backup"):
+        if mod in sys.modules:
+            importlib.reload(sys.modules[mod])
+    db = importlib.import_module("app.client_db")
+    db._CLIENTS_SEED_PATH = str(tmp_path / "clients_seed.json")
+    db.init_client_hub_db()
+    bk = importlib.import_module("app.db_backup")
+    monkeypatch.setattr(bk, "PAGES_PER_STEP", 8)
+    monkeypatch.setattr(bk, "COMPRESSION", "gzip")
+    bk.db = db
+    return bk
+
+
+def _add_claims(db, n, prefix="BK"):
+    cid = db.create_client({"username": f"lab{prefix.lower()}", "password": "labpass123",
+                            "company": "Lab", "contact_name": "Lab", "email": "l@example.com",
+                            "phone": "1", "role": "client"})
+    for i in range(n):
+        db.create_claim({"client_id": cid, "ClaimKey": f"{prefix}-{i}", "ChargeAmount": 10,
+                         "ClaimStatus": "Open", "DenialReason": "x" * 200})
+
+
+def _claims(path):
+    c = sqlite3.connect(path)
+    try:
+        return c.execute("SELECT COUNT(*) FROM claims_master").fetchone()[0]
+    finally:
+        c.close()
+
+
+def test_no_claims_is_never_snapshotted(backup):
+    assert backup.create_backup()["skipped"] == "no claims"
+    assert backup.list_backups() == []
+
+
+def test_snapshot_while_writer_runs_then_verify(backup):
+    _add_claims(backup.db, 50)
+    stop = threading.Event()
+
+    def writer():
+        i = 0
+        while not stop.is_set():
+            conn = backup.db.get_db()
+            conn.execute("UPDATE claims_master SET Owner=? WHERE ClaimKey='BK-1'", (f"w{i}",))
+            conn.commit()
+            conn.close()
+            i += 1
+            time.sleep(0.002)
+
+    t = threading.Thread(target=writer)
+    t.start()
+    try:
+        out = backup.create_backup()
+    finally:
+        stop.set()
+        t.join()
+
+    assert out["ok"] and out["file"].endswith(".db.gz") and out["pages"] > 8
+    check = backup.verify_backup(out["file"])
+    assert check["ok"] and check["integrity"] == ["ok"] and check["claims"] == 50
+
+
+def test_unchanged_db_is_not_copied_twice(backup):
+    _add_claims(backup.db, 3)
+    first = backup.create_backup()
+    again = backup.create_backup()
+    assert again["skipped"] == "unchanged since last backup"
+    assert again["file"] == first["file"]
+    assert backup.create_backup("startup", fresh_minutes=60)["skipped"] in (
+        "recent backup", "unchanged since last backup")
+
+
+def test_age_tier_retention(backup, tmp_path):
+    d = backup.backup_dir()
+    os.makedirs(d)
+    now = datetime(2026, 10, 19, 12, 0, 0)
+    ages = [timedelta(hours=h) for h in (1, 30)]                       # keep-all tier
+    ages += [timedelta(days=5, hours=h) for h in (1, 6)]               # one per day
+    ages += [timedelta(days=30), timedelta(days=31)]                   # one per week
+    ages += [timedelta(days=200)]                                      # expired
+    for age in ages:
+        open(os.path.join(d, f"leads_{(now - age):%Y%m%d_%H%M%S}.db.gz"), "wb").close()
+    open(os.path.join(d, "KEEP_leads_20200101_000000.db"), "wb").close()
+
+    removed = backup.prune_backups(now=now)
+    assert len(removed) == 3
+    kept = {b["file"] for b in backup.list_backups()}
+    assert "KEEP_leads_20200101_000000.db" in kept
+    assert len(kept) == 5
+
+
+def test_restore_replaces_live_db_after_safety_snapshot(backup):
+    _add_claims(backup.db, 4)
+    snap = backup.create_backup()["file"]
+    _add_claims(backup.db, 6, prefix="LATE")
+    assert _claims(os.environ["DB_PATH"]) == 10
+
+    out = backup.restore_backup(snap)
+    assert out["ok"] and out["pre_restore"].startswith("leads_") and "pre_restore" in out["pre_restore"]
+    assert _claims(os.environ["DB_PATH"]) == 4
+    assert backup.verify_backup(out["pre_restore"])["claims"] == 10
+
+
+def test_corrupt_backup_fails_verify_and_is_not_restored(backup):
+    _add_claims(backup.db, 2)
+    d = backup.backup_dir()
+    os.makedirs(d, exist_ok=True)
+    bad = os.path.join(d, "leads_20260101_000000.db")
+    with open(bad, "wb") as f:
+        f.write(b"SQLite format 3\x00" + b"\x00" * 100)
+    assert not backup.verify_backup(bad)["ok"]
+    assert backup.restore_backup(bad)["ok"] is False
+    assert _claims(os.environ["DB_PATH"]) == 2
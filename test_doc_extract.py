@@ -0,0 +1,104 @@
+"""Document extraction stage: PDF pages extract in parallel and in order,
+lines are cached per file (memory and disk) so a re-import never re-extracts,
+an early stop resumes from the cached pages, and each page is timed."""
+import importlib
+import io
+import os
+import sys
+
+import pytest
+
+
+@pytest.fixture
+def ext(tmp_path, monkeypatch):
+    os.environ["DB_PATH"] = str(tmp_path / "hub.db")
+    monkeypatch.setenv("DOC_CACHE_DIR", str(tmp_path / "doc_cache"))
+    for mod in ("app.config", "app.doc_extract", "app.client_routes"):
+        if mod in sys.modules:
+            importlib.reload(sys.modules[mod])
+    de = importlib.reload(importlib.import_module("app.doc_extract"))
+    routes = importlib.reload(importlib.import_module("app.client_routes"))
+    return de, routes
+
+
+def _pdf(pages, header=True):
+    from reportlab.lib.pagesizes import letter
+    from reportlab.pdfgen import canvas
+    buf = io.BytesIO()
+    c = canvas.Canvas(buf, pagesize=letter)
+    for p in range(pages):
+        y = 740
+        if header and p == 0:
+            c.drawString(40, y, "Work Date | Task | Hours | Notes")
+            y -= 16
+        for r in range(5):
+            text = f"2026-01-{p % 28 + 1:02d} | Task {p}-{r} | {r + 1} | page {p}" if header \
+                else f"Narrative paragraph {p}-{r} with no table"
+            c.drawString(40, y, text)
+            y -= 16
+        c.showPage()
+    c.save()
+    return buf.getvalue()
+
+
+def test_parallel_extraction_matches_serial_and_is_cached(ext, monkeypatch):
+    de, routes = ext
+    content = _pdf(10)
+    monkeypatch.setattr(de, "PROCESSES", 1)
+    serial = routes._parse_pdf_rows(content)
+    assert len(serial) == 50 and serial[0]["Task"] == "Task 0-0"
+
+    de.clear_cache()
+    monkeypatch.setattr(de, "PROCESSES", 2)
+    monkeypatch.setattr(de, "PARALLEL_MIN_PAGES", 4)
+    assert routes._parse_pdf_rows(content) == serial
+    stats = de.doc_extract_stats()
+    assert stats["parallel"] == 1
+    assert stats["last"]["pages"] == 10 and len(stats["last"]["page_seconds"]) == 10
+
+    extractions = stats["extractions"]
+    assert routes._parse_pdf_rows(content) == serial            # memory hit
+    de._memory.clear()
+    assert routes._parse_pdf_rows(content) == serial            # disk hit
+    stats = de.doc_extract_stats()
+    assert stats["extractions"] == extractions
+    assert stats["hits"] >= 1 and stats["disk_hits"] == 1
+
+
+def test_early_stop_caches_pages_read(ext, monkeypatch):
+    de, routes = ext
+    monkeypatch.setattr(de, "PROCESSES", 1)
+    content = _pdf(40, header=False)
+    with pytest.raises(ValueError):
+        routes._parse_pdf_rows(content)
+    first = de.doc_extract_stats()["last"]
+    assert not first["complete"] and first["pages"] < 40
+
+    with pytest.raises(ValueError):
+        routes._parse_pdf_rows(content)
+    assert de.doc_extract_stats()["extractions"] == 1           # served from the cached prefix
+
+    lines = de.pdf_lines(content)                               # resumes after the prefix
+    assert len(lines) == 200
+    last = de.doc_extract_stats()["last"]
+    assert last["complete"] and last["pages"] == 40 - first["pages"]
+
+
+def test_docx_tables_cached(ext):
+    de, routes = ext
+    import docx
+    d = docx.Document()
+    d.add_paragraph("Worklist")
+    t = d.add_table(rows=3, cols=3)
+    for r, vals in enumerate([("Date", "Task", "Hours"), ("2026-01-02", "Appeal", "2"), ("2026-01-03", "Calls", "1")]):
+        for c, v in enumerate(vals):
+            t.cell(r, c).text = v
+    buf = io.BytesIO()
+    d.save(buf)
+    content = buf.getvalue()
+
+    rows = routes._parse_docx_rows(content)
+    assert rows == [{"Date": "2026-01-02", "Task": "Appeal", "Hours": "2"},
+                    {"Date": "2026-01-03", "Task": "Calls", "Hours": "1"}]
+    assert routes._extract_text_lines(content, ".docx")[:2] == ["Worklist", "Date Task Hours"]
+    assert de.doc_extract_stats()["extractions"] == 1
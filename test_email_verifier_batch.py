@@ -0,0 +1,152 @@
+"""Batched SMTP verification: one MX lookup and one SMTP session per domain,
+pipelined RCPTs, greylist retry and the persistent verification store —
+exercised against a local SMTP stand-in instead of a real MX on port 25."""
+import asyncio
+import importlib
+import os
+import sys
+
+import pytest
+
+
+class _SmtpStandIn:
+    """Minimal asyncio SMTP server: accepts known mailboxes, rejects the rest,
+    optionally greylists an address on its first RCPT."""
+
+    def __init__(self, mailboxes, greylist=(), catchall=False):
+        self.mailboxes = set(mailboxes)
+        self.greylist = set(greylist)
+        self.catchall = catchall
+        self.sessions = 0
+        self.rcpts = []
+
+    async def handle(self, reader, writer):
+        self.sessions += 1
+        writer.write(b"220 standin ESMTP\r\n")
+        while True:
+            line = await reader.readline()
+            if not line:
+                break
+            cmd = line.decode().strip()
+            up = cmd.upper()
+            if up.startswith("EHLO"):
+                writer.write(b"250-standin\r\n250-PIPELINING\r\n250 8BITMIME\r\n")
+            elif up.startswith("MAIL FROM"):
+                writer.write(b"250 ok\r\n")
+            elif up.startswith("RCPT TO"):
+                addr = cmd[cmd.index("<") + 1:cmd.index(">")].lower()
+                self.rcpts.append(addr)
+                if addr in self.greylist:
+                    self.greylist.discard(addr)
+                    writer.write(b"451 4.7.1 greylisted\r\n")
+                elif addr in self.mailboxes or self.catchall:
+                    writer.write(b"250 ok\r\n")
+                else:
+                    writer.write(b"550 no such user\r\n")
+            elif up.startswith("QUIT"):
+                writer.write(b"221 bye\r\n")
+                await writer.drain()
+                break
+            else:
+                writer.write(b"502 unsupported\r\n")
+            await writer.drain()
+        writer.close()
+
+
+@pytest.fixture
+def verifier(tmp_path, monkeypatch):
+    os.environ["DB_PATH"] = str(tmp_path / "leads.db")
+    for mod in ("app.config", "app.database", "app.email_verifier"):
+        if mod in sys.modules:
+            importlib.reload(sys.modules[mod])
+    ev = importlib.import_module("app.email_verifier")
+    importlib.import_module("app.database").init_db()
+    lookups = []
+
+    async def _fake_mx(domain, client=None):
+        lookups.append(domain)
+        return ["127.0.0.1"]
+
+    monkeypatch.setattr(ev, "lookup_mx", _fake_mx)
+    ev.lookups = lookups
+    return ev
+
+
+def _run(ev, server, emails, **kw):
+    async def _main():
+        srv = await asyncio.start_server(server.handle, "127.0.0.1", 0)
+        ev.SMTP_PROBE_PORT = srv.sockets[0].getsockname()[1]
+        try:
+            return await ev.verify_batch(emails, **{"greylist_retry_delay": 0, **kw})
+        finally:
+            srv.close()
+            await srv.wait_closed()
+    return asyncio.run(_main())
+
+
+def test_one_session_per_domain(verifier):
+    server = _SmtpStandIn({"jane.doe@lab.com"})
+    emails = ["jane.doe@lab.com", "jdoe@lab.com", "JANE.DOE@lab.com", "bad@@x"]
+    results = _run(verifier, server, emails)
+
+    assert [r["email"] for r in results] == ["jane.doe@lab.com", "jdoe@lab.com", "jane.doe@lab.com", "bad@@x"]
+    assert results[0]["verdict"] == "deliverable"
+    assert results[1]["verdict"] == "undeliverable"
+    assert results[3]["reason"] == "bad syntax"
+    # One MX lookup and one session carrying catch-all probe + both candidates.
+    assert verifier.lookups == ["lab.com"]
+    assert server.sessions == 1
+    assert len(server.rcpts) == 3 and server.rcpts[0].startswith("zz-noexist-")
+
+
+def test_catchall_domain(verifier):
+    server = _SmtpStandIn(set(), catchall=True)
+    results = _run(verifier, server, ["a.person@wide.com"])
+    assert results[0]["verdict"] == "catch-all"
+    assert results[0]["catchall"] is True
+
+
+def test_greylisted_rcpt_is_retried(verifier):
+    server = _SmtpStandIn({"dr.lee@grey.com"}, greylist={"dr.lee@grey.com"})
+    results = _run(verifier, server, ["dr.lee@grey.com"])
+    assert results[0]["verdict"] == "deliverable"
+    assert server.sessions == 2
+    assert server.rcpts.count("dr.lee@grey.com") == 2
+
+
+def test_results_persist_and_skip_network(verifier):
+    server = _SmtpStandIn({"ops@stored.com"})
+    _run(verifier, server, ["ops@stored.com"])
+    stored = importlib.import_module("app.database").get_email_verifications(["ops@stored.com"])
+    assert stored["ops@stored.com"]["verdict"] == "deliverable"
+
+    verifier._VERIFY_CACHE.clear()
+    again = _SmtpStandIn(set())
+    results = _run(verifier, again, ["ops@stored.com"])
+    assert results[0]["verdict"] == "deliverable"
+    assert again.sessions == 0
+
+
+
+def test_inconclusive_verdicts_expire_quickly(verifier):
+    import sqlite3
+    from datetime import datetime, timedelta
+    server = _SmtpStandIn({"ok@firm.com"}, greylist={"slow@firm.com"})
+    results = _run(verifier, server, ["ok@firm.com", "slow@firm.com"], greylist_retry_delay=-1)
+    assert [r["smtp_result"] for r in results] == ["ok", "tempfail"]
+    expiry = {k: v[0] for k, v in verifier._VERIFY_CACHE.items()}
+    assert expiry["ok@firm.com"] - expiry["slow@firm.com"] > 5 * 3600
+
+    conn = sqlite3.connect(os.environ["DB_PATH"])
+    conn.execute("UPDATE email_verifications SET verified_at = ?",
+                 ((datetime.now() - timedelta(hours=2)).isoformat(),))
+    conn.commit()
+    conn.close()
+    stored = importlib.import_module("app.database").get_email_verifications(["ok@firm.com", "slow@firm.com"])
+    assert set(stored) == {"ok@firm.com"}
+
+    verifier._VERIFY_CACHE.clear()
+    again = _SmtpStandIn({"slow@firm.com"})
+    results = _run(verifier, again, ["ok@firm.com", "slow@firm.com"])
+    assert [r["verdict"] for r in results] == ["deliverable", "deliverable"]
+    assert again.rcpts == ["slow@firm.com"]           # only the greylisted one re-probed
@@ -0,0 +1,135 @@
+"""Section exports stream: rows come from the database one keyset page at a
+time, CSV/XLSX/PDF are written incrementally, and a large export can run as
+a background job whose file is downloaded when it finishes."""
+import csv
+import importlib
+import io
+import os
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+
+@pytest.fixture
+def hub_env(tmp_path, monkeypatch):
+    os.environ["DB_PATH"] = str(tmp_path / "hub.db")
+    monkeypatch.setenv("EXPORT_DIR", str(tmp_path / "exports"))
+    for mod in ("app.config", "app.client_db", "app.export_stream", "app.ingest",
+                "app.client_routes", "app.hub_app"):
+        if mod in sys.modules:
+            importlib.reload(sys.modules[mod])
+    client_db = importlib.reload(importlib.import_module("app.client_db"))
+    client_db._CLIENTS_SEED_PATH = str(tmp_path / "clients_seed.json")
+    Path(client_db._CLIENTS_SEED_PATH).write_text("[]\n", encoding="utf-8")
+    client_db.init_client_hub_db()
+    es = importlib.reload(importlib.import_module("app.export_stream"))
+    importlib.reload(importlib.import_module("app.ingest"))
+    importlib.reload(importlib.import_module("app.client_routes"))
+    hub = importlib.reload(importlib.import_module("app.hub_app"))
+    cid = client_db.create_client({
+        "username": "explab", "password": "explabpass123", "company": "Export Lab",
+        "contact_name": "Exp", "email": "exp@example.com", "phone": "1", "role": "client"})
+    return client_db, es, hub, cid
+
+
+def _claims(db, cid, n):
+    for i in range(n):
+        db.create_claim({"client_id": cid, "ClaimKey": f"EX-{i}", "ChargeAmount": i, "PatientName": f"P{i}"})
+    conn = db.get_db()
+    # Ties and NULLs in updated_at must not disturb paging.
+    conn.execute("UPDATE claims_master SET updated_at = CASE WHEN id % 7 = 0 THEN NULL "
+                 "ELSE '2026-01-0' || (id % 3 + 1) END")
+    conn.commit()
+    conn.close()
+
+
+def test_keyset_pages_match_single_query(hub_env):
+    db, es, hub, cid = hub_env
+    _claims(db, cid, 40)
+    conn = db.get_db()
+    want = [r[0] for r in conn.execute(
+        "SELECT id FROM claims_master WHERE client_id=? ORDER BY id DESC", (cid,))]
+    conn.close()
+    assert [r["id"] for r in db.iter_export_rows("claims", cid, batch=3)] == want
+    assert [r["id"] for r in db.export_claims(cid)] == want
+    assert db.count_export_rows("claims", cid) == 40
+
+    db.add_production_log({"client_id": cid, "work_date": "2026-01-02", "username": "rcm", "quantity": 1})
+    db.add_production_log({"client_id": cid, "work_date": "2026-01-03", "username": "explab", "quantity": 2})
+    assert [r["username"] for r in db.iter_export_rows("production", cid, batch=1)] == ["explab"]
+    assert db.count_export_rows("production", cid) == 1
+
+
+def test_rows_edited_mid_export_are_still_exported(hub_env):
+    db, es, hub, cid = hub_env
+    _claims(db, cid, 10)
+    ids = [c["id"] for c in db.get_claims(cid)]
+    seen = []
+    for n, r in enumerate(db.iter_export_rows("claims", cid, batch=3)):
+        seen.append(r["id"])
+        if n == 1:                               # a row not yet written is edited
+            db.update_claim(min(ids), {"ClaimStatus": "Denied"})
+    assert sorted(seen) == sorted(ids)
+
+
+def test_writers_consume_rows_lazily(hub_env):
+    db, es, hub, cid = hub_env
+    pulled = []
+
+    def rows():
+        for i in range(5000):
+            pulled.append(i)
+            yield {"a": i, "b": None}
+
+    chunks = es.iter_csv(["a", "b"], rows(), chunk_rows=100)
+    first = next(chunks)
+    assert len(pulled) == 100 and first.startswith(b"a,b\r\n0,\r\n")
+    assert len(b"".join([first, *chunks]).splitlines()) == 5001
+
+    pulled.clear()
+    buf = io.BytesIO()
+    es.write_pdf(["a", "b"], rows(), "T", 5000, buf)
+    assert len(pulled) == es.PDF_MAX_ROWS and buf.getvalue()[:4] == b"%PDF"
+
+
+def test_export_route_streams_and_background_job(hub_env):
+    from fastapi.testclient import TestClient
+    from openpyxl import load_workbook
+    db, es, hub, cid = hub_env
+    _claims(db, cid, 25)
+    with TestClient(hub.app) as tc:
+        assert tc.post("/hub/api/login", json={"username": "admin", "password": "admin123"}).status_code == 200
+        r = tc.get(f"/hub/api/export/claims?client_id={cid}&format=csv")
+        assert r.status_code == 200
+        table = list(csv.reader(io.StringIO(r.text)))
+        assert table[0] == db.export_columns("claims") and len(table) == 26
+
+        x = tc.get(f"/hub/api/export/claims?client_id={cid}&format=xlsx")
+        ws = load_workbook(io.BytesIO(x.content)).active
+        assert ws.title == "Claims" and ws.max_row == 26 and ws["A1"].font.bold
+
+        empty = tc.get("/hub/api/export/credentialing?client_id=999999&format=csv")
+        assert empty.text.splitlines() == [",".join(hub_routes_fallback("credentialing"))]
+        assert tc.get(f"/hub/api/export/claims?client_id={cid}&format=pdf").content[:4] == b"%PDF"
+        assert tc.get("/hub/api/export/bogus").status_code == 400
+
+        job = tc.get(f"/hub/api/export/claims?client_id={cid}&format=csv&background=true").json()
+        assert job["async_job"] and job["rows"] == 25
+        for _ in range(100):
+            state = tc.get(f"/hub/api/jobs/{job['job_id']}").json()
+            if state["status"] in ("done", "error"):
+                break
+            time.sleep(0.05)
+        assert state["status"] == "done", state
+        d = tc.get(f"/hub/api/export/jobs/{job['job_id']}/download")
+        assert d.status_code == 200 and d.text == r.text
+        assert "attachment" in d.headers["content-disposition"]
+
+        os.remove(os.path.join(es.export_dir(), state["result"]["file"]))
+        assert tc.get(f"/hub/api/export/jobs/{job['job_id']}/download").status_code == 410
+
+
+def hub_routes_fallback(section):
+    return sys.modules["app.client_routes"]._SECTION_FALLBACK_HEADERS[section]
@@ -0,0 +1,145 @@
+"""Global search: one FTS5 trigram index over claims, providers,
+credentialing, enrollment and EDI, re-indexed in batches from trigger-marked
+rows, matching like the old substring scan, ranked by bm25, client-scoped and
+paged."""
+import importlib
+import os
+import sys
+
+import pytest
+
+
+@pytest.fixture
+def client_db(tmp_path):
+    os.environ["DB_PATH"] = str(tmp_path / "hub.db")
+    for mod in ("app.config", "app.client_db"):
+        if mod in sys.modules:
+            importlib.reload(sys.modules[mod])
+    db = importlib.import_module("app.client_db")
+    db = importlib.reload(db)
+    db._CLIENTS_SEED_PATH = str(tmp_path / "clients_seed.json")
+    db.init_client_hub_db()
+    return db
+
+
+def _client(db, username):
+    return db.create_client({
+        "username": username, "password": "labpass123", "company": f"Lab {username}",
+        "contact_name": f"Lab {username}", "email": f"{username}@example.com",
+        "phone": "555-9", "role": "client",
+    })
+
+
+def _claim(db, cid, key, **extra):
+    return db.create_claim({"client_id": cid, "ClaimKey": key, "ChargeAmount": 100,
+                            "PatientName": "Jane Roe", "Payor": "Aetna",
+                            "ClaimStatus": "Open", **extra})
+
+
+def test_partial_claim_number_and_member_id(client_db):
+    cid = _client(client_db, "srcha")
+    _claim(client_db, cid, "CLM-004471", PatientID="W88213907")
+    _claim(client_db, cid, "CLM-009999", PatientID="X11111111")
+
+    assert [r["title"] for r in client_db.global_search("4471")] == ["CLM-004471"]
+    hit = client_db.global_search("8213")[0]
+    assert hit["type"] == "claim" and hit["subtitle"] == "Jane Roe — Aetna — $100.0"
+
+
+def test_ranks_across_types_and_scopes_by_client(client_db):
+    a, b = _client(client_db, "srchb"), _client(client_db, "srchc")
+    client_db.create_provider({"client_id": a, "ProviderName": "Dr Kessler", "NPI": "1234567890"})
+    _claim(client_db, a, "CLM-1", ProviderName="Kessler")
+    _claim(client_db, b, "CLM-2", ProviderName="Kessler")
+
+    types = [r["type"] for r in client_db.global_search("kessler", client_id=a)]
+    assert sorted(types) == ["claim", "provider"]
+    assert types[0] == "provider"   # title match outranks a body match
+    assert len(client_db.global_search("kessler")) == 3
+
+
+def test_triggers_follow_updates_and_deletes(client_db):
+    cid = _client(client_db, "srchd")
+    claim_id = _claim(client_db, cid, "CLM-777", DenialReason="Timely filing")
+    assert client_db.global_search("timely")
+
+    client_db.update_claim(claim_id, {"DenialReason": "Missing modifier"})
+    assert not client_db.global_search("timely")
+    assert client_db.global_search("modifier")[0]["id"] == claim_id
+
+    client_db.delete_claim(claim_id)
+    assert client_db.global_search("modifier") == []
+
+
+def test_pages_and_short_query_fallback(client_db):
+    cid = _client(client_db, "srche")
+    for i in range(7):
+        _claim(client_db, cid, f"PAGE-{i:03d}")
+    pages = [client_db.global_search("page", limit=3, offset=o) for o in (0, 3, 6)]
+    assert [len(p) for p in pages] == [3, 3, 1]
+    assert len({r["id"] for p in pages for r in p}) == 7
+
+    assert {r["title"] for r in client_db.global_search("E-", limit=50)} >= {"PAGE-000", "PAGE-006"}
+
+
+def test_rebuild_repopulates(client_db):
+    cid = _client(client_db, "srchf")
+    _claim(client_db, cid, "CLM-REBUILD")
+    assert client_db.global_search("rebuild")            # indexed (dirty marks flushed)
+    conn = client_db.get_db()
+    conn.execute("DELETE FROM search_index")
+    conn.commit()
+    conn.close()
+    assert client_db.global_search("rebuild") == []
+    assert client_db.rebuild_search_index()["claim"] >= 1
+    assert client_db.global_search("rebuild")[0]["title"] == "CLM-REBUILD"
+
+
+def test_query_is_one_substring_within_a_field(client_db):
+    cid = _client(client_db, "srchg")
+    _claim(client_db, cid, "CLM-SUB")
+    assert [r["title"] for r in client_db.global_search("jane roe")] == ["CLM-SUB"]
+    assert [r["title"] for r in client_db.global_search("Jane R")] == ["CLM-SUB"]
+    assert client_db.global_search("Jane X") == []       # short terms are not dropped
+    assert client_db.global_search("roe jane") == []     # terms are not ANDed
+    assert client_db.global_search("Roe Aetna") == []    # nor matched across fields
+
+
+def test_bulk_writes_are_indexed_in_one_batch(client_db):
+    cid = _client(client_db, "srchh")
+    conn = client_db.get_db()
+    conn.executemany("INSERT INTO claims_master (client_id, ClaimKey, PatientName) VALUES (?,?,?)",
+                     [(cid, f"BULK-{i:04d}", "Bulk Patient") for i in range(300)])
+    conn.commit()
+    assert conn.execute("SELECT COUNT(*) FROM search_dirty").fetchone()[0] == 300
+    assert conn.execute("SELECT COUNT(*) FROM search_index WHERE search_index MATCH 'bulk'").fetchone()[0] == 0
+    conn.close()
+
+    assert len(client_db.global_search("BULK-0", limit=500)) == 300
+    conn = client_db.get_db()
+    assert conn.execute("SELECT COUNT(*) FROM search_dirty").fetchone()[0] == 0
+    assert client_db.sync_search_index(conn) == 0
+    conn.close()
+
+
+def test_repeat_writes_under_an_outer_conflict_clause(client_db):
+    cid = _client(client_db, "srchi")
+    claim_id = _claim(client_db, cid, "CLM-ABORT")
+    conn = client_db.get_db()
+    for name in ("Ann Lee", "Ann Leigh"):              # row already marked dirty
+        conn.execute("UPDATE OR ABORT claims_master SET PatientName=? WHERE id=?", (name, claim_id))
+    conn.commit()
+    conn.close()
+    assert client_db.global_search("leigh")[0]["id"] == claim_id
+
+
+def test_index_readiness_is_tracked_per_database(client_db, tmp_path, monkeypatch):
+    hub = client_db.DATABASE_PATH
+    monkeypatch.setattr(client_db, "DATABASE_PATH", str(tmp_path / "bare.db"))
+    conn = client_db.get_db()                          # no search_index here
+    assert client_db._search_index_available(conn) is False
+    conn.close()
+    monkeypatch.setattr(client_db, "DATABASE_PATH", hub)
+    conn = client_db.get_db()
+    assert client_db._search_index_available(conn) is True
+    conn.close()
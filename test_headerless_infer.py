@@ -0,0 +1,66 @@
+"""Headerless claim files: column roles are scored on a bounded row sample
+with one regex pass per role, and every row is projected through the layout
+inferred for that file."""
+import csv
+import io
+import random
+
+
+from app import client_routes as routes
+
+_PAYORS = ["Aetna PPO", "Blue Cross Blue Shield", "Medicaid Ohio", "Cigna", "Humana Gold", "UHC Choice"]
+
+
+def _rows(n, seed):
+    rnd = random.Random(seed)
+    out = []
+    for i in range(n):
+        charge = rnd.choice([86, 120.5, 245, 310, 1250.75])
+        out.append([f"SV{seed}{i:06d}", rnd.choice(["John", "Mary", "Ana", "Lee"]),
+                    rnd.choice(["Smith", "O'Neil", "Garcia", "Nguyen"]), "2026-01-0%d" % rnd.randint(1, 9),
+                    rnd.choice(["99213", "87086", "J1100", "80053"]), rnd.choice(_PAYORS),
+                    f"{charge:.2f}", f"{charge * 0.6:.2f}", rnd.choice(["", "", "CO45", "PR1"])])
+    out.append(["", "", "", "", "", "", "99999.00", "", ""])      # footer total
+    return out
+
+
+def test_column_profile_matches_value_predicates():
+    vals = ["99213", "j1100", "co 45", "N12", "O'Neil", "Mary Ann", "Ⅻ", "José", "Blue\nShield",
+            "abc\ndef", "CLM-00123", "ab12", "$1,200.50", "-12.5", "1.2.3", "", "  ", None, 45.0, "Aetna PPO"]
+    frac, meta = routes._hl_column_profile(vals)
+    nonempty = [routes._hl_s(v) for v in vals if routes._hl_s(v)]
+    for role, pred in (("cpt", routes._hl_is_cpt), ("denial", routes._hl_is_denial),
+                       ("name", routes._hl_is_name), ("payor", routes._hl_is_payor),
+                       ("claimid", routes._hl_is_claimid)):
+        assert frac[role] == sum(map(pred, nonempty)) / len(nonempty), role
+    money = [m for m in map(routes._hl_money, vals) if m is not None]
+    assert frac["money"] == len(money) / len(vals)
+    assert meta["money_sum"] == sum(m for m in money if m)
+
+
+def test_sampled_layout_projects_every_row(monkeypatch):
+    matrix = _rows(3000, 1)
+    full = routes._infer_headerless_claim_rows(matrix, "2026-02-01")
+    assert len(full) == 3000 and full[0] == {
+        "ChargeAmount": matrix[0][6], "ClaimStatus": "Billed/Submitted", "BillDate": "2026-02-01",
+        "ClaimKey": matrix[0][0], "CPTCode": matrix[0][4], "Payor": matrix[0][5],
+        **({"DenialReason": matrix[0][8]} if matrix[0][8] else {}),
+        "PatientName": f"{matrix[0][1]} {matrix[0][2]}"}
+
+    monkeypatch.setattr(routes, "_HL_SAMPLE_ROWS", 200)
+    assert routes._infer_headerless_claim_rows(matrix, "2026-02-01") == full
+
+    buf = io.StringIO()
+    csv.writer(buf).writerows(_rows(500, 2))
+    rows = routes._maybe_headerless_billed_rows(buf.getvalue().encode(), ".csv", [], "2026-02-02")
+    assert len(rows) == 500 and all(r["Payor"] in _PAYORS for r in rows)
+
+
+def test_same_shape_with_swapped_money_columns():
+    charge_first = [[f"SVA{i:05d}", "Mary Jones", "99213", "Aetna PPO", f"{c:.2f}", f"{c / 2:.2f}"]
+                    for i, c in enumerate([175.5, 175.5, 120.0, 120.0, 175.5, 86.0])]
+    paid_first = [[r[0].replace("A", "B"), r[1], r[2], r[3], r[5], r[4]] for r in charge_first]
+    a = routes._infer_headerless_claim_rows(charge_first, "2026-02-01")
+    b = routes._infer_headerless_claim_rows(paid_first, "2026-02-01")
+    assert [r["ChargeAmount"] for r in a] == [r["ChargeAmount"] for r in b] == [
+        "175.50", "175.50", "120.00", "120.00", "175.50", "86.00"]
@@ -0,0 +1,106 @@
+"""Staged hunt pipeline: per-NPI checkpoints survive a restart, failed rows
+are retried on the next tick, and a tick budget leaves the run resumable."""
+import asyncio
+import importlib
+
+import pytest
+
+
+def _prospect(npi, state="FL"):
+    return {
+        "organization_name": f"Sunshine Clinical Laboratory {npi}", "npi": npi,
+        "state": state, "city": "Tampa", "taxonomy": "Clinical Medical Laboratory",
+        "authorized_official_first_name": "Dana", "authorized_official_last_name": "Reyes",
+    }
+
+
+@pytest.fixture
+def hunt(tmp_path, monkeypatch):
+    monkeypatch.delenv("QUALITY_FIRST", raising=False)
+    monkeypatch.delenv("REQUIRE_EMAIL", raising=False)
+    bp = importlib.import_module("app.bulk_prospector")
+    hp = importlib.import_module("app.hunt_pipeline")
+    fetched = {"FL": [_prospect("111"), _prospect("222")], "GA": [_prospect("333", "GA"), _prospect("111")]}
+    calls = {"fetch": [], "enrich": []}
+    fail_once = {"222"}
+
+    async def _fake_state(state, **kw):
+        calls["fetch"].append(state)
+        return fetched[state]
+
+    def _fake_builder(*, fast=False):
+        async def _row(p):
+            calls["enrich"].append(p["npi"])
+            if p["npi"] in fail_once:
+                fail_once.discard(p["npi"])
+                raise RuntimeError("scrape timeout")
+            return {"NPI": p["npi"], "Heat Score": int(p["npi"][0]) * 10,
+                    "Decision Maker": "DANA REYES", "LinkedIn Search URL": "https://li/search"}
+        return _row
+
+    monkeypatch.setattr(bp, "prospect_state", _fake_state)
+    monkeypatch.setattr(bp, "_dm_row_builder", _fake_builder)
+    return hp, str(tmp_path / "hunt.db"), calls
+
+
+def test_resume_skips_finished_rows_and_retries_failures(hunt):
+    hp, db, calls = hunt
+    first = asyncio.run(hp.HuntPipeline("t1", db_path=db).run(["FL", "GA"]))
+    assert first["complete"] is False
+    assert sorted(r["NPI"] for r in first["rows"]) == ["111", "333"]
+    assert sorted(calls["enrich"]) == ["111", "222", "333"]
+
+    calls["fetch"].clear()
+    calls["enrich"].clear()
+    second = asyncio.run(hp.HuntPipeline("t1", db_path=db).run(["FL", "GA"]))
+    assert second["complete"] is True
+    assert calls["fetch"] == []          # states came from checkpoints
+    assert calls["enrich"] == ["222"]    # only the failed row was redone
+    assert [r["NPI"] for r in second["rows"]] == ["333", "222", "111"]
+
+    stages = {s["stage"]: s for s in second["pipeline"]["stages"]}
+    assert stages["enrich"]["resumed"] == 2
+    assert stages["enrich"]["processed"] == 1
+
+
+def test_tick_budget_leaves_run_resumable(hunt):
+    hp, db, calls = hunt
+    exported = []
+    partial = asyncio.run(hp.HuntPipeline("t2", db_path=db).run(
+        ["FL"], budget_seconds=1e-9, export=lambda rows, s: exported.append(rows)))
+    assert partial["complete"] is False
+    assert calls["enrich"] == []
+    assert exported == []
+
+    done = asyncio.run(hp.HuntPipeline("t2", db_path=db, row_timeout=5).run(
+        ["FL"], export=lambda rows, s: exported.append(rows)))
+    assert done["complete"] is False     # 222 fails its first attempt
+    done = asyncio.run(hp.HuntPipeline("t2", db_path=db).run(
+        ["FL"], export=lambda rows, s: exported.append(rows)))
+    assert done["complete"] is True
+    assert len(exported) == 1 and len(exported[0]) == 2
+
+
+def test_stale_runs_are_pruned_whole(hunt, monkeypatch):
+    import sqlite3
+    import time
+    hp, db, calls = hunt
+    asyncio.run(hp.HuntPipeline("old", db_path=db).run(["FL"]))
+    asyncio.run(hp.HuntPipeline("live", db_path=db).run(["GA"]))
+    conn = sqlite3.connect(db)
+    week_ago = int(time.time()) - 8 * 86400
+    conn.execute("UPDATE hunt_checkpoints SET updated_at = ? WHERE run_key = 'old'", (week_ago,))
+    conn.execute("UPDATE hunt_checkpoints SET updated_at = ? WHERE run_key = 'live' AND stage = 'fetch'",
+                 (week_ago,))                    # one stale row, but the run is still live
+    conn.commit()
+    old_rows = conn.execute("SELECT COUNT(*) FROM hunt_checkpoints WHERE run_key = 'old'").fetchone()[0]
+    conn.close()
+
+    monkeypatch.setattr(hp, "_last_prune", {})
+    asyncio.run(hp.HuntPipeline("next", db_path=db).run(["FL"]))
+    conn = sqlite3.connect(db)
+    keys = dict(conn.execute("SELECT run_key, COUNT(*) FROM hunt_checkpoints GROUP BY run_key").fetchall())
+    conn.close()
+    assert old_rows and "old" not in keys
+    assert keys["live"] >= 3 and "next" in keys
+    assert hp.prune_checkpoints(db) == 0
@@ -0,0 +1,57 @@
+"""Hub cold start: ``import app.hub_app`` stays inside an import-time budget
+and leaves eligibility, PDF/XLSX, AI and parser libraries for first use or
+the background pre-warm."""
+import importlib
+import importlib.util
+import os
+import sys
+
+import pytest
+
+# Generous enough for a cold CI box; today's import is ~1.3s, most of it
+# FastAPI building the client hub's routes.
+BUDGET_SECONDS = float(os.getenv("HUB_IMPORT_BUDGET_SECONDS", "4"))
+
+
+@pytest.fixture(scope="module")
+def profile(tmp_path_factory):
+    spec = importlib.util.spec_from_file_location(
+        "profile_imports", os.path.join(os.path.dirname(__file__), "scripts", "profile_imports.py"))
+    harness = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(harness)
+    # Module-scoped, so no monkeypatch fixture; the context restores DB_PATH
+    # for the tests that run after this module.
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setenv("DB_PATH", str(tmp_path_factory.mktemp("imp") / "hub.db"))
+        return harness, harness.profile_import("app.hub_app")
+
+
+def test_hub_import_within_budget(profile):
+    _, rows = profile
+    hub = next(r for r in rows if r["name"] == "app.hub_app")
+    assert hub["depth"] == 0
+    assert hub["cumulative_us"] / 1e6 < BUDGET_SECONDS
+
+
+def test_heavy_modules_load_lazily(profile):
+    harness, rows = profile
+    assert harness.heavy_loaded(rows) == []
+    assert any(r["name"] == "app.client_routes" for r in rows)
+
+
+def test_prewarm_imports_in_background_and_reports(monkeypatch):
+    monkeypatch.delenv("STARTUP_PREWARM", raising=False)
+    sr = importlib.import_module("app.startup_repairs")
+    sys.modules.pop("rule_intercept", None)
+
+    th = sr.prewarm_lazy_imports(modules=("rule_intercept", "no_such_module_xyz"), delay=0)
+    th.join(timeout=30)
+    report = sr.startup_report()["prewarm"]
+    assert report["status"] == "done"
+    assert isinstance(report["modules"]["rule_intercept"], float)
+    assert report["modules"]["no_such_module_xyz"].startswith("ModuleNotFoundError")
+    assert "rule_intercept" in sys.modules
+
+    monkeypatch.setenv("STARTUP_PREWARM", "0")
+    assert sr.prewarm_lazy_imports() is None
+    assert sr.startup_report()["prewarm"]["status"] == "disabled"
@@ -0,0 +1,141 @@
+"""Ingestion service: upload parse+import runs on the bounded ingestion pool
+(never the event loop), can be queued as a tracked job with progress events,
+spools the body to disk and can hand large spreadsheet parses to a process."""
+import asyncio
+import importlib
+import io
+import os
+import sys
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+
+@pytest.fixture
+def hub_env(tmp_path, monkeypatch):
+    os.environ["DB_PATH"] = str(tmp_path / "hub.db")
+    monkeypatch.setenv("INGEST_SPOOL_DIR", str(tmp_path / "spool"))
+    for mod in ("app.config", "app.client_db", "app.workbook", "app.ingest", "app.client_routes", "app.hub_app"):
+        if mod in sys.modules:
+            importlib.reload(sys.modules[mod])
+    client_db = importlib.reload(importlib.import_module("app.client_db"))
+    client_db._CLIENTS_SEED_PATH = str(tmp_path / "clients_seed.json")
+    Path(client_db._CLIENTS_SEED_PATH).write_text("[]\n", encoding="utf-8")
+    client_db.init_client_hub_db()
+    ingest = importlib.reload(importlib.import_module("app.ingest"))
+    routes = importlib.reload(importlib.import_module("app.client_routes"))
+    (tmp_path / "uploads").mkdir()
+    monkeypatch.setattr(routes, "UPLOAD_DIR", str(tmp_path / "uploads"))
+    hub = importlib.reload(importlib.import_module("app.hub_app"))
+    cid = client_db.create_client({
+        "username": "inglab", "password": "inglabpass123", "company": "Ingest Lab",
+        "contact_name": "Ing", "email": "ing@example.com", "phone": "1", "role": "client"})
+    return client_db, ingest, routes, hub, cid
+
+
+CSV = (b"Claim #,Patient Name,DOS,CPT Code,Payor,Charge Amount,Claim Status\n"
+       b"IN-1,Doe,2026-01-05,99213,Aetna,120,Billed\n"
+       b"IN-2,Roe,2026-01-06,99214,Cigna,80,Billed\n")
+
+
+def _login(tc):
+    assert tc.post("/hub/api/login", json={"username": "admin", "password": "admin123"}).status_code == 200
+
+
+def test_upload_runs_on_pool_and_spool_is_cleared(hub_env, monkeypatch):
+    from fastapi.testclient import TestClient
+    db, ingest, routes, hub, cid = hub_env
+    threads = []
+    real = routes._import_claims_or_batch
+    monkeypatch.setattr(routes, "_import_claims_or_batch",
+                        lambda *a, **k: threads.append(threading.current_thread().name) or real(*a, **k))
+    with TestClient(hub.app) as tc:
+        _login(tc)
+        r = tc.post("/hub/api/files/upload", files={"file": ("claims.csv", CSV, "text/csv")},
+                    data={"category": "Claims", "client_id": str(cid)})
+        assert r.status_code == 200, r.text
+        assert r.json()["imported"] == 2
+    assert threads and threads[0].startswith("ingest")
+    assert os.listdir(ingest.spool_dir()) == []
+
+
+def test_async_job_reports_progress_and_result(hub_env):
+    from fastapi.testclient import TestClient
+    db, ingest, routes, hub, cid = hub_env
+    with TestClient(hub.app) as tc:
+        _login(tc)
+        r = tc.post("/hub/api/files/upload?async_job=true",
+                    files={"file": ("claims.csv", CSV, "text/csv")},
+                    data={"category": "Claims", "client_id": str(cid)})
+        assert r.status_code == 200 and r.json()["status"] == "queued"
+        job_id = r.json()["job_id"]
+        for _ in range(100):
+            job = tc.get(f"/hub/api/jobs/{job_id}").json()
+            if job["status"] in ("done", "error"):
+                break
+            time.sleep(0.05)
+        assert job["status"] == "done", job
+        assert job["job_type"] == "file_upload" and job["account_id"] == cid
+        assert job["result"]["imported"] == 2
+        stages = [e["stage"] for e in job["events"]]
+        assert stages[0] == "queued" and "parse" in stages and "import" in stages and stages[-1] == "done"
+
+        # A refused upload fails its job with the route's message.
+        bad = tc.post("/hub/api/import-excel?async_job=true",
+                      files={"file": ("x.csv", CSV, "text/csv")},
+                      data={"category": "Nope", "client_id": str(cid)}).json()
+        for _ in range(100):
+            job = tc.get(f"/hub/api/jobs/{bad['job_id']}").json()
+            if job["status"] in ("done", "error"):
+                break
+            time.sleep(0.05)
+        assert job["status"] == "error" and "Unknown category" in job["latest_error"]
+    assert os.listdir(ingest.spool_dir()) == []
+
+
+def test_event_loop_stays_responsive_during_import(hub_env, monkeypatch):
+    import httpx
+    db, ingest, routes, hub, cid = hub_env
+    real = routes._import_claims_or_batch
+
+    def slow(*a, **k):
+        time.sleep(0.6)
+        return real(*a, **k)
+
+    monkeypatch.setattr(routes, "_import_claims_or_batch", slow)
+
+    async def scenario():
+        transport = httpx.ASGITransport(app=hub.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://hub") as ac:
+            await ac.post("/hub/api/login", json={"username": "admin", "password": "admin123"})
+            upload = asyncio.create_task(ac.post(
+                "/hub/api/files/upload", files={"file": ("claims.csv", CSV, "text/csv")},
+                data={"category": "Claims", "client_id": str(cid)}))
+            await asyncio.sleep(0.1)
+            t = time.perf_counter()
+            ping = await ac.get("/hub/api/jobs")
+            ping_s = time.perf_counter() - t
+            assert not upload.done()
+            return ping, ping_s, await upload
+
+    ping, ping_s, upload = asyncio.run(scenario())
+    assert ping.status_code == 200 and ping_s < 0.4
+    assert upload.json()["imported"] == 2
+
+
+def test_spool_limit_and_process_parse(hub_env, monkeypatch):
+    db, ingest, routes, hub, cid = hub_env
+    from starlette.datastructures import UploadFile
+    with pytest.raises(ValueError):
+        asyncio.run(ingest.spool_upload(UploadFile(io.BytesIO(b"x" * 4096), filename="big.csv"), max_bytes=1024))
+    assert os.listdir(ingest.spool_dir()) == []
+
+    workbook = importlib.import_module("app.workbook")
+    monkeypatch.setattr(ingest, "PROCESS_MIN_BYTES", 0)
+    ingest.parse_ahead(CSV, ".csv")
+    assert ingest.ingest_stats()["process_parses"] == 1
+    parses = workbook.STATS["parses"]
+    assert [r["Claim #"] for r in routes._parse_excel_rows(CSV, ".csv")] == ["IN-1", "IN-2"]
+    assert workbook.STATS["parses"] == parses          # served from the seeded cache
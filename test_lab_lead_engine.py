@@ -0,0 +1,44 @@
+"""Lab lead engine merge: facilities with no CLIA or state match carry blank
+fields (not NaN / "nan") into scoring, routing and the Apollo export."""
+import pandas as pd
+import pytest
+
+import lab_lead_engine as engine
+
+
+def _npi():
+    df = pd.DataFrame({
+        "npi": ["1", "2"], "org_name": ["Acme Lab", "Bay Lab"], "addr1": ["", ""],
+        "city": ["Tampa", "Miami"], "state": ["FL", "FL"], "zip": ["33601", "33101"],
+        "taxonomy": ["Clinical Medical Laboratory"] * 2, "source_npi": [True, True],
+    })
+    return engine._as_category(df, ["state", "taxonomy"])
+
+
+def test_unmatched_clia_is_blank_and_scores_nothing():
+    clia = engine._as_category(pd.DataFrame({
+        "clia": ["10D0000001"], "lab_name": ["Acme"], "addr1": [""], "city": ["Tampa"],
+        "state": ["FL"], "zip": ["33601"], "lab_type": ["Independent"],
+        "complexity": ["High"], "source_clia": [True],
+    }), ["state", "lab_type", "complexity"])
+    merged = engine.merge_facilities(_npi(), clia, pd.DataFrame(), pd.DataFrame())
+
+    unmatched = merged.iloc[1]
+    assert unmatched["clia"] == "" and unmatched["complexity"] == ""
+    assert not unmatched["source_clia"]
+
+    scored = engine.score_facilities(merged)
+    assert list(scored["money_score"]) == [5, 0]
+    assert list(engine.build_apollo_export(scored).sort_values("NPI")["CLIA"]) == ["10D0000001", ""]
+
+
+def test_write_table_keeps_csv_when_parquet_rejects_a_column(tmp_path, capsys):
+    pytest.importorskip("pyarrow")
+    from lead_engine_common import write_table
+
+    csv_path = tmp_path / "out.csv"
+    write_table(pd.DataFrame({"npi": [1, "DISC-2"]}), str(csv_path))
+
+    assert pd.read_csv(csv_path, dtype=str)["npi"].tolist() == ["1", "DISC-2"]
+    assert not (tmp_path / "out.parquet").exists()
+    assert "[WARN] Skipped" in capsys.readouterr().out
@@ -0,0 +1,104 @@
+"""Lead query layer: keyset pages on (lead_score, id), SQL-side filters and
+the streaming iterators the CSV exporters use."""
+import importlib
+import os
+import sys
+
+import pytest
+
+
+@pytest.fixture
+def database(tmp_path):
+    os.environ["DB_PATH"] = str(tmp_path / "leads.db")
+    for mod in ("app.config", "app.database"):
+        if mod in sys.modules:
+            importlib.reload(sys.modules[mod])
+    db = importlib.import_module("app.database")
+    db.init_db()
+    return db
+
+
+def _seed(db, n=25):
+    leads = [
+        {
+            "npi": str(2000 + i),
+            "organization_name": f"Lab {i}",
+            "state": "FL" if i % 2 else "TX",
+            "lead_score": i % 5 * 10,
+            "tags": "tier-A" if i % 3 == 0 else "tier-B",
+        }
+        for i in range(n)
+    ]
+    db.save_leads_bulk(leads)
+    return leads
+
+
+def test_keyset_pages_cover_every_row_once_in_order(database):
+    _seed(database)
+    seen, cursor = [], None
+    while True:
+        page = database.query_saved_leads(cursor=cursor, limit=7)
+        seen.extend(page["rows"])
+        cursor = page["next_cursor"]
+        if not cursor:
+            break
+
+    assert len(seen) == 25
+    assert len({r["npi"] for r in seen}) == 25
+    keys = [(r["lead_score"], r["id"]) for r in seen]
+    assert keys == sorted(keys, reverse=True)
+
+
+def test_filters_apply_in_sql(database):
+    _seed(database)
+    fl = database.query_saved_leads(state="fl", min_score=30, limit=100)["rows"]
+    assert fl and all(r["state"] == "FL" and r["lead_score"] >= 30 for r in fl)
+
+    tier_a = list(database.iter_saved_leads(tier="A", batch_size=4))
+    assert {r["npi"] for r in tier_a} == {str(2000 + i) for i in range(25) if i % 3 == 0}
+
+    database.save_enrichment("2001", {"service_needs": {"services_needed": ["Denial Management"], "overall_score": 70}})
+    svc = database.query_saved_leads(service="Denial", limit=10)["rows"]
+    assert [r["npi"] for r in svc] == ["2001"]
+    assert svc[0]["services_wanted"] == ["Denial Management"]
+
+
+def test_verdict_filter_joins_verifications(database):
+    _seed(database, n=3)
+    database.save_lead_emails_bulk([
+        ("2000", [{"email": "jane.doe@lab0.com", "confidence": 95, "verified": True, "source": "hunter.io"}]),
+        ("2001", [{"email": "john.roe@lab1.com", "confidence": 95, "verified": True, "source": "hunter.io"}]),
+    ])
+    database.save_email_verifications([
+        {"email": "jane.doe@lab0.com", "verdict": "valid", "score": 95},
+        {"email": "john.roe@lab1.com", "verdict": "risky", "score": 40},
+    ])
+    rows = database.query_saved_leads(verdict="valid")["rows"]
+    assert [r["npi"] for r in rows] == ["2000"]
+    assert rows[0]["emails"] == "jane.doe@lab0.com"
+
+
+def test_bad_cursor_rejected(database):
+    with pytest.raises(ValueError):
+        database.query_saved_leads(cursor="nope")
+
+
+def test_enrichment_pages_and_lead_email_stream(database):
+    _seed(database, n=6)
+    for i in range(6):
+        database.save_enrichment(
+            str(2000 + i),
+            {"service_needs": {"overall_score": i * 10, "priority": "high" if i > 3 else "low"}},
+        )
+    first = database.query_enrichments(limit=4)
+    rest = database.query_enrichments(cursor=first["next_cursor"], limit=4)
+    assert [r["overall_score"] for r in first["rows"] + rest["rows"]] == [50, 40, 30, 20, 10, 0]
+    assert rest["next_cursor"] is None
+    assert [r["npi"] for r in database.iter_enrichments(priority="high", batch_size=1)] == ["2005", "2004"]
+
+    database.save_lead_emails_bulk([
+        ("2003", [{"email": "amy.lee@lab3.com", "confidence": 90, "verified": True, "source": "hunter.io"}]),
+        ("2002", [{"email": "bo.kim@lab2.com", "confidence": 85, "verified": True, "source": "hunter.io"}]),
+    ])
+    streamed = list(database.iter_lead_email_candidates(batch_size=1))
+    assert [r["npi"] for r in streamed] == ["2002", "2003"]
@@ -0,0 +1,237 @@
+"""Outbound mail spool: queued report mail drained by a worker pool over
+reused SMTP sessions / one keep-alive SendGrid client, with dedupe keys,
+retry + backoff and EOD delivery status written back to the archive —
+exercised against a local SMTP stand-in."""
+import base64
+import importlib
+import json
+import os
+import socketserver
+import sys
+import threading
+
+import httpx
+import pytest
+
+
+class _SmtpStandIn(socketserver.ThreadingTCPServer):
+    """Blocking SMTP server: accepts AUTH, bounces ``bounce@`` with 550 and
+    greylists ``flaky@`` (451) on its first RCPT."""
+
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), _SmtpHandler)
+        self.sessions = 0
+        self.logins = 0
+        self.delivered = []
+        self.greylisted = set()
+        self.lock = threading.Lock()
+
+
+class _SmtpHandler(socketserver.StreamRequestHandler):
+    def _say(self, line):
+        self.wfile.write(line.encode() + b"\r\n")
+
+    def handle(self):
+        srv = self.server
+        with srv.lock:
+            srv.sessions += 1
+        self._say("220 standin ESMTP")
+        rcpts = []
+        while True:
+            line = self.rfile.readline()
+            if not line:
+                return
+            cmd = line.decode().strip()
+            up = cmd.upper()
+            if up.startswith(("EHLO", "HELO")):
+                self.wfile.write(b"250-standin\r\n250-AUTH PLAIN LOGIN\r\n250 8BITMIME\r\n")
+            elif up.startswith("AUTH"):
+                with srv.lock:
+                    srv.logins += 1
+                self._say("235 ok")
+            elif up.startswith("MAIL FROM"):
+                rcpts = []
+                self._say("250 ok")
+            elif up.startswith("RCPT TO"):
+                addr = cmd[cmd.index("<") + 1:cmd.index(">")].lower()
+                if addr.startswith("bounce@"):
+                    self._say("550 no such user")
+                elif addr.startswith("flaky@") and addr not in srv.greylisted:
+                    srv.greylisted.add(addr)
+                    self._say("451 try later")
+                else:
+                    rcpts.append(addr)
+                    self._say("250 ok")
+            elif up == "DATA":
+                self._say("354 go")
+                data = []
+                while True:
+                    chunk = self.rfile.readline()
+                    if chunk in (b".\r\n", b""):
+                        break
+                    data.append(chunk)
+                with srv.lock:
+                    srv.delivered.append((list(rcpts), b"".join(data).decode()))
+                self._say("250 queued")
+            elif up.startswith(("RSET", "NOOP")):
+                self._say("250 ok")
+            elif up.startswith("QUIT"):
+                self._say("221 bye")
+                return
+            else:
+                self._say("502 unsupported")
+
+
+@pytest.fixture
+def smtp_server():
+    server = _SmtpStandIn()
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def spool(tmp_path, monkeypatch, smtp_server):
+    os.environ["DB_PATH"] = str(tmp_path / "hub.db")
+    for mod in ("app.config", "app.client_db", "app.mail_spool", "app.notifications"):
+        if mod in sys.modules:
+            importlib.reload(sys.modules[mod])
+    db = importlib.import_module("app.client_db")
+    db._CLIENTS_SEED_PATH = str(tmp_path / "clients_seed.json")
+    db.init_client_hub_db()
+    ms = importlib.import_module("app.mail_spool")
+    monkeypatch.setattr(ms, "BACKOFF_SECONDS", 0.05)
+    ms.cfg = {
+        "SENDGRID_API_KEY": "", "SENDGRID_FROM": "hub@example.com",
+        "SMTP_HOST": "127.0.0.1", "SMTP_PORT": smtp_server.server_address[1],
+        "SMTP_USER": "hub@example.com", "SMTP_PASS": "secret",
+    }
+    ms.db = db
+    return ms
+
+
+def test_drain_reuses_one_smtp_session_per_worker(spool, smtp_server):
+    xlsx = b"PK\x03\x04fake-xlsx"
+    ids = [
+        spool.enqueue(f"user{i}@example.com", f"Report {i}", "plain", "<b>html</b>",
+                      attachments=[{"filename": "r.xlsx", "content": xlsx, "mime": "application/vnd.ms-excel"}])
+        for i in range(8)
+    ]
+    rows = spool.drain(ids, workers=2, cfg=spool.cfg)
+
+    assert [r["status"] for r in rows] == ["sent"] * 8
+    assert {r["via"] for r in rows} == {"smtp"}
+    assert len(smtp_server.delivered) == 8
+    assert smtp_server.sessions <= 2 and smtp_server.logins == smtp_server.sessions
+    assert base64.b64encode(xlsx).decode() in smtp_server.delivered[0][1]
+
+
+def test_dedupe_key_blocks_resend_unless_requeued(spool, smtp_server):
+    key = "eod_report:2026-10-19:lexi@example.com"
+    first = spool.enqueue("lexi@example.com", "EOD", "body", dedupe_key=key)
+    assert spool.enqueue("lexi@example.com", "EOD", "body", dedupe_key=key) == first
+    spool.drain([first], cfg=spool.cfg)
+
+    # A second scheduler fire for the same day is a no-op ...
+    again = spool.enqueue("lexi@example.com", "EOD", "body", dedupe_key=key)
+    assert spool.drain([again], cfg=spool.cfg)[0]["attempts"] == 1
+    assert len(smtp_server.delivered) == 1
+
+    # ... while a manual (force) resend goes out again.
+    spool.enqueue("lexi@example.com", "EOD v2", "body", dedupe_key=key, requeue=True)
+    assert spool.drain([first], cfg=spool.cfg)[0]["status"] == "sent"
+    assert len(smtp_server.delivered) == 2
+
+
+def test_transient_failures_retry_and_permanent_fail_fast(spool, smtp_server):
+    flaky = spool.enqueue("flaky@example.com", "s", "b")
+    bounce = spool.enqueue("bounce@example.com", "s", "b")
+    rows = {r["recipient"]: r for r in spool.drain([flaky, bounce], wait_seconds=5, cfg=spool.cfg)}
+
+    assert rows["flaky@example.com"]["status"] == "sent"
+    assert rows["flaky@example.com"]["attempts"] == 2
+    assert rows["bounce@example.com"]["status"] == "failed"
+    assert rows["bounce@example.com"]["attempts"] == 1
+
+
+def test_no_provider_fails_without_retry(spool):
+    mid = spool.enqueue("lexi@example.com", "s", "b")
+    cfg = dict(spool.cfg, SMTP_USER="", SMTP_PASS="")
+    row = spool.drain([mid], wait_seconds=5, cfg=cfg)[0]
+    assert row["status"] == "failed" and row["attempts"] == 1
+    assert spool.delivery_status([row]) == "no_provider"
+
+
+def test_eod_status_written_back_to_archive(spool, smtp_server):
+    archive_id = spool.db.save_eod_report("2026-10-19", {}, {}, email_status="pending")
+    ids = [
+        spool.enqueue(addr, "EOD", "b", kind="eod_report", ref_id=archive_id,
+                      dedupe_key=f"eod_report:2026-10-19:{addr}")
+        for addr in ("lexi@example.com", "bounce@example.com")
+    ]
+    spool.drain(ids, cfg=spool.cfg)
+    saved = spool.db.get_eod_report(archive_id)
+    assert saved["email_status"] == "partial"
+    assert saved["email_recipients"] == "lexi@example.com"
+
+
+def test_send_eod_team_report_goes_through_spool(spool, smtp_server, monkeypatch):
+    monkeypatch.setenv("SENDGRID_API_KEY", "")
+    monkeypatch.setenv("SMTP_HOST", "127.0.0.1")
+    monkeypatch.setenv("SMTP_PORT", str(smtp_server.server_address[1]))
+    monkeypatch.setenv("SMTP_USER", "hub@example.com")
+    monkeypatch.setenv("SMTP_PASS", "secret")
+    monkeypatch.setenv("EOD_REPORT_EMAIL", "lexi@example.com,eric@example.com")
+    nt = importlib.import_module("app.notifications")
+    monkeypatch.setattr(nt, "SENDGRID_API_KEY", "")
+
+    out = nt.send_eod_team_report(force=True)
+    assert {s["email"] for s in out["sent"]} == {"lexi@example.com", "eric@example.com"}
+    assert spool.db.get_eod_report(out["archive_id"])["email_status"] == "delivered"
+    assert smtp_server.sessions <= spool.WORKERS
+
+
+def test_sendgrid_uses_one_keepalive_client(spool, monkeypatch):
+    seen = []
+
+    def handler(request):
+        seen.append(json.loads(request.content))
+        return httpx.Response(202)
+
+    monkeypatch.setattr(spool, "_http", httpx.Client(transport=httpx.MockTransport(handler)))
+    cfg = dict(spool.cfg, SENDGRID_API_KEY="SG.test")
+    ids = [spool.enqueue(f"u{i}@example.com", "s", "b",
+                         attachments=[{"filename": "a.xlsx", "content": b"xyz"}]) for i in range(3)]
+    rows = spool.drain(ids, workers=3, cfg=cfg)
+
+    assert [r["via"] for r in rows] == ["sendgrid"] * 3
+    assert len(seen) == 3
+    assert seen[0]["attachments"][0]["content"] == base64.b64encode(b"xyz").decode()
+
+
+def test_purge_uses_utc_and_retrying_rows_report_pending(spool):
+    old = spool.enqueue("old@example.com", "s", "b")
+    recent = spool.enqueue("recent@example.com", "s", "b")
+    conn = spool.db.get_db()
+    conn.execute("UPDATE outbound_mail SET status='sent', created_at=datetime('now', '-31 days') WHERE id=?", (old,))
+    # Settled 29.9 days ago in UTC - inside retention whatever the local offset.
+    conn.execute("UPDATE outbound_mail SET status='sent', created_at=datetime('now', '-29.9 days') WHERE id=?",
+                 (recent,))
+    conn.commit()
+    conn.close()
+    assert spool.purge() == 1
+
+    nt = importlib.import_module("app.notifications")
+    msg = {"report": {"company": "Lab", "report_date": "2026-10-19"}, "recipients": ["a@x", "b@x", "c@x"],
+           "attachments": []}
+    rows = [{"recipient": "a@x", "status": "sent", "via": "smtp", "last_error": ""},
+            {"recipient": "b@x", "status": "queued", "via": "", "last_error": "451 try later"},
+            {"recipient": "c@x", "status": "failed", "via": "", "last_error": "550 no such user"}]
+    out = nt._client_report_delivery(1, msg, rows)
+    assert [p["email"] for p in out["pending"]] == ["b@x"]
+    assert [f["email"] for f in out["failed"]] == ["c@x"]
@@ -0,0 +1,86 @@
+"""Report artifact cache: the client PDF is rendered once per client data
+version and served from disk until that client's rows change; the cache
+directory is held under its size cap by evicting the least recently used."""
+import importlib
+import os
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+
+@pytest.fixture
+def hub_env(tmp_path, monkeypatch):
+    os.environ["DB_PATH"] = str(tmp_path / "hub.db")
+    monkeypatch.setenv("REPORT_CACHE_DIR", str(tmp_path / "report_cache"))
+    for mod in ("app.config", "app.client_db", "app.report_cache", "app.client_routes"):
+        if mod in sys.modules:
+            importlib.reload(sys.modules[mod])
+    client_db = importlib.reload(importlib.import_module("app.client_db"))
+    client_db._CLIENTS_SEED_PATH = str(tmp_path / "clients_seed.json")
+    Path(client_db._CLIENTS_SEED_PATH).write_text("[]\n", encoding="utf-8")
+    client_db.init_client_hub_db()
+    cache = importlib.reload(importlib.import_module("app.report_cache"))
+    client_routes = importlib.reload(importlib.import_module("app.client_routes"))
+    return client_db, cache, client_routes
+
+
+def _client(db, username):
+    return db.create_client({
+        "username": username, "password": "labpass123", "company": f"Lab {username}",
+        "contact_name": f"Lab {username}", "email": f"{username}@example.com",
+        "phone": "555-9", "role": "client",
+    })
+
+
+def test_client_versions_follow_that_clients_writes(hub_env):
+    db, _, _ = hub_env
+    a, b = _client(db, "rca"), _client(db, "rcb")
+    before = db.get_client_data_versions(a)
+    claim_id = db.create_claim({"client_id": b, "ClaimKey": "B-1", "ChargeAmount": 10})
+    assert db.get_client_data_versions(a) == before
+
+    conn = db.get_db()
+    conn.execute("UPDATE claims_master SET client_id=? WHERE id=?", (a, claim_id))
+    conn.commit()
+    conn.close()
+    after = db.get_client_data_versions(a)
+    assert after["claims_master"] == before["claims_master"] + 1
+    assert db.get_client_data_versions(b)["claims_master"] == 2   # insert, then moved away
+
+
+def test_pdf_rendered_once_per_data_version(hub_env, monkeypatch):
+    db, cache, routes = hub_env
+    a, b = _client(db, "rcc"), _client(db, "rcd")
+    db.create_claim({"client_id": a, "ClaimKey": "A-1", "ChargeAmount": 100, "ClaimStatus": "Open"})
+    renders = []
+    real = routes._render_report_pdf
+    monkeypatch.setattr(routes, "_render_report_pdf",
+                        lambda *a, **k: renders.append(1) or real(*a, **k))
+
+    company, first = routes._report_pdf_artifact(a, "all", None, None)
+    assert company == "Lab rcc" and first.startswith(b"%PDF")
+    assert routes._report_pdf_artifact(a, "all", None, None)[1] == first
+    assert len(renders) == 1
+
+    db.create_claim({"client_id": b, "ClaimKey": "B-1", "ChargeAmount": 5})
+    routes._report_pdf_artifact(a, "all", None, None)
+    assert len(renders) == 1                      # another client's write
+
+    db.create_claim({"client_id": a, "ClaimKey": "A-2", "ChargeAmount": 5})
+    routes._report_pdf_artifact(a, "all", None, None)
+    routes._report_pdf_artifact(a, "mtd", None, "Narrative text")
+    assert len(renders) == 3
+
+
+def test_lru_eviction_keeps_recently_served(hub_env):
+    _, cache, _ = hub_env
+    for i, key in enumerate(("old", "mid", "new")):
+        cache.put_artifact(key, b"x" * 100)
+        os.utime(os.path.join(cache.cache_dir(), key), (time.time() - 100 + i, time.time() - 100 + i))
+    assert cache.get_artifact("old") == b"x" * 100   # served: now most recent
+
+    assert cache.evict(max_bytes=200) == ["mid"]
+    assert cache.get_artifact("mid") is None
+    assert cache.get_artifact("old") and cache.get_artifact("new")
@@ -0,0 +1,116 @@
+"""Dashboard-family results are cached in process and served until a write
+to a table they read bumps its trigger-maintained counter - per client for a
+scoped view, globally for the all-clients view."""
+import importlib
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+
+@pytest.fixture
+def hub_env(tmp_path):
+    os.environ["DB_PATH"] = str(tmp_path / "hub.db")
+    for mod in ("app.config", "app.client_db", "app.response_cache", "app.client_routes", "app.hub_app"):
+        if mod in sys.modules:
+            importlib.reload(sys.modules[mod])
+    client_db = importlib.reload(importlib.import_module("app.client_db"))
+    client_db._CLIENTS_SEED_PATH = str(tmp_path / "clients_seed.json")
+    Path(client_db._CLIENTS_SEED_PATH).write_text("[]\n", encoding="utf-8")
+    client_db.init_client_hub_db()
+    rc = importlib.reload(importlib.import_module("app.response_cache"))
+    routes = importlib.reload(importlib.import_module("app.client_routes"))
+    hub = importlib.reload(importlib.import_module("app.hub_app"))
+    ids = [client_db.create_client({
+        "username": name, "password": f"{name}pass123", "company": f"Lab {name}",
+        "contact_name": name, "email": f"{name}@example.com", "phone": "1", "role": "client"})
+        for name in ("rclaba", "rclabb")]
+    return client_db, rc, routes, hub, ids
+
+
+def test_dashboard_cached_until_a_write_to_its_scope(hub_env, monkeypatch):
+    from fastapi.testclient import TestClient
+    db, rc, routes, hub, (a, b) = hub_env
+    db.create_claim({"client_id": a, "ClaimKey": "RC-1", "ChargeAmount": 100, "ClaimStatus": "Denied"})
+    calls = []
+    real = routes.get_dashboard
+    monkeypatch.setattr(routes, "get_dashboard", lambda *a_, **k: calls.append(a_[0]) or real(*a_, **k))
+
+    with TestClient(hub.app) as tc:
+        assert tc.post("/hub/api/login", json={"username": "admin", "password": "admin123"}).status_code == 200
+        first = tc.get(f"/hub/api/dashboard/client/{a}")
+        assert first.status_code == 200
+        assert "no-store" in first.headers["cache-control"]
+        again = tc.get(f"/hub/api/dashboard/client/{a}").json()
+        assert again == first.json() and calls == [a]
+
+        tc.get("/hub/api/dashboard")                       # all clients: its own entry
+        tc.get("/hub/api/dashboard")
+        assert calls == [a, None]
+
+        db.create_claim({"client_id": b, "ClaimKey": "RC-2", "ChargeAmount": 5})
+        tc.get(f"/hub/api/dashboard/client/{a}")           # other client's write: still a hit
+        tc.get("/hub/api/dashboard")                       # ...but the global view recomputes
+        assert calls == [a, None, None]
+
+        db.create_payment({"client_id": a, "ClaimKey": "RC-1", "PaymentAmount": 40})
+        tc.get(f"/hub/api/dashboard/client/{a}")
+        assert calls == [a, None, None, a]
+    stats = rc.response_cache_stats()
+    assert stats["hits"] >= 3 and stats["stale"] >= 2
+
+
+def test_alerts_and_report_invalidate_and_copy(hub_env, monkeypatch):
+    db, rc, routes, hub, (a, b) = hub_env
+    computed = []
+
+    def compute():
+        computed.append(1)
+        return {"rows": [1, 2]}
+
+    first = rc.result("report", {"client_id": a}, compute, client_id=a)
+    first["rows"].append(3)                                # callers own their copy
+    assert rc.result("report", {"client_id": a}, compute, client_id=a) == {"rows": [1, 2]}
+    assert len(computed) == 1
+
+    db.create_credentialing({"client_id": a, "ProviderName": "Dr A", "Payor": "Aetna",
+                             "FollowUpDate": "2020-01-01", "Status": "Submitted"})
+    assert rc.result("report", {"client_id": a}, compute, client_id=a) == {"rows": [1, 2]}
+    assert len(computed) == 2
+
+    alerts = rc.result("alerts", {"scope": a}, lambda: db.get_alerts(a), client_id=a,
+                       tables=("credentialing", "enrollment"))
+    assert any("Overdue Credentialing" in x["title"] for x in alerts)
+    monkeypatch.setattr(rc, "ENABLED", False)
+    assert rc.result("report", {"client_id": a}, compute, client_id=a) == {"rows": [1, 2]}
+    assert len(computed) == 3
+
+
+def test_cached_computes_read_only_tagged_tables(hub_env, monkeypatch):
+    """An untagged table read inside a cached compute (say audit_log for an
+    "actions today" count) would be served stale until an unrelated write."""
+    import re
+    db, rc, routes, hub, (a, b) = hub_env
+    db.create_claim({"client_id": a, "ClaimKey": "RC-T", "ChargeAmount": 10, "ClaimStatus": "Denied"})
+    db.log_audit(a, "admin", "create", "claim", 1, "")
+    read = set()
+    real_get_db = db.get_db
+
+    def traced_get_db():
+        conn = real_get_db()
+        conn.set_trace_callback(
+            lambda sql: read.update(t.lower() for t in re.findall(r"(?i)\b(?:FROM|JOIN)\s+(\w+)", sql)))
+        return conn
+
+    monkeypatch.setattr(db, "get_db", traced_get_db)
+    computes = [
+        (lambda: db.get_dashboard(a), rc.DASHBOARD_TABLES),
+        (lambda: db.get_dashboard(None), rc.DASHBOARD_TABLES),
+        (lambda: routes._build_report(a, "all", None), rc.DASHBOARD_TABLES),
+        (lambda: db.get_alerts(a), ("credentialing", "enrollment")),
+    ]
+    for compute, tables in computes:
+        read.clear()
+        compute()
+        assert read and read <= set(tables), read - set(tables)
@@ -0,0 +1,97 @@
+"""Startup repair registry: schema script and one-shot migrations run once,
+data repairs re-run only when a watched table's write counter moved, and
+every step is timed for /readyz."""
+import importlib
+import os
+import sys
+
+import pytest
+
+
+@pytest.fixture
+def env(tmp_path):
+    os.environ["DB_PATH"] = str(tmp_path / "hub.db")
+    for mod in ("app.config", "app.client_db", "app.startup_repairs"):
+        if mod in sys.modules:
+            importlib.reload(sys.modules[mod])
+    db = importlib.import_module("app.client_db")
+    db._CLIENTS_SEED_PATH = str(tmp_path / "clients_seed.json")
+    db.init_client_hub_db()
+    sr = importlib.import_module("app.startup_repairs")
+    sr.STARTUP_STEPS.clear()
+    return db, sr
+
+
+def _statuses(steps):
+    return {s["name"]: s["status"] for s in steps}
+
+
+def test_data_versions_count_writes(env):
+    db, _ = env
+    before = db.get_data_versions(["claims_master"])["claims_master"]
+    cid = db.create_client({"username": "labdv", "password": "labpass123", "company": "Lab",
+                            "contact_name": "Lab", "email": "l@example.com", "phone": "1",
+                            "role": "client"})
+    claim = db.create_claim({"client_id": cid, "ClaimKey": "DV-1", "ChargeAmount": 5})
+    db.update_claim(claim, {"Owner": "susan"})
+    assert db.get_data_versions(["claims_master"])["claims_master"] == before + 2
+
+
+def test_repairs_skip_until_watched_table_changes(env):
+    db, sr = env
+    first = _statuses(sr.run_startup_repairs())
+    assert set(first.values()) == {"ran"}
+
+    again = _statuses(sr.run_startup_repairs())
+    assert set(again.values()) == {"skipped"}
+
+    cid = db.create_client({"username": "labrp", "password": "labpass123", "company": "Lab",
+                            "contact_name": "Lab", "email": "l@example.com", "phone": "1",
+                            "role": "client"})
+    db.create_claim({"client_id": cid, "ClaimKey": "250825SV014U", "ChargeAmount": 5,
+                     "ClaimStatus": "Billed/Submitted"})
+    third = sr.run_startup_repairs()
+    by_name = {s["name"]: s for s in third}
+    assert by_name["backfill_dos_from_claim_key"]["status"] == "ran"
+    assert by_name["backfill_dos_from_claim_key"]["result"] == 1
+    assert by_name["auto_import_pending_claim_files"]["status"] == "skipped"
+    assert all("seconds" in s for s in third)
+
+
+def test_force_and_version_bump_rerun(env, monkeypatch):
+    db, sr = env
+    sr.run_startup_repairs()
+    assert set(_statuses(sr.run_startup_repairs(force=True)).values()) == {"ran"}
+
+    bumped = [(n, v + 1 if n == "normalize_claim_statuses" else v, w, f, s)
+              for n, v, w, f, s in sr._repairs()]
+    monkeypatch.setattr(sr, "_repairs", lambda: bumped)
+    steps = _statuses(sr.run_startup_repairs())
+    assert steps["normalize_claim_statuses"] == "ran"
+    assert steps["dedupe_resubmitted_claims"] == "skipped"
+
+
+def test_failing_repair_is_recorded_and_others_run(env, monkeypatch):
+    db, sr = env
+
+    def boom():
+        raise RuntimeError("disk gone")
+
+    repairs = [("broken", 1, ("claims_master",), boom, "{}")] + list(sr._repairs())
+    monkeypatch.setattr(sr, "_repairs", lambda: repairs)
+    steps = sr.run_startup_repairs()
+    assert steps[0]["status"] == "failed" and "disk gone" in steps[0]["error"]
+    assert len(steps) == len(repairs)
+    assert sr.startup_report()["steps"][0]["name"] == "broken"
+
+
+def test_schema_script_runs_once(env):
+    db, _ = env
+    conn = db.get_db()
+    keys = [r[0] for r in conn.execute("SELECT key FROM app_migrations WHERE key LIKE 'schema_%'")]
+    conn.close()
+    assert len(keys) == 1
+    db.init_client_hub_db()
+    conn = db.get_db()
+    assert conn.execute("SELECT COUNT(*) FROM app_migrations WHERE key LIKE 'schema_%'").fetchone()[0] == 1
+    conn.close()
@@ -0,0 +1,123 @@
+"""Parse-once workbook: an upload is parsed a single time no matter how many
+classifiers and importers read it, the sweep jobs reuse that parse by file
+hash, and the shared rows keep the smart-header semantics of each format."""
+import importlib
+import io
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+
+@pytest.fixture
+def hub_env(tmp_path, monkeypatch):
+    os.environ["DB_PATH"] = str(tmp_path / "hub.db")
+    for mod in ("app.config", "app.client_db", "app.workbook", "app.client_routes", "app.hub_app"):
+        if mod in sys.modules:
+            importlib.reload(sys.modules[mod])
+    client_db = importlib.reload(importlib.import_module("app.client_db"))
+    client_db._CLIENTS_SEED_PATH = str(tmp_path / "clients_seed.json")
+    Path(client_db._CLIENTS_SEED_PATH).write_text("[]\n", encoding="utf-8")
+    client_db.init_client_hub_db()
+    workbook = importlib.reload(importlib.import_module("app.workbook"))
+    client_routes = importlib.reload(importlib.import_module("app.client_routes"))
+    (tmp_path / "uploads").mkdir()
+    monkeypatch.setattr(client_routes, "UPLOAD_DIR", str(tmp_path / "uploads"))
+    return client_db, workbook, client_routes
+
+
+def _xlsx(sheets):
+    import openpyxl
+    wb = openpyxl.Workbook()
+    wb.remove(wb.active)
+    for name, rows in sheets:
+        ws = wb.create_sheet(name)
+        for r in rows:
+            ws.append(r)
+    buf = io.BytesIO()
+    wb.save(buf)
+    return buf.getvalue()
+
+
+HEADER = ["Claim #", "Patient Name", "DOS", "CPT Code", "Payor", "Charge Amount", "Claim Status"]
+
+
+def _claims_workbook():
+    return _xlsx([
+        ("Jan", [["January worklist"], HEADER,
+                 ["WB-1", "Doe, Jane", "2026-01-05", "99213", "Aetna", 120, "Billed"],
+                 ["WB-2", "Roe, Rich", "2026-01-06", "99214", "Cigna", 180, "Billed"]]),
+        ("Feb", [HEADER, ["WB-3", "Poe, Ed", "2026-02-02", "99213", "Aetna", 90, "Denied"]]),
+        ("Notes", [["Owner", "Note", "When"], ["susan", "call payer", "today"]]),
+    ])
+
+
+def test_rows_combine_matching_sheets(hub_env):
+    _, workbook, routes = hub_env
+    content = _claims_workbook()
+    combined = routes._parse_excel_rows(content, ".xlsx")
+    assert [r["Claim #"] for r in combined] == ["WB-1", "WB-2", "WB-3"]
+    assert [r["Claim #"] for r in routes._parse_excel_rows(content, ".xlsx", combine_sheets=False)] == ["WB-1", "WB-2"]
+
+    combined[0]["Claim #"] = "changed"          # callers get their own dicts
+    assert routes._parse_excel_rows(content, ".xlsx")[0]["Claim #"] == "WB-1"
+
+    wb = workbook.parse_workbook(content, ".xlsx")
+    assert [s.name for s in wb.sheets] == ["Jan", "Feb", "Notes"]
+    assert wb.sheets[0].header_index == 1 and wb.sheets[0].headers == HEADER
+    assert workbook.workbook_stats()["parses"] == 1
+
+
+def test_csv_header_detection_and_cache_eviction(hub_env, monkeypatch):
+    _, workbook, routes = hub_env
+    content = "Report;;\nClaim #;Patient;Charge\nC-1;Doe;10\n;;\n".encode("utf-8-sig")
+    assert routes._parse_excel_rows(content, ".csv") == [{"Claim #": "C-1", "Patient": "Doe", "Charge": "10"}]
+
+    monkeypatch.setattr(workbook, "CACHE_SIZE", 2)
+    for i in range(3):
+        workbook.parse_workbook(f"a,b\n{i},x\n".encode(), ".csv")
+    assert workbook.workbook_stats()["cached"] == 2
+    before = workbook.STATS["parses"]
+    workbook.parse_workbook(content, ".csv")      # evicted: parsed again
+    assert workbook.STATS["parses"] == before + 1
+
+
+def test_cache_budget_counts_parsed_memory(hub_env, monkeypatch):
+    _, workbook, routes = hub_env
+    big = "".join(f"C-{i},Patient {i},{i}.50,Aetna PPO\n" for i in range(5000)).encode()
+    wb = workbook.parse_workbook(big, ".csv")
+    assert wb.footprint > 4 * len(big)            # the matrix, not the source bytes
+    wb.rows()
+    assert not hasattr(wb, "_rows")               # row dicts are rebuilt, not kept
+
+    monkeypatch.setattr(workbook, "CACHE_MAX_BYTES", wb.footprint + 1)
+    workbook.parse_workbook(big.replace(b"Aetna", b"Cigna"), ".csv")
+    assert workbook.workbook_stats()["cached"] == 1   # over budget: the older one goes
+
+
+def test_upload_and_sweep_share_one_parse(hub_env):
+    client_db, workbook, routes = hub_env
+    from fastapi.testclient import TestClient
+    hub = importlib.reload(importlib.import_module("app.hub_app"))
+    tc = TestClient(hub.app)
+    with tc:
+        cid = client_db.create_client({
+            "username": "wblab", "password": "wblabpass123", "company": "WB Lab",
+            "contact_name": "WB", "email": "wb@example.com", "phone": "1", "role": "client"})
+        assert tc.post("/hub/api/login", json={"username": "admin", "password": "admin123"}).status_code == 200
+        content = _claims_workbook()
+        before = workbook.STATS["parses"]
+        r = tc.post("/hub/api/files/upload",
+                    files={"file": ("daily.xlsx", content,
+                                    "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet")},
+                    data={"category": "General", "client_id": str(cid)})
+        assert r.status_code == 200, r.text
+        body = r.json()
+        assert body["effective_category"] == "Claims" and body["imported"] == 3
+        assert body["row_count"] == 3
+        assert workbook.STATS["parses"] == before + 1
+
+        result = routes.reimport_all_claim_files()
+        assert result["total_rows_imported"] == 3
+        assert workbook.STATS["parses"] == before + 1